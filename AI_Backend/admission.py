@@ -0,0 +1,256 @@
+import asyncio
+import collections
+import math
+import time
+from contextlib import asynccontextmanager
+
+# Priority classes, highest first. A free slot goes to the highest class with a
+# waiter that may use it: a recruiter's single evaluation (interactive) is not
+# queued behind a bulk import, and bulk imports are not queued behind the
+# background re-scoring of a posting.
+PRIORITY_CLASSES = ("interactive", "bulk", "background")
+INTERACTIVE = "interactive"
+
+
+class Overloaded(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_tenant_weights(value: str) -> dict:
+    """"recruiter-a=2,recruiter-b=0.5" -> {"recruiter-a": 2.0, "recruiter-b": 0.5}."""
+    weights = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        tenant, _, weight = entry.rpartition("=")
+        if not tenant or float(weight) <= 0:
+            raise ValueError(f"Invalid tenant weight {entry!r}; expected tenant=positive number.")
+        weights[tenant] = float(weight)
+    return weights
+
+
+class _Waiter:
+    __slots__ = ("future", "tenant", "start_tag")
+
+    def __init__(self, future: asyncio.Future, tenant: str):
+        self.future = future
+        self.tenant = tenant
+        self.start_tag = 0.0
+
+
+class FairQueue:
+    """Waiters of one priority class, served in weighted fair order across tenants.
+
+    Start-time fair queuing with a unit cost per evaluation: a waiter is tagged
+    with max(virtual time, its tenant's previous finish tag), the finish tag
+    grows by 1/weight, and the smallest tag is served next. While tenants are
+    waiting, each gets slots in proportion to its weight, whatever the size of
+    its backlog; a tenant that was idle is not owed the slots it did not use.
+    """
+
+    def __init__(self, weights: dict):
+        self.weights = weights
+        self._tenants = {}
+        self._finish_tags = {}
+        self.virtual_time = 0.0
+        self.depth = 0
+
+    @property
+    def tenants_waiting(self) -> int:
+        return len(self._tenants)
+
+    def push(self, waiter: _Waiter):
+        tenant = waiter.tenant
+        waiter.start_tag = max(self.virtual_time, self._finish_tags.get(tenant, 0.0))
+        self._finish_tags[tenant] = waiter.start_tag + 1.0 / self.weights.get(tenant, 1.0)
+        self._tenants.setdefault(tenant, collections.deque()).append(waiter)
+        self.depth += 1
+
+    def pop(self) -> _Waiter:
+        tenant = min(self._tenants, key=lambda name: self._tenants[name][0].start_tag)
+        waiter = self._tenants[tenant].popleft()
+        if not self._tenants[tenant]:
+            del self._tenants[tenant]
+        self.depth -= 1
+        self.virtual_time = waiter.start_tag
+        # Finish tags of idle tenants at or behind the virtual time no longer matter.
+        for name in [name for name, tag in self._finish_tags.items()
+                     if name not in self._tenants and tag <= self.virtual_time]:
+            del self._finish_tags[name]
+        return waiter
+
+    def remove(self, waiter: _Waiter):
+        queue = self._tenants.get(waiter.tenant)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._tenants[waiter.tenant]
+        self.depth -= 1
+
+
+class AdmissionController:
+    """Bounds concurrent graph runs and the queue of runs waiting for a slot.
+
+    At most `max_in_flight` evaluations execute at once. Waiting runs are kept
+    per priority class (at most `max_queue[priority]` each) and served by
+    priority, then fairly across tenants. `reserved_interactive` of the slots
+    only ever go to interactive runs, so a bulk import cannot occupy all of
+    them. A request that finds its queue full, or that waits longer than
+    `max_wait` seconds, is shed with Overloaded so the caller can answer 503
+    immediately instead of letting work pile up against Groq.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int | dict, max_wait: float, reserved_interactive: int = 0,
+                 tenant_weights: dict | None = None):
+        self.max_in_flight = max_in_flight
+        if isinstance(max_queue, int):
+            max_queue = {priority: max_queue for priority in PRIORITY_CLASSES}
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        # At least one slot stays open to the lower classes.
+        self.reserved_interactive = max(0, min(reserved_interactive, max_in_flight - 1))
+        self.in_flight = 0
+        self._running = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._queues = {priority: FairQueue(tenant_weights or {}) for priority in PRIORITY_CLASSES}
+        self._wait_times = collections.deque(maxlen=512)
+        self._class_wait_times = {priority: collections.deque(maxlen=512) for priority in PRIORITY_CLASSES}
+        self._service_time = None
+        self._admitted = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._shed = dict.fromkeys(PRIORITY_CLASSES, 0)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(queue.depth for queue in self._queues.values())
+
+    @property
+    def admitted(self) -> int:
+        return sum(self._admitted.values())
+
+    @property
+    def shed(self) -> int:
+        return sum(self._shed.values())
+
+    def _slots_for(self, priority: str) -> int:
+        return self.max_in_flight if priority == INTERACTIVE else self.max_in_flight - self.reserved_interactive
+
+    def _can_start(self, priority: str) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        return priority == INTERACTIVE or self.in_flight - self._running[INTERACTIVE] < self._slots_for(priority)
+
+    def _ahead(self, priority: str) -> int:
+        """Waiters served before a new waiter of this class."""
+        rank = PRIORITY_CLASSES.index(priority)
+        return sum(self._queues[higher].depth for higher in PRIORITY_CLASSES[:rank + 1])
+
+    def retry_after(self, priority: str = INTERACTIVE) -> int:
+        """Rough seconds until a slot frees up, from the moving average service time.
+        """
+        service_time = self._service_time or 30.0
+        backlog = (self._ahead(priority) + 1) / max(self._slots_for(priority), 1)
+        return max(1, math.ceil(service_time * backlog))
+
+    def _start(self, priority: str):
+        self.in_flight += 1
+        self._running[priority] += 1
+
+    async def _acquire(self, priority: str, tenant: str, max_wait: float):
+        if self._can_start(priority) and not self._ahead(priority):
+            self._start(priority)
+            return
+        queue = self._queues[priority]
+        if queue.depth >= self.max_queue[priority]:
+            self._shed[priority] += 1
+            raise Overloaded(f"Evaluation queue ({priority}) is full.", self.retry_after(priority))
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tenant)
+        queue.push(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was handed over just as the wait expired; keep it.
+                return
+            self._drop_waiter(priority, waiter)
+            self._shed[priority] += 1
+            raise Overloaded("Timed out waiting for an evaluation slot.", self.retry_after(priority))
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release_slot(priority)
+            else:
+                self._drop_waiter(priority, waiter)
+            raise
+
+    def _drop_waiter(self, priority: str, waiter: _Waiter):
+        waiter.future.cancel()
+        self._queues[priority].remove(waiter)
+
+    def _release_slot(self, priority: str):
+        self.in_flight -= 1
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        # Hand free slots to live waiters, highest class first; in_flight counts them on hand-over.
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            while queue.depth and self._can_start(priority):
+                waiter = queue.pop()
+                if not waiter.future.done():
+                    self._start(priority)
+                    waiter.future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, timeout: float | None = None, priority: str = INTERACTIVE, tenant: str = ""):
+        """Holds an evaluation slot of the given priority class for a tenant; waits
+        at most min(max_wait, timeout) for one.
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITY_CLASSES)}.")
+        max_wait = self.max_wait if timeout is None else max(0.0, min(self.max_wait, timeout))
+        queued_at = time.monotonic()
+        await self._acquire(priority, tenant, max_wait)
+        started_at = time.monotonic()
+        self._wait_times.append(started_at - queued_at)
+        self._class_wait_times[priority].append(started_at - queued_at)
+        self._admitted[priority] += 1
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started_at
+            self._service_time = elapsed if self._service_time is None else 0.8 * self._service_time + 0.2 * elapsed
+            self._release_slot(priority)
+
+    @staticmethod
+    def _wait_stats(wait_times) -> dict:
+        waits = sorted(wait_times)
+        return {
+            "wait_seconds_p50": round(waits[len(waits) // 2], 3) if waits else 0.0,
+            "wait_seconds_p95": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+            "wait_seconds_max": round(waits[-1], 3) if waits else 0.0,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "reserved_interactive": self.reserved_interactive,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            **self._wait_stats(self._wait_times),
+            "avg_service_seconds": round(self._service_time or 0.0, 3),
+            "classes": {
+                priority: {
+                    "max_queue": self.max_queue[priority],
+                    "in_flight": self._running[priority],
+                    "queue_depth": self._queues[priority].depth,
+                    "tenants_waiting": self._queues[priority].tenants_waiting,
+                    "admitted": self._admitted[priority],
+                    "shed": self._shed[priority],
+                    **self._wait_stats(self._class_wait_times[priority]),
+                }
+                for priority in PRIORITY_CLASSES
+            },
+        }
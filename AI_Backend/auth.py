@@ -0,0 +1,11 @@
+import os
+import secrets
+
+# Token for the admin endpoints (profiles, memory, candidate search) and for
+# the expensive profiler capture modes, sent as X-Admin-Token. Without
+# ADMIN_TOKEN they are disabled: a deployment that forgot it is closed, not open.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def admin_token_valid(token: str | None) -> bool:
+    return bool(ADMIN_TOKEN) and secrets.compare_digest((token or "").encode(), ADMIN_TOKEN.encode())
@@ -0,0 +1,100 @@
+"""Measures how many bytes the checkpointer serializes for one evaluation.
+
+Compares the in-memory saver with the durable SQLite saver (compressed values,
+one transaction per put or put_writes call, not batched across calls) and reports the SQLite write time.
+Run from AI_Backend/:
+    python -m benchmarks.checkpoint_size
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+# Every stage must really run; stored node outputs would short-circuit it.
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, install_fake_llm
+from checkpoints import SqliteCheckpointSaver
+from graph import workflow
+from main import build_initial_state, release_initial_state
+
+RESUME_REPEATS = (1, 4, 16)
+
+
+class TimedSqliteSaver(SqliteCheckpointSaver):
+    """Accumulates the time spent in checkpoint transactions."""
+
+    write_seconds = 0.0
+
+    def _transaction(self, statements: list):
+        started = time.perf_counter()
+        super()._transaction(statements)
+        self.write_seconds += time.perf_counter() - started
+
+
+def memory_bytes(saver: MemorySaver, thread_id: str) -> dict:
+    checkpoints = sum(
+        len(checkpoint[1]) + len(metadata[1])
+        for namespace in saver.storage.get(thread_id, {}).values()
+        for checkpoint, metadata, _ in namespace.values()
+    )
+    writes = sum(
+        len(serialized[1])
+        for key, stored in saver.writes.items() if key[0] == thread_id
+        for _, _, serialized, _ in stored.values()
+    )
+    blobs = sum(len(blob[1]) for key, blob in saver.blobs.items() if key[0] == thread_id)
+    return {"checkpoints": checkpoints, "writes": writes, "blobs": blobs,
+            "total": checkpoints + writes + blobs}
+
+
+def sqlite_bytes(saver: SqliteCheckpointSaver, thread_id: str) -> dict:
+    def total(sql: str) -> int:
+        return saver._query(sql, (thread_id,))[0][0] or 0
+
+    checkpoints = total("SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints WHERE thread_id = ?")
+    writes = total("SELECT SUM(LENGTH(value)) FROM writes WHERE thread_id = ?")
+    blobs = total("SELECT SUM(LENGTH(value)) FROM blobs WHERE thread_id = ?")
+    return {"checkpoints": checkpoints, "writes": writes, "blobs": blobs,
+            "total": checkpoints + writes + blobs}
+
+
+async def run_once(graph, resume_text: str) -> str:
+    thread_id = str(uuid.uuid4())
+    initial_state = build_initial_state(resume_text, SAMPLE_JD, SAMPLE_ROLE)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await graph.ainvoke(initial_state, config={"configurable": {"thread_id": thread_id}})
+    finally:
+        release_initial_state(initial_state)
+    return thread_id
+
+
+def main():
+    install_fake_llm(FakeChatModel())
+    memory = MemorySaver()
+    sqlite = TimedSqliteSaver(os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite3"))
+    backends = [("memory", memory, memory_bytes), ("sqlite", sqlite, sqlite_bytes)]
+    print(f"{'Backend':<7} | {'Resume chars':>12} | {'Checkpoints':>11} | {'Writes':>8} | {'Blobs':>8} "
+          f"| {'Total':>8} | {'write ms':>8}")
+    print("-" * 82)
+    for name, saver, measure in backends:
+        graph = workflow.compile(checkpointer=saver)
+        for repeats in RESUME_REPEATS:
+            resume_text = SAMPLE_RESUME * repeats
+            sqlite.write_seconds = 0.0
+            sizes = measure(saver, asyncio.run(run_once(graph, resume_text)))
+            write_ms = f"{sqlite.write_seconds * 1000:.1f}" if saver is sqlite else "-"
+            print(f"{name:<7} | {len(resume_text):>12} | {sizes['checkpoints']:>11} | {sizes['writes']:>8} "
+                  f"| {sizes['blobs']:>8} | {sizes['total']:>8} | {write_ms:>8}")
+
+
+if __name__ == "__main__":
+    main()
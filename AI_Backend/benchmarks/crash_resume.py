@@ -0,0 +1,139 @@
+"""Crash injection: an evaluation killed mid-run resumes without redoing finished stages.
+
+For each scenario a child process starts an evaluation with the SQLite
+checkpointer and is killed (os._exit, no cleanup) at the end of the crash
+stage's LLM call. A second fresh process resumes the thread from the same
+database, and the stages that call the LLM again are checked:
+  after_agents  killed in the aggregator: only aggregator and feedback re-run
+  mid_agents    killed in the culture agent while the two faster agents have
+                already finished in the same superstep: their pending writes
+                are kept, so only the culture agent and later stages re-run
+A retry of the finished evaluation with the same evaluation_id then has to
+return the stored result without calling the LLM, and an evaluation without an
+evaluation_id must not write to the checkpoint database. Exits 1 if any scenario re-executes a completed stage. Run from AI_Backend/:
+    python -m benchmarks.crash_resume
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+# Every stage must really run; stored node outputs would hide re-execution.
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("SPECULATIVE_AGENTS", "false")
+os.environ["CHECKPOINTER"] = "sqlite"
+
+EVALUATION_ID = "crash-injection"
+ALL_STAGES = ("jd_parser", "alignment_check", "extractor", "tech_agent", "exp_agent", "culture_agent",
+              "aggregator", "feedback")
+SCENARIOS = {
+    "after_agents": {"crash_at": "aggregator", "rerun": {"aggregator", "feedback"}},
+    "mid_agents": {"crash_at": "culture_agent", "rerun": {"culture_agent", "aggregator", "feedback"}},
+}
+# The culture agent is slow enough that the other two agents finish before it crashes.
+STAGE_SECONDS = {"culture_agent": 0.5}
+
+
+def stage_latency(stage: str) -> float:
+    return STAGE_SECONDS.get(stage, 0.02)
+
+
+def run_child(crash_at: str):
+    from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, install_fake_llm
+    from deadlines import Deadline
+    from main import run_graph
+
+    class CrashingModel(FakeChatModel):
+        def _answer(self, messages):
+            content, delay = super()._answer(messages)
+            if self.calls[-1] == crash_at:
+                # Dies at the end of the stage's generation time, like a pod killed mid-call.
+                time.sleep(delay)
+                sys.__stdout__.write(f"child: crashing in {crash_at}, stages called: {','.join(self.calls)}\n")
+                sys.__stdout__.flush()
+                os._exit(137)
+            return content, delay
+
+    install_fake_llm(CrashingModel(latency=stage_latency, calls=[]))
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(120), evaluation_id=EVALUATION_ID))
+    sys.exit("child finished without crashing")
+
+
+def run_scenario(name: str, scenario: dict) -> bool:
+    env = dict(os.environ, CHECKPOINT_DB_PATH=os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite3"))
+    child = subprocess.run(
+        [sys.executable, "-m", "benchmarks.crash_resume", "--child", scenario["crash_at"]],
+        env=env, capture_output=True, text=True
+    )
+    print(child.stdout.strip())
+    if child.returncode != 137:
+        print(f"{name}: child exited with {child.returncode}\n{child.stderr[-2000:]}")
+        return False
+    resumed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.crash_resume", "--resume"],
+        env=env, capture_output=True, text=True
+    )
+    print(resumed.stdout.strip())
+    if resumed.returncode != 0:
+        print(f"{name}: resume exited with {resumed.returncode}\n{resumed.stderr[-2000:]}")
+        return False
+    rerun = set(resumed.stdout.split("stages called: ")[-1].strip().split(","))
+    ok = rerun == scenario["rerun"]
+    print(f"{name}: re-ran {sorted(rerun)}, expected {sorted(scenario['rerun'])} -> {'OK' if ok else 'FAIL'}\n")
+    return ok
+
+
+def run_resume():
+    """Resumes the crashed thread in a fresh process, as after a pod restart."""
+    from benchmarks.fake_llm import FakeChatModel, install_fake_llm
+    from deadlines import Deadline
+    from graph import checkpointer, ephemeral_checkpointer
+    from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE
+    from main import resume_graph, run_graph
+
+    fake = install_fake_llm(FakeChatModel(latency=stage_latency, calls=[]))
+    print(f"resume: interrupted threads {checkpointer.interrupted_threads()}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(resume_graph(EVALUATION_ID, Deadline(120)))
+    complete = bool(result["summary"].get("final_score")) and bool(result["candidate_feedback"])
+    print(f"resume: final score {result['final_score']}, recommendation {result['recommendation']}, "
+          f"thread {checkpointer.get_thread(EVALUATION_ID)['status']}")
+    if not complete:
+        sys.exit("resumed evaluation is incomplete")
+    calls = list(fake.calls)
+    with contextlib.redirect_stdout(io.StringIO()):
+        retried = asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(120),
+                                        evaluation_id=EVALUATION_ID))
+    if fake.calls != calls or retried["final_score"] != result["final_score"]:
+        sys.exit(f"a retry of the finished evaluation ran again: {','.join(fake.calls[len(calls):])}")
+    stored = checkpointer.stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(120)))
+    if checkpointer.stats() != stored or ephemeral_checkpointer.storage:
+        sys.exit("an evaluation without an evaluation_id left checkpoints behind")
+    del fake.calls[len(calls):]
+    print(f"resume: stages called: {','.join(fake.calls)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", choices=ALL_STAGES)
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        return run_child(args.child)
+    if args.resume:
+        return run_resume()
+    results = [run_scenario(name, scenario) for name, scenario in SCENARIOS.items()]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Near-duplicate resume detection: accuracy of the MinHash/LSH index and lookup cost.
+
+Accuracy: every sample resume (benchmarks/resumes.py) is indexed, then queried
+with resubmissions that must be flagged (light edits, reflowed layout, an agency
+cover header) and with resumes that must not (the other candidates, and a
+colleague's resume sharing the employer and skills sections). Exact shingle
+Jaccard is shown next to the MinHash estimate.
+
+Cost: signature time per resume, and lookup time and index memory as the index
+grows with synthetic resumes. Exits 1 on a missed duplicate or a false flag.
+Run from AI_Backend/:
+    python -m benchmarks.dedup
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.resumes import SAMPLE_RESUMES
+from sections import split_sections
+from dedup import RESUME_DEDUP_THRESHOLD, SHINGLE_WORDS, ResumeIndex, _words, content_hash, resume_signature
+
+INDEX_SIZES = (1_000, 10_000, 50_000)
+QUERIES = 2_000
+SCOPE = "benchmark-jd"
+
+
+def resubmissions(text: str) -> dict:
+    lines = text.splitlines()
+    skills = next(i for i, line in enumerate(lines) if line.strip().lower().startswith(("skills", "technical skills",
+                                                                                         "core competencies")))
+    reordered = lines[:skills + 1] + list(reversed(lines[skills + 1:skills + 4])) + lines[skills + 4:]
+    return {
+        "new date and bullet": "\n".join(lines[:8] + ["• Introduced on-call runbooks for the platform team"]
+                                         + lines[8:]).replace("2021", "2022", 1),
+        "typo fixes and case": text.replace("the ", "teh ", 2).upper(),
+        "reordered skills lines": "\n".join(reordered),
+        "flattened layout": " ".join(text.split()),
+        "agency cover header": "Submitted by TalentBridge Recruiting | Candidate ref TB-20931\n"
+                               "Confidential: do not contact the candidate directly\n\n" + text,
+    }
+
+
+def colleague(text: str) -> str:
+    """Another person with the same skills, education and certifications sections,
+    and their own contact details, experience and achievements."""
+    shared = {"skills", "education", "certifications", "languages"}
+    blocks = ["Alex Kim\nalex.kim@example.com"]
+    for number, section in enumerate(split_sections(text)):
+        if section["kind"] == "contact":
+            continue
+        lines = section["lines"] if section["kind"] in shared else [
+            f"Owned roadmap item {number}.{i} for the {section['kind']} team, shipped in Q{i % 4 + 1}"
+            for i, _ in enumerate(section["lines"])]
+        blocks.append("\n".join([section["header"]] + lines))
+    return "\n\n".join(blocks)
+
+
+def exact_jaccard(a: str, b: str) -> float:
+    def shingles(text):
+        words = _words(text)
+        return {tuple(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def check_accuracy(index: ResumeIndex) -> bool:
+    ids = {}
+    for name, sample in SAMPLE_RESUMES.items():
+        text = sample["text"]
+        ids[name] = f"eval-{name[:13]}"
+        index.add(SCOPE, resume_signature(text), content_hash(text), ids[name], {"candidate": name})
+
+    print(f"{'Resume':<18} | {'Query':<24} | {'exact J':>7} | {'MinHash':>7} | {'expected':>18} | {'flagged':>18}")
+    print("-" * 108)
+    ok = True
+    for name, sample in SAMPLE_RESUMES.items():
+        text = sample["text"]
+        queries = [(query, variant, ids[name]) for query, variant in resubmissions(text).items()]
+        queries.append(("colleague", colleague(text), None))
+        # Another candidate must match only their own evaluation.
+        queries += [(f"other: {other}", SAMPLE_RESUMES[other]["text"], ids[other])
+                    for other in SAMPLE_RESUMES if other != name]
+        for query, variant, expected in queries:
+            found = index.find(SCOPE, resume_signature(variant), content_hash(variant))
+            flagged = found["evaluation_id"] if found else None
+            signature_similarity = float((resume_signature(variant) == resume_signature(text)).mean())
+            ok &= flagged == expected
+            print(f"{name:<18} | {query:<24} | {exact_jaccard(text, variant):>7.2f} | {signature_similarity:>7.2f} "
+                  f"| {expected or '-':>18} | {flagged or '-':>18}{'' if flagged == expected else '  WRONG'}")
+    print(f"Threshold {RESUME_DEDUP_THRESHOLD}: {'all correct' if ok else 'errors above'}")
+    return ok
+
+
+def synthetic_resumes(count: int, seed: int = 7):
+    vocabulary = sorted({word for sample in SAMPLE_RESUMES.values() for word in _words(sample["text"])})
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield " ".join(rng.choices(vocabulary, k=250))
+
+
+def measure_scale(directory: str):
+    texts = list(synthetic_resumes(max(INDEX_SIZES)))
+    started = time.perf_counter()
+    signatures = [resume_signature(text) for text in texts]
+    per_signature = (time.perf_counter() - started) / len(texts)
+    print(f"\nSignature: {per_signature * 1000:.3f} ms per 250-word resume")
+    print(f"{'Index size':>10} | {'load ms':>8} | {'lookup p50 us':>13} | {'lookup p99 us':>13} "
+          f"| {'candidates/lookup':>17} | {'index MB':>8}")
+    print("-" * 83)
+    for size in INDEX_SIZES:
+        path = os.path.join(directory, f"scale-{size}.sqlite3")
+        conn = ResumeIndex(path, 3600, size)._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO resume_signatures (scope, signature, evaluation_id, content_hash, result, created_at) "
+                "VALUES (?, ?, ?, ?, '{}', ?)",
+                ((SCOPE, signature.tobytes(), f"eval-{i}", "", time.time())
+                 for i, signature in enumerate(signatures[:size]))
+            )
+        # A fresh index rebuilds its buckets from SQLite on first use, as after a restart.
+        probe = ResumeIndex(path, 3600, size)
+        tracemalloc.start()
+        probe._connection()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del probe
+        index = ResumeIndex(path, 3600, size)
+        started = time.perf_counter()
+        index._connection()
+        load = time.perf_counter() - started
+        timings = []
+        for text in synthetic_resumes(QUERIES, seed=size):
+            signature = resume_signature(text)
+            started = time.perf_counter()
+            index.find(SCOPE, signature)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f"{size:>10} | {load * 1000:>8.1f} | {statistics.median(timings) * 1e6:>13.1f} "
+              f"| {timings[int(len(timings) * 0.99)] * 1e6:>13.1f} | {index.counters['candidates'] / QUERIES:>17.2f} "
+              f"| {memory / 2**20:>8.1f}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        index = ResumeIndex(os.path.join(directory, "accuracy.sqlite3"), 3600, 1000)
+        ok = check_accuracy(index)
+        measure_scale(directory)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Builds synthetic resume files (PDF and DOCX) for the upload and parsing benchmarks.
+
+Padding adds incompressible bytes the text extractors never need, so a file of
+any size still parses to the same short resume text.
+"""
+import io
+import os
+import random
+import zipfile
+import zlib
+
+from benchmarks.fake_llm import SAMPLE_RESUME
+
+# Resolution of the page image in scanned PDFs.
+SCAN_WIDTH, SCAN_HEIGHT = 850, 1100
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Default Extension="bin" ContentType="application/octet-stream"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rIdLink" Target="https://example.com/portfolio" TargetMode="External" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"/>'
+    '</Relationships>'
+)
+DOCUMENT_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:v="urn:schemas-microsoft-com:vml" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml"'
+)
+
+
+def resume_lines(text: str = SAMPLE_RESUME) -> list:
+    return [line.strip() for line in text.strip().splitlines() if line.strip()]
+
+
+def _escape(text: str, chars: str) -> str:
+    for char in chars:
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def make_pdf(lines=None, padding_bytes: int = 0, pages=("text",), compressed: bool = False) -> bytes:
+    """A PDF with one page per entry of `pages`: "text" pages show the lines, "image"
+    pages only paint a scanned-page image. Padding is a stream no content references.
+    With compressed, the page content streams are FlateDecode-compressed."""
+    lines = resume_lines() if lines is None else lines
+    text_ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+    text_ops += [f"({_escape(line, chr(92) + '()')}) Tj T*" for line in lines]
+    text_ops.append("ET")
+    contents = {
+        "text": "\n".join(text_ops).encode("latin-1", "replace"),
+        "image": b"q 612 0 0 842 0 0 cm /Im1 Do Q",
+    }
+    scan = zlib.compress(os.urandom(SCAN_WIDTH * SCAN_HEIGHT // 8) * 8) if "image" in pages else b""
+    padding = os.urandom(padding_bytes)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % (6 + 2 * i) for i in range(len(pages))), len(pages)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % (SCAN_WIDTH, SCAN_HEIGHT, len(scan))
+        + scan + b"\nendstream",
+        b"<< /Length %d >>\nstream\n" % len(padding) + padding + b"\nendstream",
+    ]
+    for i, kind in enumerate(pages):
+        resources = b"/Font << /F1 3 0 R >>" if kind == "text" else b"/XObject << /Im1 4 0 R >>"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents %d 0 R /Resources << %s >>%s >>"
+            % (7 + 2 * i, resources, b" /PieceInfo << /Padding 5 0 R >>" if i == 0 else b"")
+        )
+        content = zlib.compress(contents[kind]) if compressed else contents[kind]
+        objects.append(b"<< /Length %d%s >>\nstream\n" % (len(content), b" /Filter /FlateDecode" if compressed else b"")
+                       + content + b"\nendstream")
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def paragraphs_xml(lines) -> str:
+    return "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{_xml(line)}</w:t></w:r></w:p>" for line in lines)
+
+
+def make_docx(lines=None, padding_bytes: int = 0, body: str = None) -> bytes:
+    """A DOCX with one paragraph per line (or the given body XML), plus a stored
+    (uncompressed) padding part."""
+    body = paragraphs_xml(resume_lines() if lines is None else lines) if body is None else body
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document {DOCUMENT_NAMESPACES}><w:body>{body}<w:sectPr/></w:body></w:document>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", DOCX_RELS)
+        docx.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS)
+        docx.writestr("word/document.xml", document)
+        if padding_bytes:
+            docx.writestr("word/media/padding.bin", os.urandom(padding_bytes), zipfile.ZIP_STORED)
+    return out.getvalue()
+
+
+def _run(text: str, properties: str = "") -> str:
+    return f"<w:r>{properties}<w:t xml:space=\"preserve\">{_xml(text)}</w:t></w:r>"
+
+
+def _cell(content: str, properties: str = "") -> str:
+    return f"<w:tc><w:tcPr><w:tcW w:w=\"4000\"/>{properties}</w:tcPr>{content}</w:tc>"
+
+
+VMERGE_RESTART = '<w:vMerge w:val="restart"/>'
+VMERGE_CONTINUE = "<w:vMerge/>"
+GRID_SPAN_2 = '<w:gridSpan w:val="2"/>'
+BOLD_11PT = '<w:rPr><w:b/><w:sz w:val="22"/></w:rPr>'
+DELETED_RUN = '<w:rPr><w:del w:id="4" w:author="a"/></w:rPr>'
+
+
+# Layouts and Word features resumes commonly contain, each as body XML built
+# around the sample resume lines. `symbol_font` uses a construct only mammoth handles.
+def _docx_layouts(lines: list) -> dict:
+    head, rest = lines[:4], lines[4:]
+    half = len(rest) // 2
+    table = (
+        "<w:tbl><w:tblPr><w:tblW w:w=\"0\" w:type=\"auto\"/></w:tblPr><w:tblGrid><w:gridCol/><w:gridCol/></w:tblGrid>"
+        + "".join(
+            f"<w:tr><w:trPr><w:cantSplit/></w:trPr>{_cell(paragraphs_xml([left]))}{_cell(paragraphs_xml([right]))}</w:tr>"
+            for left, right in zip(rest[:half], rest[half:])
+        )
+        # A vertically merged cell: mammoth drops the continuation cell's content.
+        + f"<w:tr>{_cell(paragraphs_xml(['Skills']), VMERGE_RESTART)}"
+          f"{_cell(paragraphs_xml(['Python, AWS']))}</w:tr>"
+        + f"<w:tr>{_cell(paragraphs_xml(['merged away']), VMERGE_CONTINUE)}{_cell(paragraphs_xml(['Docker']))}</w:tr>"
+        + f"<w:tr>{_cell(paragraphs_xml(['Languages: English, Spanish']), GRID_SPAN_2)}</w:tr>"
+        # A deleted row.
+        + f"<w:tr><w:trPr><w:del w:id=\"1\" w:author=\"a\"/></w:trPr>{_cell(paragraphs_xml(['gone']))}"
+          f"{_cell(paragraphs_xml(['gone too']))}</w:tr>"
+        + "</w:tbl>"
+    )
+    formatted = "".join(
+        f"<w:p><w:pPr><w:pStyle w:val=\"ListBullet\"/><w:tabs><w:tab w:val=\"left\" w:pos=\"720\"/></w:tabs>"
+        f"<w:rPr><w:b/></w:rPr></w:pPr><w:proofErr w:type=\"spellStart\"/>"
+        f"<w:bookmarkStart w:id=\"{i}\" w:name=\"line{i}\"/>"
+        f"{_run(line[:10], BOLD_11PT)}<w:r><w:tab/></w:r>"
+        f"<w:r><w:t>{_xml(line[10:])}</w:t><w:br/><w:t xml:space=\"preserve\"> next</w:t></w:r>"
+        f"<w:r><w:noBreakHyphen/><w:softHyphen/><w:lastRenderedPageBreak/></w:r>"
+        f"<w:bookmarkEnd w:id=\"{i}\"/></w:p>"
+        for i, line in enumerate(rest)
+    )
+    links = (
+        f"<w:p><w:hyperlink r:id=\"rIdLink\" w:history=\"1\">{_run('Portfolio')}</w:hyperlink>"
+        f"<w:r><w:t xml:space=\"preserve\"> and </w:t></w:r>"
+        "<w:r><w:fldChar w:fldCharType=\"begin\"/></w:r>"
+        "<w:r><w:instrText xml:space=\"preserve\"> HYPERLINK \"https://github.com/jane\" </w:instrText></w:r>"
+        f"<w:r><w:fldChar w:fldCharType=\"separate\"/></w:r>{_run('GitHub')}"
+        "<w:r><w:fldChar w:fldCharType=\"end\"/></w:r>"
+        f"<w:smartTag w:uri=\"x\" w:element=\"place\">{_run(' Seattle')}</w:smartTag></w:p>"
+        f"<w:sdt><w:sdtPr><w:alias w:val=\"Summary\"/></w:sdtPr><w:sdtContent>{paragraphs_xml(rest[:2])}"
+        f"</w:sdtContent></w:sdt><w:customXml w:element=\"extra\">{paragraphs_xml(rest[2:4])}</w:customXml>"
+    )
+    tracked = "".join((
+        f"<w:p><w:ins w:id=\"2\" w:author=\"a\">{_run('Inserted summary. ')}</w:ins>"
+        f"<w:del w:id=\"3\" w:author=\"a\"><w:r><w:delText>Deleted text.</w:delText></w:r></w:del>"
+        f"{_run('Deleted run.', DELETED_RUN)}{_run(rest[0])}</w:p>",
+        # A deleted paragraph mark joins this paragraph with the next one.
+        f"<w:p><w:pPr><w:rPr><w:del w:id=\"5\" w:author=\"a\"/></w:rPr></w:pPr>{_run(rest[1])}</w:p>",
+        paragraphs_xml(rest[2:]),
+        f"<w:p><w:moveFrom w:id=\"6\" w:author=\"a\">{_run('moved away')}</w:moveFrom>"
+        f"<w:moveTo w:id=\"7\" w:author=\"a\">{_run('moved here')}</w:moveTo></w:p>",
+    ))
+    textbox = (
+        "<w:p><w:r><mc:AlternateContent><mc:Choice Requires=\"wps\"><w:drawing><wps:txbx><w:txbxContent>"
+        f"{paragraphs_xml(['choice text'])}</w:txbxContent></wps:txbx></w:drawing></mc:Choice>"
+        "<mc:Fallback><w:pict><v:shape><v:textbox><w:txbxContent>"
+        f"{paragraphs_xml(head)}</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>"
+        f"</mc:AlternateContent></w:r></w:p>{paragraphs_xml(rest)}"
+    )
+    nested = (
+        f"<w:tbl><w:tr>{_cell(paragraphs_xml(head))}"
+        f"{_cell('<w:tbl><w:tr>' + _cell(paragraphs_xml(rest[:half])) + '</w:tr></w:tbl>' + paragraphs_xml(['']))}"
+        f"</w:tr></w:tbl>{paragraphs_xml(rest[half:])}"
+    )
+    symbol = (
+        f"<w:p><w:r><w:sym w:font=\"Wingdings\" w:char=\"F0A7\"/></w:r>{_run(' ' + head[0])}</w:p>"
+        f"{paragraphs_xml(head[1:] + rest)}"
+    )
+    return {
+        "plain": paragraphs_xml(lines), "table_layout": paragraphs_xml(head) + table, "formatted": formatted,
+        "links_and_fields": paragraphs_xml(head) + links, "tracked_changes": tracked, "text_box": textbox,
+        "nested_table": nested, "symbol_font": symbol,
+    }
+
+
+def docx_corpus(variants: int = 5) -> dict:
+    """Named DOCX resumes: every layout for several shufflings of the sample resume lines."""
+    lines = resume_lines()
+    corpus = {}
+    for variant in range(variants):
+        shuffled = lines[:4] + random.Random(variant).sample(lines[4:], len(lines) - 4)
+        for name, body in _docx_layouts(shuffled).items():
+            corpus[f"{name}_{variant}"] = make_docx(body=body)
+    return corpus
+
+
+def _xml(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
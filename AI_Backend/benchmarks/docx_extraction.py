@@ -0,0 +1,82 @@
+"""DOCX text extraction: streaming extractor vs mammoth.
+
+Equivalence: every resume in the synthetic corpus (tables with merged cells,
+tracked changes, hyperlinks and fields, text boxes, nested tables, symbol fonts)
+must give exactly mammoth's raw text, or fall back to mammoth. parse_docx must
+return the same text as before. Speed: median extraction time and peak Python
+heap for resumes of growing length. Exits 1 on any text difference.
+Run from AI_Backend/:
+    python -m benchmarks.docx_extraction
+"""
+import contextlib
+import io
+import statistics
+import sys
+import time
+import tracemalloc
+
+import mammoth
+
+from benchmarks.documents import docx_corpus, make_docx, paragraphs_xml, resume_lines
+from docx_text import UnsupportedDocx, extract_docx_text
+from parsing import normalize_text, parse_docx
+
+REPEATS = (1, 10, 100, 500)
+RUNS = 5
+
+
+def mammoth_text(data: bytes) -> str:
+    return mammoth.extract_raw_text(io.BytesIO(data)).value
+
+
+def check_equivalence() -> bool:
+    corpus = docx_corpus()
+    mismatches, fallbacks = [], []
+    for name, data in corpus.items():
+        expected = mammoth_text(data)
+        try:
+            if extract_docx_text(io.BytesIO(data)) != expected:
+                mismatches.append(name)
+        except UnsupportedDocx:
+            fallbacks.append(name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parsed = parse_docx(data)
+        if parsed != normalize_text(expected):
+            mismatches.append(f"{name} (parse_docx)")
+    print(f"Equivalence: {len(corpus)} resumes, {len(corpus) - len(fallbacks)} on the fast path, "
+          f"{len(fallbacks)} fell back to mammoth, {len(mismatches)} differ from mammoth")
+    for name in mismatches:
+        print(f"  differs: {name}")
+    return not mismatches
+
+
+def measure(extract, data: bytes) -> tuple:
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        extract(data)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    extract(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    ok = check_equivalence()
+    print(f"\n{'Paragraphs':>10} | {'DOCX KB':>7} | {'mammoth ms':>10} | {'fast ms':>8} | {'speedup':>7} "
+          f"| {'mammoth heap MB':>15} | {'fast heap MB':>12}")
+    print("-" * 88)
+    lines = resume_lines()
+    for repeats in REPEATS:
+        data = make_docx(body=paragraphs_xml(lines * repeats))
+        slow, slow_peak = measure(mammoth_text, data)
+        fast, fast_peak = measure(lambda d: extract_docx_text(io.BytesIO(d)), data)
+        print(f"{len(lines) * repeats:>10} | {len(data) / 1024:>7.1f} | {slow * 1000:>10.1f} | {fast * 1000:>8.1f} "
+              f"| {slow / fast:>6.1f}x | {slow_peak / 2**20:>15.1f} | {fast_peak / 2**20:>12.1f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
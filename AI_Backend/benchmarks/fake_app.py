@@ -0,0 +1,22 @@
+"""The app with the fake LLM installed, for benchmarks that run it under uvicorn:
+    uvicorn benchmarks.fake_app:app --workers N
+
+FAKE_LLM_LATENCY_SECONDS is the simulated response time of every LLM call.
+Responses carry the serving worker's pid in X-Worker-Pid, so a client can tell
+which process answered.
+"""
+import os
+
+import llm_router
+from benchmarks.fake_llm import FakeChatModel, constant_latency, install_fake_llm
+from main import app
+
+install_fake_llm(FakeChatModel(latency=constant_latency(float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0")))))
+llm_router.HEDGING_ENABLED = False
+
+
+@app.middleware("http")
+async def worker_pid(request, call_next):
+    response = await call_next(request)
+    response.headers["X-Worker-Pid"] = str(os.getpid())
+    return response
@@ -0,0 +1,294 @@
+"""Offline stand-in for the Groq chat model, used by the benchmark scripts.
+
+Each stage is recognised from the first line of its system prompt and answered
+with a canned JSON document shaped like a real llama-3.3-70b response, so the
+whole graph can run without network access or an API key.
+"""
+import json
+import random
+import time
+from typing import Any, Callable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+SAMPLE_ROLE = "Lead AWS Engineer with Python and MLOps"
+
+SAMPLE_JD = (
+    "Job Title: Lead AWS Engineer with Python and MLOps\n"
+    "Mandate Skills: AWS, Python, MLOps, Docker or Kubernetes, SQL/NoSQL/Vector Database, "
+    "LLM and Prompt Engineering.\n"
+    "Key Responsibilities: Architect and develop end-to-end ML solutions from data ingestion to "
+    "model deployment, including LLM-based applications. Develop and optimize prompts for large "
+    "language models. Set up and optimize CI/CD pipelines for ML models. Leverage AWS services "
+    "(EC2, S3, Lambda, SageMaker, EKS) to maintain scalable, secure and cost-efficient ML "
+    "infrastructure. Work closely with product managers, data scientists and DevOps engineers.\n"
+    "Qualifications: 5+ years of professional software engineering experience. Bachelor's or "
+    "Master's degree in Computer Science, Engineering, or a related field.\n"
+) * 4
+
+SAMPLE_RESUME = (
+    "Jane A. Doe | Senior Machine Learning Engineer | jane.doe@example.com | +1 555 0100\n"
+    "Experience: Acme Analytics 2021-Present. Led MLOps platform design on AWS EKS, "
+    "deployed LLM-based retrieval services, mentored four engineers. Globex 2017-2021. "
+    "Built Python data pipelines on AWS Lambda, S3, Glue and PostgreSQL.\n"
+    "Skills: Python, AWS, Docker, Kubernetes, PostgreSQL, MongoDB, LangChain, PyTorch.\n"
+) * 8
+
+STAGE_MARKERS = {
+    "Resume Parser": "extractor",
+    "Job Requirement": "jd_parser",
+    "Alignment Checker": "alignment_check",
+    "Competency Evaluator": "tech_agent",
+    "Seniority & Relevance": "exp_agent",
+    "Cultural Fit": "culture_agent",
+    "Aggregator": "aggregator",
+    "Feedback Writer": "feedback",
+    "Market Standards Analyst": "market_standards",
+}
+
+CANNED_RESPONSES = {
+    "extractor": {
+        "skills": [
+            "Python", "AWS", "Docker", "Kubernetes", "PostgreSQL", "MongoDB",
+            "LangChain", "PyTorch", "scikit-learn", "CI/CD", "Terraform", "React",
+        ],
+        "capability_evidence": [
+            {
+                "text": f"Built and operated ML service #{i} on AWS EKS serving 2M requests/day with p99 < 120ms",
+                "source_section": "Experience",
+                "associated_role": "Senior Machine Learning Engineer",
+            }
+            for i in range(12)
+        ],
+        "work_experience": [
+            {
+                "company": "Acme Analytics",
+                "job_title": "Senior Machine Learning Engineer",
+                "start_date": "2021-03",
+                "end_date": "Present",
+                "description": "Led MLOps platform design; deployed LLM-based retrieval services; "
+                               "mentored four engineers and owned the CI/CD pipeline for model releases.",
+            },
+            {
+                "company": "Globex",
+                "job_title": "Software Engineer",
+                "start_date": "2017-06",
+                "end_date": "2021-02",
+                "description": "Built Python data pipelines on AWS (Lambda, S3, Glue) and PostgreSQL; "
+                               "introduced Docker-based deployments.",
+            },
+        ],
+        "education": [
+            {
+                "institution": "State University",
+                "degree_level": "Bachelor",
+                "field_of_study": "Computer Science",
+                "year_graduated": 2017,
+            }
+        ],
+        "certifications": ["AWS Certified Machine Learning - Specialty"],
+        "candidate_name": "Jane A. Doe",
+        "email": "Jane.Doe@example.com",
+        "phone_number": "+1 555 0100",
+        "current_position": "Senior Machine Learning Engineer",
+        "total_years_experience": 7,
+        "experience_level": "Senior",
+        "is_valid_resume": True,
+        "extraction_confidence": {"email": 0.98, "phone": 0.9, "experience": 0.85},
+    },
+    "jd_parser": {
+        "role_title": "Lead AWS Engineer with Python and MLOps",
+        "required_years": 5,
+        "primary_requirements": [
+            {"id": i + 1, "text": text}
+            for i, text in enumerate([
+                "AWS", "Python", "MLOps", "Docker", "Kubernetes", "SQL",
+                "NoSQL", "Vector database", "LLM", "Prompt engineering",
+            ])
+        ],
+        "education_requirement": {
+            "required_level": "Bachelor",
+            "valid_majors": ["Computer Science", "Engineering"],
+        },
+        "required_certifications": [],
+        "responsibilities": [
+            {"id": i + 1, "text": text}
+            for i, text in enumerate([
+                "Architect end-to-end ML solutions",
+                "Optimize prompts for large language models",
+                "Set up CI/CD pipelines for ML models",
+                "Maintain scalable AWS infrastructure",
+            ])
+        ],
+    },
+    "alignment_check": {
+        "jd_role_mismatch": False,
+        "inferred_job_family": "Machine Learning Engineering",
+        "stated_role_family": "Machine Learning Engineering",
+        "reasoning": "The JD and the role name describe the same profession.",
+    },
+    "tech_agent": {
+        "inferred_job_family": "Machine Learning Engineering",
+        "jd_role_mismatch": False,
+        "jd_is_vague": False,
+        "use_market_standards": False,
+        "inferred_requirements": [],
+        "jurisdiction_issue": False,
+        "critical_success_factors": ["Production MLOps", "AWS depth"],
+        "score": 80,
+        "reasoning": "Eight of ten requirements are supported by skills or evidence.",
+        "matched_competencies": ["AWS", "Python", "MLOps", "Docker", "Kubernetes", "SQL", "NoSQL", "LLM"],
+        "missing_competencies": ["Vector database", "Prompt engineering"],
+    },
+    "exp_agent": {
+        "score": 85,
+        "reasoning": "Seven years of directly relevant engineering experience.",
+        "relevant_years_validated": 7,
+        "education_match": True,
+        "education_adjustment_applied": False,
+        "red_flags": [],
+    },
+    "culture_agent": {
+        "score": 75,
+        "reasoning": "Mentoring and ownership are evidenced in role descriptions.",
+        "soft_skills_detected": ["Leadership", "Mentoring", "Ownership"],
+        "missing_role_skills": ["Stakeholder communication"],
+    },
+    "aggregator": {
+        "final_score": 80,
+        "final_reasoning": "Weighted 0.5/0.3/0.2 across competency, experience and soft skills.",
+        "category_scores": {"competency": 80, "experience": 85, "soft_skills": 75},
+        "jurisdiction_flag": False,
+        "strengths": ["AWS", "MLOps", "Python"],
+        "weaknesses": ["Vector database", "Prompt engineering"],
+        "interview_questions": ["Describe a model rollout you owned end to end."],
+    },
+    "market_standards": {
+        "role_family": "aws engineer with python and mlops",
+        "seniority": "lead",
+        "competencies": ["AWS", "Python", "MLOps", "Docker", "Kubernetes", "Terraform", "CI/CD", "SQL"],
+        "typical_years": 7,
+        "education_level": "Bachelor's degree in Computer Science or related field",
+        "certifications": [],
+        "soft_skills": ["Technical leadership", "Mentoring", "Stakeholder communication", "Ownership"],
+    },
+    "feedback": {
+        "recommendation": "Shortlist",
+        "feedback_email": {
+            "subject": "Your Application Results - Lead AWS Engineer",
+            "body": "Dear Jane,\n\nThank you for applying.\n\nWarm regards\nThe TalentScan AI Team",
+        },
+        "strengths": ["AWS", "MLOps"],
+        "improvement_areas": ["Vector databases"],
+    },
+}
+
+
+def detect_stage(messages: List[BaseMessage]) -> str:
+    system_text = str(messages[0].content) if messages else ""
+    for marker, stage in STAGE_MARKERS.items():
+        if marker in system_text:
+            return stage
+    return "unknown"
+
+
+def constant_latency(seconds: float) -> Callable[[str], float]:
+    return lambda stage: seconds
+
+
+def heavy_tailed_latency(median: float = 1.0, tail_probability: float = 0.05,
+                         tail_multiplier: float = 8.0, seed: Optional[int] = None) -> Callable[[str], float]:
+    """Lognormal body with an occasional pathological stall, like a shared LLM endpoint.
+    """
+    rng = random.Random(seed)
+
+    def sample(stage: str) -> float:
+        latency = rng.lognormvariate(0, 0.35) * median
+        if rng.random() < tail_probability:
+            latency *= tail_multiplier
+        return latency
+
+    return sample
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers every pipeline stage with canned JSON.
+
+    `latency` maps a stage name to a simulated response time in seconds (spread
+    over the chunks when streaming);
+    `calls` records the stage of every request so benchmarks can count spend.
+    `invalid_json_rate` is the share of answers cut off mid-document, as small
+    models sometimes do. Token usage is estimated at four characters per token.
+    """
+
+    latency: Callable[[str], float] = constant_latency(0.0)
+    responses: dict = CANNED_RESPONSES
+    calls: list = []
+    invalid_json_rate: float = 0.0
+    seed: Optional[int] = None
+    model_name: str = "fake-llama"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    def _answer(self, messages: List[BaseMessage]) -> tuple:
+        stage = detect_stage(messages)
+        self.calls.append(stage)
+        content = json.dumps(self.responses.get(stage, {}))
+        if self._rng.random() < self.invalid_json_rate:
+            content = content[:len(content) // 2]
+        return content, self.latency(stage)
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        content, delay = self._answer(messages)
+        if delay > 0:
+            time.sleep(delay)
+        return content
+
+    @staticmethod
+    def _usage(messages: List[BaseMessage], content: str) -> dict:
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        return {
+            "input_tokens": prompt_chars // 4,
+            "output_tokens": len(content) // 4,
+            "total_tokens": (prompt_chars + len(content)) // 4,
+        }
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        content = self._respond(messages)
+        message = AIMessage(content=content, usage_metadata=self._usage(messages, content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any):
+        # Like Groq, which answers 400 to a streamed request in JSON mode.
+        if kwargs.get("response_format"):
+            raise ValueError("response_format json_object is not supported with streaming")
+        # The response time is spread evenly over the chunks, like token-by-token generation.
+        content, delay = self._answer(messages)
+        starts = range(0, len(content), 16)
+        for start in starts:
+            if delay > 0:
+                time.sleep(delay / len(starts))
+            last = start + 16 >= len(content)
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=content[start:start + 16],
+                usage_metadata=self._usage(messages, content) if last else None,
+            ))
+
+
+def install_fake_llm(model: BaseChatModel, by_spec: Optional[dict] = None) -> BaseChatModel:
+    """Routes llm_router model specs to fakes: by_spec[spec] when present, else model.
+    """
+    import llm_router
+    by_spec = by_spec or {}
+    llm_router.get_model = lambda spec: by_spec.get(spec, model)
+    return model
@@ -0,0 +1,80 @@
+"""Simulates hedged LLM calls against a heavy-tailed fake model.
+
+Reports p50/p99 call latency and the extra calls spent on hedges for several
+hedge percentiles. Run from AI_Backend/:
+    python -m benchmarks.hedging
+"""
+import contextlib
+import io
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+import llm_router
+from benchmarks.fake_llm import FakeChatModel, heavy_tailed_latency, install_fake_llm
+from langchain_core.prompts import ChatPromptTemplate
+
+CALLS = 600
+CLIENTS = 8
+MEDIAN_SECONDS = 0.04
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a TalentScanAI Competency Evaluator."),
+    ("user", "{payload}"),
+])
+SCENARIOS = [
+    ("no hedging", None),
+    ("hedge at p99", 0.99),
+    ("hedge at p95", 0.95),
+    ("hedge at p90", 0.90),
+]
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_scenario(hedge_percentile) -> dict:
+    fake = install_fake_llm(FakeChatModel(latency=heavy_tailed_latency(MEDIAN_SECONDS, seed=7)))
+    llm_router._stats.clear()
+    llm_router.HEDGING_ENABLED = hedge_percentile is not None
+    llm_router.NODE_POLICIES["tech_agent"] = {
+        "hedge_percentile": hedge_percentile or 0.95,
+        "hedge_after": MEDIAN_SECONDS * 3,
+        "models": ["fake:primary"],
+    }
+
+    def timed_call(i: int) -> float:
+        started = time.monotonic()
+        llm_router.invoke_json("tech_agent", PROMPT, {"payload": str(i)})
+        return time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool, contextlib.redirect_stdout(io.StringIO()):
+        latencies = list(pool.map(timed_call, range(CALLS)))
+    # Let losing hedges finish so every call is counted.
+    time.sleep(MEDIAN_SECONDS * 20)
+    return {
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies),
+        "calls_per_request": len(fake.calls) / CALLS,
+    }
+
+
+def main():
+    print(f"{CALLS} calls, {CLIENTS} concurrent clients, lognormal body (median {MEDIAN_SECONDS * 1000:.0f}ms) "
+          f"with a 5% x8 stall tail")
+    print(f"{'Scenario':<14} | {'p50 ms':>7} | {'p99 ms':>7} | {'mean ms':>7} | {'calls/request':>13}")
+    print("-" * 62)
+    for name, hedge_percentile in SCENARIOS:
+        result = run_scenario(hedge_percentile)
+        print(f"{name:<14} | {result['p50'] * 1000:>7.1f} | {result['p99'] * 1000:>7.1f} "
+              f"| {result['mean'] * 1000:>7.1f} | {result['calls_per_request']:>13.3f}")
+    llm_router.HEDGING_ENABLED = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Memory instrumentation: tracemalloc overhead, and a snapshot diff across evaluations.
+
+Evaluations go through POST /analyze/graph with the fake LLM and instant answers,
+on the in-memory checkpointer. Overhead: median latency with tracemalloc off and
+on, started through the admin endpoint. Diff: snapshots before and after a batch
+of evaluations, diffed per module and line, next to the MemorySaver growth that
+/admin/memory reports. Exits 1 when the report lacks RSS or checkpointer figures,
+the MemorySaver thread count does not follow the evaluations, or the diff does
+not attribute the growth to any module. Run from AI_Backend/:
+    python -m benchmarks.memory [--runs N]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_directory = tempfile.mkdtemp()
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("ADMIN_TOKEN", "benchmark")
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ["CHECKPOINTER"] = "memory"
+os.environ.setdefault("RATE_LIMIT", "100000/minute")
+os.environ.setdefault("RESUME_DEDUP", "false")
+os.environ.setdefault("MARKET_STANDARDS_PATH", os.path.join(_directory, "market_standards.sqlite3"))
+os.environ.setdefault("SKILL_INDEX_PATH", os.path.join(_directory, "skill_index.npz"))
+os.environ.setdefault("TRACE_EXPORTER", "none")
+os.environ.setdefault("MEMORY_SAMPLE_INTERVAL_SECONDS", "0")
+
+import httpx
+
+import llm_router
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, install_fake_llm
+from main import app
+from memory import memory_monitor
+
+
+async def evaluate(client: httpx.AsyncClient, number: int) -> float:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = await client.post("/analyze/graph", data={
+            "raw_text": f"{SAMPLE_RESUME}\nReference number {number}",
+            "job_description": SAMPLE_JD,
+            "role_name": SAMPLE_ROLE,
+        })
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def print_changes(title: str, changes: list):
+    print(f"\n{title}")
+    print(f"{'':<44} | {'KB now':>9} | {'KB diff':>9} | {'blocks diff':>11}")
+    print("-" * 82)
+    for change in changes:
+        print(f"{change['name'][-44:]:<44} | {change['bytes'] / 1024:>9.1f} | {change['bytes_diff'] / 1024:>+9.1f} "
+              f"| {change['blocks_diff']:>+11}")
+
+
+async def run(runs: int) -> bool:
+    problems = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60,
+                                 headers={"X-Admin-Token": os.getenv("ADMIN_TOKEN", "")}) as client:
+        install_fake_llm(FakeChatModel())
+        for number in range(3):
+            await evaluate(client, -number - 1)
+
+        latencies = {"off": [], "tracemalloc": []}
+        for mode in latencies:
+            (await client.post("/admin/memory/tracemalloc", params={"enabled": mode != "off"})).raise_for_status()
+            for number in range(runs):
+                latencies[mode].append(await evaluate(client, number))
+        baseline = statistics.median(latencies["off"])
+        frames = memory_monitor.tracing_stats()["frames"]
+        print(f"Overhead, {runs} evaluations per mode with instant LLM answers")
+        print(f"{'Mode':<12} | {'median ms':>9} | {'added ms':>8} | {'overhead':>8}")
+        print("-" * 47)
+        for mode, values in latencies.items():
+            median = statistics.median(values)
+            print(f"{mode:<12} | {median * 1000:>9.1f} | {(median - baseline) * 1000:>8.1f} "
+                  f"| {(median - baseline) / baseline:>+8.1%}"
+                  + (f"  ({frames} frames)" if mode != "off" else ""))
+
+        before = (await client.get("/admin/memory")).json()
+        base = (await client.post("/admin/memory/snapshots", params={"label": "before"})).json()
+        for number in range(runs):
+            await evaluate(client, runs + number)
+        after = (await client.get("/admin/memory")).json()
+        diff = (await client.get("/admin/memory/diff", params={"base": base["id"], "limit": 10})).json()
+
+    saver_before, saver_after = before["caches"]["checkpoints"], after["caches"]["checkpoints"]
+    print(f"\nAfter {runs} more evaluations: RSS {before['rss_bytes'] / 1e6:.1f} -> {after['rss_bytes'] / 1e6:.1f} MB, "
+          f"traced {diff['traced_diff_bytes'] / 1024:+.0f} KB")
+    print(f"MemorySaver: {saver_before['threads']} -> {saver_after['threads']} threads, "
+          f"{saver_before['checkpoints']} -> {saver_after['checkpoints']} checkpoints, "
+          f"{saver_before['serialized_bytes'] / 1024:.0f} -> {saver_after['serialized_bytes'] / 1024:.0f} KB serialized")
+    print_changes("Allocation change per module", diff["modules"])
+    print_changes("Allocation change per line", diff["lines"])
+
+    if not after.get("rss_bytes") or "threads" not in saver_after:
+        problems.append("report lacks RSS or MemorySaver figures")
+    elif saver_after["threads"] - saver_before["threads"] != runs:
+        problems.append(f"MemorySaver grew by {saver_after['threads'] - saver_before['threads']} threads, expected {runs}")
+    if not diff["modules"] or diff["modules"][0]["name"].startswith("stdlib:"):
+        problems.append("diff does not attribute the growth to a module")
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    # Hedge delays learned from the instant answers would hedge every timed call.
+    llm_router.HEDGING_ENABLED = False
+    sys.exit(0 if asyncio.run(run(args.runs)) else 1)
+
+
+if __name__ == "__main__":
+    main()
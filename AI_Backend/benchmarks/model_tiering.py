@@ -0,0 +1,118 @@
+"""Compares routing profiles: latency, tokens and agreement with the all-large profile.
+
+By default both tiers are fakes (the small one faster, terser and sometimes cut
+off mid-JSON); pass --live to call the configured Groq models instead. Run from
+AI_Backend/:
+    python -m benchmarks.model_tiering [--live] [--runs N]
+"""
+import argparse
+import asyncio
+import contextlib
+import copy
+import io
+import os
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+# Every stage must really run; stored node outputs would short-circuit it.
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+
+import llm_router
+import speculation
+from benchmarks.fake_llm import (
+    CANNED_RESPONSES, SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE,
+    FakeChatModel, heavy_tailed_latency, install_fake_llm,
+)
+from graph import app_graph
+from main import build_initial_state, release_initial_state
+
+
+def small_model_responses() -> dict:
+    # A smaller model tends to extract less: fewer skills and evidence items.
+    responses = copy.deepcopy(CANNED_RESPONSES)
+    profile = responses["extractor"]
+    profile["skills"] = profile["skills"][:-3]
+    profile["capability_evidence"] = profile["capability_evidence"][:-4]
+    return responses
+
+
+def install_fakes():
+    large = FakeChatModel(latency=heavy_tailed_latency(0.06, seed=1))
+    small = FakeChatModel(latency=heavy_tailed_latency(0.015, seed=2), responses=small_model_responses(),
+                          invalid_json_rate=0.1, seed=3)
+    install_fake_llm(large, by_spec={llm_router.SMALL_MODEL: small})
+
+
+async def evaluate() -> tuple:
+    initial_state = build_initial_state(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE)
+    thread_id = str(uuid.uuid4())
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            final_state = await app_graph.ainvoke(initial_state, config={"configurable": {"thread_id": thread_id}})
+    finally:
+        release_initial_state(initial_state)
+        speculation.discard(thread_id)
+    return time.monotonic() - started, final_state
+
+
+def skill_overlap(state: dict, reference: dict) -> float:
+    skills = {s.lower() for s in (state.get("candidate_profile") or {}).get("skills", [])}
+    expected = {s.lower() for s in (reference.get("candidate_profile") or {}).get("skills", [])}
+    return len(skills & expected) / len(skills | expected) if skills | expected else 1.0
+
+
+def run_profile(profile: str, runs: int) -> dict:
+    llm_router.ROUTING_PROFILE = profile
+    llm_router._stats.clear()
+    latencies, states = [], []
+    for _ in range(runs):
+        latency, state = asyncio.run(evaluate())
+        latencies.append(latency)
+        states.append(state)
+    stats = llm_router.llm_stats().values()
+    return {
+        "latencies": latencies,
+        "states": states,
+        "input_tokens": sum(s["input_tokens"] for s in stats) / runs,
+        "output_tokens": sum(s["output_tokens"] for s in stats) / runs,
+        "small_calls": sum(s["calls_by_model"].get(llm_router.SMALL_MODEL, 0) for s in stats) / runs,
+        "large_tokens": sum(s["tokens_by_model"].get(llm_router.PRIMARY_MODEL, 0) for s in stats) / runs,
+        "escalations": sum(s["fallbacks"] for s in stats) / runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="call the configured models instead of fakes")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    if not args.live:
+        install_fakes()
+    llm_router.HEDGING_ENABLED = False
+
+    results = {profile: run_profile(profile, args.runs) for profile in llm_router.ROUTING_PROFILES}
+    reference = results["quality"]["states"]
+
+    print(f"{args.runs} evaluations per profile ({'live models' if args.live else 'fake models'})")
+    print(f"{'Profile':<9} | {'mean s':>6} | {'p95 s':>6} | {'in tok':>7} | {'out tok':>7} | {'small calls':>11} "
+          f"| {'large tok':>9} | {'escalations':>11} | {'|Δscore|':>8} | {'same rec':>8} | {'skill overlap':>13}")
+    print("-" * 125)
+    for profile, result in results.items():
+        latencies = sorted(result["latencies"])
+        score_diffs = [abs(s["final_evaluation"].get("final_score", 0) - r["final_evaluation"].get("final_score", 0))
+                       for s, r in zip(result["states"], reference)]
+        same_rec = [s["candidate_feedback"].get("recommendation") == r["candidate_feedback"].get("recommendation")
+                    for s, r in zip(result["states"], reference)]
+        overlap = [skill_overlap(s, r) for s, r in zip(result["states"], reference)]
+        print(f"{profile:<9} | {statistics.mean(latencies):>6.3f} | {latencies[int(len(latencies) * 0.95) - 1]:>6.3f} "
+              f"| {result['input_tokens']:>7.0f} | {result['output_tokens']:>7.0f} | {result['small_calls']:>11.2f} "
+              f"| {result['large_tokens']:>9.0f} | {result['escalations']:>11.2f} | {statistics.mean(score_diffs):>8.2f} "
+              f"| {sum(same_rec) / len(same_rec):>8.0%} | {statistics.mean(overlap):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""PDF triage: classification of text, scanned and mixed resumes, and its cost.
+
+For each synthetic document the triage verdict is checked against the expected
+class. Its median time is compared with the full pypdf text extraction that
+parse_pdf otherwise runs over every page: for a scanned document that
+extraction is the wasted work triage avoids. "scan with text pages" shows the
+limit of inspecting PDF_TRIAGE_PAGES pages: its only text page comes after them,
+so parse_pdf must extract it rather than reject it.
+Exits 1 on a wrong classification or parse_pdf outcome.
+Run from AI_Backend/:
+    python -m benchmarks.pdf_triage
+"""
+import contextlib
+import io
+import statistics
+import sys
+import time
+
+from pypdf import PdfReader
+
+from benchmarks.documents import make_pdf
+from parsing import parse_pdf
+from pdf_triage import ImageOnlyPdf, triage_pdf
+
+# Pages, expected class, expected parse_pdf outcome with PDF_IMAGE_ONLY_ACTION=reject.
+DOCUMENTS = {
+    "text, 2 pages": (("text",) * 2, "text", "text"),
+    "text, 10 pages": (("text",) * 10, "text", "text"),
+    "scanned, 2 pages": (("image",) * 2, "image_only", "rejected"),
+    "scanned, 10 pages": (("image",) * 10, "image_only", "rejected"),
+    "mixed": (("text", "image", "text"), "mixed", "text"),
+    "scan with text pages": (("image", "image", "image", "text"), "image_only", "text"),
+}
+RUNS = 7
+
+
+def extract_all(data: bytes) -> str:
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def triage(data: bytes) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return triage_pdf(PdfReader(io.BytesIO(data)))
+
+
+def parse_outcome(data: bytes) -> str:
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return "text" if parse_pdf(data) else "empty"
+    except ImageOnlyPdf:
+        return "rejected"
+
+
+def median_ms(fn, data: bytes) -> float:
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    print(f"{'Document':<21} | {'Expected':<10} | {'Triage':<10} | {'Text bytes/page':<17} | {'parse_pdf':<9} "
+          f"| {'triage ms':>9} | {'extract ms':>10}")
+    print("-" * 104)
+    ok = True
+    for name, (pages, expected, expected_outcome) in DOCUMENTS.items():
+        data = make_pdf(pages=pages)
+        result = triage(data)
+        density = ",".join(str(page["text_bytes"]) for page in result["page_density"])
+        outcome = parse_outcome(data)
+        ok &= result["kind"] == expected and outcome == expected_outcome
+        print(f"{name:<21} | {expected:<10} | {result['kind']:<10} | {density:<17} | {outcome:<9} "
+              f"| {median_ms(triage, data):>9.2f} | {median_ms(extract_all, data):>10.2f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Priority scheduling: interactive latency during a bulk import, and fair shares across tenants.
+
+End to end: POST /analyze/graph with the fake LLM (--latency-ms per call). An
+interactive evaluation arrives every --interval seconds, alone and then while
+a bulk import of --bulk evaluations from two recruiters is queued at once.
+The import is sent without priority or tenant headers (one FIFO queue, the
+behaviour before priority classes), as interactive work of other tenants
+(fair queuing only), and marked as bulk. Reports the interactive latency
+percentiles and the per-class queue times from /metrics.
+
+Scheduler: the admission controller alone, with simulated service times. Two
+tenants with weights 2 and 1 queue bulk runs; the order of the hand-overs must
+give them slots 2:1, bulk runs must leave the reserved slot free, and an
+interactive run arriving during the import must start at once.
+
+Exits 1 when interactive p95 during a marked bulk import exceeds
+--max-slowdown times the p95 without it, or a scheduler check fails.
+Run from AI_Backend/:
+    python -m benchmarks.priority [--bulk N] [--interactive N] [--latency-ms MS]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_directory = tempfile.mkdtemp()
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ["CHECKPOINTER"] = "memory"
+os.environ.setdefault("RATE_LIMIT", "100000/minute")
+os.environ.setdefault("RESUME_DEDUP", "false")
+os.environ.setdefault("MARKET_STANDARDS_PATH", os.path.join(_directory, "market_standards.sqlite3"))
+os.environ.setdefault("SKILL_INDEX_PATH", os.path.join(_directory, "skill_index.npz"))
+os.environ.setdefault("TRACE_EXPORTER", "none")
+os.environ.setdefault("MEMORY_SAMPLE_INTERVAL_SECONDS", "0")
+
+import httpx
+
+import llm_router
+import main as service
+from admission import AdmissionController
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, constant_latency, install_fake_llm
+
+MAX_IN_FLIGHT = 4
+RESERVED_INTERACTIVE = 1
+
+
+def percentile(values: list, share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def evaluate(client: httpx.AsyncClient, number: int, headers: dict) -> float:
+    started = time.perf_counter()
+    response = await client.post("/analyze/graph", headers=headers, data={
+        "raw_text": f"{SAMPLE_RESUME}\nReference number {number}",
+        "job_description": SAMPLE_JD,
+        "role_name": SAMPLE_ROLE,
+        "timeout_seconds": "3600",
+    })
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def scenario(client: httpx.AsyncClient, args, offset: int, bulk_headers: dict | None,
+                   interactive_headers: dict) -> tuple:
+    """Interactive latencies, and the admission stats, of one run; no bulk import when bulk_headers is None."""
+    service.admission = AdmissionController(MAX_IN_FLIGHT, 1000,
+                                         max_wait=3600, reserved_interactive=RESERVED_INTERACTIVE)
+    bulk = []
+    if bulk_headers is not None:
+        for number in range(args.bulk):
+            # Two recruiters import at once, 3:1 by volume.
+            headers = {**bulk_headers, "X-Tenant-Id": "recruiter-a" if number % 4 else "recruiter-b"} \
+                if bulk_headers else {}
+            bulk.append(asyncio.ensure_future(evaluate(client, offset + 10000 + number, headers)))
+        await asyncio.sleep(args.interval)
+
+    async def interactive(number: int) -> float:
+        await asyncio.sleep(number * args.interval)
+        return await evaluate(client, offset + number, interactive_headers)
+
+    latencies = await asyncio.gather(*(interactive(number) for number in range(args.interactive)))
+    stats = service.admission.stats()
+    for task in bulk:
+        task.cancel()
+    await asyncio.gather(*bulk, return_exceptions=True)
+    return latencies, stats
+
+
+async def scheduler_checks() -> list:
+    problems = []
+    controller = AdmissionController(MAX_IN_FLIGHT, 1000, max_wait=60, reserved_interactive=RESERVED_INTERACTIVE,
+                                     tenant_weights={"heavy": 2.0})
+    order, bulk_peak = [], 0
+
+    async def run(priority: str, tenant: str, seconds: float) -> float:
+        nonlocal bulk_peak
+        queued_at = time.perf_counter()
+        async with controller.slot(priority=priority, tenant=tenant):
+            waited = time.perf_counter() - queued_at
+            order.append(tenant)
+            bulk_peak = max(bulk_peak, controller.in_flight - controller.stats()["classes"]["interactive"]["in_flight"])
+            await asyncio.sleep(seconds)
+        return waited
+
+    bulk = [asyncio.ensure_future(run("bulk", tenant, 0.01)) for tenant in ["light"] * 60 + ["heavy"] * 60]
+    await asyncio.sleep(0.05)
+    interactive_wait = await run("interactive", "recruiter", 0.01)
+    await asyncio.gather(*bulk)
+
+    served = [tenant for tenant in order if tenant != "recruiter"]
+    window = served[MAX_IN_FLIGHT:MAX_IN_FLIGHT + 60]
+    ratio = window.count("heavy") / max(window.count("light"), 1)
+    print(f"Scheduler: tenants with weights 2 and 1 served {ratio:.2f}:1 while both waited; "
+          f"bulk runs in flight at most {bulk_peak} of {MAX_IN_FLIGHT}; "
+          f"interactive run waited {interactive_wait * 1000:.1f} ms during the import")
+    if not 1.8 <= ratio <= 2.2:
+        problems.append(f"weighted fair queuing served the tenants {ratio:.2f}:1 instead of 2:1")
+    if bulk_peak > MAX_IN_FLIGHT - RESERVED_INTERACTIVE:
+        problems.append(f"bulk runs took {bulk_peak} slots, past the {RESERVED_INTERACTIVE} reserved one")
+    if interactive_wait > 0.005:
+        problems.append(f"an interactive run waited {interactive_wait * 1000:.1f} ms for its reserved slot")
+    return problems
+
+
+async def run(args) -> bool:
+    problems = await scheduler_checks()
+    install_fake_llm(FakeChatModel(latency=constant_latency(args.latency_ms / 1000)))
+    llm_router.HEDGING_ENABLED = False
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=service.app), base_url="http://benchmark",
+                                 timeout=3600) as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await evaluate(client, -1, {})
+            recruiter = {"X-Priority": "interactive", "X-Tenant-Id": "recruiter-c"}
+            runs = {
+                "interactive alone": await scenario(client, args, 0, None, recruiter),
+                "bulk, FIFO": await scenario(client, args, 1000, {}, {}),
+                "bulk, same class": await scenario(client, args, 2000, {"X-Priority": "interactive"}, recruiter),
+                "bulk, marked": await scenario(client, args, 3000, {"X-Priority": "bulk"}, recruiter),
+            }
+
+    print(f"\n{args.interactive} interactive evaluations, one every {args.interval:.1f}s; bulk import of {args.bulk}; "
+          f"fake LLM {args.latency_ms:.0f} ms per call; {MAX_IN_FLIGHT} slots, {RESERVED_INTERACTIVE} reserved")
+    print(f"{'Run':<18} | {'p50 ms':>7} | {'p95 ms':>7} | {'interactive class queue p95 ms':>30} | {'bulk queue p95 ms':>17}")
+    print("-" * 92)
+    for name, (latencies, stats) in runs.items():
+        classes = stats["classes"]
+        print(f"{name:<18} | {statistics.median(latencies) * 1000:>7.0f} | {percentile(latencies, 0.95) * 1000:>7.0f} "
+              f"| {classes['interactive']['wait_seconds_p95'] * 1000:>30.0f} "
+              f"| {classes['bulk']['wait_seconds_p95'] * 1000:>17.0f}")
+
+    alone = percentile(runs["interactive alone"][0], 0.95)
+    marked = percentile(runs["bulk, marked"][0], 0.95)
+    if marked > alone * args.max_slowdown:
+        problems.append(f"interactive p95 rose from {alone * 1000:.0f} ms to {marked * 1000:.0f} ms during the bulk "
+                        f"import (allowed {args.max_slowdown:.1f}x)")
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk", type=int, default=60)
+    parser.add_argument("--interactive", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--max-slowdown", type=float, default=2.0,
+                        help="allowed interactive p95 during the import, relative to without it")
+    ok = asyncio.run(run(parser.parse_args()))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
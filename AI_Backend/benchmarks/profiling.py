@@ -0,0 +1,159 @@
+"""Profiling: overhead per capture mode, and what a profiled evaluation shows.
+
+Evaluations go through POST /analyze/graph with the fake LLM. Overhead: with
+instant answers, so the backend's own work is all that is measured, requests
+are sent without profiling, with X-Profile: true (spans) and with X-Profile:
+cprofile, interleaved. Timeline: one spans-profiled evaluation whose stages
+take a fixed time, broken down per node and category, with the concurrency of
+the three agents. Exits 1 when a node or LLM call is missing from the timeline,
+the agents do not overlap, or the aggregate profile is not a readable pstats file.
+Run from AI_Backend/:
+    python -m benchmarks.profiling [--runs N]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import pstats
+import statistics
+import sys
+import tempfile
+import time
+
+_directory = tempfile.mkdtemp()
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("ADMIN_TOKEN", "benchmark")
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+os.environ.setdefault("RATE_LIMIT", "100000/minute")
+os.environ.setdefault("RESUME_DEDUP", "false")
+os.environ.setdefault("MARKET_STANDARDS_PATH", os.path.join(_directory, "market_standards.sqlite3"))
+os.environ.setdefault("SKILL_INDEX_PATH", os.path.join(_directory, "skill_index.npz"))
+
+import httpx
+
+import llm_router
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, install_fake_llm
+from graph import workflow
+from main import app
+from profiling import profile_store
+
+MODES = {"off": None, "spans": "true", "cprofile": "cprofile"}
+STAGE_SECONDS = {"extractor": 0.6, "tech_agent": 0.3, "exp_agent": 0.3, "culture_agent": 0.3}
+DEFAULT_STAGE_SECONDS = 0.1
+
+
+async def evaluate(client: httpx.AsyncClient, number: int, profile: str | None) -> tuple:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = await client.post("/analyze/graph", data={
+            "raw_text": f"{SAMPLE_RESUME}\nReference number {number}",
+            "job_description": SAMPLE_JD,
+            "role_name": SAMPLE_ROLE,
+        }, headers={"X-Profile": profile} if profile else {})
+    response.raise_for_status()
+    return time.perf_counter() - started, response.headers.get("X-Profile-Id")
+
+
+async def measure_overhead(client: httpx.AsyncClient, runs: int) -> dict:
+    install_fake_llm(FakeChatModel())
+    for number in range(3):
+        await evaluate(client, -number - 1, None)
+    latencies = {mode: [] for mode in MODES}
+    for number in range(runs):
+        for mode, header in MODES.items():
+            latency, _ = await evaluate(client, number, header)
+            latencies[mode].append(latency)
+    return latencies
+
+
+def check_timeline(timeline: dict) -> list:
+    problems = []
+    nodes = timeline["nodes"]
+    for node in workflow.nodes:
+        if node not in nodes:
+            problems.append(f"no span for node {node}")
+        elif "llm" not in nodes[node]["breakdown_ms"]:
+            problems.append(f"no LLM call attributed to {node}")
+    if timeline["agents"]["concurrent_ms"] <= 0:
+        problems.append("agents did not overlap")
+    return problems
+
+
+def print_timeline(timeline: dict):
+    print(f"\nTimeline of one evaluation, stages taking {STAGE_SECONDS['extractor']}s (extraction), "
+          f"{STAGE_SECONDS['tech_agent']}s (agents), {DEFAULT_STAGE_SECONDS}s (others); "
+          f"total {timeline['total_ms']:.0f} ms")
+    categories = ("llm", "speculation", "prompt", "json", "log", "cache")
+    print(f"{'Node':<16} | {'start ms':>8} | {'end ms':>8} | {'ms':>7} | "
+          + " | ".join(f"{category:>11}" for category in categories) + f" | {'other':>6}")
+    print("-" * 128)
+    for node, entry in sorted(timeline["nodes"].items(), key=lambda item: item[1]["start_ms"]):
+        breakdown = entry["breakdown_ms"]
+        print(f"{node:<16} | {entry['start_ms']:>8.1f} | {entry['end_ms']:>8.1f} | {entry['duration_ms']:>7.1f} | "
+              + " | ".join(f"{breakdown.get(category, 0.0):>11.1f}" for category in categories)
+              + f" | {entry['other_ms']:>6.1f}")
+    agents = timeline["agents"]
+    print(f"Agents: {agents['count']} node runs in a {agents['window_ms']:.0f} ms window, {agents['sum_ms']:.0f} ms "
+          f"in total, {agents['concurrent_ms']:.0f} ms with two or more running (parallelism "
+          f"{agents['parallelism']:.2f}); graph time outside any node {timeline['graph_overhead_ms']:.1f} ms")
+
+
+async def run(runs: int) -> bool:
+    ok = True
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60,
+                                 headers={"X-Admin-Token": os.getenv("ADMIN_TOKEN", "")}) as client:
+        latencies = await measure_overhead(client, runs)
+        baseline = statistics.median(latencies["off"])
+        print(f"Overhead, {runs} evaluations per mode with instant LLM answers")
+        print(f"{'Mode':<10} | {'median ms':>9} | {'p90 ms':>7} | {'overhead':>8}")
+        print("-" * 44)
+        for mode, values in latencies.items():
+            values.sort()
+            median = statistics.median(values)
+            print(f"{mode:<10} | {median * 1000:>9.1f} | {values[int(len(values) * 0.9)] * 1000:>7.1f} "
+                  f"| {(median - baseline) / baseline:>+8.1%}")
+
+        # With instant answers these are the backend's own costs per stage.
+        aggregate = profile_store.aggregate()
+        print(f"\nSpan totals over {aggregate['requests']} profiled evaluations (both modes), top 8")
+        for entry in aggregate["spans"][:8]:
+            print(f"  {entry['category']:<12} {entry['name']:<40} {entry['count']:>5} x {entry['mean_ms']:>7.2f} ms")
+
+        install_fake_llm(FakeChatModel(latency=lambda stage: STAGE_SECONDS.get(stage, DEFAULT_STAGE_SECONDS)))
+        _, profile_id = await evaluate(client, runs, "true")
+        timeline = (await client.get(f"/admin/profiles/{profile_id}")).json()
+        print_timeline(timeline)
+        problems = check_timeline(timeline)
+        folded = (await client.get(f"/admin/profiles/{profile_id}", params={"format": "folded"})).text
+        print(f"Flame graph input: {len(folded.splitlines())} collapsed stacks, e.g.")
+        for line in sorted(folded.splitlines(), key=lambda line: -int(line.rsplit(" ", 1)[1]))[:4]:
+            print(f"  {line}")
+
+        response = await client.get("/admin/profiles/aggregate", params={"format": "pstats"})
+        path = os.path.join(_directory, "evaluations.prof")
+        with open(path, "wb") as f:
+            f.write(response.content)
+        try:
+            functions = len(pstats.Stats(path).stats)
+            print(f"Aggregate cProfile download: {len(response.content) / 1024:.0f} KB, {functions} functions")
+        except Exception as e:
+            problems.append(f"aggregate profile is not a pstats file: {e}")
+    for problem in problems:
+        print(f"FAILED: {problem}")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    # Hedge delays learned from the instant answers would hedge every timed call.
+    llm_router.HEDGING_ENABLED = False
+    sys.exit(0 if asyncio.run(run(args.runs)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Reports the static (cacheable) prefix and per-request variable tokens of every prompt.
+
+Runs the sample evaluation against the fake LLM, records the messages each stage
+sends, and splits them into the system prefix and the user message. Exits with
+status 1 if any system message still interpolates variables, since that defeats
+provider-side prefix caching. Run from AI_Backend/:
+    python -m benchmarks.prompt_prefix
+"""
+import asyncio
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+# Every stage must really run; stored node outputs would short-circuit it.
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+
+import prompts
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, detect_stage, install_fake_llm
+from graph import app_graph
+from main import build_initial_state, release_initial_state
+
+PROMPTS = {
+    "extractor": "RESUME_EXTRACTION_PROMPT",
+    "jd_parser": "JD_PARSING_PROMPT",
+    "alignment_check": "JD_ROLE_ALIGNMENT_PROMPT",
+    "tech_agent": "COMPETENCY_EVAL_PROMPT",
+    "exp_agent": "EXP_EVAL_PROMPT",
+    "culture_agent": "CULTURE_EVAL_PROMPT",
+    "aggregator": "AGGREGATOR_PROMPT",
+    "feedback": "FEEDBACK_GENERATION_PROMPT",
+}
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKENIZER = "cl100k_base"
+except Exception:
+    # tiktoken missing, or its encoding file cannot be downloaded.
+    def count_tokens(text: str) -> int:
+        return len(text) // 4
+
+    TOKENIZER = "estimate, 4 chars/token"
+
+
+class RecordingFake(FakeChatModel):
+    sent: dict = {}
+
+    def _answer(self, messages):
+        self.sent[detect_stage(messages)] = messages
+        return super()._answer(messages)
+
+
+def record_messages() -> dict:
+    fake = install_fake_llm(RecordingFake(sent={}))
+    initial_state = build_initial_state(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(app_graph.ainvoke(initial_state, config={"configurable": {"thread_id": str(uuid.uuid4())}}))
+    finally:
+        release_initial_state(initial_state)
+    return fake.sent
+
+
+def main():
+    sent = record_messages()
+    print(f"Prompt version {prompts.PROMPT_VERSION}; tokens: {TOKENIZER}")
+    print(f"{'Stage':<16} | {'prompt':<26} | {'static prefix':>13} | {'variable':>8} | {'cacheable':>9} | {'prefix sha256':<12}")
+    print("-" * 100)
+    dynamic = []
+    for stage, name in PROMPTS.items():
+        template = getattr(prompts, name)
+        system_variables = template.messages[0].prompt.input_variables
+        if system_variables:
+            dynamic.append(f"{name}: {', '.join(system_variables)}")
+        messages = sent.get(stage, [])
+        static = str(messages[0].content) if messages else ""
+        variable = "".join(str(message.content) for message in messages[1:])
+        static_tokens, variable_tokens = count_tokens(static), count_tokens(variable)
+        share = static_tokens / max(static_tokens + variable_tokens, 1)
+        fingerprint = hashlib.sha256(static.encode("utf-8")).hexdigest()[:12]
+        print(f"{stage:<16} | {name:<26} | {static_tokens:>13} | {variable_tokens:>8} | {share:>9.0%} | {fingerprint:<12}")
+    if dynamic:
+        print("\nSystem messages with per-request variables (not cacheable):")
+        for line in dynamic:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measures bulk re-scoring of a posting through POST /rescore/posting.
+
+A posting's candidates are evaluated once, then re-scored after the JD is
+edited and after only the category weights change, and finally re-scored after
+the JD edit with the node cache disabled (the old from-scratch behaviour).
+Fake answers carry a digest of their input in a text field the nodes keep, so
+every changed input really changes the stage's output. Run from AI_Backend/:
+    python -m benchmarks.rescore [--candidates N]
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("CHECKPOINTER", "memory")
+_directory = tempfile.mkdtemp()
+os.environ["NODE_CACHE_PATH"] = os.path.join(_directory, "node_cache.sqlite3")
+os.environ.setdefault("SKILL_INDEX_PATH", os.path.join(_directory, "skill_index.npz"))
+os.environ.setdefault("MARKET_STANDARDS_PATH", os.path.join(_directory, "market_standards.sqlite3"))
+
+import httpx
+
+import node_cache
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, constant_latency, install_fake_llm
+from main import app
+
+CALL_SECONDS = 0.05
+EDITED_JD = SAMPLE_JD + "Nice to have: experience with feature stores and model monitoring.\n"
+WEIGHTS = {"competency": 0.6, "experience": 0.3, "soft_skills": 0.1}
+DIGEST_FIELDS = ("reasoning", "final_reasoning")
+# Lists the downstream stages read: resume skills and JD requirements.
+DIGEST_LISTS = ("skills", "primary_requirements")
+
+
+class DigestingModel(FakeChatModel):
+    def _answer(self, messages):
+        content, delay = super()._answer(messages)
+        answer = json.loads(content)
+        digest = hashlib.sha256(str(messages[-1].content).encode()).hexdigest()[:12]
+        field = next((f for f in DIGEST_FIELDS if isinstance(answer.get(f), str)), None)
+        listed = next((f for f in DIGEST_LISTS if isinstance(answer.get(f), list)), None)
+        if listed:
+            answer[listed].append(f"Item {digest}")
+        elif field:
+            answer[field] = f"{answer[field]} [{digest}]"
+        else:
+            answer["input_digest"] = digest
+        return json.dumps(answer), delay
+
+
+async def rescore(client: httpx.AsyncClient, job_description: str, candidates: list, weights=None) -> dict:
+    response = await client.post("/rescore/posting", json={
+        "job_description": job_description,
+        "role_name": SAMPLE_ROLE,
+        "weights": weights,
+        "candidates": candidates,
+    }, timeout=600)
+    response.raise_for_status()
+    return response.json()
+
+
+async def run(candidate_count: int):
+    fake = install_fake_llm(DigestingModel(latency=constant_latency(CALL_SECONDS), calls=[]))
+    candidates = [
+        {"candidate_id": f"c{i}", "raw_text": f"Candidate #{i}\n{SAMPLE_RESUME}"}
+        for i in range(candidate_count)
+    ]
+    scenarios = [
+        ("initial evaluation", SAMPLE_JD, None, True),
+        ("JD edited", EDITED_JD + " ", None, True),
+        ("weights changed", EDITED_JD + " ", WEIGHTS, True),
+        ("JD edited, no cache", EDITED_JD, None, False),
+    ]
+    print(f"{candidate_count} candidates, {CALL_SECONDS * 1000:.0f}ms per fake LLM call")
+    print(f"{'Scenario':<20} | {'seconds':>7} | {'LLM calls':>9} | {'calls/cand':>10} | {'stages reused':>13} | {'failed':>6}")
+    print("-" * 80)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for name, job_description, weights, cached in scenarios:
+            node_cache.NODE_CACHE_ENABLED = cached
+            calls_before = len(fake.calls)
+            started = time.monotonic()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = await rescore(client, job_description, candidates, weights)
+            elapsed = time.monotonic() - started
+            calls = len(fake.calls) - calls_before
+            print(f"{name:<20} | {elapsed:>7.2f} | {calls:>9} | {calls / candidate_count:>10.2f} "
+                  f"| {result['stages_reused']:>13} | {result['failed']:>6}")
+    node_cache.NODE_CACHE_ENABLED = True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args.candidates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Sample resumes as the parsers return them with PRESERVE_RESUME_LAYOUT: one
+line per layout line, blank lines between blocks and a form feed line between
+pages. Each comes with the facts the extraction must still see ("required") and
+content it never uses ("irrelevant").
+"""
+
+SAMPLE_RESUMES = {
+    "ml_engineer": {
+        "text": """Jane A. Doe
+Senior Machine Learning Engineer
+jane.doe@example.com | +1 555 0100 | linkedin.com/in/janedoe
+
+PROFESSIONAL SUMMARY
+Machine learning engineer with 8 years building production ML platforms on AWS.
+
+WORK EXPERIENCE
+Acme Analytics — Senior Machine Learning Engineer, 2021 – Present
+• Led MLOps platform design on AWS EKS serving 2M requests/day with p99 < 120ms
+• Deployed LLM-based retrieval services with LangChain and PostgreSQL pgvector
+• Mentored four engineers and ran the model review board
+
+Jane A. Doe — Resume
+Page 1 of 2
+\f
+Globex Corporation — Machine Learning Engineer, 2017 – 2021
+• Built Python data pipelines on AWS Lambda, S3, Glue and PostgreSQL
+• Cut batch scoring cost by 40% by moving feature generation to Spark
+
+EDUCATION
+M.Sc. Computer Science, University of Toronto, 2017
+B.Sc. Mathematics, McGill University, 2015
+
+SKILLS
+Languages: Python, SQL, Go
+Frameworks: PyTorch, scikit-learn, LangChain
+Cloud & DevOps: AWS, Docker, Kubernetes, Terraform
+
+CERTIFICATIONS
+AWS Certified Machine Learning – Specialty (2022)
+Certified Kubernetes Administrator (2020)
+
+INTERESTS
+Marathon running, landscape photography, chess club captain
+Volunteering at the local food bank on weekends
+
+REFERENCES
+Available upon request
+
+Jane A. Doe — Resume
+Page 2 of 2""",
+        "required": ["jane.doe@example.com", "+1 555 0100", "Acme Analytics", "Globex Corporation",
+                     "M.Sc. Computer Science", "University of Toronto", "PyTorch", "Terraform",
+                     "AWS Certified Machine Learning", "Certified Kubernetes Administrator", "2M requests/day"],
+        "irrelevant": ["Marathon running", "landscape photography", "food bank", "Page 1 of 2"],
+    },
+    "backend_developer": {
+        "text": """RAHUL MEHTA
+Backend Developer · Bengaluru, India
+rahul.mehta@example.in · +91 98765 43210
+
+Objective
+To work as a backend developer in a fast-growing product company.
+
+Technical Skills
+Java, Spring Boot, Kotlin, PostgreSQL, Redis, Kafka, Docker, Jenkins
+Languages: Java, Kotlin, Python
+
+Experience
+Flipkart, Software Development Engineer II (2020 - Present)
+- Designed the order reconciliation service processing 5M events/day on Kafka
+- Reduced p95 checkout latency from 900ms to 250ms with Redis caching
+Infosys, Systems Engineer (2017 - 2020)
+- Maintained Spring Boot microservices for a banking client
+
+Projects
+Distributed rate limiter — token bucket in Go backed by Redis, open-sourced on GitHub
+
+Education
+B.Tech in Computer Science, IIT Roorkee, 2017 — CGPA 8.4
+
+Achievements
+Winner, Flipkart internal hackathon 2021
+Star performer award, Infosys 2019
+Runner-up, Smart India Hackathon 2016
+Published two articles on the Flipkart engineering blog
+Top 1% on LeetCode weekly contests
+Speaker at a local Java user group meetup
+
+Personal Details
+Date of Birth: 14 March 1995
+Father's Name: Suresh Mehta
+Marital Status: Single
+Nationality: Indian
+Passport: available
+
+Declaration
+I hereby declare that the above information is true to the best of my knowledge.
+Place: Bengaluru""",
+        "required": ["rahul.mehta@example.in", "+91 98765 43210", "Flipkart", "Infosys", "Spring Boot", "Kafka",
+                     "5M events/day", "B.Tech in Computer Science", "IIT Roorkee", "Distributed rate limiter",
+                     "Winner, Flipkart internal hackathon"],
+        "irrelevant": ["Date of Birth", "Father's Name", "Marital Status", "I hereby declare"],
+    },
+    "data_analyst": {
+        "text": """Maria Garcia
+Data Analyst
+Madrid, Spain | maria.garcia@example.es | +34 612 345 678
+
+Profile
+Data analyst turning retail sales data into pricing decisions. Fluent in SQL and Python.
+
+Employment History
+Zara (Inditex) | Data Analyst | 2019 – Present
+Built Tableau dashboards for 300 store managers.
+Forecasted weekly demand with Prophet, improving accuracy by 18%.
+Telefonica | Junior Analyst | 2017 – 2019
+Automated monthly churn reports in Python and Excel.
+
+Education & Training
+MSc Business Analytics, IE Business School, 2017
+Google Data Analytics Professional Certificate, 2021
+
+Core Competencies
+SQL, Python (pandas), Tableau, Power BI, Excel, A/B testing, forecasting
+
+Languages
+Spanish (native), English (C1), French (B1)
+
+Hobbies & Interests
+Salsa dancing, cooking, travel photography
+
+Volunteer Experience
+Data for Good Madrid — pro bono dashboards for NGOs, 2020 – Present
+Red Cross — weekend volunteer, 2016 – 2018
+Code club mentor for teenagers, 2019
+Charity run organiser, 2018
+Beach clean-up coordinator, 2017
+Museum guide, 2015""",
+        "required": ["maria.garcia@example.es", "+34 612 345 678", "Zara (Inditex)", "Telefonica", "Tableau",
+                     "Prophet", "MSc Business Analytics", "IE Business School",
+                     "Google Data Analytics Professional Certificate", "English (C1)", "Data for Good Madrid"],
+        "irrelevant": ["Salsa dancing", "travel photography", "Beach clean-up", "Museum guide"],
+    },
+    "devops_engineer": {
+        "text": """Tom Becker — DevOps Engineer
+tom.becker@example.de
+Hobbies: climbing, board games
+
+About Me
+Platform engineer who likes boring, reliable infrastructure.
+
+Experience
+SAP SE — Site Reliability Engineer — 2020–present
+Migrated 120 services from VMs to Kubernetes (GKE) with Argo CD
+Introduced SLOs and error budgets; paging volume down 60%
+
+Experience (continued)
+Deutsche Telekom — Systems Administrator — 2016–2020
+Automated server provisioning with Ansible and Terraform
+
+Skills: Kubernetes, Terraform, Ansible, Argo CD, Prometheus, Grafana, GCP, Bash, Go
+
+Certifications
+Google Professional Cloud Architect
+HashiCorp Certified: Terraform Associate
+
+Education
+Diplom-Informatiker (Dipl.-Inf.), TU München, 2016
+
+Referees
+Dr. Anna Schmidt, Head of Platform, SAP SE, anna.schmidt@example.de
+Available on request""",
+        "required": ["tom.becker@example.de", "SAP SE", "Deutsche Telekom", "Kubernetes (GKE)", "Ansible",
+                     "Prometheus", "Google Professional Cloud Architect", "Terraform Associate", "TU München",
+                     "paging volume down 60%"],
+        "irrelevant": ["climbing", "board games", "Head of Platform"],
+    },
+}
@@ -0,0 +1,103 @@
+"""Resume section segmentation: extraction prompt size and what it still contains.
+
+For each sample resume (benchmarks/resumes.py) the extraction prompt is
+formatted with the full text and with compact_resume's text, and both are
+counted in tokens. Accuracy is the share of required facts (contact details,
+employers, degrees, skills, certifications) still present in the compact text,
+and the share of irrelevant content (hobbies, referees, personal details)
+removed. With --live the configured extractor model runs on both texts, and its
+skills, employers and certifications are compared. Exits 1 if a required fact
+is lost. Run from AI_Backend/:
+    python -m benchmarks.sections [--live]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from benchmarks.prompt_prefix import TOKENIZER, count_tokens
+from benchmarks.resumes import SAMPLE_RESUMES
+from prompts import RESUME_EXTRACTION_PROMPT
+from sections import compact_resume
+
+
+def prompt_tokens(resume_text: str) -> int:
+    messages = RESUME_EXTRACTION_PROMPT.format_messages(resume_text=resume_text)
+    return sum(count_tokens(message.content) for message in messages)
+
+
+def extract(resume_text: str) -> dict:
+    from llm_router import invoke_json
+    with contextlib.redirect_stdout(io.StringIO()):
+        return invoke_json("extractor", RESUME_EXTRACTION_PROMPT, {"resume_text": resume_text})
+
+
+def _names(items, key) -> set:
+    return {str(item.get(key, "") if key and isinstance(item, dict) else item).strip().lower()
+            for item in items or []}
+
+
+def agreement(full: dict, compact: dict) -> dict:
+    """Jaccard overlap of the fields the scoring agents read."""
+    fields = {
+        "skills": (full.get("skills"), compact.get("skills"), None),
+        "employers": (full.get("work_experience"), compact.get("work_experience"), "company"),
+        "certifications": (full.get("certifications"), compact.get("certifications"), None),
+    }
+    overlap = {}
+    for field, (a, b, key) in fields.items():
+        a, b = _names(a, key), _names(b, key)
+        overlap[field] = len(a & b) / len(a | b) if a | b else 1.0
+    overlap["same_email"] = str(full.get("email", "")).lower() == str(compact.get("email", "")).lower()
+    return overlap
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="run the configured extractor model on both texts")
+    args = parser.parse_args()
+
+    print(f"Tokens counted with {TOKENIZER}")
+    print(f"{'Resume':<18} | {'resume tok':>10} | {'compact tok':>11} | {'saved':>6} | {'prompt tok':>10} "
+          f"| {'compact prompt':>14} | {'saved':>6} | {'facts kept':>10} | {'noise removed':>13} "
+          f"| sections dropped/shortened")
+    print("-" * 149)
+    ok = True
+    totals = [0, 0]
+    for name, sample in SAMPLE_RESUMES.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            compact, report = compact_resume(sample["text"])
+        full_prompt, compact_prompt = prompt_tokens(sample["text"]), prompt_tokens(compact)
+        totals[0] += full_prompt
+        totals[1] += compact_prompt
+        lost = [fact for fact in sample["required"] if fact not in compact]
+        removed = [fact for fact in sample["irrelevant"] if fact not in compact]
+        ok &= not lost
+        changed = ", ".join(f"{s['kind']}:{s['action']}" for s in report["sections"] if s["action"] != "kept")
+        resume, resume_compact = count_tokens(sample["text"]), count_tokens(compact)
+        print(f"{name:<18} | {resume:>10} | {resume_compact:>11} | {1 - resume_compact / resume:>6.1%} "
+              f"| {full_prompt:>10} | {compact_prompt:>14} | {1 - compact_prompt / full_prompt:>6.1%} "
+              f"| {len(sample['required']) - len(lost):>4}/{len(sample['required']):<5} "
+              f"| {len(removed):>6}/{len(sample['irrelevant']):<6} | {changed}")
+        for fact in lost:
+            print(f"  lost: {fact}")
+    print(f"{'all':<18} | {'':>10} | {'':>11} | {'':>6} | {totals[0]:>10} | {totals[1]:>14} "
+          f"| {1 - totals[1] / totals[0]:>6.1%}")
+
+    if args.live:
+        print(f"\n{'Resume':<18} | {'skills':>6} | {'employers':>9} | {'certifications':>14} | same email")
+        print("-" * 70)
+        for name, sample in SAMPLE_RESUMES.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                compact, _ = compact_resume(sample["text"])
+            overlap = agreement(extract(sample["text"]), extract(compact))
+            print(f"{name:<18} | {overlap['skills']:>6.2f} | {overlap['employers']:>9.2f} "
+                  f"| {overlap['certifications']:>14.2f} | {overlap['same_email']}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Startup: import time of the app and time until the process is warm.
+
+Each run starts a fresh interpreter with `python -X importtime -c "import main"`
+and reads the total import time and the per-module breakdown; another fresh
+interpreter imports the app and runs the warm-up (without opening connections,
+so it needs no network or API key). Exits 1 when a lazily imported module (the
+parsers, the LLM provider SDKs) is imported with the app, or when the median
+import time exceeds --budget-ms. CI runs this on every pull request and keeps
+the importtime output as an artifact. Run from AI_Backend/:
+    python -m benchmarks.startup [--runs N] [--budget-ms MS] [--output DIR]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Must not be imported by `import main`; the app imports them on first use or in the warm-up.
+LAZY_MODULES = ("pypdf", "mammoth", "langchain_groq", "groq", "langchain_openai", "openai")
+WARM_SCRIPT = "import json, main; from startup import readiness; readiness.start(); readiness.wait(); " \
+              "print(json.dumps(readiness.status()))"
+
+
+def environment(directory: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "benchmark")
+    env.update({
+        "CHECKPOINT_DB_PATH": os.path.join(directory, "checkpoints.sqlite3"),
+        "NODE_CACHE_PATH": os.path.join(directory, "node_cache.sqlite3"),
+        "MARKET_STANDARDS_PATH": os.path.join(directory, "market_standards.sqlite3"),
+        "RESUME_DEDUP_PATH": os.path.join(directory, "resume_dedup.sqlite3"),
+        "SKILL_INDEX_PATH": os.path.join(directory, "skill_index.npz"),
+        "TRACE_EXPORTER": "none",
+        "MEMORY_SAMPLE_INTERVAL_SECONDS": "0",
+        "WARMUP_CONNECT": "false",
+    })
+    return env
+
+
+def parse_importtime(output: str) -> list:
+    """(module, depth, self_us, cumulative_us) per line of -X importtime output."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def import_run(env: dict) -> tuple:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], env=env,
+                            capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, result.stderr
+
+
+def warm_run(env: dict) -> tuple:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", WARM_SCRIPT], env=env, capture_output=True, text=True, check=True)
+    status = json.loads([line for line in result.stdout.splitlines() if line.startswith("{")][-1])
+    return time.perf_counter() - started, status
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail above this median import time (0: no budget)")
+    parser.add_argument("--output", help="directory for the importtime output and a JSON summary")
+    args = parser.parse_args()
+    env = environment(tempfile.mkdtemp())
+
+    # The first run writes the bytecode caches; it is not counted.
+    import_run(env)
+    imports, warm_ups = [], []
+    for _ in range(args.runs):
+        process_seconds, output = import_run(env)
+        modules = parse_importtime(output)
+        imports.append((next(m[3] for m in modules if m[0] == "main") / 1000, process_seconds * 1000, output))
+        warm_ups.append(warm_run(env))
+    import_ms = statistics.median(entry[0] for entry in imports)
+    median_run = sorted(imports, key=lambda entry: entry[0])[len(imports) // 2]
+    modules = parse_importtime(median_run[2])
+    warm_status = warm_ups[len(warm_ups) // 2][1]
+
+    print(f"Import of main, {args.runs} fresh interpreters: median {import_ms:.0f} ms "
+          f"(min {min(entry[0] for entry in imports):.0f}, max {max(entry[0] for entry in imports):.0f}); "
+          f"whole process {statistics.median(entry[1] for entry in imports):.0f} ms")
+    print(f"Process warm: median {statistics.median(seconds for seconds, _ in warm_ups) * 1000:.0f} ms "
+          f"(imported after {warm_status['imported_after_seconds'] * 1000:.0f} ms, "
+          f"warm after {warm_status['warm_after_seconds'] * 1000:.0f} ms of the process)")
+    for step, entry in warm_status["steps"].items():
+        print(f"  warm-up {step:<20} {entry['ms']:>7.1f} ms  {entry['status']}")
+
+    print(f"\n{'Imported by main':<36} | {'cumulative ms':>13} | {'self ms':>7}")
+    print("-" * 64)
+    for name, _, self_us, cumulative_us in sorted((m for m in modules if m[1] == 1), key=lambda m: -m[3])[:12]:
+        print(f"{name:<36} | {cumulative_us / 1000:>13.1f} | {self_us / 1000:>7.1f}")
+    print(f"\n{'Slowest modules (self time)':<36} | {'self ms':>7}")
+    print("-" * 48)
+    for name, _, self_us, _ in sorted(modules, key=lambda m: -m[2])[:10]:
+        print(f"{name:<36} | {self_us / 1000:>7.1f}")
+
+    imported = {m[0] for m in modules}
+    problems = [f"{module} is imported with the app" for module in LAZY_MODULES if module in imported]
+    if args.budget_ms and import_ms > args.budget_ms:
+        problems.append(f"median import time {import_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        with open(os.path.join(args.output, "importtime.txt"), "w") as f:
+            f.write(median_run[2])
+        with open(os.path.join(args.output, "startup.json"), "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "import_ms": round(import_ms, 1),
+                       "budget_ms": args.budget_ms, "warm_up": warm_status, "modules": len(modules),
+                       "problems": problems}, f, indent=2)
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
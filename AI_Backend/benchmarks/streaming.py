@@ -0,0 +1,168 @@
+"""Measures how much streaming extraction with speculative agent starts shortens a run.
+
+Every stage answers from the fake LLM with a fixed generation time spread over
+the streamed chunks; extraction is the longest. Scenarios:
+  sequential   agents wait for the whole extraction (SPECULATIVE_AGENTS=false)
+  speculative  agents start once the profile fields they read are complete
+  reconciled   the first extraction answer is cut off and the fallback model
+               returns a different profile, so the speculative answers must be
+               discarded and the agents re-run on the final profile
+Run from AI_Backend/:
+    python -m benchmarks.streaming [--runs N]
+"""
+import argparse
+import asyncio
+import contextlib
+import copy
+import hashlib
+import io
+import json
+import os
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+# Every stage must really run; stored node outputs would short-circuit it.
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+
+import llm_router
+import speculation
+from benchmarks.fake_llm import (
+    CANNED_RESPONSES, SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE,
+    FakeChatModel, detect_stage, install_fake_llm,
+)
+from graph import app_graph
+from main import build_initial_state, release_initial_state
+
+STAGE_SECONDS = {"extractor": 1.2, "tech_agent": 0.5, "exp_agent": 0.5, "culture_agent": 0.5}
+DEFAULT_STAGE_SECONDS = 0.2
+AGENT_STATES = ("tech_evaluation", "experience_evaluation", "culture_evaluation")
+
+
+def stage_latency(stage: str) -> float:
+    return STAGE_SECONDS.get(stage, DEFAULT_STAGE_SECONDS)
+
+
+class InputEchoingModel(FakeChatModel):
+    """Agents answer with a fingerprint of their input, so a speculative answer
+    computed from a stale profile shows up as a different agent output.
+    """
+
+    def _answer(self, messages):
+        content, delay = super()._answer(messages)
+        if detect_stage(messages) in ("tech_agent", "exp_agent", "culture_agent"):
+            answer = json.loads(content)
+            answer["reasoning"] = hashlib.sha256(str(messages[-1].content).encode()).hexdigest()[:12]
+            content = json.dumps(answer)
+        return content, delay
+
+
+class CutOffExtraction(InputEchoingModel):
+    """Streams the extraction but stops just before the closing brace."""
+
+    def _answer(self, messages):
+        content, delay = super()._answer(messages)
+        return content[:-40], delay
+
+
+def revised_responses() -> dict:
+    responses = copy.deepcopy(CANNED_RESPONSES)
+    responses["extractor"]["skills"].append("Terraform Cloud")
+    responses["extractor"]["work_experience"][1]["end_date"] = "2021-06"
+    return responses
+
+
+def install(scenario: str) -> FakeChatModel:
+    llm_router.NODE_POLICIES.pop("extractor", None)
+    speculation.SPECULATIVE_AGENTS = scenario != "sequential"
+    if scenario == "reconciled":
+        main_model = InputEchoingModel(latency=stage_latency, responses=revised_responses(), calls=[])
+        cut_off = CutOffExtraction(latency=stage_latency)
+        cut_off.calls = main_model.calls  # one shared list; passing it to the constructor copies it
+        llm_router.NODE_POLICIES["extractor"] = {"hedge_after": 60.0, "models": ["fake:cut-off", "fake:main"]}
+        return install_fake_llm(main_model, by_spec={"fake:cut-off": cut_off})
+    return install_fake_llm(InputEchoingModel(latency=stage_latency, calls=[]))
+
+
+async def evaluate() -> tuple:
+    initial_state = build_initial_state(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE)
+    thread_id = str(uuid.uuid4())
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            final_state = await app_graph.ainvoke(initial_state, config={"configurable": {"thread_id": thread_id}})
+    finally:
+        release_initial_state(initial_state)
+        speculation.discard(thread_id)
+    return time.monotonic() - started, final_state
+
+
+def run_scenario(scenario: str, runs: int) -> dict:
+    fake = install(scenario)
+    speculation._counters.update(started=0, hits=0)
+    latencies, states = [], []
+    for _ in range(runs):
+        latency, state = asyncio.run(evaluate())
+        latencies.append(latency)
+        states.append(state)
+    # Let discarded speculative calls finish before counting calls.
+    time.sleep(max(STAGE_SECONDS.values()))
+    return {
+        "latencies": latencies,
+        "states": states,
+        "llm_calls": len(fake.calls) / runs,
+        "started": speculation._counters["started"] / runs,
+        "hits": speculation._counters["hits"] / runs,
+    }
+
+
+def agent_outputs(state: dict) -> tuple:
+    return tuple(
+        {k: v for k, v in state[key].items() if k != "score_override_reason"}
+        for key in AGENT_STATES
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    llm_router.HEDGING_ENABLED = False
+
+    critical_path = (2 * DEFAULT_STAGE_SECONDS + STAGE_SECONDS["extractor"] + STAGE_SECONDS["tech_agent"]
+                     + 2 * DEFAULT_STAGE_SECONDS)
+    print(f"{args.runs} runs per scenario; stage times: extraction {STAGE_SECONDS['extractor']}s, "
+          f"agents {STAGE_SECONDS['tech_agent']}s, others {DEFAULT_STAGE_SECONDS}s "
+          f"(sequential critical path {critical_path:.1f}s)")
+    print(f"{'Scenario':<12} | {'mean s':>6} | {'min s':>6} | {'vs sequential':>13} | {'LLM calls':>9} "
+          f"| {'early starts':>12} | {'reused':>6} | {'agent outputs':>13}")
+    print("-" * 100)
+    baseline = None
+    for scenario in ("sequential", "speculative", "reconciled"):
+        result = run_scenario(scenario, args.runs)
+        mean = statistics.mean(result["latencies"])
+        if baseline is None:
+            baseline = result
+        reference = run_reference(scenario, baseline)
+        same = all(agent_outputs(s) == agent_outputs(reference) for s in result["states"])
+        change = (mean - statistics.mean(baseline["latencies"])) / statistics.mean(baseline["latencies"])
+        print(f"{scenario:<12} | {mean:>6.3f} | {min(result['latencies']):>6.3f} | {change:>+13.1%} "
+              f"| {result['llm_calls']:>9.1f} | {result['started']:>12.1f} | {result['hits']:>6.1f} "
+              f"| {'as expected' if same else 'DIFFERENT':>13}")
+
+
+def run_reference(scenario: str, baseline: dict) -> dict:
+    """Agent outputs a non-speculative run produces for the scenario's final profile."""
+    if scenario != "reconciled":
+        return baseline["states"][0]
+    install_fake_llm(InputEchoingModel(responses=revised_responses(), calls=[]))
+    speculation.SPECULATIVE_AGENTS = False
+    llm_router.NODE_POLICIES.pop("extractor", None)
+    _, state = asyncio.run(evaluate())
+    return state
+
+
+if __name__ == "__main__":
+    main()
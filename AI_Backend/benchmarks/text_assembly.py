@@ -0,0 +1,58 @@
+"""Microbenchmark: assembling and normalizing the text of 1-, 10- and 100-page PDFs.
+
+  previous   `text += page + "\\n"` per page, then re.sub(r"\\s+", " ") over the whole text
+  flat       per-page normalization with the precompiled pattern, one join over a generator
+  layout     the same, keeping line breaks and block boundaries (PRESERVE_RESUME_LAYOUT)
+
+Page texts come from pypdf's extract_text on generated resume pages; the pypdf
+extraction time of the whole document is shown for scale. Exits 1 if the flat
+output differs from the previous output. Run from AI_Backend/:
+    python -m benchmarks.text_assembly
+"""
+import io
+import re
+import sys
+import time
+import timeit
+
+from pypdf import PdfReader
+
+from benchmarks.documents import make_pdf
+from parsing import join_normalized
+
+PAGE_COUNTS = (1, 10, 100)
+
+
+def previous_assembly(pages) -> str:
+    text = ""
+    for content in pages:
+        if content:
+            text += content + "\n"
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def best_ms(fn, number: int = 20) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    print(f"{'Pages':>5} | {'Chars':>7} | {'pypdf extract ms':>16} | {'previous ms':>11} | {'flat ms':>8} "
+          f"| {'layout ms':>9}")
+    print("-" * 74)
+    ok = True
+    for count in PAGE_COUNTS:
+        reader = PdfReader(io.BytesIO(make_pdf(pages=("text",) * count)))
+        started = time.perf_counter()
+        pages = [page.extract_text() for page in reader.pages]
+        extract_ms = (time.perf_counter() - started) * 1000
+        ok &= join_normalized(pages) == previous_assembly(pages)
+        previous = best_ms(lambda: previous_assembly(pages))
+        flat = best_ms(lambda: join_normalized(pages))
+        layout = best_ms(lambda: join_normalized(pages, keep_layout=True))
+        print(f"{count:>5} | {sum(map(len, pages)):>7} | {extract_ms:>16.1f} | {previous:>11.3f} | {flat:>8.3f} "
+              f"| {layout:>9.3f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Tracing: overhead, and the span tree of one traced evaluation.
+
+Evaluations go through POST /analyze/graph with the fake LLM and instant answers,
+so the backend's own work is all that is measured; requests alternate between
+TRACE_EXPORTER=none and file export to a temporary TRACE_FILE. One evaluation
+then continues an incoming sampled traceparent and is printed as a span tree;
+another carries an unsampled one. Exits 1 when the trace was not continued, a
+node or LLM span is missing or misparented, LLM spans lack token counts, or spans
+of the unsampled request were exported. Run from AI_Backend/:
+    python -m benchmarks.tracing [--runs N]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_directory = tempfile.mkdtemp()
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+os.environ.setdefault("RATE_LIMIT", "100000/minute")
+os.environ.setdefault("RESUME_DEDUP", "false")
+os.environ.setdefault("MARKET_STANDARDS_PATH", os.path.join(_directory, "market_standards.sqlite3"))
+os.environ.setdefault("SKILL_INDEX_PATH", os.path.join(_directory, "skill_index.npz"))
+os.environ["TRACE_EXPORTER"] = "file"
+os.environ["TRACE_FILE"] = os.path.join(_directory, "traces.jsonl")
+os.environ["TRACE_SAMPLE_RATE"] = "1.0"
+
+import httpx
+
+import llm_router
+import tracing
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, install_fake_llm
+from graph import workflow
+from main import app
+
+MODES = ("none", "file")
+SAMPLED_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+UNSAMPLED_TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+async def evaluate(client: httpx.AsyncClient, number: int, traceparent: str | None = None) -> tuple:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = await client.post("/analyze/graph", data={
+            "raw_text": f"{SAMPLE_RESUME}\nReference number {number}",
+            "job_description": SAMPLE_JD,
+            "role_name": SAMPLE_ROLE,
+        }, headers={"traceparent": traceparent} if traceparent else {})
+    response.raise_for_status()
+    return time.perf_counter() - started, response.headers
+
+
+async def measure_overhead(client: httpx.AsyncClient, runs: int) -> dict:
+    for number in range(3):
+        await evaluate(client, -number - 1)
+    latencies = {mode: [] for mode in MODES}
+    for number in range(runs):
+        for mode in MODES:
+            tracing.TRACE_EXPORTER = mode
+            latency, _ = await evaluate(client, number)
+            latencies[mode].append(latency)
+    tracing.TRACE_EXPORTER = "file"
+    return latencies
+
+
+def check_trace(spans: list, headers) -> list:
+    problems = []
+    if headers.get("X-Trace-Id") != SAMPLED_TRACE_ID:
+        problems.append(f"incoming trace not continued (X-Trace-Id {headers.get('X-Trace-Id')})")
+    trace = [span for span in spans if span["traceId"] == SAMPLED_TRACE_ID]
+    by_id = {span["spanId"]: span for span in trace}
+    servers = [span for span in trace if span.get("parentSpanId") == PARENT_ID]
+    if len(servers) != 1:
+        problems.append(f"{len(servers)} spans are children of the incoming parent, expected the server span only")
+    graphs = [span for span in trace if span["name"] == "graph"]
+    if not graphs or graphs[0].get("parentSpanId") not in {span["spanId"] for span in servers}:
+        problems.append("graph span missing or not under the server span")
+    nodes = {span["attributes"].get("graph.node"): span for span in trace if span["name"].startswith("node ")}
+    for node in workflow.nodes:
+        if node not in nodes:
+            problems.append(f"no span for node {node}")
+        elif graphs and nodes[node].get("parentSpanId") != graphs[0]["spanId"]:
+            problems.append(f"node {node} not under the graph span")
+    calls = [span for span in trace if span["name"].startswith("llm ")]
+    for span in calls:
+        parent = by_id.get(span.get("parentSpanId"))
+        while parent is not None and not parent["name"].startswith("node "):
+            parent = by_id.get(parent.get("parentSpanId"))
+        if parent is None:
+            problems.append(f"{span['name']} span is not inside a node span")
+        if "gen_ai.usage.output_tokens" not in span["attributes"]:
+            problems.append(f"{span['name']} span of {span['attributes'].get('graph.node')} has no token counts")
+        if "llm.json.outcome" not in span["attributes"]:
+            problems.append(f"{span['name']} span of {span['attributes'].get('graph.node')} has no JSON outcome")
+    if not calls:
+        problems.append("no LLM call spans")
+    if any(span["traceId"] == UNSAMPLED_TRACE_ID for span in spans):
+        problems.append("spans of an unsampled trace were exported")
+    return problems
+
+
+async def run(runs: int) -> bool:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark",
+                                 timeout=60) as client:
+        install_fake_llm(FakeChatModel())
+        latencies = await measure_overhead(client, runs)
+        baseline = statistics.median(latencies["none"])
+        print(f"Overhead, {runs} evaluations per mode with instant LLM answers")
+        print(f"{'Exporter':<10} | {'median ms':>9} | {'p90 ms':>7} | {'overhead':>8}")
+        print("-" * 44)
+        for mode, values in latencies.items():
+            values.sort()
+            median = statistics.median(values)
+            print(f"{mode:<10} | {median * 1000:>9.1f} | {values[int(len(values) * 0.9)] * 1000:>7.1f} "
+                  f"| {(median - baseline) / baseline:>+8.1%}")
+
+        _, headers = await evaluate(client, runs, f"00-{SAMPLED_TRACE_ID}-{PARENT_ID}-01")
+        await evaluate(client, runs + 1, f"00-{UNSAMPLED_TRACE_ID}-{PARENT_ID}-00")
+    tracing.exporter.flush()
+    spans = tracing.load_spans((tracing.TRACE_FILE + ".1", tracing.TRACE_FILE))
+    print(f"\nTrace {SAMPLED_TRACE_ID} continued from the caller's traceparent")
+    tracing.print_trace(spans, SAMPLED_TRACE_ID)
+    stats = tracing.exporter.stats()
+    print(f"Exporter: {stats}")
+    problems = check_trace(spans, headers)
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    # Hedge delays learned from the instant answers would hedge every timed call.
+    llm_router.HEDGING_ENABLED = False
+    sys.exit(0 if asyncio.run(run(args.runs)) else 1)
+
+
+if __name__ == "__main__":
+    main()
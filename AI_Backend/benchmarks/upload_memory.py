@@ -0,0 +1,153 @@
+"""Memory used by concurrent 10 MB resume uploads, buffered vs streamed.
+
+  buffered  the previous handler: `await file.read()` copies every upload into
+            memory and the parser reads that copy
+  streamed  the spooled upload is parsed in place through an mmap, with the
+            byte limit enforced while the body is received
+
+Each mode runs in a fresh process that posts CONCURRENCY multipart uploads at
+once to an app with the matching handler. The process reports the peak Python
+heap (tracemalloc) and the growth of its peak RSS. The mmap pages are file-backed
+page cache, so the kernel can drop them under pressure. The limit is also checked
+with an oversized upload, sent once with a Content-Length and once chunked
+without one. Run from AI_Backend/:
+    python -m benchmarks.upload_memory
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+from benchmarks.documents import make_pdf
+from parsing import parse_pdf
+from uploads import MAX_UPLOAD_BYTES, UploadSizeLimit, upload_buffer
+
+CONCURRENCY = 8
+UPLOAD_BYTES = 10_000_000
+OVERSIZED_BYTES = 50_000_000
+CHUNK_BYTES = 64 * 1024
+BOUNDARY = "benchmark-boundary"
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        if mode == "buffered":
+            content = await file.read()
+            text = await asyncio.to_thread(parse_pdf, content)
+        else:
+            with upload_buffer(file) as source:
+                text = await asyncio.to_thread(parse_pdf, source)
+        return {"chars": len(text)}
+
+    if mode == "streamed":
+        app.add_middleware(UploadSizeLimit, paths=("/upload",))
+    return app
+
+
+def multipart_chunks(payload_bytes: int):
+    """A multipart body sent in server-sized chunks, without a Content-Length."""
+    yield (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"resume.pdf\"\r\n"
+           f"Content-Type: application/pdf\r\n\r\n").encode()
+    chunk = b"\0" * CHUNK_BYTES
+    for _ in range(payload_bytes // CHUNK_BYTES):
+        yield chunk
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def post_all(app: FastAPI, document: bytes) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://upload", timeout=300) as client:
+        # File objects are sent in 64 KB reads, as a server would receive them.
+        responses = await asyncio.gather(*(
+            client.post("/upload", files={"file": ("resume.pdf", io.BytesIO(document), "application/pdf")})
+            for _ in range(CONCURRENCY)
+        ))
+    return [r.json()["chars"] for r in responses]
+
+
+async def post_oversized(app: FastAPI) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://upload", timeout=300) as client:
+        declared = await client.post("/upload", files={"file": ("resume.pdf", b"\0" * OVERSIZED_BYTES)})
+        sent = 0
+
+        async def counted():
+            nonlocal sent
+            for chunk in multipart_chunks(OVERSIZED_BYTES):
+                sent += len(chunk)
+                yield chunk
+
+        chunked = await client.post("/upload", content=counted(),
+                                    headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"})
+    return {"declared_status": declared.status_code, "chunked_status": chunked.status_code,
+            "chunked_bytes_read": sent}
+
+
+def max_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_mode(mode: str):
+    document = make_pdf(padding_bytes=UPLOAD_BYTES)
+    app = build_app(mode)
+    # Warm up imports and the parser so only the uploads show in the peaks.
+    asyncio.run(post_one(app, make_pdf()))
+    rss_before = max_rss_bytes()
+    tracemalloc.start()
+    chars = asyncio.run(post_all(app, document))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"mode": mode, "heap_peak": peak, "rss_growth": max_rss_bytes() - rss_before,
+              "chars": sorted(set(chars)), "document_bytes": len(document)}
+    if mode == "streamed":
+        result.update(asyncio.run(post_oversized(app)))
+    print(json.dumps(result))
+
+
+async def post_one(app: FastAPI, document: bytes):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://upload") as client:
+        await client.post("/upload", files={"file": ("resume.pdf", document, "application/pdf")})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=("buffered", "streamed"))
+    args = parser.parse_args()
+    if args.mode:
+        return run_mode(args.mode)
+
+    mb = 1024 * 1024
+    print(f"{CONCURRENCY} concurrent uploads of {UPLOAD_BYTES / mb:.1f} MiB, limit {MAX_UPLOAD_BYTES / mb:.1f} MiB")
+    print(f"{'Mode':<9} | {'Heap peak MiB':>13} | {'RSS growth MiB':>14} | {'Parsed chars':>12}")
+    print("-" * 58)
+    results = {}
+    for mode in ("buffered", "streamed"):
+        child = subprocess.run([sys.executable, "-m", "benchmarks.upload_memory", "--mode", mode],
+                               capture_output=True, text=True, check=True)
+        result = results[mode] = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{mode:<9} | {result['heap_peak'] / mb:>13.1f} | {result['rss_growth'] / mb:>14.1f} "
+              f"| {','.join(map(str, result['chars'])):>12}")
+    streamed = results["streamed"]
+    print(f"\nOversized {OVERSIZED_BYTES / mb:.0f} MiB upload: {streamed['declared_status']} with Content-Length; "
+          f"{streamed['chunked_status']} chunked after {streamed['chunked_bytes_read'] / mb:.1f} MiB was read")
+    ok = (results["buffered"]["chars"] == streamed["chars"]
+          and streamed["declared_status"] == streamed["chunked_status"] == 413)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Multi-worker mode: throughput with 1, 2, 4 and 8 uvicorn workers, and shared state.
+
+Each configuration starts `uvicorn benchmarks.fake_app:app --workers N` on a
+free port, with the shared store, checkpoints and indexes in a temporary
+directory, waits until every worker answers GET /ready, then drives concurrent
+POST /analyze/graph requests (the fake LLM answers every call after
+--latency-ms). Throughput scales with the CPU cores the host has; the parsing,
+graph and JSON work of an evaluation holds the GIL of its worker.
+
+The correctness run starts two workers on the shared store and checks, over
+fresh connections so the kernel spreads them across the workers, that:
+  - the per-IP rate limit is counted once for both workers,
+  - a replayed Idempotency-Key returns the stored result from the other worker,
+  - a skill search on any worker finds the candidates evaluated by all of them.
+Exits 1 when one of these fails. Run from AI_Backend/:
+    python -m benchmarks.workers [--requests N] [--concurrency C] [--latency-ms MS] [--workers 1,2,4,8]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE
+
+STARTUP_TIMEOUT_SECONDS = 120
+ADMIN_TOKEN = os.environ.setdefault("ADMIN_TOKEN", "benchmark")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, directory: str, **env) -> subprocess.Popen:
+    environment = dict(os.environ)
+    environment.setdefault("GROQ_API_KEY", "benchmark")
+    environment.update({
+        "WEB_CONCURRENCY": str(workers),
+        "SHARED_STORE_URL": "sqlite:///" + os.path.join(directory, "shared_store.sqlite3"),
+        "CHECKPOINTER": "sqlite",
+        "CHECKPOINT_DB_PATH": os.path.join(directory, "checkpoints.sqlite3"),
+        "NODE_CACHE": "false",
+        "MARKET_STANDARDS_PATH": os.path.join(directory, "market_standards.sqlite3"),
+        "RESUME_DEDUP": "false",
+        "SKILL_INDEX_PATH": os.path.join(directory, "skill_index.npz"),
+        "TRACE_EXPORTER": "none",
+        "MEMORY_SAMPLE_INTERVAL_SECONDS": "0",
+        "WARMUP_CONNECT": "false",
+        "RATE_LIMIT": "100000/minute",
+        **env,
+    })
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "benchmarks.fake_app:app", "--host", "127.0.0.1",
+                             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+                            env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def fresh_client(port: int) -> httpx.AsyncClient:
+    """A client that opens a new connection per request, so requests reach different workers."""
+    return httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120,
+                             limits=httpx.Limits(max_keepalive_connections=0))
+
+
+async def wait_ready(client: httpx.AsyncClient, workers: int, process: subprocess.Popen) -> set:
+    """Pids of the workers seen ready; returns once all of them have answered, or raises."""
+    ready = set()
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while len(ready) < workers:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {process.returncode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"only {len(ready)} of {workers} workers became ready")
+        try:
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                ready.add(response.headers["X-Worker-Pid"])
+                continue
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    return ready
+
+
+def evaluation_form(number: int, **fields) -> dict:
+    return {"raw_text": f"{SAMPLE_RESUME}\nReference number {number}", "job_description": SAMPLE_JD,
+            "role_name": SAMPLE_ROLE, **fields}
+
+
+async def throughput(port: int, requests: int, concurrency: int) -> dict:
+    latencies, pids = [], []
+    queue = asyncio.Queue()
+    for number in range(requests):
+        queue.put_nowait(number)
+
+    async def client_loop(client: httpx.AsyncClient):
+        while not queue.empty():
+            number = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post("/analyze/graph", data=evaluation_form(number))
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            pids.append(response.headers["X-Worker-Pid"])
+
+    async with fresh_client(port) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "busiest": max(pids.count(pid) for pid in set(pids)) / len(pids),
+    }
+
+
+async def rate_limit(port: int, limit: int) -> list:
+    problems = []
+    async with fresh_client(port) as client:
+        # Rate limit: requests without a resume pass the limiter and are refused with 400 after it.
+        statuses = [(await client.post("/analyze/graph", data=evaluation_form(0, raw_text=""))).status_code
+                    for _ in range(limit + 10)]
+        allowed = statuses.count(400)
+        print(f"Rate limit {limit}/minute, {len(statuses)} requests over both workers: "
+              f"{allowed} allowed, {statuses.count(429)} refused")
+        if allowed != limit:
+            problems.append(f"{allowed} requests passed a limit of {limit} shared by the workers")
+    return problems
+
+
+async def idempotency(port: int) -> list:
+    problems = []
+    async with fresh_client(port) as client:
+        # Idempotency: replay one key until another worker than the first has answered it.
+        headers = {"Idempotency-Key": "benchmark-replay"}
+        first = await client.post("/analyze/graph", data=evaluation_form(1), headers=headers)
+        first.raise_for_status()
+        cross_worker = None
+        for _ in range(30):
+            replay = await client.post("/analyze/graph", data=evaluation_form(1), headers=headers)
+            replay.raise_for_status()
+            if replay.headers["X-Worker-Pid"] != first.headers["X-Worker-Pid"]:
+                cross_worker = replay
+                break
+        if cross_worker is None:
+            problems.append("no replay of the idempotency key reached the second worker")
+        else:
+            same = cross_worker.json()["evaluation_id"] == first.json()["evaluation_id"]
+            print(f"Idempotent replay on worker {cross_worker.headers['X-Worker-Pid']} of the evaluation from "
+                  f"worker {first.headers['X-Worker-Pid']}: {'same result' if same else 'NEW EVALUATION'}")
+            if not same:
+                problems.append("the replayed idempotency key ran a new evaluation on the other worker")
+    return problems
+
+
+async def skill_search(port: int, candidates: int) -> list:
+    problems = []
+    async with fresh_client(port) as client:
+        evaluated_by = set()
+        for number in range(candidates):
+            response = await client.post("/analyze/graph", data=evaluation_form(100 + number,
+                                                                                candidate_id=f"candidate-{number}"))
+            response.raise_for_status()
+            evaluated_by.add(response.headers["X-Worker-Pid"])
+        totals = {}
+        for _ in range(30):
+            response = await client.get("/candidates/search", params={"q": "Python"},
+                                        headers={"X-Admin-Token": ADMIN_TOKEN})
+            response.raise_for_status()
+            totals.setdefault(response.headers["X-Worker-Pid"], response.json()["total"])
+            if len(totals) == 2:
+                break
+    print(f"Skill search after {candidates} candidates evaluated by {len(evaluated_by)} workers: "
+          + ", ".join(f"worker {pid} finds {total}" for pid, total in totals.items()))
+    if len(evaluated_by) < 2 or len(totals) < 2:
+        problems.append("the requests did not reach both workers")
+    problems += [f"worker {pid} finds {total} of {candidates} candidates"
+                 for pid, total in totals.items() if total != candidates]
+    return problems
+
+
+async def run(args) -> bool:
+    print(f"Host: {os.cpu_count()} CPU(s); fake LLM latency {args.latency_ms:.0f} ms per call, "
+          f"{args.requests} evaluations, {args.concurrency} concurrent clients")
+    print(f"{'Workers':>7} | {'req/s':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'busiest worker':>14}")
+    print("-" * 57)
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            port = free_port()
+            process = start_server(workers, port, directory, FAKE_LLM_LATENCY_SECONDS=str(args.latency_ms / 1000))
+            try:
+                async with fresh_client(port) as client:
+                    await wait_ready(client, workers, process)
+                result = await throughput(port, args.requests, args.concurrency)
+            finally:
+                stop_server(process)
+        print(f"{workers:>7} | {result['rps']:>7.1f} | {result['p50']:>8.0f} | {result['p95']:>8.0f} "
+              f"| {result['busiest']:>13.0%}")
+
+    print()
+    limit = 20
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        process = start_server(2, port, directory, RATE_LIMIT=f"{limit}/minute")
+        try:
+            async with fresh_client(port) as client:
+                await wait_ready(client, 2, process)
+            problems = await rate_limit(port, limit)
+        finally:
+            stop_server(process)
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        process = start_server(2, port, directory)
+        try:
+            async with fresh_client(port) as client:
+                await wait_ready(client, 2, process)
+            problems += await idempotency(port)
+            problems += await skill_search(port, 12)
+        finally:
+            stop_server(process)
+
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=lambda value: [int(n) for n in value.split(",")], default=[1, 2, 4, 8])
+    ok = asyncio.run(run(parser.parse_args()))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join("data", "checkpoints.sqlite3"))
+# Finished threads are kept this long so a retried request can still read the
+# result; interrupted threads stay resumable this long before they are purged.
+CHECKPOINT_FINISHED_TTL_SECONDS = float(os.getenv("CHECKPOINT_FINISHED_TTL_SECONDS", "3600"))
+CHECKPOINT_INTERRUPTED_TTL_SECONDS = float(os.getenv("CHECKPOINT_INTERRUPTED_TTL_SECONDS", str(24 * 3600)))
+# Expired threads are purged at startup and then at this interval (see main.py's lifespan).
+CHECKPOINT_GC_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_GC_INTERVAL_SECONDS", "300"))
+# Serialized values above this size are zlib-compressed when that makes them smaller.
+COMPRESS_MIN_BYTES = 512
+COMPRESSED_SUFFIX = "+zlib"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL, metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL,
+    type TEXT NOT NULL, value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT NOT NULL,
+    value BLOB, task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY, status TEXT NOT NULL, role_name TEXT,
+    inputs BLOB, created_at REAL NOT NULL, updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_by_status ON threads (status, updated_at);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """LangGraph checkpointer persisted in a local SQLite database.
+
+    Each put or put_writes call is one transaction with all of its rows. Writes
+    are not batched across calls: an agent's write has to be on disk before a
+    sibling in the same superstep crashes, or the resumed run repeats it. The
+    database runs in WAL mode with synchronous=NORMAL (a process crash loses
+    nothing, a power loss at most the last commits), and serialized values are
+    compressed when that pays off. Only channels that changed at a superstep are
+    written, as with MemorySaver.
+
+    Besides checkpoints it tracks each evaluation thread: its status, and the
+    inputs a restarted process needs to continue it, since the resume and JD
+    texts live in the in-memory text store rather than in the state. Only runs
+    started with an evaluation_id are stored here (see graph.py).
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB_PATH):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _dumps(self, value: Any) -> tuple:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(data, 1)
+            if len(compressed) < len(data):
+                return type_ + COMPRESSED_SUFFIX, compressed
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(COMPRESSED_SUFFIX):
+            type_, data = type_[:-len(COMPRESSED_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _transaction(self, statements: list):
+        with self._lock, self._conn:
+            for sql, rows in statements:
+                if rows:
+                    self._conn.executemany(sql, rows)
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, data, metadata_type, metadata = row
+        checkpoint = self._loads(type_, data)
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self._query(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version))
+            )
+            if blob and blob[0][0] != "empty":
+                channel_values[channel] = self._loads(*blob[0])
+        writes = self._query(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        )
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id
+            }},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self._loads(metadata_type, metadata),
+            pending_writes=[(task_id, channel, self._loads(t, v)) for task_id, channel, t, v in writes],
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id
+                }}
+                if parent_checkpoint_id else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        if checkpoint_id := get_checkpoint_id(config):
+            rows = self._query(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id)
+            )
+        else:
+            rows = self._query(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns)
+            )
+        return self._tuple(thread_id, checkpoint_ns, rows[0]) if rows else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[dict] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+            tuple(params)
+        )
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            checkpoint_tuple = self._tuple(thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield checkpoint_tuple
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+        blob_rows = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self._dumps(values[channel]) if channel in values else ("empty", None)))
+            for channel, version in new_versions.items()
+        ]
+        self._transaction([
+            ("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows),
+            ("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [(
+                thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                *self._dumps(stored), *self._dumps(get_checkpoint_metadata(config, metadata))
+            )]),
+        ])
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]
+        }}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel,
+             *self._dumps(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        # Special writes (errors, interrupts) replace earlier ones; regular writes are kept once.
+        self._transaction([
+            ("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [r for r in rows if r[4] >= 0]),
+            ("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [r for r in rows if r[4] < 0]),
+        ])
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._transaction([
+            (f"DELETE FROM {table} WHERE thread_id = ?", [(thread_id,)])
+            for table in ("checkpoints", "blobs", "writes", "threads")
+        ])
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[dict] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple], task_id: str,
+                          task_path: str = "") -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Same version format as MemorySaver: zero-padded counter plus a random tiebreak.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- Evaluation threads ---
+
+    def start_thread(self, thread_id: str, role_name: str, inputs: Optional[dict] = None):
+        """Records a running evaluation, with the inputs needed to resume it when given."""
+        now = time.time()
+        stored = zlib.compress(json.dumps(inputs).encode("utf-8")) if inputs is not None else None
+        self._transaction([(
+            "INSERT OR REPLACE INTO threads VALUES (?, 'running', ?, ?, ?, ?)",
+            [(thread_id, role_name, stored, now, now)]
+        )])
+
+    def finish_thread(self, thread_id: str):
+        """Marks a thread finished; its inputs are no longer needed."""
+        self._transaction([(
+            "UPDATE threads SET status = 'finished', inputs = NULL, updated_at = ? WHERE thread_id = ?",
+            [(time.time(), thread_id)]
+        )])
+
+    def get_thread(self, thread_id: str) -> Optional[dict]:
+        rows = self._query("SELECT status, role_name, inputs FROM threads WHERE thread_id = ?", (thread_id,))
+        if not rows:
+            return None
+        status, role_name, inputs = rows[0]
+        return {
+            "status": status,
+            "role_name": role_name,
+            "inputs": json.loads(zlib.decompress(inputs)) if inputs else None,
+        }
+
+    def interrupted_threads(self) -> list:
+        return [row[0] for row in self._query("SELECT thread_id FROM threads WHERE status = 'running'")]
+
+    def collect_garbage(self) -> int:
+        """Purges finished threads past their retention, and interrupted ones nobody resumed."""
+        now = time.time()
+        expired = [row[0] for row in self._query(
+            "SELECT thread_id FROM threads WHERE (status = 'finished' AND updated_at < ?) "
+            "OR (status = 'running' AND updated_at < ?)",
+            (now - CHECKPOINT_FINISHED_TTL_SECONDS, now - CHECKPOINT_INTERRUPTED_TTL_SECONDS)
+        )]
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        if expired:
+            print(f"[CHECKPOINTS] Purged {len(expired)} expired threads")
+        return len(expired)
+
+    def stats(self) -> dict:
+        counts = dict(self._query("SELECT status, COUNT(*) FROM threads GROUP BY status"))
+        return {
+            "backend": "sqlite",
+            "running_threads": counts.get("running", 0),
+            "finished_threads": counts.get("finished", 0),
+            "checkpoints": self._query("SELECT COUNT(*) FROM checkpoints")[0][0],
+            "database_bytes": sum(
+                os.path.getsize(self.path + suffix)
+                for suffix in ("", "-wal") if os.path.exists(self.path + suffix)
+            ),
+        }
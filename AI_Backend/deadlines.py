@@ -0,0 +1,59 @@
+import asyncio
+import os
+import time
+
+# A node is not started when less than this many seconds remain: a stage is
+# one LLM call, and a call that cannot finish in time only burns quota.
+DEADLINE_MARGIN_SECONDS = float(os.getenv("DEADLINE_MARGIN_SECONDS", "5"))
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    """Time budget of one evaluation, passed to the graph as config["configurable"]["deadline"].
+
+    With allow_partial, nodes that no longer fit are skipped and the run returns
+    whatever the completed stages produced; otherwise the run is aborted.
+    """
+
+    def __init__(self, timeout_seconds: float, allow_partial: bool = False):
+        self.expires_at = time.monotonic() + timeout_seconds
+        self.allow_partial = allow_partial
+        self.skipped = []
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def is_near(self, margin: float = DEADLINE_MARGIN_SECONDS) -> bool:
+        return self.remaining() < margin
+
+
+def with_deadline(node_name: str, node_fn):
+    """Wraps a graph node so it is skipped (or the run aborted) once the deadline is near.
+    """
+    def run(state, config):
+        deadline = config.get("configurable", {}).get("deadline")
+        if deadline is not None and deadline.is_near():
+            if not deadline.allow_partial:
+                raise DeadlineExceeded(f"Deadline reached before stage '{node_name}'")
+            print(f"[DEADLINE] Skipping {node_name}: {deadline.remaining():.1f}s left")
+            deadline.skipped.append(node_name)
+            return {}
+        return node_fn(state)
+
+    # Not functools.wraps: LangGraph inspects the signature to decide whether to pass config.
+    run.__name__ = node_fn.__name__
+    return run
+
+
+async def cancel_on_disconnect(request, task: asyncio.Future, poll_interval: float = 1.0):
+    """Cancels task when the HTTP client goes away, so no further stages are started for it.
+    """
+    while not task.done():
+        if await request.is_disconnected():
+            print("[DEADLINE] Client disconnected, cancelling evaluation")
+            task.cancel()
+            return
+        await asyncio.sleep(poll_interval)
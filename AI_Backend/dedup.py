@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from shared_store import WORKERS
+
+# Candidates resubmit lightly edited resumes and agencies submit the same person
+# again; each is a full evaluation. Every resume gets a MinHash signature of its
+# word shingles, indexed with LSH per (JD, role, weights) scope. A new resume whose
+# estimated Jaccard similarity to one already evaluated in its scope reaches
+# RESUME_DEDUP_THRESHOLD is flagged with the earlier evaluation, and with
+# RESUME_DEDUP_ACTION=reuse (or reuse_duplicate per request) that evaluation is
+# returned instead of running the graph. Signatures are kept in SQLite; the LSH
+# buckets live in memory and are rebuilt from it on first use. The earlier
+# evaluation's response, which holds the candidate's parsed profile (name,
+# email, phone), is stored with its signature only when reuse is configured
+# (RESUME_DEDUP_KEEP_RESULTS, on by default with RESUME_DEDUP_ACTION=reuse).
+# Entries expire after RESUME_DEDUP_TTL_SECONDS and are purged periodically.
+# With several worker processes each lookup first indexes the rows the other
+# workers have added since (one primary-key range query).
+RESUME_DEDUP_ENABLED = os.getenv("RESUME_DEDUP", "true").lower() == "true"
+RESUME_DEDUP_ACTION = os.getenv("RESUME_DEDUP_ACTION", "flag")  # flag | reuse
+RESUME_DEDUP_THRESHOLD = float(os.getenv("RESUME_DEDUP_THRESHOLD", "0.85"))
+RESUME_DEDUP_PATH = os.getenv("RESUME_DEDUP_PATH", os.path.join("data", "resume_signatures.sqlite3"))
+RESUME_DEDUP_KEEP_RESULTS = os.getenv(
+    "RESUME_DEDUP_KEEP_RESULTS", "true" if RESUME_DEDUP_ACTION == "reuse" else "false").lower() == "true"
+RESUME_DEDUP_TTL_SECONDS = float(os.getenv("RESUME_DEDUP_TTL_SECONDS", str(30 * 24 * 3600)))
+# About 2.3 KB of memory per indexed resume.
+RESUME_DEDUP_MAX_ENTRIES = int(os.getenv("RESUME_DEDUP_MAX_ENTRIES", "20000"))
+
+SHINGLE_WORDS = 3
+PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs at Jaccard 0.85 share a band with probability
+# 0.9998, pairs at 0.5 with 0.06. Candidates are then checked on the whole signature.
+BANDS = 16
+ROWS = PERMUTATIONS // BANDS
+PRUNE_EVERY_PUTS = 500
+
+_WORD = re.compile(r"\w+")
+# Multiply-shift hashing, h(x) = ((a*x + b) mod 2^64) >> 32 with odd a, one
+# (a, b) pair per permutation. Seeded, so signatures stored by earlier processes stay valid.
+_random = np.random.RandomState(20240601)
+_A = _random.randint(0, 2**63, size=PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _random.randint(0, 2**63, size=PERMUTATIONS, dtype=np.uint64)
+# Folds the ROWS values of a band into one 64-bit bucket hash.
+_MIX = _random.randint(0, 2**63, size=ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def _words(text: str) -> list:
+    return _WORD.findall(text.lower())
+
+
+def resume_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (PERMUTATIONS uint32 values) of the text's word shingles.
+    Case, punctuation and layout do not matter. None for texts shorter than a shingle.
+    """
+    words = _words(text)
+    if len(words) < SHINGLE_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    with np.errstate(over="ignore"):
+        permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(_words(text)).encode("utf-8")).hexdigest()
+
+
+def _scope_hash(scope: str) -> np.uint64:
+    return np.uint64(int(hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16], 16))
+
+
+def _band_hashes(scope_hashes: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+    """One 64-bit hash per band of each signature (rows), salted with the row's scope."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return (bands * _MIX).sum(axis=2, dtype=np.uint64) ^ scope_hashes[:, None]
+
+
+def _bands(scope: str, signature: np.ndarray) -> list:
+    return _band_hashes(np.array([_scope_hash(scope)]), signature[None]).tolist()[0]
+
+
+class ResumeIndex:
+    """MinHash signatures of evaluated resumes, with their evaluation results when
+    keep_results is set, persisted in SQLite and banded into in-memory LSH buckets.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, keep_results: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.keep_results = keep_results
+        self._conn = None
+        self._lock = threading.Lock()
+        self._puts = 0
+        # row id -> (band hashes, signature bytes, evaluation_id, content hash), oldest first
+        self._entries = OrderedDict()
+        # One dict per band: band hash -> row id, or a list of row ids once they collide.
+        self._buckets = [{} for _ in range(BANDS)]
+        self._lookup_seconds = 0.0
+        # Highest row id read from SQLite, for picking up other workers' rows.
+        self._last_id = 0
+        self.counters = Counter()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS resume_signatures ("
+                "id INTEGER PRIMARY KEY, scope TEXT NOT NULL, signature BLOB NOT NULL, "
+                "evaluation_id TEXT NOT NULL, content_hash TEXT NOT NULL, result TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM resume_signatures").fetchone()[0]
+            self._index_rows(self._conn.execute(
+                "SELECT id, scope, signature, evaluation_id, content_hash FROM resume_signatures "
+                "WHERE created_at >= ? ORDER BY id DESC LIMIT ?",
+                (time.time() - self.ttl_seconds, self.max_entries)
+            ).fetchall()[::-1])
+        elif WORKERS > 1:
+            rows = self._conn.execute(
+                "SELECT id, scope, signature, evaluation_id, content_hash FROM resume_signatures "
+                "WHERE id > ? ORDER BY id", (self._last_id,)
+            ).fetchall()
+            if rows:
+                self._last_id = rows[-1][0]
+                self._index_rows([row for row in rows if row[0] not in self._entries])
+        return self._conn
+
+    def _index_rows(self, rows: list):
+        if not rows:
+            return
+        scopes = {scope: _scope_hash(scope) for scope in {row[1] for row in rows}}
+        signatures = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.uint32)
+        hashes = _band_hashes(np.array([scopes[row[1]] for row in rows], dtype=np.uint64),
+                              signatures.reshape(len(rows), PERMUTATIONS)).tolist()
+        for (row_id, _, signature, evaluation_id, digest), band_hashes in zip(rows, hashes):
+            self._index(row_id, band_hashes, signature, evaluation_id, digest)
+
+    def _index(self, row_id: int, band_hashes: list, signature: bytes, evaluation_id: str, digest: str):
+        self._entries[row_id] = (band_hashes, signature, evaluation_id, digest)
+        for bucket, band_hash in zip(self._buckets, band_hashes):
+            ids = bucket.get(band_hash)
+            if ids is None:
+                bucket[band_hash] = row_id
+            elif isinstance(ids, list):
+                ids.append(row_id)
+            else:
+                bucket[band_hash] = [ids, row_id]
+        while len(self._entries) > self.max_entries:
+            self._unindex(next(iter(self._entries)))
+
+    def _unindex(self, row_id: int):
+        entry = self._entries.pop(row_id, None)
+        if entry is None:
+            return
+        for bucket, band_hash in zip(self._buckets, entry[0]):
+            ids = bucket.get(band_hash)
+            if isinstance(ids, list):
+                ids.remove(row_id)
+                if len(ids) == 1:
+                    bucket[band_hash] = ids[0]
+            elif ids == row_id:
+                del bucket[band_hash]
+
+    def find(self, scope: str, signature: Optional[np.ndarray], digest: str = "") -> Optional[dict]:
+        """The most similar resume evaluated in this scope at or above the threshold."""
+        if signature is None:
+            return None
+        with self._lock:
+            self._connection()
+            started = time.perf_counter()
+            candidates = set()
+            for bucket, band_hash in zip(self._buckets, _bands(scope, signature)):
+                ids = bucket.get(band_hash)
+                if isinstance(ids, list):
+                    candidates.update(ids)
+                elif ids is not None:
+                    candidates.add(ids)
+            best, best_similarity = None, 0.0
+            for row_id in candidates:
+                _, other, evaluation_id, other_digest = self._entries[row_id]
+                similarity = (1.0 if digest and digest == other_digest
+                              else float(np.mean(signature == np.frombuffer(other, dtype=np.uint32))))
+                if similarity > best_similarity:
+                    best, best_similarity = (row_id, evaluation_id, other_digest), similarity
+            self._lookup_seconds += time.perf_counter() - started
+            self.counters["lookups"] += 1
+            self.counters["candidates"] += len(candidates)
+            if best is None or best_similarity < RESUME_DEDUP_THRESHOLD:
+                return None
+            self.counters["duplicates"] += 1
+        row_id, evaluation_id, other_digest = best
+        return {"evaluation_id": evaluation_id, "similarity": round(best_similarity, 3),
+                "identical": bool(digest) and digest == other_digest, "_row": row_id}
+
+    def result(self, duplicate: dict) -> Optional[dict]:
+        """The stored response of a duplicate's earlier evaluation; None when results are not kept."""
+        if not self.keep_results:
+            return None
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT result FROM resume_signatures WHERE id = ? AND created_at >= ?",
+                (duplicate["_row"], time.time() - self.ttl_seconds)
+            ).fetchone()
+            if not row or not row[0]:
+                return None
+            self.counters["reused"] += 1
+        return json.loads(row[0])
+
+    def add(self, scope: str, signature: Optional[np.ndarray], digest: str, evaluation_id: str, result: dict):
+        if signature is None:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                row_id = conn.execute(
+                    "INSERT INTO resume_signatures (scope, signature, evaluation_id, content_hash, result, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (scope, signature.tobytes(), evaluation_id, digest,
+                     json.dumps(result, default=str) if self.keep_results else "", time.time())
+                ).lastrowid
+            self._index(row_id, _bands(scope, signature), signature.tobytes(), evaluation_id, digest)
+            self._puts += 1
+            if self._puts % PRUNE_EVERY_PUTS == 0:
+                self._prune(conn)
+
+    def prune(self):
+        """Deletes expired entries, and the responses stored while results were kept if they no longer are."""
+        with self._lock:
+            conn = self._connection()
+            self._prune(conn)
+            if not self.keep_results:
+                with conn:
+                    cleared = conn.execute("UPDATE resume_signatures SET result = '' WHERE result != ''").rowcount
+                if cleared:
+                    print(f"[DEDUP] Cleared {cleared} stored evaluation results (RESUME_DEDUP_KEEP_RESULTS is off)")
+
+    def _prune(self, conn: sqlite3.Connection):
+        cutoff = time.time() - self.ttl_seconds
+        with conn:
+            expired = [row[0] for row in conn.execute("SELECT id FROM resume_signatures WHERE created_at < ?",
+                                                      (cutoff,))]
+            conn.execute("DELETE FROM resume_signatures WHERE created_at < ?", (cutoff,))
+        for row_id in expired:
+            self._unindex(row_id)
+        self.counters["expired"] += len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._connection()
+            lookups = self.counters["lookups"]
+            return {
+                "enabled": RESUME_DEDUP_ENABLED,
+                "action": RESUME_DEDUP_ACTION,
+                "keep_results": self.keep_results,
+                "threshold": RESUME_DEDUP_THRESHOLD,
+                "entries": len(self._entries),
+                **self.counters,
+                "avg_lookup_us": round(self._lookup_seconds * 1e6 / lookups, 1) if lookups else 0.0,
+            }
+
+
+resume_index = ResumeIndex(RESUME_DEDUP_PATH, RESUME_DEDUP_TTL_SECONDS, RESUME_DEDUP_MAX_ENTRIES,
+                           RESUME_DEDUP_KEEP_RESULTS)
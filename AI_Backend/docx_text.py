@@ -0,0 +1,187 @@
+import os
+import zipfile
+from typing import BinaryIO
+from xml.etree.ElementTree import iterparse
+
+# Plain text of a DOCX without mammoth's document model: word/document.xml is
+# decompressed and parsed incrementally straight from the zip, and paragraph text
+# is emitted as the parser goes. The output is identical to
+# mammoth.extract_raw_text. It reads the same elements, drops deleted rows and
+# merged cells, moves text boxes after their paragraph and ends each paragraph
+# with "\n\n". Documents using a construct whose text mammoth rewrites (symbol
+# fonts, checkboxes) raise UnsupportedDocx, and the caller falls back to mammoth.
+DOCX_FAST_PATH = os.getenv("DOCX_FAST_PATH", "true").lower() == "true"
+
+NAMESPACES = {
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main": "w",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main": "w",
+    "http://schemas.openxmlformats.org/markup-compatibility/2006": "mc",
+    "urn:schemas-microsoft-com:vml": "v",
+    "http://schemas.microsoft.com/office/word/2010/wordml": "wordml",
+}
+RELATIONSHIPS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT_TYPES = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument",
+    "http://purl.oclc.org/ooxml/officeDocument/relationships/officeDocument",
+)
+
+# Elements whose children mammoth reads; everything else is skipped with its subtree.
+CONTAINERS = {
+    "w:document", "w:body", "w:p", "w:r", "w:tbl", "w:tr", "w:tc", "w:hyperlink", "w:customXml", "w:ins",
+    "w:moveTo", "w:moveToRangeStart", "w:moveToRangeEnd", "w:moveFromRangeStart", "w:moveFromRangeEnd",
+    "w:object", "w:smartTag", "w:drawing", "w:pict", "w:txbxContent", "w:sdt", "w:sdtContent",
+    "v:group", "v:rect", "v:roundrect", "v:shape", "v:textbox",
+    # mammoth replaces an AlternateContent block by the children of its Fallback.
+    "mc:AlternateContent", "mc:Fallback",
+}
+TEXT_ELEMENTS = {"w:t": None, "w:tab": "\t", "w:noBreakHyphen": "\u2011", "w:softHyphen": "\u00ad"}
+# Elements collecting text that may still be dropped, merged or moved. Picture
+# (text box) content goes after the paragraph that holds it, as in mammoth.
+FRAMES = {"w:p", "w:r", "w:tbl", "w:tr", "w:tc", "w:pict"}
+# Tables hold rows and rows hold cells; anything else makes mammoth skip cell merging.
+TABLE_CHILDREN = {"w:tbl": "w:tr", "w:tr": "w:tc"}
+# Text mammoth maps through font tables or replaces by a checkbox.
+UNSUPPORTED = {"w:sym", "wordml:checkbox"}
+# Properties of the enclosing frame, as (frame, property element, child) paths.
+DELETED_PATHS = {("w:p", "w:pPr", "w:rPr", "w:del"), ("w:tr", "w:trPr", "w:del")}
+
+
+class UnsupportedDocx(Exception):
+    """The document needs mammoth to extract the same text."""
+
+
+class _Frame:
+    __slots__ = ("name", "depth", "parts", "extra", "deleted", "vmerge", "colspan", "cell_index", "columns")
+
+    def __init__(self, name: str, depth: int, parts: list):
+        self.name = name
+        self.depth = depth
+        self.parts = parts
+        self.extra = []
+        self.deleted = False
+        self.vmerge = False
+        self.colspan = 1
+        self.cell_index = 0
+        self.columns = set()
+
+
+def _qualified(tag: str, cache: dict) -> str:
+    name = cache.get(tag)
+    if name is None:
+        uri, _, local = tag[1:].partition("}") if tag.startswith("{") else ("", "", tag)
+        name = cache[tag] = f"{NAMESPACES.get(uri, uri)}:{local}"
+    return name
+
+
+def _document_path(docx: zipfile.ZipFile) -> str:
+    try:
+        with docx.open("_rels/.rels") as rels:
+            for _, elem in iterparse(rels):
+                if elem.tag == RELATIONSHIPS_NS + "Relationship" and elem.get("Type") in OFFICE_DOCUMENT_TYPES:
+                    return elem.get("Target", "").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+
+def extract_docx_text(source: BinaryIO) -> str:
+    """Returns the raw text of the DOCX, the same string mammoth.extract_raw_text produces.
+    """
+    with zipfile.ZipFile(source) as docx:
+        path = _document_path(docx)
+        try:
+            xml = docx.open(path)
+        except KeyError:
+            raise UnsupportedDocx(f"missing {path}")
+        with xml:
+            return _extract(xml)
+
+
+def _extract(xml) -> str:
+    names = {}
+    stack = []
+    skip = None  # depth of the outermost skipped element
+    root = _Frame("root", 0, [])
+    frames = [root]
+    pending = []  # contents of paragraphs whose mark was deleted; they join the next paragraph
+    for event, elem in iterparse(xml, events=("start", "end")):
+        name = _qualified(elem.tag, names)
+        if event == "start":
+            if name in UNSUPPORTED:
+                raise UnsupportedDocx(name)
+            stack.append(name)
+            depth = len(stack)
+            if skip is not None:
+                _read_property(stack, skip, frames[-1], elem)
+            elif depth == 1 and name != "w:document":
+                raise UnsupportedDocx(f"unexpected root {name}")
+            elif name in FRAMES:
+                parent = frames[-1]
+                if TABLE_CHILDREN.get(parent.name, name) != name:
+                    raise UnsupportedDocx(f"{name} inside {parent.name}")
+                frames.append(_Frame(name, depth, pending if name == "w:p" else []))
+                if name == "w:p":
+                    pending = []
+            elif name not in CONTAINERS and name not in TEXT_ELEMENTS:
+                if frames[-1].name in TABLE_CHILDREN and name == "w:bookmarkStart":
+                    raise UnsupportedDocx(f"{name} inside {frames[-1].name}")
+                skip = depth
+            continue
+
+        depth = len(stack)
+        stack.pop()
+        if skip is not None:
+            if depth == skip:
+                skip = None
+            elem.clear()
+            continue
+        if name in TEXT_ELEMENTS:
+            text = TEXT_ELEMENTS[name]
+            frames[-1].parts.append((elem.text or "") if text is None else text)
+        elif name in FRAMES:
+            frame = frames.pop()
+            parent = frames[-1]
+            if name == "w:p":
+                if frame.deleted:
+                    pending = frame.parts
+                else:
+                    frame.parts.append("\n\n")
+                    parent.parts.append("".join(frame.parts + frame.extra))
+            elif name == "w:tc":
+                index = parent.cell_index
+                parent.cell_index += frame.colspan
+                table = frames[-2]
+                if not parent.deleted:
+                    if frame.vmerge and index in table.columns:
+                        frame.deleted = True
+                    else:
+                        table.columns.add(index)
+                if not frame.deleted:
+                    parent.parts.extend(frame.parts)
+            elif name == "w:pict":
+                paragraph = next((f for f in reversed(frames) if f.name == "w:p"), parent)
+                (paragraph.extra if paragraph.name == "w:p" else paragraph.parts).extend(frame.parts)
+            elif not frame.deleted:
+                parent.parts.extend(frame.parts)
+        elem.clear()
+    return "".join(root.parts)
+
+
+def _read_property(stack: list, skip: int, frame: _Frame, elem):
+    """Records the deletion and cell-merge properties of the innermost frame."""
+    if frame.depth != skip - 1 or len(stack) - skip > 2:
+        return
+    path = tuple(stack[skip - 2:])
+    if path in DELETED_PATHS:
+        frame.deleted = True
+    elif path == ("w:tc", "w:tcPr", "w:vMerge"):
+        frame.vmerge = _attribute(elem, "val") in (None, "continue")
+    elif path == ("w:tc", "w:tcPr", "w:gridSpan"):
+        frame.colspan = int(_attribute(elem, "val") or 1)
+
+
+def _attribute(elem, local: str):
+    for key, value in elem.attrib.items():
+        if key.rpartition("}")[2] == local:
+            return value
+    return None
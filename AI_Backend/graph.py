@@ -1,9 +1,15 @@
+import os
 from typing import List
-from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
 from langgraph.types import RetryPolicy
 
+from checkpoints import SqliteCheckpointSaver
 from states import AgentState
+from deadlines import with_deadline
+from node_cache import with_node_cache
+from profiling import with_profiling
+from tracing import with_tracing
 from nodes import(
     extract_resume_node,
     parse_jd_node,
@@ -15,20 +21,39 @@ from nodes import(
     feedback_node    
 )
 
-checkpointer = MemorySaver()
+# "sqlite" persists every superstep of the runs started with an evaluation_id,
+# the ones a caller can resume or retry; runs without one are checkpointed in
+# memory and dropped when they finish, so their state never reaches the disk.
+# "memory" keeps all checkpoints only for the lifetime of the process.
+CHECKPOINTER = os.getenv("CHECKPOINTER", "sqlite")
+if CHECKPOINTER == "sqlite":
+    checkpointer = SqliteCheckpointSaver()
+else:
+    checkpointer = MemorySaver()
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        print("[GRAPH] CHECKPOINTER=memory with several workers: an evaluation can only be resumed "
+              "by the worker that started it")
+DURABLE_CHECKPOINTS = isinstance(checkpointer, SqliteCheckpointSaver)
 
 llm_retry = RetryPolicy(max_attempts=3)
 
+
+def stage(node_name: str, node_fn):
+    # Outermost first: trace span, profiling span, deadline check, node cache.
+    node_fn = with_deadline(node_name, with_node_cache(node_name, node_fn))
+    return with_tracing(node_name, with_profiling(node_name, node_fn))
+
+
 workflow = StateGraph(AgentState)
 
-workflow.add_node("jd_parser", parse_jd_node, retry=llm_retry)
-workflow.add_node("alignment_check", jd_role_alignment_node, retry=llm_retry)
-workflow.add_node("extractor", extract_resume_node, retry=llm_retry)
-workflow.add_node("tech_agent", tech_agent_node, retry=llm_retry)
-workflow.add_node("exp_agent", experience_agent_node, retry=llm_retry)
-workflow.add_node("culture_agent", culture_agent_node, retry=llm_retry)
-workflow.add_node("aggregator", aggregator_node, retry=llm_retry)
-workflow.add_node("feedback", feedback_node, retry=llm_retry)
+workflow.add_node("jd_parser", stage("jd_parser", parse_jd_node), retry=llm_retry)
+workflow.add_node("alignment_check", stage("alignment_check", jd_role_alignment_node), retry=llm_retry)
+workflow.add_node("extractor", stage("extractor", extract_resume_node), retry=llm_retry)
+workflow.add_node("tech_agent", stage("tech_agent", tech_agent_node), retry=llm_retry)
+workflow.add_node("exp_agent", stage("exp_agent", experience_agent_node), retry=llm_retry)
+workflow.add_node("culture_agent", stage("culture_agent", culture_agent_node), retry=llm_retry)
+workflow.add_node("aggregator", stage("aggregator", aggregator_node), retry=llm_retry)
+workflow.add_node("feedback", stage("feedback", feedback_node), retry=llm_retry)
 workflow.add_edge(START, "jd_parser")
 workflow.add_edge("jd_parser", "alignment_check")
 workflow.add_edge("alignment_check", "extractor")
@@ -42,3 +67,6 @@ workflow.add_edge("aggregator", "feedback")
 workflow.add_edge("feedback", END)
 
 app_graph = workflow.compile(checkpointer=checkpointer)
+# Runs nobody can resume, on an in-memory checkpointer even with CHECKPOINTER=sqlite.
+ephemeral_checkpointer = MemorySaver() if DURABLE_CHECKPOINTS else checkpointer
+ephemeral_graph = workflow.compile(checkpointer=ephemeral_checkpointer) if DURABLE_CHECKPOINTS else app_graph
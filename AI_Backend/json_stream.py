@@ -0,0 +1,63 @@
+import json
+
+
+class JsonFieldStream:
+    """Incremental parser for a streamed JSON object.
+
+    Text is fed chunk by chunk; each top-level member is decoded as soon as the
+    comma or closing brace that ends it arrives, so consumers can act on early
+    fields while the rest of the document is still being generated. Anything
+    before the opening brace (a markdown fence, say) is ignored.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = None
+
+    def feed(self, chunk: str) -> list:
+        """Consumes a chunk and returns the names of the fields it completed."""
+        self._text += chunk
+        completed = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 1 and c == "{":
+                    self._member_start = i + 1
+            elif c in "}]":
+                if self._depth == 1 and self._member_start is not None:
+                    completed += self._emit(text[self._member_start:i])
+                    self._member_start = None
+                self._depth -= 1
+            elif c == "," and self._depth == 1 and self._member_start is not None:
+                completed += self._emit(text[self._member_start:i])
+                self._member_start = i + 1
+        self._pos = len(text)
+        return completed
+
+    def _emit(self, member: str) -> list:
+        member = member.strip()
+        if not member:
+            return []
+        try:
+            decoded = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            # Left for the final parse and schema validation to report.
+            return []
+        self.fields.update(decoded)
+        return list(decoded)
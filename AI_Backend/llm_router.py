@@ -0,0 +1,434 @@
+import collections
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import dotenv
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import ValidationError
+
+from json_stream import JsonFieldStream
+from profiling import span
+from tracing import set_attribute, start_span
+from prompts import FIELD_REPAIR_PROMPT
+from schemas import STAGE_SCHEMAS, StageOutput
+from speculation import shared_call
+
+dotenv.load_dotenv()
+
+# Model specs are "<provider>:<model>"; supported providers are groq and openai.
+PRIMARY_MODEL = os.getenv("LLM_PRIMARY_MODEL", "groq:llama-3.3-70b-versatile")
+SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "groq:llama-3.1-8b-instant")
+FALLBACK_MODELS = [spec.strip() for spec in os.getenv("LLM_FALLBACK_MODELS", "").split(",") if spec.strip()]
+# Hedges duplicate a slow call on the provider, paying for both; opt-in.
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "false").lower() == "true"
+ROUTING_PROFILE = os.getenv("LLM_ROUTING_PROFILE", "quality")
+# Idle provider connections are kept this long (the SDKs' default is 5 s), so the
+# connection opened by the startup warm-up, or by the previous evaluation, is
+# still there for the next call instead of costing another TLS handshake.
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+# Ask the provider for a JSON object (response_format json_object) on every
+# non-streamed call. Streamed calls go without it: Groq's JSON mode does not
+# support streaming, and JsonFieldStream skips any text before the object.
+JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+
+TIER_MODELS = {"small": SMALL_MODEL, "large": PRIMARY_MODEL}
+
+# Model tier of every node under each routing profile. Mechanical extraction and
+# formatting stages can run on the small model; judgment stages stay on the large
+# one. A small-model answer that is not valid JSON or fails its schema even
+# after the field repair pass is escalated to the large model automatically.
+MODEL_ROUTING = {
+    #                     quality   balanced  fast
+    "jd_parser":         ("large", "small", "small"),
+    "alignment_check":   ("large", "small", "small"),
+    "extractor":         ("large", "large", "small"),
+    "tech_agent":        ("large", "large", "large"),
+    "exp_agent":         ("large", "large", "large"),
+    "culture_agent":     ("large", "large", "large"),
+    "aggregator":        ("large", "large", "large"),
+    "feedback":          ("large", "small", "small"),
+    # Stored and reused for every candidate of the role family.
+    "market_standards":  ("large", "large", "large"),
+}
+ROUTING_PROFILES = ("quality", "balanced", "fast")
+
+
+def parse_node_tiers(value: str) -> dict:
+    """"jd_parser=small,feedback=small" -> {"jd_parser": "small", "feedback": "small"}."""
+    tiers = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        node_name, _, tier = (part.strip() for part in entry.partition("="))
+        if node_name not in MODEL_ROUTING or tier not in TIER_MODELS:
+            raise ValueError(f"Invalid node tier {entry!r}; expected one of {', '.join(MODEL_ROUTING)}"
+                             f"={'|'.join(TIER_MODELS)}.")
+        tiers[node_name] = tier
+    return tiers
+
+
+if ROUTING_PROFILE not in ROUTING_PROFILES:
+    raise ValueError(f"Unknown LLM_ROUTING_PROFILE {ROUTING_PROFILE!r}; expected one of {', '.join(ROUTING_PROFILES)}.")
+# Per-node tiers that take precedence over the routing profile, e.g. to move
+# only the stages whose small-model answers were checked onto the small model.
+NODE_TIERS = parse_node_tiers(os.getenv("LLM_NODE_TIERS", ""))
+
+# Hedge delays come from observed latencies once a node has this many samples.
+MIN_LATENCY_SAMPLES = 20
+
+DEFAULT_POLICY = {
+    # A duplicate call is fired once the first one has run longer than this
+    # percentile of the node's recent latencies...
+    "hedge_percentile": 0.9,
+    # ...or, until enough samples exist, longer than this many seconds.
+    "hedge_after": 10.0,
+    "max_hedges": 1,
+}
+
+# Per-node overrides of DEFAULT_POLICY. A "models" entry replaces the routed chain.
+NODE_POLICIES = {
+    "jd_parser": {"hedge_after": 6.0},
+    "alignment_check": {"hedge_after": 3.0},
+    "extractor": {"hedge_after": 12.0},
+    "tech_agent": {"hedge_after": 8.0},
+    "exp_agent": {"hedge_after": 8.0},
+    "culture_agent": {"hedge_after": 8.0},
+    "aggregator": {"hedge_after": 8.0},
+    "feedback": {"hedge_after": 8.0},
+    "market_standards": {"hedge_after": 8.0},
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_MAX_CONCURRENT_CALLS", "32")),
+    thread_name_prefix="llm"
+)
+_models = {}
+_models_lock = threading.Lock()
+
+
+class LLMCallFailed(Exception):
+    pass
+
+
+def model_chain(node_name: str, profile: str | None = None) -> list:
+    """Models tried in order for the node: its tier (LLM_NODE_TIERS, else the
+    routing profile), the large model when escalating from the small one, then
+    the configured fallbacks.
+    """
+    profile = profile or ROUTING_PROFILE
+    tiers = MODEL_ROUTING.get(node_name, ("large",) * len(ROUTING_PROFILES))
+    tier = NODE_TIERS.get(node_name) or tiers[ROUTING_PROFILES.index(profile)]
+    chain = []
+    for spec in [TIER_MODELS[tier], PRIMARY_MODEL] + FALLBACK_MODELS:
+        if spec not in chain:
+            chain.append(spec)
+    return chain
+
+
+def policy_for(node_name: str) -> dict:
+    return {**DEFAULT_POLICY, "models": model_chain(node_name), **NODE_POLICIES.get(node_name, {})}
+
+
+def _connection_limits():
+    import httpx
+    # The SDKs' default pool sizes, with a longer keep-alive.
+    return httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=LLM_KEEPALIVE_SECONDS)
+
+
+def build_model(spec: str):
+    provider, _, model = spec.partition(":")
+    if provider == "groq":
+        import groq
+        from langchain_groq import ChatGroq
+        return ChatGroq(model=model, temperature=0, groq_api_key=os.getenv("GROQ_API_KEY"),
+                        http_client=groq.DefaultHttpxClient(limits=_connection_limits()))
+    if provider == "openai":
+        import openai
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=model, temperature=0, api_key=os.getenv("OPENAI_API_KEY"),
+                          http_client=openai.DefaultHttpxClient(limits=_connection_limits()))
+    raise ValueError(f"Unknown LLM provider in model spec '{spec}'")
+
+
+def get_model(spec: str):
+    with _models_lock:
+        if spec not in _models:
+            _models[spec] = build_model(spec)
+        return _models[spec]
+
+
+def _json_model(spec: str):
+    model = get_model(spec)
+    return model.bind(response_format={"type": "json_object"}) if JSON_MODE else model
+
+
+class NodeStats:
+    def __init__(self):
+        self.latencies = collections.deque(maxlen=256)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.answers = 0
+        self.parse_failures = 0
+        self.validation_failures = 0
+        self.repairs_succeeded = 0
+        self.calls_by_model = collections.Counter()
+        self.tokens_by_model = collections.Counter()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.lock = threading.Lock()
+
+    def record_usage(self, spec: str, message):
+        usage = getattr(message, "usage_metadata", None) or {}
+        with self.lock:
+            self.calls_by_model[spec] += 1
+            self.tokens_by_model[spec] += usage.get("total_tokens", 0)
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+
+    def count(self, counter: str):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_latency(self, seconds: float):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        with self.lock:
+            if len(self.latencies) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def hedge_delay(self, policy: dict) -> float:
+        observed = self.percentile(policy["hedge_percentile"])
+        return policy["hedge_after"] if observed is None else observed
+
+    def snapshot(self) -> dict:
+        latency_p50, latency_p95 = self.percentile(0.5), self.percentile(0.95)
+        with self.lock:
+            return self._counters(latency_p50, latency_p95)
+
+    def _counters(self, latency_p50, latency_p95) -> dict:
+        answers = max(self.answers, 1)
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+            "answers": self.answers,
+            "parse_failures": self.parse_failures,
+            "validation_failures": self.validation_failures,
+            "repairs_succeeded": self.repairs_succeeded,
+            "parse_failure_rate": round(self.parse_failures / answers, 4),
+            "validation_failure_rate": round(self.validation_failures / answers, 4),
+            "calls_by_model": dict(self.calls_by_model),
+            "tokens_by_model": dict(self.tokens_by_model),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_p50": latency_p50,
+            "latency_p95": latency_p95,
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _node_stats(node_name: str) -> NodeStats:
+    with _stats_lock:
+        stats = _stats.get(node_name)
+        if stats is None:
+            stats = _stats[node_name] = NodeStats()
+        return stats
+
+
+def _load_json(content: str):
+    # Strict json.loads: a document cut off mid-way is a failure, not something to patch up.
+    return parse_json_markdown(content, parser=json.loads)
+
+
+def _repair_fields(node_name: str, spec: str, prompt_value, content: str, data: dict,
+                   error: ValidationError) -> dict:
+    """Re-asks the model for only the fields that failed validation and merges them in.
+    """
+    stats = _node_stats(node_name)
+    schema = STAGE_SCHEMAS.get(node_name, StageOutput)
+    fields = sorted({str(err["loc"][0]) for err in error.errors() if err["loc"]})
+    properties = schema.model_json_schema().get("properties", {})
+    print(f"[LLM_ROUTER] {node_name}: repairing invalid fields {', '.join(fields)} on {spec}")
+    messages = prompt_value.to_messages() + [AIMessage(content=content)] + FIELD_REPAIR_PROMPT.format_messages(
+        errors="\n".join(f"- {'.'.join(map(str, err['loc']))}: {err['msg']}" for err in error.errors()),
+        fields=", ".join(fields),
+        field_schemas=json.dumps({field: properties.get(field, {}) for field in fields}),
+    )
+    message = _json_model(spec).invoke(messages)
+    stats.record_usage(spec, message)
+    try:
+        fix = _load_json(message.content)
+    except Exception as e:
+        raise OutputParserException(f"Field repair answer is not valid JSON: {e}")
+    if isinstance(fix, dict):
+        data.update({field: fix[field] for field in fields if field in fix})
+    try:
+        result = schema.model_validate(data).model_dump()
+    except ValidationError as e:
+        raise OutputParserException(f"Answer still fails its schema after repair: {e}")
+    stats.count("repairs_succeeded")
+    return result
+
+
+def _validate(node_name: str, spec: str, prompt_value, content: str) -> dict:
+    """Parses and validates an answer against the node's schema.
+
+    The common case is a single pass of the compiled pydantic-core validator over
+    the raw JSON; answers wrapped in markdown fall back to a lenient load first.
+    """
+    stats = _node_stats(node_name)
+    schema = STAGE_SCHEMAS.get(node_name, StageOutput)
+    try:
+        result = schema.model_validate_json(content).model_dump()
+        set_attribute("llm.json.outcome", "valid")
+        return result
+    except ValidationError:
+        pass
+    try:
+        data = _load_json(content)
+    except Exception as e:
+        stats.count("parse_failures")
+        set_attribute("llm.json.outcome", "invalid_json")
+        raise OutputParserException(f"Answer is not valid JSON: {e}")
+    if not isinstance(data, dict):
+        stats.count("parse_failures")
+        set_attribute("llm.json.outcome", "not_an_object")
+        raise OutputParserException(f"Expected a JSON object, got {type(data).__name__}")
+    try:
+        result = schema.model_validate(data).model_dump()
+        set_attribute("llm.json.outcome", "lenient")
+        return result
+    except ValidationError as e:
+        stats.count("validation_failures")
+        set_attribute("llm.json.outcome", "schema_error")
+        result = _repair_fields(node_name, spec, prompt_value, content, data, e)
+        set_attribute("llm.json.outcome", "repaired")
+        return result
+
+
+def _stream(node_name: str, model, prompt_value, on_fields):
+    """Streams the answer, handing the fields parsed so far to on_fields each time one completes.
+    """
+    stream = JsonFieldStream()
+    message = None
+    for chunk in model.stream(prompt_value):
+        message = chunk if message is None else message + chunk
+        if stream.feed(chunk.content):
+            try:
+                on_fields(dict(stream.fields))
+            except Exception as e:
+                print(f"[LLM_ROUTER] {node_name}: field callback failed: {e}")
+    return message
+
+
+def _call(node_name: str, spec: str, prompt_value, on_fields=None, hedge: int = 0, fallback: int = 0) -> dict:
+    stats = _node_stats(node_name)
+    started = time.monotonic()
+    provider, _, model_name = spec.partition(":")
+    attributes = {"gen_ai.system": provider, "gen_ai.request.model": model_name, "graph.node": node_name,
+                  "llm.hedge": hedge, "llm.fallback": fallback, "llm.streamed": on_fields is not None}
+    with start_span(f"llm {spec}", "client", attributes) as trace:
+        model = _json_model(spec) if on_fields is None else get_model(spec)
+        with span(f"llm:{spec}", "llm", node_name, capture=True):
+            if on_fields is None:
+                message = model.invoke(prompt_value)
+            else:
+                message = _stream(node_name, model, prompt_value, on_fields)
+        stats.record_usage(spec, message)
+        stats.count("answers")
+        if trace is not None:
+            usage = getattr(message, "usage_metadata", None) or {}
+            trace.set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens"))
+            trace.set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens"))
+        with span(f"validate:{node_name}", "json", node_name, capture=True):
+            result = _validate(node_name, spec, prompt_value, message.content)
+    stats.record_latency(time.monotonic() - started)
+    return result
+
+
+def _hedged_call(node_name: str, spec: str, prompt_value, policy: dict, on_fields=None, fallback: int = 0) -> dict:
+    """Returns the first schema-valid answer among the original call and its hedges.
+    Losing calls are left to finish in the background; their latencies still feed the percentiles.
+    """
+    stats = _node_stats(node_name)
+    # Calls run with the caller's context so the graph config stays visible to them.
+    first = _executor.submit(contextvars.copy_context().run, _call, node_name, spec, prompt_value, on_fields, 0,
+                             fallback)
+    pending = {first}
+    hedges_left = policy["max_hedges"] if HEDGING_ENABLED else 0
+    last_error = None
+    while pending:
+        timeout = stats.hedge_delay(policy) if hedges_left > 0 else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            hedges_left -= 1
+            stats.count("hedges")
+            print(f"[LLM_ROUTER] {node_name}: no answer after {timeout:.1f}s, hedging on {spec}")
+            hedge = policy["max_hedges"] - hedges_left
+            pending.add(_executor.submit(contextvars.copy_context().run, _call, node_name, spec, prompt_value,
+                                         on_fields, hedge, fallback))
+            continue
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                last_error = e
+                continue
+            if future is not first:
+                stats.count("hedge_wins")
+            return result
+    raise last_error
+
+
+def invoke_json(node_name: str, prompt, inputs: dict, on_fields=None) -> dict:
+    """Formats the node's prompt and returns the model's answer, validated
+    against the node's schema, as a dict.
+
+    Applies the node's hedging policy to each model of its chain in turn and
+    raises LLMCallFailed only when every model has failed. With on_fields the
+    answer is streamed and on_fields receives the top-level fields parsed so
+    far each time one completes. Agent calls with the same inputs in one run
+    are shared with their speculative start (see speculation.py).
+    """
+    return shared_call(node_name, inputs, lambda: _invoke(node_name, prompt, inputs, on_fields))
+
+
+def _invoke(node_name: str, prompt, inputs: dict, on_fields) -> dict:
+    policy = policy_for(node_name)
+    stats = _node_stats(node_name)
+    stats.count("calls")
+    with span(f"prompt:{node_name}", "prompt", node_name):
+        prompt_value = prompt.invoke(inputs)
+    errors = []
+    for index, spec in enumerate(policy["models"]):
+        if index > 0:
+            stats.count("fallbacks")
+            print(f"[LLM_ROUTER] {node_name}: escalating to {spec}")
+        try:
+            return _hedged_call(node_name, spec, prompt_value, policy, on_fields, index)
+        except Exception as e:
+            errors.append(f"{spec}: {e}")
+    stats.count("failures")
+    raise LLMCallFailed("; ".join(errors))
+
+
+def llm_stats() -> dict:
+    with _stats_lock:
+        nodes = dict(_stats)
+    return {node_name: stats.snapshot() for node_name, stats in nodes.items()}
@@ -1,21 +1,113 @@
 import asyncio
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+import contextlib
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from pydantic import BaseModel
-import uvicorn
-from fastapi import Request
+from fastapi import Request, Response
 import json
+import math
+import os
+import time
 import uuid
 
-from graph import app_graph
-from parsing import parse_pdf, parse_docx
+from graph import app_graph, checkpointer, ephemeral_checkpointer, ephemeral_graph, DURABLE_CHECKPOINTS
+from checkpoints import CHECKPOINT_GC_INTERVAL_SECONDS
+from parsing import PRESERVE_LAYOUT, parse_pdf, parse_docx
+from uploads import UploadSizeLimit, upload_buffer
+from pdf_triage import ImageOnlyPdf, triage_stats
+from sections import section_stats
+from dedup import RESUME_DEDUP_ENABLED, RESUME_DEDUP_ACTION, resume_index, resume_signature, content_hash
+from skill_index import SKILL_INDEX_ENABLED, QuerySyntaxError, skill_index
+from text_store import put_text, release_text, store_stats
+from singleflight import COALESCED, REPLAYED, SingleFlight, IdempotencyConflict, content_key
+from admission import INTERACTIVE, PRIORITY_CLASSES, AdmissionController, Overloaded, parse_tenant_weights
+from deadlines import Deadline, DeadlineExceeded, cancel_on_disconnect
+from llm_router import llm_stats
+from speculation import discard as discard_speculation, speculation_stats
+from node_cache import node_cache
+from market_standards import market_standards
+from profiling import ProfileRequests, current_profile, profile_store, record_span, span
+from tracing import TraceRequests, exporter as trace_exporter, set_attribute, start_span
+from memory import NotTracing, memory_monitor, memory_saver_stats
+from startup import readiness
+from shared_store import RATE_LIMIT_STORAGE_URI, SHARED, WORKERS, shared_store
+from auth import ADMIN_TOKEN, admin_token_valid
 
-app = FastAPI(title="TalentScan AI Backend (LangGraph)")
+async def collect_garbage():
+    """Purges expired checkpoint threads, including runs that crashed or were abandoned,
+    and expired near-duplicate entries, at startup and every CHECKPOINT_GC_INTERVAL_SECONDS.
+    """
+    while True:
+        if DURABLE_CHECKPOINTS:
+            try:
+                await asyncio.to_thread(checkpointer.collect_garbage)
+            except Exception as e:
+                print(f"[CHECKPOINTS] Garbage collection failed: {e}")
+        if RESUME_DEDUP_ENABLED:
+            try:
+                await asyncio.to_thread(resume_index.prune)
+            except Exception as e:
+                print(f"[DEDUP] Pruning failed: {e}")
+        await asyncio.sleep(CHECKPOINT_GC_INTERVAL_SECONDS)
 
-limiter = Limiter(key_func=get_remote_address)
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The server accepts connections while the warm-up runs; /ready reports when it is done.
+    readiness.start()
+    memory_monitor.start()
+    if SKILL_INDEX_ENABLED:
+        await asyncio.to_thread(skill_index.load)
+    gc_task = asyncio.create_task(collect_garbage()) if DURABLE_CHECKPOINTS or RESUME_DEDUP_ENABLED else None
+    yield
+    if gc_task is not None:
+        gc_task.cancel()
+    if SKILL_INDEX_ENABLED:
+        await asyncio.to_thread(skill_index.flush)
+
+app = FastAPI(title="TalentScan AI Backend (LangGraph)", lifespan=lifespan)
+
+# Identical (resume, JD, role) evaluations share one graph run; results for
+# caller-supplied idempotency keys are replayed for IDEMPOTENCY_TTL_SECONDS,
+# from the shared store when several workers run.
+# Partial results are not replayed: a retry gets a full run.
+evaluations = SingleFlight(result_ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+                           store=shared_store if SHARED else None,
+                           replayable=lambda result: not result.get("partial"))
+
+# All traffic arrives from the NestJS backend's IP, so load is bounded by the
+# admission controller; the per-IP rate limit is only a coarse safety net.
+# Both limits apply per worker process, except the rate limit when the workers
+# share a store: its counters are kept there.
+# Interactive runs keep RESERVED_INTERACTIVE_EVALUATIONS of the slots to
+# themselves; bulk imports and background re-scores queue separately, shared
+# fairly between tenants (recruiters) weighted by TENANT_WEIGHTS.
+admission = AdmissionController(
+    max_in_flight=int(os.getenv("MAX_IN_FLIGHT_EVALUATIONS", "4")),
+    max_queue={
+        "interactive": int(os.getenv("MAX_QUEUED_EVALUATIONS", "16")),
+        "bulk": int(os.getenv("MAX_QUEUED_BULK_EVALUATIONS", "512")),
+        "background": int(os.getenv("MAX_QUEUED_BACKGROUND_EVALUATIONS", "512")),
+    },
+    max_wait=float(os.getenv("MAX_QUEUE_WAIT_SECONDS", "60")),
+    reserved_interactive=int(os.getenv("RESERVED_INTERACTIVE_EVALUATIONS", "1")),
+    tenant_weights=parse_tenant_weights(os.getenv("TENANT_WEIGHTS", ""))
+)
+RATE_LIMIT = os.getenv("RATE_LIMIT", "5/minute")
+
+# Matches the 120s axios timeout in the NestJS ai.service.ts.
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("DEFAULT_REQUEST_TIMEOUT_SECONDS", "120"))
+# Longer timeouts asked for by a client are cut to this.
+MAX_TIMEOUT_SECONDS = float(os.getenv("MAX_REQUEST_TIMEOUT_SECONDS", "600"))
+
+# Bulk re-scoring feeds candidates to the admission controller this many at a time.
+RESCORE_CONCURRENCY = int(os.getenv("RESCORE_CONCURRENCY", os.getenv("MAX_IN_FLIGHT_EVALUATIONS", "4")))
+RESCORE_MAX_CANDIDATES = int(os.getenv("RESCORE_MAX_CANDIDATES", "500"))
+WEIGHT_CATEGORIES = ("competency", "experience", "soft_skills")
+
+limiter = Limiter(key_func=get_remote_address, storage_uri=RATE_LIMIT_STORAGE_URI)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -32,80 +124,555 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadSizeLimit)
+app.add_middleware(ProfileRequests)
+app.add_middleware(TraceRequests)
+
+def checkpoint_stats() -> dict:
+    return checkpointer.stats() if DURABLE_CHECKPOINTS else memory_saver_stats(checkpointer)
+
+# Sizes of the in-process stores, sampled with the RSS by the memory monitor.
+memory_monitor.register("checkpoints", checkpoint_stats)
+memory_monitor.register("text_store", store_stats)
+memory_monitor.register("single_flight", lambda: {
+    key: value for key, value in evaluations.stats().items() if key in ("in_flight", "remembered_results")})
+memory_monitor.register("speculation", lambda: {"runs_tracked": speculation_stats()["runs_tracked"]})
+memory_monitor.register("resume_dedup", lambda: {"entries": resume_index.stats()["entries"]})
+memory_monitor.register("skill_index", lambda: {
+    key: value for key, value in skill_index.stats().items() if key in ("candidates", "terms", "posting_bytes")})
+memory_monitor.register("profiles", lambda: {"kept": len(profile_store.recent())})
+memory_monitor.register("trace_queue", lambda: {"queued": trace_exporter.stats()["queued"]})
+
+def require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(403, "Admin endpoints are disabled; set ADMIN_TOKEN to enable them.")
+    if not admin_token_valid(request.headers.get("X-Admin-Token")):
+        raise HTTPException(401, "Admin token required.")
 
 class TextRequest(BaseModel):
     text: str
 
+class RescoreCandidate(BaseModel):
+    candidate_id: str
+    raw_text: str
+
+class RescorePostingRequest(BaseModel):
+    job_description: str
+    role_name: str
+    weights: dict[str, float] | None = None
+    candidates: list[RescoreCandidate]
+
+def parse_weights(weights) -> dict | None:
+    """Validates category weights (JSON string or dict) and normalizes them to sum to 1.
+    """
+    if weights in (None, "", {}):
+        return None
+    try:
+        if isinstance(weights, str):
+            weights = json.loads(weights)
+        unknown = set(weights) - set(WEIGHT_CATEGORIES)
+        values = {key: float(weights.get(key, 0)) for key in WEIGHT_CATEGORIES}
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(422, "weights must be a JSON object of numbers.")
+    if unknown:
+        raise HTTPException(422, f"Unknown weight categories: {', '.join(sorted(unknown))}. "
+                                 f"Use {', '.join(WEIGHT_CATEGORIES)}.")
+    total = sum(values.values())
+    if any(value < 0 for value in values.values()) or total <= 0:
+        raise HTTPException(422, "weights must be non-negative and not all zero.")
+    return {key: round(value / total, 4) for key, value in values.items()}
+
+def public_duplicate(duplicate: dict | None) -> dict | None:
+    return {key: value for key, value in duplicate.items() if not key.startswith("_")} if duplicate else None
+
+async def index_candidate(candidate_id: str, result: dict):
+    """Adds a completed evaluation's profile to the skill index."""
+    if SKILL_INDEX_ENABLED and not result.get("partial") and result.get("parsed_profile"):
+        await asyncio.to_thread(skill_index.add, candidate_id, result["parsed_profile"])
+
+def parse_timeout(request: Request, timeout_seconds: str | None = None) -> float:
+    """Timeout from the form field or X-Request-Timeout, clamped to (0, MAX_TIMEOUT_SECONDS]."""
+    value = timeout_seconds or request.headers.get("X-Request-Timeout")
+    if value in (None, ""):
+        return min(DEFAULT_TIMEOUT_SECONDS, MAX_TIMEOUT_SECONDS)
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise HTTPException(400, f"Invalid timeout {value!r}; expected a number of seconds.")
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise HTTPException(400, f"Invalid timeout {value!r}; expected a positive number of seconds.")
+    return min(seconds, MAX_TIMEOUT_SECONDS)
+
+def parse_priority(priority: str | None) -> str:
+    priority = (priority or INTERACTIVE).lower()
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(422, f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITY_CLASSES)}.")
+    return priority
+
+def build_initial_state(resume_text: str, job_description: str, role_name: str, weights: dict | None = None) -> dict:
+    """Registers the raw texts in the text store; the state only carries their refs.
+    Pair every call with release_initial_state once the run is over.
+    """
+    return {
+        "resume_ref": put_text(resume_text),
+        "job_description_ref": put_text(job_description),
+        "role_name": role_name,
+        "weights": weights,
+        "candidate_profile": {},
+        "extracted_scoring_rules": {},
+        "jd_role_alignment": {},
+        "tech_evaluation": {},
+        "experience_evaluation": {},
+        "culture_evaluation": {},
+        "candidate_feedback": {},
+        "final_evaluation": {}
+    }
+
+def release_initial_state(initial_state: dict):
+    release_text(initial_state["resume_ref"])
+    release_text(initial_state["job_description_ref"])
+
+async def run_evaluation(resume_text: str, job_description: str, role_name: str, deadline: Deadline,
+                         weights: dict | None = None, evaluation_id: str | None = None,
+                         priority: str = INTERACTIVE, tenant: str = "") -> dict:
+    queued_at = time.perf_counter()
+    set_attribute("evaluation.priority", priority)
+    try:
+        async with admission.slot(timeout=deadline.remaining(), priority=priority, tenant=tenant):
+            record_span("admission", "queue", queued_at)
+            return await run_graph(resume_text, job_description, role_name, deadline, weights, evaluation_id)
+    except Overloaded as e:
+        print(f"--- SHEDDING EVALUATION FOR: {role_name} ({e}) ---")
+        raise HTTPException(503, str(e), headers={"Retry-After": str(e.retry_after)})
+
+def build_response(final_state: dict, role_name: str, deadline: Deadline, reused_stages: list,
+                   evaluation_id: str) -> dict:
+    final_evaluation = final_state.get("final_evaluation") or {}
+    candidate_feedback = final_state.get("candidate_feedback") or {}
+    return {
+        "success": True,
+        "evaluation_id": evaluation_id,
+        "role": role_name,
+        "final_score": final_evaluation.get("final_score", 0),
+        "recommendation": candidate_feedback.get("recommendation", "Maybe"),
+        "summary": final_evaluation,
+        "agent_reports": {
+            "competency_agent": final_state.get("tech_evaluation") or {},
+            "experience_agent": final_state.get("experience_evaluation") or {},
+            "behavioral_agent": final_state.get("culture_evaluation") or {}
+        },
+        "parsed_profile": final_state.get("candidate_profile") or {},
+        "candidate_feedback": candidate_feedback,
+        "partial": bool(deadline.skipped),
+        "skipped_stages": deadline.skipped,
+        "reused_stages": reused_stages
+    }
+
+async def run_graph(resume_text: str, job_description: str, role_name: str, deadline: Deadline,
+                    weights: dict | None = None, evaluation_id: str | None = None) -> dict:
+    thread_id = evaluation_id or str(uuid.uuid4())
+    durable = DURABLE_CHECKPOINTS and bool(evaluation_id)
+    if durable:
+        thread = await asyncio.to_thread(checkpointer.get_thread, thread_id)
+        if thread:
+            # A retry: an interrupted run (crash, restart, deadline) continues from its
+            # last checkpoint, and a finished one returns its stored result.
+            return await resume_graph(thread_id, deadline)
+    elif evaluation_id:
+        snapshot = await app_graph.aget_state({"configurable": {"thread_id": thread_id}})
+        if snapshot.values and not snapshot.next:
+            return build_response(snapshot.values, role_name, deadline, [], thread_id)
+
+    initial_state = build_initial_state(resume_text, job_description, role_name, weights)
+    if durable:
+        # The raw texts are on disk until the run finishes, so a restarted process can resume it.
+        await asyncio.to_thread(checkpointer.start_thread, thread_id, role_name, {
+            "resume_text": resume_text, "job_description": job_description,
+            "role_name": role_name, "weights": weights
+        })
+    print(f"--- STARTING EVALUATION FOR: {role_name} ---")
+    try:
+        return await invoke_graph(initial_state, thread_id, role_name, deadline,
+                                  ephemeral=DURABLE_CHECKPOINTS and not durable)
+    finally:
+        release_initial_state(initial_state)
+
+async def resume_graph(thread_id: str, deadline: Deadline) -> dict:
+    """Continues a thread from its last checkpoint; stages completed before the
+    interruption are not run again. A finished thread just returns its result.
+    """
+    thread = await asyncio.to_thread(checkpointer.get_thread, thread_id)
+    if thread is None:
+        raise HTTPException(404, f"No resumable evaluation {thread_id}.")
+    role_name = thread["role_name"]
+    if thread["status"] == "finished":
+        print(f"--- RETURNING FINISHED EVALUATION {thread_id} FOR: {role_name} ---")
+        snapshot = await app_graph.aget_state({"configurable": {"thread_id": thread_id}})
+        return build_response(snapshot.values, role_name, deadline, [], thread_id)
+
+    # The texts lived in the text store of the process that started the run.
+    inputs = thread["inputs"]
+    initial_state = build_initial_state(inputs["resume_text"], inputs["job_description"], role_name,
+                                        inputs["weights"])
+    config = {"configurable": {"thread_id": thread_id}}
+    # Interrupted before the first checkpoint was written: start over.
+    started = (await app_graph.aget_state(config)).values
+    print(f"--- {'RESUMING' if started else 'RESTARTING'} EVALUATION {thread_id} FOR: {role_name} ---")
+    try:
+        return await invoke_graph(None if started else initial_state, thread_id, role_name, deadline)
+    finally:
+        release_initial_state(initial_state)
+
+async def invoke_graph(graph_input: dict | None, thread_id: str, role_name: str, deadline: Deadline,
+                       ephemeral: bool = False) -> dict:
+    """Runs the graph from graph_input, or from the thread's last checkpoint when it is None.
+    An ephemeral run is checkpointed in memory, and its thread dropped at the end.
+    """
+    graph = ephemeral_graph if ephemeral else app_graph
+    # Stages answered from the node cache are appended to reused_stages.
+    reused_stages = []
+    config = {"configurable": {"thread_id": thread_id, "deadline": deadline, "reused_stages": reused_stages}}
+    profile = current_profile()
+    if profile is not None:
+        profile.meta.setdefault("evaluation_ids", []).append(thread_id)
+    try:
+        with start_span("graph", attributes={"evaluation.id": thread_id, "evaluation.role": role_name,
+                                             "evaluation.resumed": graph_input is None}) as trace, \
+                span("graph", "graph"):
+            final_state = await asyncio.wait_for(
+                graph.ainvoke(graph_input, config=config),
+                timeout=max(deadline.remaining(), 0)
+            )
+            if trace is not None:
+                trace.set_attribute("evaluation.reused_stages", reused_stages)
+        if DURABLE_CHECKPOINTS and not ephemeral:
+            await asyncio.to_thread(checkpointer.finish_thread, thread_id)
+        return build_response(final_state, role_name, deadline, reused_stages, thread_id)
+    except (asyncio.TimeoutError, DeadlineExceeded) as e:
+        if not deadline.allow_partial:
+            print(f"Graph Deadline Exceeded: {e}")
+            raise HTTPException(504, "Analysis did not finish before the request deadline.")
+        # The stage running at the deadline was cancelled; report the last checkpoint.
+        snapshot = await graph.aget_state(config)
+        deadline.skipped.extend(node for node in snapshot.next if node not in deadline.skipped)
+        print(f"--- RETURNING PARTIAL EVALUATION FOR: {role_name} (skipped: {deadline.skipped}) ---")
+        return build_response(snapshot.values, role_name, deadline, reused_stages, thread_id)
+    except Exception as e:
+        print(f"Graph Execution Error: {e}")
+        raise HTTPException(500, f"Analysis failed: {str(e)}")
+    finally:
+        discard_speculation(thread_id)
+        if ephemeral:
+            ephemeral_checkpointer.delete_thread(thread_id)
+
 @app.get("/")
 async def health_check():
     return {"status": "AI Agent System is Running"}
 
+@app.get("/ready")
+async def ready(response: Response):
+    """Readiness: 200 once the warm-up has run, 503 while the process is up but cold."""
+    status = readiness.status()
+    if not readiness.warm:
+        response.status_code = 503
+    return status
+
+# The counters reveal tenants' load, stored profile counts, the worker layout and
+# memory figures, so they are an admin endpoint like /admin.
+@app.get("/metrics", dependencies=[Depends(require_admin)])
+async def metrics():
+    return {
+        "admission": admission.stats(),
+        "single_flight": evaluations.stats(),
+        "text_store": store_stats(),
+        "llm": llm_stats(),
+        "speculation": speculation_stats(),
+        "node_cache": node_cache.stats(),
+        "market_standards": market_standards.stats(),
+        "pdf_triage": triage_stats(),
+        "resume_sections": section_stats(),
+        "resume_dedup": resume_index.stats(),
+        "skill_index": skill_index.stats(),
+        "profiling": profile_store.stats(),
+        "tracing": trace_exporter.stats(),
+        "worker": {"pid": os.getpid(), "workers": WORKERS, "shared_store": shared_store.stats()},
+        "memory": memory_monitor.stats(),
+        "checkpoints": checkpoint_stats()
+    }
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Recently profiled requests, newest first."""
+    return {"profiles": profile_store.recent(), **profile_store.stats()}
+
+@app.get("/admin/profiles/aggregate", dependencies=[Depends(require_admin)])
+async def aggregate_profile(format: str = "json", limit: int = 40):
+    """Span totals over all profiled requests (json), or the merged cProfile captures
+    as top functions (text) or a pstats file for snakeviz or pstats (pstats).
+    """
+    if format == "json":
+        return profile_store.aggregate()
+    if format == "text":
+        return Response(profile_store.aggregate_text(limit), media_type="text/plain")
+    if format == "pstats":
+        data = profile_store.aggregate_pstats()
+        if data is None:
+            raise HTTPException(404, "No cProfile captures yet; profile requests with X-Profile: cprofile.")
+        return Response(data, media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="evaluations.prof"'})
+    raise HTTPException(422, "format must be json, text or pstats.")
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str, format: str = "json", limit: int = 40):
+    """One request's timeline (json), collapsed stacks for a flame graph (folded),
+    or its cProfile/pyinstrument report (text).
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(404, f"No profile {profile_id}.")
+    if format == "json":
+        return profile.timeline()
+    if format == "folded":
+        return Response(profile.folded(), media_type="text/plain")
+    if format == "text":
+        return Response(profile.report(limit), media_type="text/plain")
+    raise HTTPException(422, "format must be json, folded or text.")
+
+@app.get("/admin/memory", dependencies=[Depends(require_admin)])
+async def memory_report(limit: int = 15):
+    """RSS, GC state, checkpointer and cache sizes, the sampled RSS trend and, while
+    tracemalloc runs, the top allocating modules and lines.
+    """
+    return await asyncio.to_thread(memory_monitor.report, limit)
+
+@app.get("/admin/memory/samples", dependencies=[Depends(require_admin)])
+async def memory_samples():
+    return {"samples": list(memory_monitor.samples), "growth": memory_monitor.growth()}
+
+@app.post("/admin/memory/tracemalloc", dependencies=[Depends(require_admin)])
+async def memory_tracing(enabled: bool = True, frames: int = 0):
+    """Starts or stops tracemalloc; only allocations made while it runs are seen."""
+    if not 0 <= frames <= 100:
+        raise HTTPException(422, "frames must be between 1 and 100, or 0 for MEMORY_TRACEMALLOC_FRAMES.")
+    return memory_monitor.set_tracing(enabled, frames) if frames else memory_monitor.set_tracing(enabled)
+
+@app.post("/admin/memory/snapshots", dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(label: str = ""):
+    try:
+        return await asyncio.to_thread(memory_monitor.take_snapshot, label)
+    except NotTracing as e:
+        raise HTTPException(409, str(e))
+
+@app.get("/admin/memory/snapshots", dependencies=[Depends(require_admin)])
+async def list_memory_snapshots():
+    return {"snapshots": memory_monitor.list_snapshots()}
+
+@app.get("/admin/memory/diff", dependencies=[Depends(require_admin)])
+async def memory_diff(base: str, against: str | None = None, limit: int = 15):
+    """Allocation changes per module and line from snapshot `base` to snapshot
+    `against`, or to a snapshot taken now.
+    """
+    try:
+        diff = await asyncio.to_thread(memory_monitor.diff, base, against, limit)
+    except NotTracing as e:
+        raise HTTPException(409, str(e))
+    if diff is None:
+        raise HTTPException(404, "Unknown snapshot; list them with GET /admin/memory/snapshots.")
+    return diff
+
 @app.post("/analyze/graph")
-@limiter.limit("5/minute")
+@limiter.limit(RATE_LIMIT)
 async def analyze_with_graph(
     request: Request,
+    response: Response,
     file: UploadFile | None = File(None),
     raw_text: str | None = Form(None),
     job_description: str = Form(...),
-    role_name: str = Form(...)
+    role_name: str = Form(...),
+    idempotency_key: str | None = Form(None),
+    timeout_seconds: str | None = Form(None),
+    allow_partial: bool = Form(False),
+    weights: str | None = Form(None),
+    evaluation_id: str | None = Form(None),
+    reuse_duplicate: bool | None = Form(None),
+    candidate_id: str | None = Form(None),
+    priority: str | None = Form(None),
+    tenant_id: str | None = Form(None)
 ):
+    timeout_seconds = parse_timeout(request, timeout_seconds)
+    allow_partial = allow_partial or request.headers.get("X-Allow-Partial", "").lower() == "true"
+    deadline = Deadline(timeout_seconds, allow_partial)
+    weights = parse_weights(weights)
+    evaluation_id = evaluation_id or request.headers.get("X-Evaluation-Id")
+    priority = parse_priority(priority or request.headers.get("X-Priority"))
+    tenant_id = tenant_id or request.headers.get("X-Tenant-Id", "")
 
     resume_text = ""
     if file:
-        content = await file.read()
-        filename = file.filename.lower()
+        filename = (file.filename or "").lower()
         if filename.endswith(".pdf"):
-            resume_text = await asyncio.to_thread(parse_pdf, content)
+            parser = parse_pdf
         elif filename.endswith(".docx"):
-            resume_text = await asyncio.to_thread(parse_docx, content)
+            parser = parse_docx
         else:
             raise HTTPException(400, "Invalid file type. Use PDF or DOCX.")
+        def parse_upload(source):
+            with span(f"parse:{filename.rsplit('.', 1)[-1]}", "document", capture=True):
+                return parser(source, PRESERVE_LAYOUT)
+
+        # The parser reads the spooled upload in place instead of a copy of its bytes.
+        try:
+            with upload_buffer(file) as source:
+                resume_text = await asyncio.to_thread(parse_upload, source)
+        except ImageOnlyPdf as e:
+            raise HTTPException(422, f"No text layer on any of the {e.triage['pages']} PDF pages; "
+                                     "it looks scanned. Upload a text PDF "
+                                     "or DOCX, or send the resume as raw_text.")
     elif raw_text:
         resume_text = raw_text
     
     if not resume_text:
         raise HTTPException(400, "No resume text provided.")
 
-    initial_state = {
-        "resume_text": resume_text,
-        "job_description_text": job_description,
-        "role_name": role_name,
-        "candidate_profile": {},
-        "extracted_scoring_rules": {},
-        "jd_role_alignment": {},
-        "tech_evaluation": {},
-        "experience_evaluation": {},
-        "culture_evaluation": {},
-        "candidate_feedback": {},
-        "final_evaluation": {}
-    }
+    # Near-duplicates of a resume already evaluated against the same JD, role and weights.
+    duplicate, signature, digest = None, None, ""
+    scope = content_key(job_description, role_name, json.dumps(weights, sort_keys=True))
+    if RESUME_DEDUP_ENABLED:
+        with span("dedup:lookup", "dedup"):
+            signature, digest = await asyncio.to_thread(lambda: (resume_signature(resume_text),
+                                                                 content_hash(resume_text)))
+            duplicate = await asyncio.to_thread(resume_index.find, scope, signature, digest)
+    if duplicate:
+        print(f"--- NEAR-DUPLICATE OF EVALUATION {duplicate['evaluation_id']} "
+              f"(similarity {duplicate['similarity']}) FOR: {role_name} ---")
+        response.headers["X-Duplicate-Of"] = duplicate["evaluation_id"]
+        set_attribute("evaluation.duplicate_of", duplicate["evaluation_id"])
+        if reuse_duplicate is None:
+            header = request.headers.get("X-Reuse-Duplicate")
+            reuse_duplicate = header.lower() == "true" if header else RESUME_DEDUP_ACTION == "reuse"
+        prior = await asyncio.to_thread(resume_index.result, duplicate) if reuse_duplicate else None
+        if prior is not None:
+            response.headers["X-Evaluation-Reused"] = "true"
+            set_attribute("evaluation.reused", True)
+            if candidate_id:
+                await index_candidate(candidate_id, prior)
+            return {**prior, "duplicate_of": public_duplicate(duplicate), "reused_evaluation": True}
 
-    print(f"--- STARTING EVALUATION FOR: {role_name} ---")
-    thread_id = str(uuid.uuid4())
+    key = content_key(resume_text, job_description, role_name, json.dumps(weights, sort_keys=True),
+                      evaluation_id or "", str(allow_partial))
+    idempotency_key = idempotency_key or request.headers.get("Idempotency-Key")
+    # A coalesced follower shares the leader's run and therefore the leader's deadline.
+    work = asyncio.ensure_future(evaluations.do(
+        key,
+        lambda: run_evaluation(resume_text, job_description, role_name, deadline, weights, evaluation_id,
+                               priority, tenant_id),
+        idempotency_key=idempotency_key
+    ))
+    watcher = asyncio.ensure_future(cancel_on_disconnect(request, work))
     try:
-        final_state = await app_graph.ainvoke(
-            initial_state,
-            config={"configurable": {"thread_id": thread_id}}
-        )
-
-        return {
-            "success": True,
-            "role": role_name,
-            "final_score": final_state["final_evaluation"].get("final_score", 0),
-            "recommendation": final_state.get("candidate_feedback", {}).get("recommendation", "Maybe"),
-            "summary": final_state["final_evaluation"],
-            "agent_reports": {
-                "competency_agent": final_state["tech_evaluation"],
-                "experience_agent": final_state["experience_evaluation"],
-                "behavioral_agent": final_state["culture_evaluation"]
-            },
-            "parsed_profile": final_state["candidate_profile"],
-            "candidate_feedback": final_state.get("candidate_feedback", {})
-        }
-    except Exception as e:
-        print(f"Graph Execution Error: {e}")
-        raise HTTPException(500, f"Analysis failed: {str(e)}")
+        result, source = await work
+    except IdempotencyConflict as e:
+        raise HTTPException(409, str(e))
+    finally:
+        watcher.cancel()
+
+    if source == REPLAYED:
+        print(f"--- REPLAYED STORED EVALUATION FOR: {role_name} ---")
+        response.headers["X-Idempotent-Replay"] = "true"
+        set_attribute("evaluation.replayed", True)
+    elif source == COALESCED:
+        print(f"--- COALESCED WITH IN-FLIGHT EVALUATION FOR: {role_name} ---")
+        response.headers["X-Evaluation-Coalesced"] = "true"
+        set_attribute("evaluation.coalesced", True)
+    elif RESUME_DEDUP_ENABLED and not result["partial"] and not (duplicate and duplicate["identical"]):
+        await asyncio.to_thread(resume_index.add, scope, signature, digest, result["evaluation_id"], result)
+    if candidate_id:
+        await index_candidate(candidate_id, result)
+    return {**result, "duplicate_of": public_duplicate(duplicate), "reused_evaluation": False}
+
+@app.get("/candidates/search", dependencies=[Depends(require_admin)])
+async def search_candidates(q: str, limit: int = 100, offset: int = 0):
+    """Boolean skill search over indexed candidate profiles, e.g. "Python AND Kubernetes AND 5+ years"."""
+    if not SKILL_INDEX_ENABLED:
+        raise HTTPException(501, "The skill index is disabled (SKILL_INDEX=false).")
+    try:
+        return await asyncio.to_thread(skill_index.search, q, max(0, min(limit, 1000)), max(offset, 0))
+    except QuerySyntaxError as e:
+        raise HTTPException(422, f"Invalid query: {e}")
+
+@app.delete("/candidates/{candidate_id}", dependencies=[Depends(require_admin)])
+async def remove_candidate(candidate_id: str):
+    """Removes a candidate from the skill index."""
+    if not await asyncio.to_thread(skill_index.remove, candidate_id):
+        raise HTTPException(404, f"Candidate {candidate_id} is not indexed.")
+    return {"removed": candidate_id}
+
+@app.post("/evaluations/{evaluation_id}/resume", dependencies=[Depends(require_admin)])
+@limiter.limit(RATE_LIMIT)
+async def resume_evaluation(request: Request, evaluation_id: str):
+    """Continues an interrupted evaluation from its last completed stage."""
+    if not DURABLE_CHECKPOINTS:
+        raise HTTPException(501, "Resuming requires CHECKPOINTER=sqlite.")
+    deadline = Deadline(parse_timeout(request), request.headers.get("X-Allow-Partial", "").lower() == "true")
+    priority = parse_priority(request.headers.get("X-Priority"))
+    try:
+        async with admission.slot(timeout=deadline.remaining(), priority=priority,
+                                  tenant=request.headers.get("X-Tenant-Id", "")):
+            return await resume_graph(evaluation_id, deadline)
+    except Overloaded as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": str(e.retry_after)})
+
+@app.post("/rescore/posting")
+@limiter.limit(RATE_LIMIT)
+async def rescore_posting(request: Request, body: RescorePostingRequest):
+    """Re-evaluates a posting's candidates after its JD or weights changed.
+
+    Every stage whose inputs are unchanged is answered from the node cache, so an
+    edited JD re-runs JD parsing and the stages downstream of it but not resume
+    extraction, and new weights re-run only the aggregation.
+    """
+    if len(body.candidates) > RESCORE_MAX_CANDIDATES:
+        raise HTTPException(413, f"At most {RESCORE_MAX_CANDIDATES} candidates per request.")
+    weights = parse_weights(body.weights)
+    priority = parse_priority(request.headers.get("X-Priority", "background"))
+    tenant = request.headers.get("X-Tenant-Id", "")
+    gate = asyncio.Semaphore(RESCORE_CONCURRENCY)
+
+    async def rescore(candidate: RescoreCandidate) -> dict:
+        async with gate:
+            deadline = Deadline(DEFAULT_TIMEOUT_SECONDS)
+            try:
+                result = await run_evaluation(candidate.raw_text, body.job_description, body.role_name,
+                                              deadline, weights, priority=priority, tenant=tenant)
+                await index_candidate(candidate.candidate_id, result)
+            except HTTPException as e:
+                return {"candidate_id": candidate.candidate_id, "success": False, "error": e.detail}
+            except Exception as e:
+                # One failed candidate must not throw away the results of the others.
+                print(f"[RESCORE] Candidate {candidate.candidate_id} failed: {e}")
+                return {"candidate_id": candidate.candidate_id, "success": False, "error": "Evaluation failed."}
+            return {"candidate_id": candidate.candidate_id, **result}
+
+    print(f"--- RE-SCORING {len(body.candidates)} CANDIDATES FOR: {body.role_name} ---")
+    # Candidates not started yet are dropped, and running ones cancelled, when the client goes away.
+    work = asyncio.ensure_future(asyncio.gather(*(rescore(candidate) for candidate in body.candidates)))
+    watcher = asyncio.ensure_future(cancel_on_disconnect(request, work))
+    try:
+        results = await work
+    finally:
+        watcher.cancel()
+    return {
+        "role": body.role_name,
+        "evaluated": sum(1 for result in results if result["success"]),
+        "failed": sum(1 for result in results if not result["success"]),
+        "stages_reused": sum(len(result.get("reused_stages", [])) for result in results),
+        "results": results
+    }
+
+
+readiness.imported()
 
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
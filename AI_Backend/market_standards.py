@@ -0,0 +1,200 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from llm_router import invoke_json
+from prompts import MARKET_STANDARDS_PROMPT
+
+# When a JD is vague or does not match the role, the agents evaluate against
+# market standards for the role. The profile for a (role family, seniority) is
+# generated once, stored and injected into the agent prompts, instead of every
+# agent inferring it again for every candidate. Warm the store for the common
+# role families (real LLM calls) with:
+#     python -m market_standards [--roles "Data Engineer" "Nurse" ...]
+MARKET_STANDARDS_ENABLED = os.getenv("MARKET_STANDARDS", "true").lower() == "true"
+MARKET_STANDARDS_PATH = os.getenv("MARKET_STANDARDS_PATH", os.path.join("data", "market_standards.sqlite3"))
+MARKET_STANDARDS_TTL_SECONDS = float(os.getenv("MARKET_STANDARDS_TTL_SECONDS", str(90 * 24 * 3600)))
+
+# Title words that set the seniority; they are dropped from the role family.
+# A title with several ("Senior Staff Engineer") takes the highest.
+SENIORITY_WORDS = {
+    "intern": "entry", "trainee": "entry", "graduate": "entry", "entry": "entry",
+    "junior": "entry", "jr": "entry",
+    "mid": "mid", "intermediate": "mid",
+    "senior": "senior", "sr": "senior", "snr": "senior",
+    "lead": "lead", "staff": "lead", "principal": "lead", "head": "lead", "chief": "lead",
+}
+# Trailing level numbers, as in "Software Engineer II".
+LEVEL_SUFFIXES = {"i": "entry", "1": "entry", "ii": "mid", "2": "mid", "iii": "senior", "3": "senior",
+                  "iv": "lead", "4": "lead"}
+# Words left over once the seniority is taken out ("Mid-Level", "Head of Data").
+FILLER_WORDS = {"level", "of", "the"}
+SENIORITIES = ("entry", "mid", "senior", "lead")
+TITLE_NOISE = re.compile(r"[^a-z0-9+#/ ]")
+
+COMMON_ROLE_FAMILIES = (
+    "Software Engineer", "Frontend Developer", "Backend Developer", "Full Stack Developer",
+    "Mobile Developer", "DevOps Engineer", "Cloud Engineer", "Data Engineer", "Data Scientist",
+    "Data Analyst", "Machine Learning Engineer", "QA Engineer", "Security Analyst",
+    "Product Manager", "Project Manager", "UX Designer", "Business Analyst", "Accountant",
+    "Financial Analyst", "Marketing Specialist", "Sales Representative", "HR Specialist",
+    "Customer Support Specialist", "Registered Nurse", "Teacher", "Mechanical Engineer",
+    "Civil Engineer", "Electrical Engineer",
+)
+
+# Profiles generated by an older version of the prompt are regenerated.
+PROMPT_HASH = hashlib.sha256(MARKET_STANDARDS_PROMPT.messages[0].prompt.template.encode("utf-8")).hexdigest()[:16]
+
+
+def role_key(role_name: str) -> tuple:
+    """Splits a role title into its normalized family and seniority.
+
+    "Sr. Data Engineer", "senior data engineer" and "Data Engineer III" share
+    ("data engineer", "senior"); titles without a seniority word are "mid".
+    """
+    words = TITLE_NOISE.sub(" ", (role_name or "").lower()).split()
+    levels = [SENIORITY_WORDS[word] for word in words if word in SENIORITY_WORDS]
+    if len(words) > 1 and words[-1] in LEVEL_SUFFIXES:
+        levels.append(LEVEL_SUFFIXES[words.pop()])
+    seniority = max(levels, key=SENIORITIES.index, default="mid")
+    family = " ".join(word for word in words if word not in SENIORITY_WORDS and word not in FILLER_WORDS)
+    return family, seniority
+
+
+class MarketStandardsStore:
+    """Profiles keyed by (role family, seniority) in SQLite. Lookups that miss
+    generate the profile; concurrent misses for the same key share one LLM call.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.counters = Counter()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS role_profiles ("
+                "role_family TEXT NOT NULL, seniority TEXT NOT NULL, prompt_hash TEXT NOT NULL, "
+                "profile TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (role_family, seniority))"
+            )
+        return self._conn
+
+    def get(self, family: str, seniority: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT profile FROM role_profiles WHERE role_family = ? AND seniority = ? "
+                "AND prompt_hash = ? AND created_at >= ?",
+                (family, seniority, PROMPT_HASH, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, family: str, seniority: str, profile: dict):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO role_profiles VALUES (?, ?, ?, ?, ?)",
+                    (family, seniority, PROMPT_HASH, json.dumps(profile), time.time())
+                )
+
+    def profile(self, role_name: str) -> Optional[dict]:
+        """Returns the stored profile for the role, generating it on a miss.
+        None if it cannot be generated; the agents then infer standards themselves.
+        """
+        return self.profile_for(*role_key(role_name))
+
+    def profile_for(self, family: str, seniority: str) -> Optional[dict]:
+        """profile() for a (family, seniority) key from role_key."""
+        if not MARKET_STANDARDS_ENABLED or not family:
+            return None
+        profile = self.get(family, seniority)
+        if profile is not None:
+            self.counters["hits"] += 1
+            return profile
+        with self._lock:
+            future = self._inflight.get((family, seniority))
+            owner = future is None
+            if owner:
+                future = self._inflight[(family, seniority)] = Future()
+        if not owner:
+            self.counters["coalesced"] += 1
+            return future.result()
+        self.counters["misses"] += 1
+        profile = None
+        try:
+            profile = self._generate(family, seniority)
+            return profile
+        finally:
+            future.set_result(profile)
+            with self._lock:
+                self._inflight.pop((family, seniority), None)
+
+    def _generate(self, family: str, seniority: str) -> Optional[dict]:
+        print(f"[MARKET_STANDARDS] Generating profile for {family} ({seniority})")
+        try:
+            profile = invoke_json("market_standards", MARKET_STANDARDS_PROMPT, {
+                "role_family": family,
+                "seniority": seniority,
+            })
+        except Exception as e:
+            self.counters["failures"] += 1
+            print(f"[MARKET_STANDARDS] Could not generate profile for {family} ({seniority}): {e}")
+            return None
+        profile.update(role_family=family, seniority=seniority)
+        self.put(family, seniority, profile)
+        return profile
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection().execute(
+                "SELECT COUNT(*) FROM role_profiles WHERE prompt_hash = ?", (PROMPT_HASH,)
+            ).fetchone()[0]
+        return {"enabled": MARKET_STANDARDS_ENABLED, "entries": entries, **self.counters}
+
+
+market_standards = MarketStandardsStore(MARKET_STANDARDS_PATH, MARKET_STANDARDS_TTL_SECONDS)
+
+
+def warm_up(role_names, seniorities=SENIORITIES, workers: int = 4) -> int:
+    """Generates the missing profiles for every role and seniority; returns how many were built.
+
+    Roles are keyed by role_key like lookups, so "Sr. Data Engineer" warms the
+    "data engineer" family; a seniority in the role name itself is ignored.
+    """
+    families = dict.fromkeys(family for family, _ in map(role_key, role_names) if family)
+    keys = [(family, seniority) for family in families for seniority in seniorities]
+    missing = [key for key in keys if market_standards.get(*key) is None]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        built = sum(1 for profile in pool.map(lambda key: market_standards.profile_for(*key), missing) if profile)
+    print(f"[MARKET_STANDARDS] {len(keys) - len(missing)} profiles already stored, "
+          f"{built}/{len(missing)} generated")
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build market-standards profiles for common role families.")
+    parser.add_argument("--roles", nargs="+", default=list(COMMON_ROLE_FAMILIES))
+    parser.add_argument("--seniorities", nargs="+", choices=SENIORITIES, default=list(SENIORITIES))
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    warm_up(args.roles, args.seniorities, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import gc
+import os
+import resource
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+# Memory visibility for long-running pods. A background sampler records the
+# process RSS, the checkpointer's threads and size and the in-process cache
+# sizes every MEMORY_SAMPLE_INTERVAL_SECONDS, so steady growth shows up as a
+# trend. With tracemalloc running (MEMORY_TRACEMALLOC=true at startup, or
+# switched on through the admin endpoint) allocations are attributed to the
+# module that made them: the innermost frame in this service's own files or in
+# a third-party package (nodes.py, parsing.py, langgraph, langchain_core, ...),
+# skipping the standard library frames (json, copy) that only do the work.
+# Named snapshots can be diffed against each other or against now, which pins
+# a leak down to a module and line without attaching a debugger.
+MEMORY_TRACEMALLOC = os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+# Frames stored per allocation; attribution needs enough of them to get past
+# the standard library, and each one adds tracemalloc time and memory.
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "8"))
+MEMORY_SAMPLE_INTERVAL_SECONDS = float(os.getenv("MEMORY_SAMPLE_INTERVAL_SECONDS", "60"))
+MEMORY_SAMPLES_KEEP = int(os.getenv("MEMORY_SAMPLES_KEEP", "240"))
+MEMORY_SNAPSHOTS_KEEP = int(os.getenv("MEMORY_SNAPSHOTS_KEEP", "4"))
+
+APP_DIRECTORY = os.path.dirname(os.path.abspath(__file__)) + os.sep
+STDLIB_DIRECTORIES = tuple({sysconfig.get_paths()["stdlib"] + os.sep, sysconfig.get_paths()["platstdlib"] + os.sep})
+PACKAGE_MARKERS = (os.sep + "site-packages" + os.sep, os.sep + "dist-packages" + os.sep)
+# Allocations of tracemalloc itself and of snapshot handling are not the app's.
+IGNORED_FILES = (tracemalloc.__file__, __file__, "<unknown>")
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process; the peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _serialized_bytes(value, depth: int = 0) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)) and depth < 4:
+        return sum(_serialized_bytes(item, depth + 1) for item in value)
+    return 0
+
+
+def memory_saver_stats(saver) -> dict:
+    """Threads, checkpoints and serialized bytes held by a LangGraph MemorySaver."""
+    # Copies, because graph runs in other threads write to these dicts.
+    storage = dict(saver.storage)
+    namespaces = [checkpoints for thread in storage.values() for checkpoints in list(thread.values())]
+    return {
+        "backend": "memory",
+        "threads": len(storage),
+        "checkpoints": sum(len(checkpoints) for checkpoints in namespaces),
+        "pending_writes": sum(len(writes) for writes in list(saver.writes.values())),
+        "blobs": len(saver.blobs),
+        "serialized_bytes": sum(_serialized_bytes(entry) for checkpoints in namespaces
+                                for entry in list(checkpoints.values()))
+                            + sum(_serialized_bytes(blob) for blob in list(saver.blobs.values()))
+                            + sum(_serialized_bytes(write) for writes in list(saver.writes.values())
+                                  for write in list(writes.values())),
+    }
+
+
+_locations = {}
+
+
+def locate(filename: str) -> Optional[tuple]:
+    """(group, path) of a source file: this service's module (nodes.py) or a package's
+    top-level name (langgraph) with the file's path, None for the standard library.
+    """
+    location = _locations.get(filename, False)
+    if location is False:
+        marker = next((marker for marker in PACKAGE_MARKERS if marker in filename), None)
+        if filename.startswith(APP_DIRECTORY):
+            path = filename[len(APP_DIRECTORY):].replace(os.sep, "/")
+            location = (path, path)
+        elif marker:
+            path = filename.split(marker, 1)[1].replace(os.sep, "/")
+            group = path.split("/", 1)[0]
+            location = (group[:-3] if group.endswith(".py") else group, path)
+        elif filename.startswith(STDLIB_DIRECTORIES) or filename.startswith("<frozen"):
+            location = None
+        else:
+            location = (filename, filename)
+        _locations[filename] = location
+    return location
+
+
+def attribute(traceback: tracemalloc.Traceback) -> tuple:
+    """(group, "path:line") of the innermost non-stdlib frame of an allocation."""
+    for frame in reversed(traceback):
+        location = locate(frame.filename)
+        if location is not None:
+            return location[0], f"{location[1]}:{frame.lineno}"
+    frame = traceback[-1]
+    return "stdlib:" + os.path.basename(frame.filename), f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+def summarize(snapshot: tracemalloc.Snapshot) -> dict:
+    """Bytes and blocks per module group and per attributed line."""
+    groups, lines = {}, {}
+    for stat in snapshot.statistics("traceback"):
+        group, line = attribute(stat.traceback)
+        for totals, key in ((groups, group), (lines, line)):
+            entry = totals.setdefault(key, [0, 0])
+            entry[0] += stat.size
+            entry[1] += stat.count
+    return {"groups": groups, "lines": lines}
+
+
+def _top(totals: dict, limit: int) -> list:
+    ordered = sorted(totals.items(), key=lambda item: -item[1][0])[:limit]
+    return [{"name": name, "bytes": size, "blocks": count} for name, (size, count) in ordered]
+
+
+def _top_diff(new: dict, old: dict, limit: int) -> list:
+    changes = []
+    for name in new.keys() | old.keys():
+        size, count = new.get(name, (0, 0))
+        old_size, old_count = old.get(name, (0, 0))
+        if size != old_size or count != old_count:
+            changes.append({"name": name, "bytes": size, "bytes_diff": size - old_size,
+                            "blocks": count, "blocks_diff": count - old_count})
+    changes.sort(key=lambda change: -abs(change["bytes_diff"]))
+    return changes[:limit]
+
+
+class MemorySnapshot:
+    def __init__(self, label: str, snapshot: tracemalloc.Snapshot):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.taken_at = time.time()
+        self.rss_bytes = rss_bytes()
+        self.traced_bytes = sum(trace.size for trace in snapshot.traces)
+        self.summary = summarize(snapshot)
+
+    def info(self) -> dict:
+        return {"id": self.id, "label": self.label, "taken_at": round(self.taken_at, 3),
+                "rss_bytes": self.rss_bytes, "traced_bytes": self.traced_bytes}
+
+
+class NotTracing(RuntimeError):
+    pass
+
+
+class MemoryMonitor:
+    """RSS and cache-size sampler, tracemalloc control and snapshot diffs."""
+
+    def __init__(self):
+        # name -> callable returning that cache's size figures.
+        self.sources: dict[str, Callable[[], dict]] = {}
+        self.samples = deque(maxlen=MEMORY_SAMPLES_KEEP)
+        self.snapshots: OrderedDict[str, MemorySnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name: str, source: Callable[[], dict]):
+        self.sources[name] = source
+
+    def start(self, interval: float = MEMORY_SAMPLE_INTERVAL_SECONDS):
+        if MEMORY_TRACEMALLOC:
+            self.set_tracing(True)
+        if interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="memory-sampler", daemon=True)
+            self._thread.start()
+
+    def _run(self, interval: float):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"[MEMORY] Sample failed: {e}")
+            time.sleep(interval)
+
+    def set_tracing(self, enabled: bool, frames: int = MEMORY_TRACEMALLOC_FRAMES) -> dict:
+        """Starts or stops tracemalloc; stopping discards its traces and the snapshots."""
+        with self._lock:
+            if enabled and not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                print(f"[MEMORY] tracemalloc started with {frames} frames")
+            elif not enabled and tracemalloc.is_tracing():
+                tracemalloc.stop()
+                self.snapshots.clear()
+                print("[MEMORY] tracemalloc stopped")
+        return self.tracing_stats()
+
+    def tracing_stats(self) -> dict:
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        traced, peak = tracemalloc.get_traced_memory()
+        return {"tracing": True, "frames": tracemalloc.get_traceback_limit(), "traced_bytes": traced,
+                "peak_traced_bytes": peak, "overhead_bytes": tracemalloc.get_tracemalloc_memory()}
+
+    def cache_sizes(self) -> dict:
+        sizes = {}
+        for name, source in self.sources.items():
+            try:
+                sizes[name] = source()
+            except Exception as e:
+                sizes[name] = {"error": str(e)}
+        return sizes
+
+    def sample(self) -> dict:
+        sample = {"at": round(time.time(), 3), "rss_bytes": rss_bytes(), **self.cache_sizes()}
+        if tracemalloc.is_tracing():
+            sample["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+        self.samples.append(sample)
+        return sample
+
+    def growth(self) -> dict:
+        """RSS change over the sampled window, as a rate per hour."""
+        if len(self.samples) < 2:
+            return {"samples": len(self.samples)}
+        first, last = self.samples[0], self.samples[-1]
+        hours = (last["at"] - first["at"]) / 3600
+        change = last["rss_bytes"] - first["rss_bytes"]
+        return {"samples": len(self.samples), "window_seconds": round(hours * 3600),
+                "rss_change_bytes": change, "rss_bytes_per_hour": round(change / hours) if hours > 0 else 0,
+                "min_rss_bytes": min(sample["rss_bytes"] for sample in self.samples),
+                "max_rss_bytes": max(sample["rss_bytes"] for sample in self.samples)}
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise NotTracing("tracemalloc is not running; start it with MEMORY_TRACEMALLOC=true "
+                             "or POST /admin/memory/tracemalloc?enabled=true.")
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES])
+
+    def report(self, limit: int = 15) -> dict:
+        """Current RSS, GC state, cache sizes, RSS trend and, when tracing, top allocators."""
+        report = {
+            "rss_bytes": rss_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "gc": {"counts": gc.get_count(), "collections": [stats["collections"] for stats in gc.get_stats()],
+                   "uncollectable": len(gc.garbage)},
+            "tracemalloc": self.tracing_stats(),
+            "caches": self.cache_sizes(),
+            "growth": self.growth(),
+        }
+        if tracemalloc.is_tracing():
+            summary = summarize(self._snapshot())
+            report["top_modules"] = _top(summary["groups"], limit)
+            report["top_lines"] = _top(summary["lines"], limit)
+        return report
+
+    def take_snapshot(self, label: str = "") -> dict:
+        snapshot = MemorySnapshot(label, self._snapshot())
+        with self._lock:
+            self.snapshots[snapshot.id] = snapshot
+            while len(self.snapshots) > MEMORY_SNAPSHOTS_KEEP:
+                self.snapshots.popitem(last=False)
+        print(f"[MEMORY] Snapshot {snapshot.id} ({label or 'unlabelled'}): "
+              f"{snapshot.traced_bytes / 1e6:.1f} MB traced, RSS {snapshot.rss_bytes / 1e6:.1f} MB")
+        return snapshot.info()
+
+    def list_snapshots(self) -> list:
+        return [snapshot.info() for snapshot in self.snapshots.values()]
+
+    def diff(self, base_id: str, against_id: Optional[str] = None, limit: int = 15) -> Optional[dict]:
+        """Allocation changes per module and line from one snapshot to another, or to now."""
+        base = self.snapshots.get(base_id)
+        against = self.snapshots.get(against_id) if against_id else MemorySnapshot("now", self._snapshot())
+        if base is None or against is None:
+            return None
+        return {
+            "base": base.info(),
+            "against": against.info(),
+            "seconds": round(against.taken_at - base.taken_at, 3),
+            "rss_diff_bytes": against.rss_bytes - base.rss_bytes,
+            "traced_diff_bytes": against.traced_bytes - base.traced_bytes,
+            "modules": _top_diff(against.summary["groups"], base.summary["groups"], limit),
+            "lines": _top_diff(against.summary["lines"], base.summary["lines"], limit),
+        }
+
+    def stats(self) -> dict:
+        return {"rss_bytes": rss_bytes(), "peak_rss_bytes": peak_rss_bytes(),
+                "tracemalloc": tracemalloc.is_tracing(), "snapshots": len(self.snapshots), **self.growth()}
+
+
+memory_monitor = MemoryMonitor()
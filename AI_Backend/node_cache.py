@@ -0,0 +1,203 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, wait
+
+from langgraph.config import get_config
+
+from deadlines import DeadlineExceeded
+from llm_router import model_chain
+from profiling import span
+from tracing import set_attribute
+from prompts import PROMPT_VERSION
+
+# Stored outputs are derived from resumes (the extracted profile holds the
+# candidate's name, email and phone) and kept on disk for NODE_CACHE_TTL_SECONDS,
+# so the cache is opt-in.
+NODE_CACHE_ENABLED = os.getenv("NODE_CACHE", "false").lower() == "true"
+NODE_CACHE_PATH = os.getenv("NODE_CACHE_PATH", os.path.join("data", "node_cache.sqlite3"))
+NODE_CACHE_TTL_SECONDS = float(os.getenv("NODE_CACHE_TTL_SECONDS", str(14 * 24 * 3600)))
+
+# State channels each node reads. A node's stored output is reused when these
+# channels are unchanged; text refs are content hashes, so they stand for the
+# texts themselves. Changes propagate through the outputs: a new JD re-runs JD
+# parsing and every node whose inputs then differ, while the resume extraction
+# is reused; new weights re-run only the aggregator (and the feedback if the
+# final evaluation changes).
+NODE_INPUTS = {
+    "jd_parser": ("job_description_ref",),
+    "alignment_check": ("role_name", "job_description_ref", "extracted_scoring_rules"),
+    "extractor": ("resume_ref",),
+    "tech_agent": ("role_name", "candidate_profile", "extracted_scoring_rules", "jd_role_alignment"),
+    "exp_agent": ("role_name", "candidate_profile", "extracted_scoring_rules", "jd_role_alignment"),
+    "culture_agent": ("role_name", "candidate_profile", "extracted_scoring_rules", "jd_role_alignment"),
+    "aggregator": ("role_name", "extracted_scoring_rules", "tech_evaluation", "experience_evaluation",
+                   "culture_evaluation", "weights"),
+    "feedback": ("role_name", "candidate_profile", "final_evaluation", "tech_evaluation"),
+}
+PRUNE_EVERY_PUTS = 500
+
+
+class NodeCache:
+    """Per-node outputs persisted in SQLite, keyed by a fingerprint of the node's inputs.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn = None
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.coalesced = Counter()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS node_outputs ("
+                "fingerprint TEXT PRIMARY KEY, node TEXT NOT NULL, output TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, node_name: str, fingerprint: str):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT output FROM node_outputs WHERE fingerprint = ? AND created_at >= ?",
+                (fingerprint, time.time() - self.ttl_seconds)
+            ).fetchone()
+        if row is None:
+            self.misses[node_name] += 1
+            return None
+        self.hits[node_name] += 1
+        return json.loads(row[0])
+
+    def put(self, node_name: str, fingerprint: str, output: dict):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO node_outputs VALUES (?, ?, ?, ?)",
+                    (fingerprint, node_name, json.dumps(output, default=str), time.time())
+                )
+            self._puts += 1
+            if self._puts % PRUNE_EVERY_PUTS == 0:
+                self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("DELETE FROM node_outputs WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM node_outputs").fetchone()[0]
+        return {
+            "enabled": NODE_CACHE_ENABLED,
+            "entries": entries,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "coalesced": dict(self.coalesced),
+        }
+
+
+node_cache = NodeCache(NODE_CACHE_PATH, NODE_CACHE_TTL_SECONDS)
+# fingerprint -> Future of the output being computed. Bulk re-scoring runs many
+# candidates at once; the JD stages they share are computed once, not per run.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def fingerprint(node_name: str, state: dict) -> str:
+    inputs = {channel: state.get(channel) for channel in NODE_INPUTS[node_name]}
+    payload = json.dumps(
+        {"node": node_name, "prompts": PROMPT_VERSION, "models": model_chain(node_name), "inputs": inputs},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cacheable(output: dict) -> bool:
+    # Nodes report LLM failures as an error entry or an empty result; never persist those.
+    return all(not (isinstance(value, dict) and (not value or value.get("error"))) for value in output.values())
+
+
+def _deadline():
+    try:
+        return get_config().get("configurable", {}).get("deadline")
+    except RuntimeError:
+        return None
+
+
+def _record_reuse(node_name: str):
+    try:
+        reused = get_config().get("configurable", {}).get("reused_stages")
+    except RuntimeError:
+        return
+    if reused is not None:
+        reused.append(node_name)
+
+
+def with_node_cache(node_name: str, node_fn):
+    """Wraps a graph node so it returns its stored output when its inputs are unchanged.
+    """
+    def run(state):
+        if not NODE_CACHE_ENABLED:
+            set_attribute("cache.status", "disabled")
+            return node_fn(state)
+        with span("cache:lookup", "cache", node_name):
+            key = fingerprint(node_name, state)
+            output = node_cache.get(node_name, key)
+        set_attribute("cache.status", "miss" if output is None else "hit")
+        if output is not None:
+            print(f"[NODE_CACHE] Reusing stored {node_name} output")
+            _record_reuse(node_name)
+            return output
+        with _inflight_lock:
+            future = _inflight.get(key)
+            owner = future is None
+            if owner:
+                future = _inflight[key] = Future()
+        if not owner:
+            deadline = _deadline()
+            # The concurrent run has its own deadline; this one waits only until its own.
+            if not wait([future], timeout=max(deadline.remaining(), 0) if deadline else None).done:
+                raise DeadlineExceeded(f"Deadline reached waiting for a concurrent {node_name} run")
+            try:
+                output = future.result()
+            except Exception:
+                return node_fn(state)
+            if output is not None:
+                node_cache.coalesced[node_name] += 1
+                print(f"[NODE_CACHE] Reusing {node_name} output computed by a concurrent run")
+                set_attribute("cache.status", "coalesced")
+                _record_reuse(node_name)
+                return copy.deepcopy(output)
+            return node_fn(state)
+        try:
+            output = node_fn(state)
+            cacheable = _cacheable(output)
+            if cacheable:
+                with span("cache:store", "cache", node_name):
+                    node_cache.put(node_name, key, output)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # Waiters recompute on their own when the output was an error.
+            future.set_result(output if cacheable else None)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+        return copy.deepcopy(output)
+
+    run.__name__ = node_fn.__name__
+    return run
@@ -1,12 +1,16 @@
 import json
-import os
 import re
+import threading
 from datetime import datetime
-from langchain_groq import ChatGroq
-import dotenv
-from langchain_core.output_parsers import JsonOutputParser
 
 from states import AgentState
+from text_store import get_text
+from llm_router import invoke_json
+from schemas import ResumeExtraction
+from speculation import AGENT_PROFILE_FIELDS, speculate
+from market_standards import market_standards
+from sections import compact_resume
+from profiling import span
 from prompts import (
     RESUME_EXTRACTION_PROMPT,
     JD_PARSING_PROMPT,
@@ -18,26 +22,19 @@ from prompts import (
     FEEDBACK_GENERATION_PROMPT,
 )
 
-dotenv.load_dotenv()
-
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
-
 
 def log_stage(stage_name: str, data: dict, is_output: bool = False):
-    separator = "=" * 60
-    direction = "OUTPUT" if is_output else "INPUT"
-    print(f"\n{separator}")
-    if not is_output:
-        print(f"STAGE: {stage_name}")
+    with span(f"log:{stage_name}", "log"):
+        separator = "=" * 60
+        direction = "OUTPUT" if is_output else "INPUT"
         print(f"\n{separator}")
-    print(f"[{stage_name}] {direction}")
-    print(separator)
-    print(json.dumps(data, indent=2, default=str))
-    print(separator)
+        if not is_output:
+            print(f"STAGE: {stage_name}")
+            print(f"\n{separator}")
+        print(f"[{stage_name}] {direction}")
+        print(separator)
+        print(json.dumps(data, indent=2, default=str))
+        print(separator)
 
 def extract_first_name(candidate_name: str) -> str:
     if not candidate_name or not isinstance(candidate_name, str):
@@ -102,45 +99,77 @@ def calculate_total_years(work_experience: list, current_date: datetime) -> floa
     
     return total_years
 
+def apply_calculated_years(profile: dict):
+    work_experience = profile.get("work_experience", [])
+    if work_experience:
+        calculated_years = calculate_total_years(work_experience, datetime.now())
+        profile["total_years_experience"] = round(calculated_years, 2)
+        return calculated_years
+    return None
+
+def start_agents_early(state: AgentState):
+    """Returns a streaming callback that starts each specialist agent as soon as the
+    extraction has produced every profile field the agent reads.
+    """
+    agents = {
+        "tech_agent": tech_agent_node,
+        "exp_agent": experience_agent_node,
+        "culture_agent": culture_agent_node,
+    }
+    started = set()
+    # A hedged extraction streams from several attempts at once.
+    started_lock = threading.Lock()
+
+    def on_fields(fields: dict):
+        with started_lock:
+            ready = [name for name, needed in AGENT_PROFILE_FIELDS.items()
+                     if name not in started and all(field in fields for field in needed)]
+            started.update(ready)
+        if not ready:
+            return
+        # Same validation and post-processing as the final profile, so unchanged
+        # fields give the agents identical inputs.
+        profile = ResumeExtraction.model_validate(
+            {"skills": [], "work_experience": [], "education": [], **fields}).model_dump()
+        apply_calculated_years(profile)
+        for name in ready:
+            speculate(name, agents[name], {**state, "candidate_profile": profile})
+
+    return on_fields
+
 def extract_resume_node(state: AgentState):
     print("STAGE: RESUME EXTRACTION")
+    resume_text = get_text(state.get("resume_ref"))
+    # Hobbies, references and other sections the extraction never uses are not sent.
+    prompt_text, sections = compact_resume(resume_text)
     
     log_stage("RESUME_EXTRACTION", {
-        "resume_text_length": len(state.get("resume_text", "")),
-        "resume_text_preview": state.get("resume_text", "")[:500] + "..." if len(state.get("resume_text", "")) > 500 else state.get("resume_text", "")
+        "resume_text_length": len(resume_text),
+        "prompt_text_length": len(prompt_text),
+        "sections": [f"{s['kind']}:{s['action']}" for s in sections["sections"]],
+        "resume_text_preview": prompt_text[:500] + "..." if len(prompt_text) > 500 else prompt_text
     }, is_output=False)
 
-    chain=RESUME_EXTRACTION_PROMPT | llm | JsonOutputParser()
-
     try:
-        result=chain.invoke({"resume_text": state["resume_text"]})
+        result=invoke_json("extractor", RESUME_EXTRACTION_PROMPT, {"resume_text": prompt_text},
+                           on_fields=start_agents_early(state))
         
         if not result.get("is_valid_resume", True):
             print("[RESUME_EXTRACTION] Warning: Document may not be a valid resume")
             log_stage("RESUME_EXTRACTION_WARNING", {"is_valid_resume": False}, is_output=True)
         
         work_experience = result.get("work_experience", [])
-        if work_experience:
-            calculated_years = calculate_total_years(work_experience, datetime.now())
-            result["total_years_experience"] = round(calculated_years, 2)
+        calculated_years = apply_calculated_years(result)
+        if calculated_years is not None:
             print(f"[RESUME_EXTRACTION] Overriding total_years_experience with calculated value: {calculated_years:.2f}")
         
-        years = result.get("total_years_experience", 0)
-        try:
-            years = float(years) if years is not None else 0
-        except (TypeError, ValueError):
-            years = 0
-        result["total_years_experience"] = years
-        print(f"[RESUME_EXTRACTION] Total years: {years}")
+        print(f"[RESUME_EXTRACTION] Total years: {result['total_years_experience']}")
         
         candidate_name = result.get("candidate_name", "")
         result["first_name"] = extract_first_name(candidate_name)
         
         email = result.get("email")
-        if email and isinstance(email, str):
-            email = email.strip().lower()
-            result["email"] = email
-            
+        if email:
             if "email_valid" not in result:
                 email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
                 result["email_valid"] = bool(re.match(email_pattern, email))
@@ -149,59 +178,33 @@ def extract_resume_node(state: AgentState):
             
         else:
             result["email_valid"] = False
-            result["email"] = None
-        
-        if not result.get("phone_number"):
-            result["phone_number"] = None
-        
-        confidence = result.get("extraction_confidence", {})
-        if isinstance(confidence, dict):
-            for field in ["email", "phone", "experience"]:
-                val = confidence.get(field)
-                if isinstance(val, (int, float)):
-                    normalized = float(val)
-                    if normalized > 1:
-                        normalized = normalized / 100
-                    normalized = min(max(normalized, 0.0), 1.0)
-                    confidence[field] = round(normalized, 2)
-                    if val > 1 or val < 0:
-                        print(f"[RESUME_EXTRACTION] Normalized {field} confidence: {val} -> {confidence[field]}")
-            result["extraction_confidence"] = confidence
-        
-        for exp in result.get("work_experience", []):
-            desc = (exp.get("description") or "").strip()
-            title = (exp.get("job_title") or "").strip()
-            if desc and title and desc.lower().strip('.') == title.lower().strip('.'):
-                print(f"[RESUME_EXTRACTION] Warning: Description identical to title, clearing: '{desc}'")
-                exp["description"] = ""
         
         if not result.get("current_position") and work_experience:
             for exp in work_experience:
-                if (exp.get("end_date") or "").lower() == "present":
+                if exp["end_date"].lower() == "present":
                     result["current_position"] = exp.get("job_title")
                     break
             if not result.get("current_position") and work_experience:
                 result["current_position"] = work_experience[0].get("job_title")
         
         log_stage("RESUME_EXTRACTION", result, is_output=True)
-        return {"candidate_profile": result}
+        return {"candidate_profile": result, "resume_ref": None}
     except Exception as e:
         error_result = {"error": str(e), "candidate_profile": {}}
         log_stage("RESUME_EXTRACTION_ERROR", error_result, is_output=True)
-        return {"candidate_profile": {}}
+        return {"candidate_profile": {}, "resume_ref": None}
 
 def parse_jd_node(state: AgentState):
     print("STAGE: JD PARSING")
+    job_description_text = get_text(state.get("job_description_ref"))
     
     log_stage("JD_PARSING", {
-        "job_description_length": len(state.get("job_description_text", "")),
-        "job_description_preview": state.get("job_description_text", "")[:500] + "..." if len(state.get("job_description_text", "")) > 500 else state.get("job_description_text", "")
+        "job_description_length": len(job_description_text),
+        "job_description_preview": job_description_text[:500] + "..." if len(job_description_text) > 500 else job_description_text
     }, is_output=False)
 
-    chain=JD_PARSING_PROMPT | llm | JsonOutputParser()
-
     try:
-        result=chain.invoke({"job_description_text": state["job_description_text"]})
+        result=invoke_json("jd_parser", JD_PARSING_PROMPT, {"job_description_text": job_description_text})
         target_role=result.get("role_title", "Candidate")
         log_stage("JD_PARSING", result, is_output=True)
         return{
@@ -222,7 +225,7 @@ def jd_role_alignment_node(state: AgentState):
     primary_requirements = jd.get("primary_requirements") or []
     responsibilities = jd.get("responsibilities") or []
     
-    original_jd_text = state.get("job_description_text", "")
+    original_jd_text = get_text(state.get("job_description_ref"))
     jd_word_count = len(original_jd_text.split())
     jd_is_vague_by_length = jd_word_count < 50  # Less than 50 words = vague JD
     jd_is_vague_by_content = len(primary_requirements) < 3 and len(responsibilities) < 3
@@ -244,10 +247,8 @@ def jd_role_alignment_node(state: AgentState):
     }
     log_stage("JD_ROLE_ALIGNMENT", input_data, is_output=False)
     
-    chain = JD_ROLE_ALIGNMENT_PROMPT | llm | JsonOutputParser()
-    
     try:
-        result = chain.invoke({
+        result = invoke_json("alignment_check", JD_ROLE_ALIGNMENT_PROMPT, {
             "role_name": role_name,
             "jd_requirements": json.dumps(primary_requirements),
             "jd_responsibilities": json.dumps(responsibilities)
@@ -268,9 +269,11 @@ def jd_role_alignment_node(state: AgentState):
         if use_market_standards:
             reason = "JD-Role mismatch" if jd_role_mismatch else "Vague/insufficient JD"
             print(f"[JD_ROLE_ALIGNMENT] {reason} detected - will use market standards for {role_name}")
+            # One stored profile for the role family instead of three inferences per candidate.
+            result["market_profile"] = market_standards.profile(role_name)
         
         log_stage("JD_ROLE_ALIGNMENT", result, is_output=True)
-        return {"jd_role_alignment": result}
+        return {"jd_role_alignment": result, "job_description_ref": None}
     except Exception as e:
         error_result = {
             "jd_role_mismatch": False,
@@ -280,6 +283,7 @@ def jd_role_alignment_node(state: AgentState):
             "stated_role_family": role_name,
             "reasoning": f"Error during alignment check: {str(e)}",
             "error": True,
+            "market_profile": market_standards.profile(role_name) if jd_is_vague else None,
             "preserved_jd_requirements": {
                 "required_years": jd.get("required_years"),
                 "education_requirement": jd.get("education_requirement"),
@@ -287,7 +291,7 @@ def jd_role_alignment_node(state: AgentState):
             }
         }
         log_stage("JD_ROLE_ALIGNMENT_ERROR", error_result, is_output=True)
-        return {"jd_role_alignment": error_result}
+        return {"jd_role_alignment": error_result, "job_description_ref": None}
 
 def tech_agent_node(state: AgentState):
     print("STAGE: TECH/COMPETENCY AGENT")
@@ -299,6 +303,7 @@ def tech_agent_node(state: AgentState):
     jd_is_vague = alignment.get("jd_is_vague", False)
     use_market_standards = alignment.get("use_market_standards", False)
     inferred_job_family = alignment.get("inferred_job_family", "Unknown")
+    market_profile = alignment.get("market_profile") if use_market_standards else None
     
     candidate_skills = candidate.get("skills", [])
     candidate_evidence = candidate.get("capability_evidence", [])
@@ -327,14 +332,14 @@ def tech_agent_node(state: AgentState):
         "certifications": candidate_certifications
     }
     
-    chain = COMPETENCY_EVAL_PROMPT | llm | JsonOutputParser()
     try:
-        result = chain.invoke({
+        result = invoke_json("tech_agent", COMPETENCY_EVAL_PROMPT, {
             "role_name": state["role_name"],
             "jd_role_mismatch": jd_role_mismatch,
             "jd_is_vague": jd_is_vague,
             "use_market_standards": use_market_standards,
             "inferred_job_family": inferred_job_family,
+            "market_profile": json.dumps(market_profile),
             "jd_skills": json.dumps(jd_requirements),
             "candidate_skills": json.dumps(candidate_skills),
             "candidate_evidence": json.dumps(combined_evidence)
@@ -350,11 +355,7 @@ def tech_agent_node(state: AgentState):
         total = len(matched) + len(missing)
         if total > 0:
             correct_score = int(round((len(matched) / total) * 100))
-            raw_score = result.get("score", 0)
-            try:
-                llm_score = float(raw_score) if raw_score is not None else 0.0
-            except (TypeError, ValueError):
-                llm_score = 0.0
+            llm_score = result["score"]
             if abs(correct_score - llm_score) > 1:
                 print(f"[TECH_AGENT] Score recalculated: LLM said {llm_score}, "
                       f"actual is ({len(matched)}/{total})*100 = {correct_score}")
@@ -363,13 +364,6 @@ def tech_agent_node(state: AgentState):
                     f"Recalculated from matched/missing arrays: "
                     f"{len(matched)} matched, {len(missing)} missing out of {total}")
         
-        raw_score = result.get("score", 0)
-        try:
-            numeric_score = float(raw_score) if raw_score is not None else 0.0
-        except (TypeError, ValueError):
-            numeric_score = 0.0
-        result["score"] = max(0, min(100, round(numeric_score)))
-        
         log_stage("TECH_AGENT", result, is_output=True)
         return {"tech_evaluation": result}
     except Exception as e:
@@ -396,6 +390,7 @@ def experience_agent_node(state: AgentState):
     jd_is_vague = alignment.get("jd_is_vague", False)
     use_market_standards = alignment.get("use_market_standards", False)
     inferred_job_family = alignment.get("inferred_job_family", "Unknown")
+    market_profile = alignment.get("market_profile") if use_market_standards else None
     preserved_reqs = alignment.get("preserved_jd_requirements", {})
     
     required_years = preserved_reqs.get("required_years") or jd.get("required_years")
@@ -422,15 +417,15 @@ def experience_agent_node(state: AgentState):
         "education_requirement": education_requirement
     }
     
-    chain = EXP_EVAL_PROMPT | llm | JsonOutputParser()
     current_date = current_dt.strftime("%Y-%m-%d")
     try:
-        result = chain.invoke({
+        result = invoke_json("exp_agent", EXP_EVAL_PROMPT, {
             "role_name": state["role_name"],
             "jd_role_mismatch": jd_role_mismatch,
             "jd_is_vague": jd_is_vague,
             "use_market_standards": use_market_standards,
             "inferred_job_family": inferred_job_family,
+            "market_profile": json.dumps(market_profile),
             "current_date": current_date,
             "total_years_calculated": calculated_years,
             "preserved_required_years": required_years,
@@ -443,12 +438,6 @@ def experience_agent_node(state: AgentState):
         result["jd_role_mismatch"] = jd_role_mismatch
         result["jd_is_vague"] = jd_is_vague
         result["use_market_standards"] = use_market_standards
-        raw_score = result.get("score", 0)
-        try:
-            numeric_score = float(raw_score) if raw_score is not None else 0.0
-        except (TypeError, ValueError):
-            numeric_score = 0.0
-        result["score"] = max(0, min(100, round(numeric_score)))
         log_stage("EXPERIENCE_AGENT", result, is_output=True)
         return {"experience_evaluation": result}
     except Exception as e:
@@ -465,6 +454,7 @@ def culture_agent_node(state: AgentState):
     jd_is_vague = alignment.get("jd_is_vague", False)
     use_market_standards = alignment.get("use_market_standards", False)
     inferred_job_family = alignment.get("inferred_job_family", "Unknown")
+    market_profile = alignment.get("market_profile") if use_market_standards else None
     work_experience = candidate.get("work_experience", [])
     candidate_evidence = candidate.get("capability_evidence", [])
     
@@ -487,14 +477,14 @@ def culture_agent_node(state: AgentState):
     }
     log_stage("CULTURE_AGENT", input_data, is_output=False)
     
-    chain = CULTURE_EVAL_PROMPT | llm | JsonOutputParser()
     try:
-        result = chain.invoke({
+        result = invoke_json("culture_agent", CULTURE_EVAL_PROMPT, {
             "role_name": state.get("role_name", ""),
             "jd_role_mismatch": jd_role_mismatch,
             "jd_is_vague": jd_is_vague,
             "use_market_standards": use_market_standards,
             "inferred_job_family": inferred_job_family,
+            "market_profile": json.dumps(market_profile),
             "jd_responsibilities": json.dumps(jd_responsibilities),
             "candidate_summary": json.dumps(work_descriptions),
             "candidate_evidence": json.dumps(candidate_evidence)
@@ -503,12 +493,6 @@ def culture_agent_node(state: AgentState):
         result["jd_role_mismatch"] = jd_role_mismatch
         result["jd_is_vague"] = jd_is_vague
         result["use_market_standards"] = use_market_standards
-        raw_score = result.get("score", 0)
-        try:
-            numeric_score = float(raw_score) if raw_score is not None else 0.0
-        except (TypeError, ValueError):
-            numeric_score = 0.0
-        result["score"] = max(0, min(100, round(numeric_score)))
         log_stage("CULTURE_AGENT", result, is_output=True)
         return {"culture_evaluation": result}
     except Exception as e:
@@ -564,8 +548,11 @@ def aggregator_node(state: AgentState):
         "reasoning": culture_eval_full.get("reasoning", "")
     }
     
+    weights = state.get("weights")
+    
     input_data = {
         "role_name": state["role_name"],
+        "weights": weights,
         "tech_eval_score": tech_eval_summary["score"],
         "experience_eval_score": exp_eval_summary["score"],
         "culture_eval_score": culture_eval_summary["score"],
@@ -583,22 +570,28 @@ def aggregator_node(state: AgentState):
     log_stage("EXPERIENCE_EVAL_FULL", exp_eval_full, is_output=False)
     log_stage("CULTURE_EVAL_FULL", culture_eval_full, is_output=False)
     
-    chain = AGGREGATOR_PROMPT | llm | JsonOutputParser()
     try:
-        result = chain.invoke({
+        result = invoke_json("aggregator", AGGREGATOR_PROMPT, {
             "role_name": state["role_name"],
             "evaluation_criteria": json.dumps(evaluation_criteria),
             "criteria_count": len(evaluation_criteria),
+            "weights": json.dumps(weights),
             "tech_eval": json.dumps(tech_eval_summary),  
             "exp_eval": json.dumps(exp_eval_summary),    
             "culture_eval": json.dumps(culture_eval_summary)  
         })
-        result["final_score"] = max(0, min(100, round(result.get("final_score", 0))))
-        cat = result.get("category_scores", {})
-        for key in ["competency", "experience", "soft_skills"]:
-            if key in cat:
-                cat[key] = max(0, min(100, round(cat[key])))
-        result["category_scores"] = cat
+        if weights:
+            agent_scores = {
+                "competency": tech_eval_summary["score"],
+                "experience": exp_eval_summary["score"],
+                "soft_skills": culture_eval_summary["score"]
+            }
+            weighted_score = round(sum(agent_scores[key] * weights.get(key, 0) for key in agent_scores))
+            if weighted_score != result["final_score"]:
+                print(f"[AGGREGATOR] Score recalculated with requested weights: LLM said "
+                      f"{result['final_score']}, weighted is {weighted_score}")
+                result["final_score"] = weighted_score
+            result["weights_applied"] = weights
         log_stage("AGGREGATOR", result, is_output=True)
         return {"final_evaluation": result}
     except Exception as e:
@@ -623,10 +616,8 @@ def feedback_node(state: AgentState):
     }      
     log_stage("FEEDBACK_GENERATION", input_data, is_output=False)
 
-    chain = FEEDBACK_GENERATION_PROMPT | llm | JsonOutputParser()
-
     try:
-        result=chain.invoke({
+        result=invoke_json("feedback", FEEDBACK_GENERATION_PROMPT, {
             "first_name": first_name,
             "role_name": state.get("role_name", ""),
             "final_score": final_score,
@@ -1,37 +1,127 @@
 import io
+import os
 import re
-from pypdf import PdfReader
-import mammoth
+from typing import BinaryIO, Iterable, Union
+from docx_text import DOCX_FAST_PATH, UnsupportedDocx, extract_docx_text
+from pdf_triage import (PDF_IMAGE_ONLY_ACTION, PDF_TRIAGE_ENABLED, ImageOnlyPdf, record_rejection,
+                        record_uninspected_fallback, triage_pdf)
+# pypdf and mammoth are imported on first use (or by the startup warm-up), not
+# with the app: mammoth is only the fallback for DOCX files the fast path skips.
+
+# Keep line breaks and blank-line block boundaries in parsed resumes; section
+# headers are only recognisable on their own line. Off flattens all whitespace.
+PRESERVE_LAYOUT = os.getenv("PRESERVE_RESUME_LAYOUT", "true").lower() == "true"
+# Pages of layout-preserving text are separated by a form feed on its own line,
+# which splitlines() reads as blank lines; sections.py finds page edges by it.
+PAGE_BREAK = "\f"
+WHITESPACE = re.compile(r"\s+")
+# Extracted text carries typesetting artefacts: ligature glyphs ("ﬁ" in
+# "certiﬁed"), soft hyphens, zero-width spaces, words hyphenated across a line
+# break and bullet glyphs from symbol fonts. Keyword matching needs plain words.
+GLYPHS = str.maketrans({"\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl",
+                        "\ufb05": "st", "\ufb06": "st", "\u00ad": None, "\u200b": None, "\ufeff": None})
+# Only a lowercase letter on both sides: "Front-\nEnd" and "2019-\n2021" keep their
+# hyphen. The pattern starts with the literal hyphen, which re scans for quickly.
+HYPHENATED_BREAK = re.compile(r"-(?<=[a-z]-)[ \t]*\r?\n[ \t]*(?=[a-z])")
+BULLET = re.compile(r"^[ \t]*[•‣◦▪▫●○■□►▸➢➤⁃∙\uf0a7\uf0b7\uf0d8\uf076]+[ \t]*", re.MULTILINE)
+
+def _plain_glyphs(text: str) -> str:
+    text = HYPHENATED_BREAK.sub("", text)
+    if text.isascii():
+        # Ligatures, invisible characters and bullet glyphs are all non-ASCII.
+        return text
+    return BULLET.sub("• ", text.translate(GLYPHS))
 
 def clean_text(text: str) -> str:
     """Removes extra whitespace, tabs, and newlines.
     """
     if not text:
         return ""
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return WHITESPACE.sub(" ", text).strip()
+
+def _layout_blocks(text: str) -> Iterable[str]:
+    """Yields blocks of consecutive non-blank lines, each line with its whitespace collapsed."""
+    block = []
+    for line in text.splitlines():
+        line = WHITESPACE.sub(" ", line).strip()
+        if line:
+            block.append(line)
+        elif block:
+            yield "\n".join(block)
+            block = []
+    if block:
+        yield "\n".join(block)
+
+def normalize_text(text: str, keep_layout: bool = False) -> str:
+    """Plain glyphs, then clean_text, or with keep_layout one line per text line and a blank
+    line between blocks.
+    """
+    if not text:
+        return ""
+    text = _plain_glyphs(text)
+    if keep_layout:
+        return "\n\n".join(_layout_blocks(text))
+    return clean_text(text)
+
+def join_normalized(parts: Iterable[str], keep_layout: bool = False) -> str:
+    """Normalizes each part (a page) on its own and joins the non-empty results in one pass.
+    """
+    normalized = (normalize_text(part, keep_layout) for part in parts)
+    return (f"\n{PAGE_BREAK}\n" if keep_layout else " ").join(part for part in normalized if part)
 
-def parse_pdf(file_bytes: bytes) -> str:
-    """Extracts text from a PDF file using pypdf
+def as_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    """Returns the file as a readable stream; streams (spooled uploads, mmaps) are used as-is.
     """
+    return source if hasattr(source, "read") else io.BytesIO(source)
+
+def parse_pdf(source: Union[bytes, BinaryIO], keep_layout: bool = False) -> str:
+    """Extracts text from a PDF file using pypdf. Raises ImageOnlyPdf for a scanned
+    document, all of whose pages were triaged, when PDF_IMAGE_ONLY_ACTION is reject.
+    """
+    from pypdf import PdfReader
     try:
-        reader = PdfReader(io.BytesIO(file_bytes))
-        text = ""
-        for page in reader.pages:
-            content=page.extract_text()
-            if content:
-                text += content + "\n"
-        return clean_text(text)
+        reader = PdfReader(as_stream(source))
+        triage = triage_pdf(reader) if PDF_TRIAGE_ENABLED else None
+        scanned = triage is not None and triage["kind"] == "image_only" and PDF_IMAGE_ONLY_ACTION == "reject"
+        if scanned:
+            if triage["complete"]:
+                record_rejection()
+                raise ImageOnlyPdf(triage)
+            # The pages after the inspected ones may have text.
+            print(f"[PDF_TRIAGE] First {triage['inspected']} of {triage['pages']} pages scanned; extracting all")
+            record_uninspected_fallback()
+        text = join_normalized((page.extract_text() for page in reader.pages), keep_layout)
+        if scanned and not text.strip():
+            record_rejection()
+            raise ImageOnlyPdf(triage)
+        return text
+    except ImageOnlyPdf:
+        raise
     except Exception as e:
         print(f"Error parsing PDF: {e}") 
         return ""
 
-def parse_docx(file_bytes: bytes) -> str:
-    """Extracts text from a DOCX file using mammoth
+def _docx_lines(raw_text: str) -> str:
+    # Raw DOCX text ends every paragraph with a blank line; make paragraphs lines,
+    # so that only empty paragraphs separate blocks.
+    return raw_text.replace("\n\n", "\n")
+
+def parse_docx(source: Union[bytes, BinaryIO], keep_layout: bool = False) -> str:
+    """Extracts text from a DOCX file, with mammoth for documents the fast path does not cover
     """
+    stream = as_stream(source)
+    if DOCX_FAST_PATH:
+        try:
+            return normalize_text(_docx_lines(extract_docx_text(stream)), keep_layout)
+        except UnsupportedDocx as e:
+            print(f"[PARSING] DOCX needs mammoth ({e})")
+        except Exception as e:
+            print(f"[PARSING] Fast DOCX extraction failed, using mammoth: {e}")
+        stream.seek(0)
     try:
-        result=mammoth.extract_raw_text(io.BytesIO(file_bytes))
-        return clean_text(result.value)
+        import mammoth
+        result=mammoth.extract_raw_text(stream)
+        return normalize_text(_docx_lines(result.value), keep_layout)
     except Exception as e:
         print(f"Error parsing DOCX: {e}") 
         return ""
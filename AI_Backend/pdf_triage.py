@@ -0,0 +1,135 @@
+import itertools
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+# Scanned resumes have no text layer: extracting text walks every page and ends
+# with an empty string. Triage reads only the first pages' raw content streams
+# and resources, without laying out any text. It counts the string bytes shown
+# inside text objects, the fonts and the images painted, and classifies the
+# document as text, image_only, mixed (text pages and scanned pages) or empty
+# (neither). It takes a few milliseconds. Image-only documents are rejected with
+# 422 before extraction, or still extracted with PDF_IMAGE_ONLY_ACTION=parse.
+# Only a document whose pages were all inspected is rejected: a longer one may
+# have its text after the scanned first pages, so it is extracted anyway.
+PDF_TRIAGE_ENABLED = os.getenv("PDF_TRIAGE", "true").lower() == "true"
+PDF_TRIAGE_PAGES = int(os.getenv("PDF_TRIAGE_PAGES", "3"))
+# Below this many shown string bytes a page counts as having no text (stray page numbers, OCR noise).
+PDF_TRIAGE_MIN_TEXT_BYTES = int(os.getenv("PDF_TRIAGE_MIN_TEXT_BYTES", "20"))
+PDF_IMAGE_ONLY_ACTION = os.getenv("PDF_IMAGE_ONLY_ACTION", "reject")  # reject | parse
+MAX_FORM_DEPTH = 3
+
+TEXT_OBJECT = re.compile(rb"\bBT\b(.*?)\bET\b", re.S)
+LITERAL_STRING = re.compile(rb"\((?:\\.|[^\\()])*\)", re.S)
+HEX_STRING = re.compile(rb"<([0-9A-Fa-f\s]*)>")
+WHITESPACE = re.compile(rb"\s+")
+XOBJECT_USE = re.compile(rb"/([^\s/\[\]()<>{}%]+)\s+Do\b")
+INLINE_IMAGE = re.compile(rb"\bBI\b.*?\bID\b.*?\bEI\b", re.S)
+
+triage_counts = Counter()
+_lock = threading.Lock()
+_triage_seconds = 0.0
+
+
+class ImageOnlyPdf(Exception):
+    """The PDF has no text layer on the inspected pages."""
+
+    def __init__(self, triage: dict):
+        super().__init__(f"image-only PDF ({triage['inspected']} of {triage['pages']} pages inspected)")
+        self.triage = triage
+
+
+def _resolve(obj):
+    return obj.get_object() if obj is not None else None
+
+
+def _content_stats(content: bytes, resources, depth: int = 0) -> Counter:
+    stats = Counter()
+    stats["images"] += len(INLINE_IMAGE.findall(content))
+    # Inline image data is binary and could look like operators.
+    content = INLINE_IMAGE.sub(b" ", content)
+    for block in TEXT_OBJECT.findall(content):
+        stats["text_bytes"] += sum(len(s) - 2 for s in LITERAL_STRING.findall(block))
+        stats["text_bytes"] += sum(len(WHITESPACE.sub(b"", h)) // 2 for h in HEX_STRING.findall(block))
+    resources = _resolve(resources) or {}
+    stats["fonts"] += len(_resolve(resources.get("/Font")) or {})
+    xobjects = _resolve(resources.get("/XObject")) or {}
+    for name in XOBJECT_USE.findall(content):
+        xobject = _resolve(xobjects.get("/" + name.decode("latin-1")))
+        if xobject is None:
+            continue
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            stats["images"] += 1
+        elif subtype == "/Form" and depth < MAX_FORM_DEPTH:
+            stats.update(_content_stats(xobject.get_data(), xobject.get("/Resources"), depth + 1))
+    return stats
+
+
+def _page_density(number: int, page) -> dict:
+    contents = page.get_contents()
+    stats = _content_stats(contents.get_data() if contents is not None else b"", page.get("/Resources"))
+    if stats["text_bytes"] >= PDF_TRIAGE_MIN_TEXT_BYTES:
+        kind = "text"
+    elif stats["images"]:
+        kind = "image"
+    else:
+        kind = "blank"
+    return {"page": number, "kind": kind, "text_bytes": stats["text_bytes"], "images": stats["images"],
+            "fonts": stats["fonts"]}
+
+
+def triage_pdf(reader: "PdfReader") -> dict:
+    """Classifies the document from its first PDF_TRIAGE_PAGES pages, with per-page text density.
+    """
+    global _triage_seconds
+    started = time.perf_counter()
+    try:
+        pages = [_page_density(number, page)
+                 for number, page in enumerate(itertools.islice(reader.pages, PDF_TRIAGE_PAGES), start=1)]
+        kinds = {page["kind"] for page in pages}
+        if "text" in kinds:
+            kind = "mixed" if "image" in kinds else "text"
+        else:
+            kind = "image_only" if "image" in kinds else "empty"
+        total_pages = len(reader.pages)
+    except Exception as e:
+        print(f"[PDF_TRIAGE] Could not triage PDF: {e}")
+        pages, kind, total_pages = [], "unknown", 0
+    elapsed = time.perf_counter() - started
+    with _lock:
+        triage_counts[kind] += 1
+        _triage_seconds += elapsed
+    density = ", ".join(f"p{page['page']}={page['text_bytes']}B/{page['images']}img" for page in pages)
+    print(f"[PDF_TRIAGE] {kind} in {elapsed * 1000:.1f}ms ({density})")
+    return {"kind": kind, "pages": total_pages, "inspected": len(pages), "complete": len(pages) >= total_pages,
+            "page_density": pages,
+            "ms": round(elapsed * 1000, 2)}
+
+
+def record_rejection():
+    with _lock:
+        triage_counts["rejected"] += 1
+
+
+def record_uninspected_fallback():
+    with _lock:
+        triage_counts["image_only_parsed"] += 1
+
+
+def triage_stats() -> dict:
+    with _lock:
+        documents = sum(n for kind, n in triage_counts.items() if kind not in ("rejected", "image_only_parsed"))
+        return {
+            "enabled": PDF_TRIAGE_ENABLED,
+            "image_only_action": PDF_IMAGE_ONLY_ACTION,
+            "documents": documents,
+            "counts": dict(triage_counts),
+            "avg_ms": round(_triage_seconds * 1000 / documents, 2) if documents else 0.0,
+        }
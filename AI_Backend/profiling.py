@@ -0,0 +1,393 @@
+import contextlib
+import contextvars
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, defaultdict, namedtuple
+from typing import Optional
+
+from auth import admin_token_valid
+
+# Opt-in profiling of single evaluations: a request sent with "X-Profile: true"
+# (or a capture mode, with the admin token) or picked by PROFILE_SAMPLE_RATE records timing spans for
+# its upload parsing, admission wait, graph run and every node, and inside the
+# nodes for prompt formatting, LLM calls, JSON validation, node cache lookups
+# and stage logging. PROFILE_CAPTURE=cprofile additionally runs cProfile in
+# each node and LLM call thread (several times slower, meant for short
+# investigations); pyinstrument does the same with pyinstrument when installed.
+# The last PROFILE_KEEP profiles are kept for the admin endpoints, and cProfile
+# captures are merged into one aggregate profile.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_CAPTURE = os.getenv("PROFILE_CAPTURE", "spans")  # spans | cprofile | pyinstrument
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+CAPTURE_MODES = ("spans", "cprofile", "pyinstrument")
+AGENT_NODES = ("tech_agent", "exp_agent", "culture_agent")
+PROFILED_PATHS = ("/analyze/", "/evaluations/", "/rescore/")
+
+# start and end are seconds since the request started; stack is the names of
+# the enclosing spans and this one, joined by ";".
+Span = namedtuple("Span", "name category node thread start end stack")
+
+_current = contextvars.ContextVar("request_profile", default=None)
+# Node whose spans are being recorded, for spans that do not name one.
+_node = contextvars.ContextVar("profile_node", default=None)
+_stack = contextvars.ContextVar("profile_stack", default="request")
+# Only one profiler can be active per thread; nested captures are skipped.
+_capturing = threading.local()
+_NO_SPAN = contextlib.nullcontext()
+
+try:
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:
+    _Pyinstrument = None
+
+
+class RequestProfile:
+    """Spans (and optional profiler captures) of one request."""
+
+    def __init__(self, profile_id: str, capture: str):
+        if capture == "pyinstrument" and _Pyinstrument is None:
+            print("[PROFILE] pyinstrument is not installed, capturing with cProfile")
+            capture = "cprofile"
+        self.profile_id = profile_id
+        self.capture = capture
+        self.created_at = time.time()
+        self.total_ms = None
+        self.meta = {}
+        self.spans = []
+        self.stats = None
+        self.reports = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, node: Optional[str] = None, capture: bool = False):
+        stack = f"{_stack.get()};{name}"
+        stack_token = _stack.set(stack)
+        # Spans nested in one that names a node are that node's by default.
+        node_token = _node.set(node) if node is not None else None
+        profiler = self._start_capture() if capture and self.capture != "spans" else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if profiler is not None:
+                self._stop_capture(name, profiler)
+            _stack.reset(stack_token)
+            if node_token is not None:
+                _node.reset(node_token)
+            self._add(Span(name, category, node or _node.get(), threading.current_thread().name,
+                           start - self._started, end - self._started, stack))
+
+    def _add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def _start_capture(self):
+        if getattr(_capturing, "active", False):
+            return None
+        try:
+            if self.capture == "pyinstrument":
+                profiler = _Pyinstrument(async_mode="disabled")
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except ValueError:
+            # From Python 3.12 cProfile is interpreter-wide: concurrent nodes are not captured.
+            self.meta["skipped_captures"] = self.meta.get("skipped_captures", 0) + 1
+            return None
+        _capturing.active = True
+        return profiler
+
+    def _stop_capture(self, name: str, profiler):
+        _capturing.active = False
+        if self.capture == "pyinstrument":
+            profiler.stop()
+            report = profiler.output_text(unicode=True, color=False)
+            with self._lock:
+                self.reports[name] = self.reports.get(name, "") + report
+            return
+        profiler.disable()
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+    def finish(self):
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 2)
+
+    def timeline(self) -> dict:
+        """Spans in start order, per-node breakdown, agent overlap and the graph
+        time not spent inside any node (LangGraph scheduling, checkpoints, state merges).
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        by_category = defaultdict(float)
+        nodes = {}
+        for span in spans:
+            by_category[span.category] += span.end - span.start
+            if span.category == "node":
+                entry = nodes.setdefault(span.node, {"start_ms": _ms(span.start), "runs": 0, "seconds": 0.0,
+                                                     "breakdown": defaultdict(float)})
+                entry["runs"] += 1
+                entry["seconds"] += span.end - span.start
+                entry["end_ms"] = _ms(span.end)
+        for span in spans:
+            if span.category != "node" and span.node in nodes:
+                nodes[span.node]["breakdown"][span.category] += span.end - span.start
+        for entry in nodes.values():
+            seconds = entry.pop("seconds")
+            breakdown = entry.pop("breakdown")
+            entry["duration_ms"] = _ms(seconds)
+            entry["breakdown_ms"] = {category: _ms(value) for category, value in breakdown.items()}
+            # Hedged and speculative calls overlap, so the sum can exceed the node's time.
+            entry["other_ms"] = _ms(max(seconds - sum(breakdown.values()), 0.0))
+        node_intervals = [(span.start, span.end) for span in spans if span.category == "node"]
+        graph_seconds = sum(span.end - span.start for span in spans if span.category == "graph")
+        return {
+            "profile_id": self.profile_id,
+            "capture": self.capture,
+            "created_at": self.created_at,
+            "total_ms": self.total_ms,
+            **self.meta,
+            "by_category_ms": {category: _ms(value) for category, value in by_category.items()},
+            "nodes": nodes,
+            "agents": overlap([(span.start, span.end) for span in spans
+                               if span.category == "node" and span.node in AGENT_NODES]),
+            "graph_overhead_ms": round(max(_ms(graph_seconds) - overlap(node_intervals)["busy_ms"], 0.0), 2)
+                                 if graph_seconds else None,
+            "spans": [{"name": span.name, "category": span.category, "node": span.node, "thread": span.thread,
+                       "start_ms": _ms(span.start), "end_ms": _ms(span.end),
+                       "duration_ms": _ms(span.end - span.start), "stack": span.stack}
+                      for span in spans],
+        }
+
+    def folded(self) -> str:
+        """Collapsed stacks (flamegraph.pl, speedscope) weighted by self time in microseconds.
+        Concurrent children can add up to more than their parent; its self time is then 0.
+        """
+        totals = defaultdict(float)
+        totals["request"] = (self.total_ms or 0) / 1000
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            totals[span.stack] += span.end - span.start
+        lines = []
+        for path, seconds in totals.items():
+            children = sum(value for other, value in totals.items()
+                           if other.startswith(path + ";") and ";" not in other[len(path) + 1:])
+            self_us = int(max(seconds - children, 0.0) * 1e6)
+            if self_us:
+                lines.append(f"{path} {self_us}")
+        return "\n".join(sorted(lines)) + "\n"
+
+    def report(self, limit: int = 40) -> str:
+        """Top functions of the cProfile capture, or the pyinstrument reports."""
+        if self.reports:
+            return "\n".join(f"== {name} ==\n{text}" for name, text in self.reports.items())
+        return stats_text(self.stats, limit)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def overlap(intervals: list) -> dict:
+    """Window, busy time and concurrency of possibly overlapping (start, end) intervals."""
+    if not intervals:
+        return {"count": 0, "window_ms": 0.0, "sum_ms": 0.0, "concurrent_ms": 0.0, "parallelism": 0.0,
+                "busy_ms": 0.0}
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    busy = concurrent = 0.0
+    running, previous = 0, events[0][0]
+    for at, change in events:
+        if running >= 1:
+            busy += at - previous
+        if running >= 2:
+            concurrent += at - previous
+        running += change
+        previous = at
+    window = max(end for _, end in intervals) - min(start for start, _ in intervals)
+    total = sum(end - start for start, end in intervals)
+    return {"count": len(intervals), "window_ms": _ms(window), "sum_ms": _ms(total),
+            "concurrent_ms": _ms(concurrent), "parallelism": round(total / window, 2) if window else 0.0,
+            "busy_ms": _ms(busy)}
+
+
+def stats_text(stats: Optional[pstats.Stats], limit: int = 40, sort: str = "cumulative") -> str:
+    if stats is None:
+        return "No cProfile capture.\n"
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfileStore:
+    """The last profiled requests, and the aggregate of all their captures and spans."""
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._profiles = OrderedDict()
+        self._aggregate = None
+        # (category, name) -> [count, seconds]
+        self._spans = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+            self.counters["profiled"] += 1
+            self.counters[f"capture_{profile.capture}"] += 1
+            for span in profile.spans:
+                entry = self._spans[(span.category, span.name)]
+                entry[0] += 1
+                entry[1] += span.end - span.start
+            if profile.stats is not None:
+                if self._aggregate is None:
+                    self._aggregate = pstats.Stats()
+                self._aggregate.add(profile.stats)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def recent(self) -> list:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [{"profile_id": profile.profile_id, "capture": profile.capture, "created_at": profile.created_at,
+                 "total_ms": profile.total_ms, **profile.meta} for profile in reversed(profiles)]
+
+    def aggregate(self) -> dict:
+        """Span totals per category and name over every profiled request."""
+        with self._lock:
+            spans = dict(self._spans)
+        return {
+            "requests": self.counters["profiled"],
+            "spans": [{"category": category, "name": name, "count": count, "total_ms": _ms(seconds),
+                       "mean_ms": _ms(seconds / count)}
+                      for (category, name), (count, seconds) in sorted(spans.items(), key=lambda item: -item[1][1])],
+        }
+
+    def aggregate_pstats(self) -> Optional[bytes]:
+        """The merged cProfile captures in the pstats file format (pstats, snakeviz)."""
+        with self._lock:
+            return marshal.dumps(self._aggregate.stats) if self._aggregate is not None else None
+
+    def aggregate_text(self, limit: int = 40) -> str:
+        with self._lock:
+            return stats_text(self._aggregate, limit)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sample_rate": PROFILE_SAMPLE_RATE, "capture": PROFILE_CAPTURE, "kept": len(self._profiles),
+                    **self.counters}
+
+
+profile_store = ProfileStore(PROFILE_KEEP)
+
+
+def start_profile(requested: Optional[str], admin: bool = False) -> Optional[RequestProfile]:
+    """A profile for this request when asked for in the X-Profile header ("true" or
+    a capture mode) or picked by the sampling rate; None otherwise. Without a valid
+    admin token the header only gets spans: the other modes are several times slower.
+    """
+    requested = (requested or "").strip().lower()
+    if requested in CAPTURE_MODES and admin:
+        capture = requested
+    elif requested in ("true", "1"):
+        capture = PROFILE_CAPTURE if admin else "spans"
+    elif requested not in ("false", "0") and PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        capture = PROFILE_CAPTURE
+        profile_store.counters["sampled"] += 1
+    else:
+        return None
+    return RequestProfile(str(uuid.uuid4()), capture)
+
+
+class ProfileRequests:
+    """ASGI middleware that profiles the evaluation endpoints when start_profile
+    picks the request. The profile is current for the endpoint and every task and
+    thread it starts; its id is returned in the X-Profile-Id header.
+    """
+
+    def __init__(self, app, paths=PROFILED_PATHS):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.paths):
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        profile = start_profile(headers.get(b"x-profile", b"").decode("latin-1"),
+                                admin_token_valid(headers.get(b"x-admin-token", b"").decode("latin-1")))
+        if profile is None:
+            return await self.app(scope, receive, send)
+        profile.meta["path"] = scope["path"]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.profile_id.encode("latin-1"))]
+                profile.meta["status"] = message["status"]
+            await send(message)
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            profile.finish()
+            profile_store.add(profile)
+            print(f"[PROFILE] {profile.profile_id}: {profile.total_ms:.0f} ms, {len(profile.spans)} spans "
+                  f"({profile.capture})")
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+def span(name: str, category: str, node: Optional[str] = None, capture: bool = False):
+    """Records a span in the current request's profile; a shared no-op when it is not profiled."""
+    profile = _current.get()
+    if profile is None:
+        return _NO_SPAN
+    return profile.span(name, category, node, capture)
+
+
+def record_span(name: str, category: str, started: float):
+    """Records a span that began at perf_counter() value started and ends now."""
+    profile = _current.get()
+    if profile is None:
+        return
+    profile._add(Span(name, category, _node.get(), threading.current_thread().name,
+                      started - profile._started, time.perf_counter() - profile._started,
+                      f"{_stack.get()};{name}"))
+
+
+def with_profiling(node_name: str, node_fn):
+    """Wraps a graph node in a span (with profiler capture) when its request is profiled.
+    """
+    def run(state, config):
+        profile = _current.get()
+        if profile is None:
+            return node_fn(state, config)
+        with profile.span(f"node:{node_name}", "node", node_name, capture=True):
+            return node_fn(state, config)
+
+    # Not functools.wraps: LangGraph inspects the signature to decide whether to pass config.
+    run.__name__ = node_fn.__name__
+    return run
@@ -1,5 +1,14 @@
 from langchain_core.prompts import ChatPromptTemplate
 
+# Every system message below is fully static so providers can cache it as a
+# prompt prefix; per-request values go only in the user message, job-level
+# values first and candidate-level values last. Bump the version whenever a
+# system message changes, since that invalidates cached prefixes.
+# benchmarks/prompt_prefix.py reports prefix and variable token counts.
+# The resume extraction schema lists the fields the specialist agents read
+# first: the answer is streamed and the agents start once those are complete.
+PROMPT_VERSION = "5"
+
 RESUME_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
 ("system", """
 You are a TalentScanAI Resume Parser and Evidence Extractor.
@@ -128,14 +137,6 @@ In "Dr. John Smith", remove "Dr." → "John Smith" → first_name = "John" (the
 
 # OUTPUT SCHEMA (STRICT JSON)
 {{
-  "candidate_name": "string (full name as written)",
-  "first_name": "string (CRITICAL: ONLY the given name, NO titles, NO honorifics, NO suffixes. If you extract 'Dr.', 'Mr.', 'CPA', etc., you FAILED)",
-  "email": "string or null",
-  "email_valid": boolean,
-  "phone_number": "string or null",
-  "current_position": "string or null",
-  "total_years_experience": number,
-  "experience_level": "Entry | Mid | Senior",
   "skills": ["string"],
   "capability_evidence": [
     {{
@@ -162,6 +163,14 @@ In "Dr. John Smith", remove "Dr." → "John Smith" → first_name = "John" (the
     }}
   ],
   "certifications": ["string"],
+  "candidate_name": "string (full name as written)",
+  "first_name": "string (CRITICAL: ONLY the given name, NO titles, NO honorifics, NO suffixes. If you extract 'Dr.', 'Mr.', 'CPA', etc., you FAILED)",
+  "email": "string or null",
+  "email_valid": boolean,
+  "phone_number": "string or null",
+  "current_position": "string or null",
+  "total_years_experience": number,
+  "experience_level": "Entry | Mid | Senior",
   "is_valid_resume": boolean,
   "extraction_confidence": {{
   "email": number (0.0 to 1.0 ONLY — NOT a percentage. Example: 0.95, not 95),
@@ -289,17 +298,17 @@ COMPETENCY_EVAL_PROMPT = ChatPromptTemplate.from_messages([
 You are a TalentScanAI Competency Evaluator.
 
 ### JD-ROLE ALIGNMENT STATUS (PRE-DETERMINED)
-The JD-Role alignment has already been checked. Use the provided values:
-- jd_role_mismatch: {jd_role_mismatch}
-- jd_is_vague: {jd_is_vague}
-- use_market_standards: {use_market_standards}
-- inferred_job_family: {inferred_job_family}
+The JD-Role alignment has already been checked. Use the values given in the input:
+JD-ROLE MISMATCH STATUS (jd_role_mismatch), JD IS VAGUE (jd_is_vague),
+USE MARKET STANDARDS (use_market_standards) and INFERRED JOB FAMILY (inferred_job_family).
 
 ### MARKET STANDARDS MODE
 If use_market_standards is true (due to JD-Role mismatch OR vague JD):
 - IGNORE the JD requirements provided
 - CRITICAL: Use the ROLE NAME (not the JD profession) for inferring standards
-- INFER 7-10 standard market competencies for the ROLE NAME
+- If a MARKET STANDARDS PROFILE is given in the input, use its competencies as the standard
+  market competencies and copy them into inferred_requirements; otherwise
+  INFER 7-10 standard market competencies for the ROLE NAME
 - Set inferred_job_family = role_name (they must match exactly)
 - Evaluate the candidate against these ROLE-based standards
 - Score based on how well the candidate matches the ROLE NAME requirements
@@ -403,11 +412,12 @@ WRONG: "Valid nursing license with current registration in good standing"
 }}
 """),
 ("user", """
+ROLE: {role_name}
 JD-ROLE MISMATCH STATUS: {jd_role_mismatch}
 JD IS VAGUE: {jd_is_vague}
 USE MARKET STANDARDS: {use_market_standards}
 INFERRED JOB FAMILY: {inferred_job_family}
-ROLE: {role_name}
+MARKET STANDARDS PROFILE: {market_profile}
 JD REQUIREMENTS: {jd_skills}
 CANDIDATE SKILLS: {candidate_skills}
 CANDIDATE EVIDENCE: {candidate_evidence}
@@ -419,15 +429,15 @@ EXP_EVAL_PROMPT = ChatPromptTemplate.from_messages([
 You are a TalentScanAI Seniority & Relevance Evaluator.
 
 ### JD-ROLE ALIGNMENT STATUS (PRE-DETERMINED)
-The JD-Role alignment has already been checked. Use the provided values:
-- jd_role_mismatch: {jd_role_mismatch}
-- jd_is_vague: {jd_is_vague}
-- use_market_standards: {use_market_standards}
-- inferred_job_family: {inferred_job_family}
+The JD-Role alignment has already been checked. Use the values given in the input:
+JD-ROLE MISMATCH STATUS (jd_role_mismatch), JD IS VAGUE (jd_is_vague),
+USE MARKET STANDARDS (use_market_standards) and INFERRED JOB FAMILY (inferred_job_family).
 
 ### MARKET STANDARDS MODE
 If use_market_standards is true (due to JD-Role mismatch OR vague JD):
 - CRITICAL: INFER typical experience requirements for the ROLE NAME (not JD profession)
+- If a MARKET STANDARDS PROFILE is given in the input, take the typical years and
+  education level from it instead of inferring them
 - Use PRESERVED requirements if provided (required_years, education_requirement) from the JD
 - If preserved_required_years is provided, use that instead of inferring
 - If preserved_education_requirement is provided, use that instead of inferring
@@ -487,16 +497,17 @@ If relevant_years_validated >= required_years, cap score at 100.
 }}
 """),
 ("user", """
+ROLE: {role_name}
 JD-ROLE MISMATCH STATUS: {jd_role_mismatch}
 JD IS VAGUE: {jd_is_vague}
 USE MARKET STANDARDS: {use_market_standards}
 INFERRED JOB FAMILY: {inferred_job_family}
-CURRENT DATE: {current_date}
-TOTAL YEARS OF EXPERIENCE (USE THIS VALUE): {total_years_calculated}
+MARKET STANDARDS PROFILE: {market_profile}
 PRESERVED REQUIRED YEARS (use if provided): {preserved_required_years}
 PRESERVED EDUCATION REQUIREMENT (use if provided): {preserved_education_requirement}
-ROLE: {role_name}
 JD REQUIREMENTS: {jd_experience_rules}
+CURRENT DATE: {current_date}
+TOTAL YEARS OF EXPERIENCE (USE THIS VALUE): {total_years_calculated}
 CANDIDATE EXPERIENCE: {candidate_experience}
 CANDIDATE EDUCATION: {candidate_education}
 """)
@@ -506,17 +517,17 @@ CULTURE_EVAL_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """You are the TalentScanAI Cultural Fit Evaluator.
     
 ### JD-ROLE ALIGNMENT STATUS (PRE-DETERMINED)
-The JD-Role alignment has already been checked. Use the provided values:
-- jd_role_mismatch: {jd_role_mismatch}
-- jd_is_vague: {jd_is_vague}
-- use_market_standards: {use_market_standards}
-- inferred_job_family: {inferred_job_family}
+The JD-Role alignment has already been checked. Use the values given in the input:
+JD-ROLE MISMATCH STATUS (jd_role_mismatch), JD IS VAGUE (jd_is_vague),
+USE MARKET STANDARDS (use_market_standards) and INFERRED JOB FAMILY (inferred_job_family).
 
 Do NOT re-evaluate the alignment yourself. Use the provided status.
 
 ### MARKET STANDARDS MODE
 If use_market_standards is true (due to JD-Role mismatch OR vague JD):
 - CRITICAL: INFER typical soft skills required for the ROLE NAME (not JD profession)
+- If a MARKET STANDARDS PROFILE is given in the input, use its soft skills as the
+  role's typical soft skills and copy them into inferred_soft_skills
 - Evaluate the candidate against these ROLE NAME requirements
 - Score based on how well the candidate matches the ROLE NAME's typical soft skill requirements
 - Do NOT cap scores artificially - evaluate fairly against role standards
@@ -562,11 +573,12 @@ Your entire response must be a single valid JSON object:
     """),
 
     ("user", """
+    ROLE: {role_name}
     JD-ROLE MISMATCH STATUS: {jd_role_mismatch}
     JD IS VAGUE: {jd_is_vague}
     USE MARKET STANDARDS: {use_market_standards}
     INFERRED JOB FAMILY: {inferred_job_family}
-    ROLE: {role_name}
+    MARKET STANDARDS PROFILE: {market_profile}
     JD RESPONSIBILITIES: {jd_responsibilities}
     CANDIDATE SUMMARY: {candidate_summary}
     CANDIDATE EVIDENCE: {candidate_evidence}
@@ -574,6 +586,40 @@ Your entire response must be a single valid JSON object:
 ])
 
 
+# Builds a reusable requirement profile for a role family at one seniority; the
+# agents receive it in market standards mode instead of each inferring one.
+MARKET_STANDARDS_PROMPT = ChatPromptTemplate.from_messages([
+("system", """
+You are a TalentScanAI Market Standards Analyst.
+Describe what the job market typically requires of a role, independent of any
+single employer's job description.
+
+# RULES
+1. List 7-10 core competencies (tools, technologies, methods, licenses or domain skills)
+   expected of the role at the given seniority. Use simple skill names.
+2. typical_years is the usual minimum years of relevant experience for the seniority.
+3. education_level is the usual minimum degree, or "None" if none is expected.
+4. List certifications or licenses only if they are commonly required, not merely nice to have.
+5. List 4-6 soft skills the role depends on.
+6. Do not tailor the profile to any candidate.
+
+# OUTPUT SCHEMA (STRICT JSON)
+{{
+    "role_family": "string",
+    "seniority": "string",
+    "competencies": ["string"],
+    "typical_years": number,
+    "education_level": "string",
+    "certifications": ["string"],
+    "soft_skills": ["string"]
+}}
+"""),
+("user", """
+ROLE FAMILY: {role_family}
+SENIORITY: {seniority}
+""")
+])
+
 AGGREGATOR_PROMPT = ChatPromptTemplate.from_messages([
 ("system", """
 You are a TalentScanAI Aggregator.
@@ -586,6 +632,7 @@ High responsibility density → increase experience weight
 High collaboration language → increase soft skill weight
 Licensing/certification language → mark as flag for review (do NOT cap score)
 Normalize weights to sum to 1.0 (e.g., 0.5, 0.3, 0.2).
+If CATEGORY WEIGHTS are provided in the input, use them exactly instead of inferring.
 
 # LICENSING/CERTIFICATION FLAG (ZERO SCORE PENALTY)
 If JD contains mandatory license/certification and competency report shows it as missing:
@@ -643,6 +690,7 @@ CORRECT: "Leadership experience", "Advanced Excel", "Project management certific
 ROLE: {role_name}
 EVALUATION CRITERIA ({criteria_count} items):
 {evaluation_criteria}
+CATEGORY WEIGHTS (null = infer from the JD): {weights}
 COMPETENCY REPORT: {tech_eval}
 EXPERIENCE REPORT: {exp_eval}
 BEHAVIORAL REPORT: {culture_eval}
@@ -666,7 +714,7 @@ FEEDBACK_GENERATION_PROMPT = ChatPromptTemplate.from_messages([
     * Reject (0-49): Warm and growth-focused
 
   # FEEDBACK STRUCTURE
-  1. Greeting: "Dear {first_name},"
+  1. Greeting: "Dear <CANDIDATE FIRST NAME>,"
   2. Thank-you note: Acknowledge effort, express appreciation.
   3. Strengths section: 3-5 bullet points, lead with STRONGEST.
   4. Growth suggestions: 2-3 areas framed as opportunities.
@@ -698,8 +746,8 @@ FEEDBACK_GENERATION_PROMPT = ChatPromptTemplate.from_messages([
   }}
   """),
   ("user", """
-  CANDIDATE FIRST NAME: {first_name}
   ROLE APPLIED FOR: {role_name}
+  CANDIDATE FIRST NAME: {first_name}
   FINAL SCORE: {final_score}
   CATEGORY SCORES: {category_scores}
   STRENGTHS: {strengths}
@@ -708,4 +756,17 @@ FEEDBACK_GENERATION_PROMPT = ChatPromptTemplate.from_messages([
   MISSING COMPETENCIES: {missing_competencies}
   EXPERIENCE LEVEL: {experience_level}
   """) 
-])
\ No newline at end of file
+])
+
+# Follow-up turn sent after an answer whose JSON failed schema validation: only
+# the listed fields are asked for again, not the whole evaluation.
+FIELD_REPAIR_PROMPT = ChatPromptTemplate.from_messages([
+("user", """
+Some fields of your JSON answer are invalid:
+{errors}
+
+Reply with a JSON object containing ONLY these corrected fields: {fields}
+Expected schema of each field:
+{field_schemas}
+""")
+])
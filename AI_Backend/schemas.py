@@ -0,0 +1,194 @@
+import re
+from typing import Annotated, Any, Literal, Optional
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, field_validator, model_validator
+
+
+def _to_score(value):
+    """Scores are integers clamped to 0-100; numeric strings such as "85" or "85%" are accepted."""
+    if value is None:
+        raise ValueError("score is missing")
+    if isinstance(value, str):
+        value = value.strip().rstrip("%")
+    return max(0, min(100, round(float(value))))
+
+
+def _to_years(value):
+    """Years as a float; "5+" or "3-5 years" give their first number, anything else None."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    match = re.search(r"\d+(\.\d+)?", str(value))
+    return float(match.group()) if match else None
+
+
+def _to_confidence(value):
+    """Confidences are 0-1; values given as percentages are scaled down."""
+    if not isinstance(value, (int, float)):
+        return None
+    normalized = float(value) / 100 if value > 1 else float(value)
+    normalized = round(min(max(normalized, 0.0), 1.0), 2)
+    if value > 1 or value < 0:
+        print(f"[SCHEMAS] Normalized confidence: {value} -> {normalized}")
+    return normalized
+
+
+def _to_text(value):
+    return "" if value is None else str(value)
+
+
+Score = Annotated[int, BeforeValidator(_to_score)]
+Years = Annotated[Optional[float], BeforeValidator(_to_years)]
+Confidence = Annotated[Optional[float], BeforeValidator(_to_confidence)]
+Text = Annotated[str, BeforeValidator(_to_text)]
+
+
+class StageOutput(BaseModel):
+    # Keys a prompt asks for but no schema declares are passed through untouched.
+    model_config = ConfigDict(extra="allow")
+
+
+class WorkExperience(StageOutput):
+    company: Text = ""
+    job_title: Text = ""
+    start_date: Text = ""
+    end_date: Text = ""
+    description: Text = ""
+
+    @model_validator(mode="after")
+    def clear_title_echo(self):
+        desc = self.description.strip()
+        title = self.job_title.strip()
+        if desc and title and desc.lower().strip('.') == title.lower().strip('.'):
+            print(f"[SCHEMAS] Description identical to title, clearing: '{desc}'")
+            self.description = ""
+        return self
+
+
+class ExtractionConfidence(StageOutput):
+    email: Confidence = None
+    phone: Confidence = None
+    experience: Confidence = None
+
+
+class ResumeExtraction(StageOutput):
+    candidate_name: Optional[str] = None
+    email: Optional[str] = None
+    phone_number: Optional[str] = None
+    current_position: Optional[str] = None
+    total_years_experience: Years = 0.0
+    experience_level: Optional[str] = None
+    skills: list[str]
+    capability_evidence: list[Any] = Field(default_factory=list)
+    work_experience: list[WorkExperience]
+    education: list[Any]
+    certifications: list[Any] = Field(default_factory=list)
+    is_valid_resume: bool = True
+    extraction_confidence: ExtractionConfidence = Field(default_factory=ExtractionConfidence)
+
+    @field_validator("email", mode="before")
+    @classmethod
+    def normalize_email(cls, value):
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return value.strip().lower()
+
+    @field_validator("phone_number", mode="before")
+    @classmethod
+    def empty_phone_is_none(cls, value):
+        return value or None
+
+    @field_validator("total_years_experience", mode="after")
+    @classmethod
+    def years_default(cls, value):
+        return value or 0.0
+
+    @field_validator("extraction_confidence", mode="before")
+    @classmethod
+    def confidence_object(cls, value):
+        return value if isinstance(value, dict) else {}
+
+
+class JDParsing(StageOutput):
+    role_title: Optional[str] = None
+    required_years: Years = None
+    primary_requirements: list[Any]
+    education_requirement: Optional[Any] = None
+    required_certifications: list[Any] = Field(default_factory=list)
+    responsibilities: list[Any]
+
+
+class RoleAlignment(StageOutput):
+    jd_role_mismatch: bool
+    inferred_job_family: str
+    stated_role_family: Text = ""
+    reasoning: Text = ""
+
+
+class CompetencyEvaluation(StageOutput):
+    score: Score
+    reasoning: Text = ""
+    matched_competencies: list[Any]
+    missing_competencies: list[Any]
+
+
+class ExperienceEvaluation(StageOutput):
+    score: Score
+    reasoning: Text
+    relevant_years_validated: Years = None
+    red_flags: list[Any] = Field(default_factory=list)
+
+
+class CultureEvaluation(StageOutput):
+    score: Score
+    reasoning: Text
+    soft_skills_detected: list[Any] = Field(default_factory=list)
+    missing_role_skills: list[Any] = Field(default_factory=list)
+
+
+class MarketStandardsProfile(StageOutput):
+    role_family: Text = ""
+    seniority: Text = ""
+    competencies: list[str] = Field(min_length=1)
+    typical_years: Years = None
+    education_level: Text = ""
+    certifications: list[str] = Field(default_factory=list)
+    soft_skills: list[str] = Field(default_factory=list)
+
+
+class FinalEvaluation(StageOutput):
+    final_score: Score
+    final_reasoning: Text = ""
+    category_scores: dict[str, Score]
+    strengths: list[Any] = Field(default_factory=list)
+    weaknesses: list[Any] = Field(default_factory=list)
+
+
+class FeedbackEmail(StageOutput):
+    subject: str
+    body: str
+
+
+class CandidateFeedback(StageOutput):
+    recommendation: Literal["Shortlist", "Maybe", "Reject"]
+    feedback_email: FeedbackEmail
+    strengths: list[Any] = Field(default_factory=list)
+    improvement_areas: list[Any] = Field(default_factory=list)
+
+    @field_validator("recommendation", mode="before")
+    @classmethod
+    def recommendation_case(cls, value):
+        return value.strip().capitalize() if isinstance(value, str) else value
+
+
+# Output schema of every LLM stage, keyed by the node name used in llm_router.
+STAGE_SCHEMAS = {
+    "extractor": ResumeExtraction,
+    "jd_parser": JDParsing,
+    "alignment_check": RoleAlignment,
+    "tech_agent": CompetencyEvaluation,
+    "exp_agent": ExperienceEvaluation,
+    "culture_agent": CultureEvaluation,
+    "market_standards": MarketStandardsProfile,
+    "aggregator": FinalEvaluation,
+    "feedback": CandidateFeedback,
+}
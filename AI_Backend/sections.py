@@ -0,0 +1,226 @@
+import os
+import re
+import threading
+from collections import Counter
+from parsing import PAGE_BREAK
+
+# Splits a layout-preserving resume (see PRESERVE_RESUME_LAYOUT in parsing.py)
+# into sections by their headers before the extraction prompt. The extraction
+# never uses sections such as hobbies, references or personal details (date of
+# birth, marital status), so they are dropped. Long secondary sections are cut
+# to their first lines. Running page headers and footers (the same line at the
+# top or bottom of at least RESUME_REPEATED_LINE_MIN_PAGES pages) are kept once;
+# a line repeated in the body, such as a second "Software Engineer" title, is
+# kept. Blank lines between entries survive. Text without recognisable headers
+# (flattened text, unusual layouts) is passed through unchanged.
+RESUME_SECTIONS_ENABLED = os.getenv("RESUME_SECTIONS", "true").lower() == "true"
+SECONDARY_SECTION_LINES = int(os.getenv("RESUME_SECONDARY_SECTION_LINES", "4"))
+REPEATED_LINE_MIN_PAGES = int(os.getenv("RESUME_REPEATED_LINE_MIN_PAGES", "2"))
+
+SECTION_HEADERS = {
+    "summary": ("summary", "professional summary", "career summary", "profile", "professional profile",
+                "about me", "about", "objective", "career objective", "personal statement", "overview"),
+    "experience": ("experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history", "professional background",
+                   "experience and employment", "internships", "internship experience"),
+    "education": ("education", "academic background", "academic qualifications", "qualifications",
+                  "education and training", "educational background", "academics"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "skills and competencies", "technologies", "tools", "tools and technologies", "tech stack",
+               "technical expertise", "areas of expertise", "expertise", "skill set", "skillset"),
+    "certifications": ("certifications", "certification", "certificates", "licenses", "licences",
+                       "licenses and certifications", "licences and certifications", "certifications and licenses",
+                       "accreditations", "courses and certifications", "training and certifications"),
+    "projects": ("projects", "personal projects", "key projects", "selected projects", "academic projects",
+                 "side projects", "portfolio"),
+    "awards": ("awards", "achievements", "honors", "honours", "awards and achievements", "honors and awards",
+               "accomplishments"),
+    "publications": ("publications", "selected publications", "conference talks", "patents"),
+    "volunteering": ("volunteering", "volunteer experience", "volunteer work", "community involvement",
+                     "extracurricular activities", "leadership and activities"),
+    "languages": ("languages", "language skills", "spoken languages"),
+    "interests": ("interests", "hobbies", "hobbies and interests", "interests and hobbies", "personal interests",
+                  "leisure activities"),
+    "references": ("references", "referees", "references available upon request",
+                   "references available on request"),
+    "personal": ("personal details", "personal information", "personal data", "personal particulars",
+                 "declaration"),
+}
+# Sections the extraction never uses.
+DROPPED_SECTIONS = {"interests", "references", "personal"}
+# Sections kept only in their first SECONDARY_SECTION_LINES lines.
+SECONDARY_SECTIONS = {"awards", "publications", "volunteering", "languages"}
+
+section_counts = Counter()
+_lock = threading.Lock()
+
+_HEADER_KINDS = {alias: kind for kind, aliases in SECTION_HEADERS.items() for alias in aliases}
+_HEADER = re.compile(
+    r"^[\W_]*(" + "|".join(sorted((re.escape(a) for a in _HEADER_KINDS), key=len, reverse=True)) + r")\b"
+    r"\s*(?:[:|\-–—]\s*(.*))?$",
+    re.IGNORECASE
+)
+_CONTINUED = re.compile(r"\s*\(?\b(continued|cont'd|cont\.?)\)?\s*:?$", re.IGNORECASE)
+# Contact lines survive in personal details sections (email, phone, date of birth).
+_CONTACT_LINE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d\s().-]{7,}\d")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+# Header lines are short; longer lines starting with "Experience" are sentences.
+MAX_HEADER_WORDS = 6
+# Running headers and footers are shorter than this and within this many lines
+# of the top or bottom of a page (a name line over a contact line).
+MAX_REPEATED_LINE_CHARS = 120
+PAGE_EDGE_LINES = 2
+
+
+def _normalize_header(line: str) -> str:
+    line = _CONTINUED.sub("", line.replace("&", "and").replace("/", " and "))
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def match_header(line: str):
+    """Returns (kind, inline content) when the line is a section header, else None.
+    "SKILLS", "Work Experience:" and "Skills: Python, AWS" are headers; sentences are not.
+    """
+    normalized = _normalize_header(line)
+    match = _HEADER.match(normalized)
+    if not match:
+        return None
+    inline = (match.group(2) or "").strip()
+    if not inline and len(normalized.split()) > MAX_HEADER_WORDS:
+        return None
+    if not inline and normalized.rstrip(":").strip(" \t-–—|*•").lower() != match.group(1).lower():
+        return None
+    return _HEADER_KINDS[match.group(1).lower()], inline
+
+
+def split_sections(text: str) -> list:
+    """Splits the text into [{"kind", "header", "lines"}] in document order. Lines
+    before the first header are the "contact" section. A blank line between two
+    blocks of a section is kept as one "" line.
+
+    A labelled line ("Skills: Python, AWS") opens a section only for the main
+    kinds. "Languages: Python, Go" inside a skills list stays a line of that
+    list, and a one-line "Hobbies: chess" becomes its own dropped section.
+    """
+    sections = [{"kind": "contact", "header": "", "lines": []}]
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            if sections[-1]["lines"] and sections[-1]["lines"][-1]:
+                sections[-1]["lines"].append("")
+            continue
+        header = match_header(line)
+        if header and header[1] and header[0] in SECONDARY_SECTIONS:
+            header = None
+        if header:
+            kind, inline = header
+            sections.append({"kind": kind, "header": line[:len(line) - len(inline)].strip() if inline else line,
+                             "lines": [inline] if inline else []})
+            if inline and kind in DROPPED_SECTIONS:
+                # The next lines belong to the section the label interrupted.
+                sections.append({**sections[-2], "header": "", "lines": []})
+        else:
+            sections[-1]["lines"].append(line)
+    for section in sections:
+        section["lines"] = _trim_blanks(section["lines"])
+    return [s for s in sections if s["lines"] or s["kind"] != "contact"]
+
+
+def _trim_blanks(lines: list) -> list:
+    """Drops leading, trailing and consecutive blank lines."""
+    trimmed = []
+    for line in lines:
+        if line or (trimmed and trimmed[-1]):
+            trimmed.append(line)
+    return trimmed[:-1] if trimmed and not trimmed[-1] else trimmed
+
+
+def _page_edges(lines: list) -> set:
+    """Indexes of the first and last PAGE_EDGE_LINES text lines of a page, page numbers aside."""
+    text = [i for i, line in enumerate(lines) if line.strip() and not _PAGE_NUMBER.match(line.strip())]
+    return set(text[:PAGE_EDGE_LINES] + text[-PAGE_EDGE_LINES:])
+
+
+def drop_running_lines(text: str) -> str:
+    """Keeps the first occurrence of each running page header or footer: a short
+    non-header line at a page edge on at least REPEATED_LINE_MIN_PAGES pages.
+    Pages are separated by PAGE_BREAK; the same line inside a page is kept.
+    """
+    pages = [page.splitlines() for page in text.split(PAGE_BREAK)]
+    if len(pages) < 2:
+        return text
+    edges = [_page_edges(lines) for lines in pages]
+    counts = Counter()
+    for lines, page_edges in zip(pages, edges):
+        counts.update({lines[i].strip() for i in page_edges})
+    running = {line for line, count in counts.items() if count >= REPEATED_LINE_MIN_PAGES
+               and len(line) <= MAX_REPEATED_LINE_CHARS and not match_header(line)}
+    if not running:
+        return text
+    kept, emitted = [], set()
+    for lines, page_edges in zip(pages, edges):
+        for i, line in enumerate(lines):
+            if i in page_edges and line.strip() in running:
+                if line.strip() in emitted:
+                    continue
+                emitted.add(line.strip())
+            kept.append(line)
+        kept.append("")
+    return "\n".join(kept)
+
+
+def compact_resume(text: str) -> tuple:
+    """Returns (text for the extraction prompt, report). Sections the extraction does
+    not use are dropped, secondary ones shortened and running page lines kept once.
+    """
+    report = {"chars_before": len(text), "chars_after": len(text), "sections": [], "applied": False}
+    if not text:
+        return text, report
+    if not RESUME_SECTIONS_ENABLED:
+        return text.replace(PAGE_BREAK, ""), report
+    sections = split_sections(drop_running_lines(text))
+    if not any(s["kind"] != "contact" for s in sections):
+        return text.replace(PAGE_BREAK, ""), report
+
+    blocks = []
+    previous_kind = None
+    for section in sections:
+        lines = _trim_blanks([line for line in section["lines"] if not _PAGE_NUMBER.match(line)])
+        content = [i for i, line in enumerate(lines) if line]
+        kind = section["kind"]
+        if kind in DROPPED_SECTIONS:
+            action = "dropped"
+            lines = [line for line in lines if kind == "personal" and _CONTACT_LINE.search(line)]
+        elif kind in SECONDARY_SECTIONS and len(content) > SECONDARY_SECTION_LINES:
+            action = "shortened"
+            lines = lines[:content[SECONDARY_SECTION_LINES - 1] + 1] + [
+                f"(+{len(content) - SECONDARY_SECTION_LINES} more lines)"]
+        else:
+            action = "kept"
+        report["sections"].append({"kind": kind, "header": section["header"],
+                                   "lines": sum(1 for line in section["lines"] if line), "action": action})
+        if not lines and (action == "dropped" or not section["header"]):
+            continue
+        # A section continued on the next page ("Experience (continued)") is not headed twice.
+        header = [section["header"]] if section["header"] and kind != previous_kind and action != "dropped" else []
+        blocks.append("\n".join(header + lines))
+        previous_kind = kind
+
+    compact = "\n\n".join(blocks)
+    report.update(chars_after=len(compact), applied=True)
+    changed = ", ".join(f"{s['kind']} {s['action']}" for s in report["sections"] if s["action"] != "kept")
+    print(f"[SECTIONS] {len(text)} -> {len(compact)} chars ({changed or 'nothing dropped'})")
+    with _lock:
+        section_counts["resumes"] += 1
+        section_counts["chars_before"] += len(text)
+        section_counts["chars_after"] += len(compact)
+        section_counts.update(f"{s['action']}_sections" for s in report["sections"] if s["action"] != "kept")
+    return compact, report
+
+
+def section_stats() -> dict:
+    with _lock:
+        counts = dict(section_counts)
+    before = counts.get("chars_before", 0)
+    saved = 1 - counts.get("chars_after", 0) / before if before else 0.0
+    return {"enabled": RESUME_SECTIONS_ENABLED, **counts, "chars_saved": round(saved, 3)}
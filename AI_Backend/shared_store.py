@@ -0,0 +1,325 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from limits.storage import Storage
+
+# State that must agree across worker processes. With WEB_CONCURRENCY > 1
+# (uvicorn's --workers default) every worker is a separate process: idempotent
+# results, rate-limit counters and skill-index updates go through this store
+# instead of process memory. Its interface is a small Redis-like subset: keys
+# with an expiry, atomic counters, and append-only logs read from a sequence
+# number. Backends:
+#   memory://               this process only; the default with one worker, and the stand-in in benchmarks
+#   sqlite:///path          a WAL SQLite file shared by the workers of one host; the default with several
+#   redis://host:port/db    a Redis-compatible server shared by several hosts (needs the redis package)
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+SHARED_STORE_URL = os.getenv("SHARED_STORE_URL") or (
+    "memory://" if WORKERS == 1 else "sqlite:///" + os.path.join("data", "shared_store.sqlite3"))
+# Expired keys are deleted from SQLite every this many writes.
+PURGE_EVERY_WRITES = 1000
+
+
+class SharedStore:
+    """Keys with expiry, counters and append-only logs."""
+    scheme = ""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        """Stores the value; with nx only when the key is absent. False when nx found the key."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Adds to a counter; a counter created by this call expires after ttl seconds."""
+        raise NotImplementedError
+
+    def expires_at(self, key: str) -> Optional[float]:
+        raise NotImplementedError
+
+    def append(self, log: str, value: str) -> int:
+        """Appends to a log; returns the entry's sequence number, increasing per log."""
+        raise NotImplementedError
+
+    def read(self, log: str, after: int = 0, limit: int = 1000) -> list:
+        """(sequence, value) of the log entries after the given sequence number, oldest first."""
+        raise NotImplementedError
+
+    def trim(self, log: str, upto: int):
+        """Drops the log entries up to and including the given sequence number."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.scheme}
+
+
+class MemoryStore(SharedStore):
+    scheme = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # key -> (value, expires_at or None)
+        self._logs = {}  # log -> [(sequence, value)]
+        self._sequence = 0
+
+    def _live(self, key: str):
+        entry = self._values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return False
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                entry = (0, time.time() + ttl if ttl else None)
+            value = int(entry[0]) + amount
+            self._values[key] = (value, entry[1])
+            return value
+
+    def expires_at(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[1] if entry else None
+
+    def append(self, log: str, value: str) -> int:
+        with self._lock:
+            self._sequence += 1
+            self._logs.setdefault(log, []).append((self._sequence, value))
+            return self._sequence
+
+    def read(self, log: str, after: int = 0, limit: int = 1000) -> list:
+        with self._lock:
+            return [entry for entry in self._logs.get(log, []) if entry[0] > after][:limit]
+
+    def trim(self, log: str, upto: int):
+        with self._lock:
+            self._logs[log] = [entry for entry in self._logs.get(log, []) if entry[0] > upto]
+
+    def stats(self) -> dict:
+        return {"backend": self.scheme, "keys": len(self._values),
+                "log_entries": sum(len(entries) for entries in self._logs.values())}
+
+
+class SqliteStore(SharedStore):
+    scheme = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Autocommit: every statement is its own transaction, and the ones that
+            # read and write (counters, set-if-absent) are single statements.
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS kv ("
+                               "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS logs ("
+                               "seq INTEGER PRIMARY KEY AUTOINCREMENT, log TEXT NOT NULL, value TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS logs_by_log ON logs (log, seq)")
+        return self._conn
+
+    def _wrote(self, conn: sqlite3.Connection):
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            conn = self._connection()
+            if nx:
+                # Takes over the key only when it has expired.
+                stored = conn.execute(
+                    "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE "
+                    "SET value = excluded.value, expires_at = excluded.expires_at WHERE kv.expires_at <= ?",
+                    (key, value, expires_at, now)
+                ).rowcount > 0
+            else:
+                stored = conn.execute("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                                      (key, value, expires_at)).rowcount > 0
+            self._wrote(conn)
+        return stored
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            value = conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "value = CASE WHEN kv.expires_at <= ? THEN excluded.value ELSE CAST(kv.value AS INTEGER) + ? END, "
+                "expires_at = CASE WHEN kv.expires_at <= ? THEN excluded.expires_at ELSE kv.expires_at END "
+                "RETURNING value",
+                (key, amount, now + ttl if ttl else None, now, amount, now)
+            ).fetchone()[0]
+            self._wrote(conn)
+        return int(value)
+
+    def expires_at(self, key: str) -> Optional[float]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT expires_at FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def append(self, log: str, value: str) -> int:
+        with self._lock:
+            return self._connection().execute("INSERT INTO logs (log, value) VALUES (?, ?)", (log, value)).lastrowid
+
+    def read(self, log: str, after: int = 0, limit: int = 1000) -> list:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT seq, value FROM logs WHERE log = ? AND seq > ? ORDER BY seq LIMIT ?", (log, after, limit)
+            ).fetchall()
+
+    def trim(self, log: str, upto: int):
+        with self._lock:
+            self._connection().execute("DELETE FROM logs WHERE log = ? AND seq <= ?", (log, upto))
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connection()
+            keys = conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+            entries = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        return {"backend": self.scheme, "path": self.path, "keys": keys, "log_entries": entries}
+
+
+class RedisStore(SharedStore):
+    scheme = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STORE_URL is a redis:// URL but the redis package is not installed.")
+        self.url = url
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._redis.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        return bool(self._redis.set(key, value, px=int(ttl * 1000) if ttl else None, nx=nx))
+
+    def delete(self, key: str):
+        self._redis.delete(key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        value = self._redis.incrby(key, amount)
+        if ttl and value == amount:
+            self._redis.pexpire(key, int(ttl * 1000))
+        return value
+
+    def expires_at(self, key: str) -> Optional[float]:
+        remaining = self._redis.pttl(key)
+        return time.time() + remaining / 1000 if remaining and remaining > 0 else None
+
+    def append(self, log: str, value: str) -> int:
+        # A sorted set scored by a per-log counter; the member carries the number to stay unique.
+        sequence = self._redis.incr(f"{log}:seq")
+        self._redis.zadd(log, {f"{sequence}:{value}": sequence})
+        return sequence
+
+    def read(self, log: str, after: int = 0, limit: int = 1000) -> list:
+        members = self._redis.zrangebyscore(log, f"({after}", "+inf", start=0, num=limit)
+        return [(int(member.split(":", 1)[0]), member.split(":", 1)[1]) for member in members]
+
+    def trim(self, log: str, upto: int):
+        self._redis.zremrangebyscore(log, "-inf", upto)
+
+    def stats(self) -> dict:
+        return {"backend": self.scheme, "keys": self._redis.dbsize()}
+
+
+def open_store(url: str) -> SharedStore:
+    if url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SqliteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported SHARED_STORE_URL '{url}'; use memory://, sqlite:///path or redis://host:port/db")
+
+
+shared_store = open_store(SHARED_STORE_URL)
+# True when the store is seen by other processes; in-process state is used otherwise.
+SHARED = shared_store.scheme != "memory"
+if WORKERS > 1 and not SHARED:
+    print(f"[SHARED_STORE] {WORKERS} workers with a memory:// store: idempotent results, rate limits "
+          f"and skill-index updates are per worker")
+
+
+class SharedLimitStorage(Storage):
+    """Rate-limit counters (slowapi / limits fixed windows) kept in the shared store."""
+    STORAGE_SCHEME = ["shared"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return Exception
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return shared_store.incr(f"ratelimit:{key}", amount, ttl=expiry)
+
+    def get(self, key: str) -> int:
+        return int(shared_store.get(f"ratelimit:{key}") or 0)
+
+    def get_expiry(self, key: str) -> float:
+        return shared_store.expires_at(f"ratelimit:{key}") or time.time()
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self) -> Optional[int]:
+        return None
+
+    def clear(self, key: str) -> None:
+        shared_store.delete(f"ratelimit:{key}")
+
+
+# storage_uri for the rate limiter: the shared store across workers, limits' own memory storage otherwise.
+RATE_LIMIT_STORAGE_URI = "shared://" if SHARED else "memory://"
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+# How a caller of SingleFlight.do got its result.
+EXECUTED, COALESCED, REPLAYED = "executed", "coalesced", "replayed"
+
+
+def content_key(*parts: str) -> str:
+    """Stable hash of the evaluation inputs; identical requests map to the same key.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto one execution.
+
+    The work runs as its own task, so a caller that goes away does not cancel it
+    for the others; it is only cancelled once every waiter has left. Results of
+    calls made with an idempotency key are kept for `result_ttl` seconds so a
+    retry that arrives after completion gets the same answer without re-running;
+    a result `replayable` rejects (a partial one) frees the key instead.
+    The idempotency key is reserved for the inputs as soon as their run starts,
+    so a request reusing it with other inputs is refused at once rather than
+    after a second full run. With a shared store the reservations and results
+    are kept there as JSON, so the retry may reach another worker process;
+    coalescing stays within one process.
+    """
+
+    def __init__(self, result_ttl: float = 600.0, store=None,
+                 replayable: Optional[Callable[[Any], bool]] = None):
+        self.result_ttl = result_ttl
+        self.store = store
+        self.replayable = replayable
+        self._inflight: dict = {}
+        self._waiters: dict = {}
+        self._completed: dict = {}
+        # idempotency key -> content key of its run in progress
+        self._reserved: dict = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.replayed = 0
+
+    def _lookup_completed(self, idempotency_key: str, key: str):
+        if self.store is not None:
+            stored = self.store.get(f"idempotency:{idempotency_key}")
+            if stored is None:
+                return None
+            entry = json.loads(stored)
+            if entry["key"] != key:
+                raise IdempotencyConflict("Idempotency-Key was already used with different inputs.")
+            # Without a result the key is only reserved by a run in progress.
+            return entry.get("result")
+        entry = self._completed.get(idempotency_key)
+        if entry is None:
+            return None
+        expires_at, stored_key, result = entry
+        if expires_at < time.monotonic():
+            del self._completed[idempotency_key]
+            return None
+        if stored_key != key:
+            raise IdempotencyConflict("Idempotency-Key was already used with different inputs.")
+        return result
+
+    def _reserve(self, idempotency_key: str, key: str):
+        """Claims the idempotency key for these inputs; raises IdempotencyConflict
+        when a run with other inputs holds it."""
+        if self.store is not None:
+            name = f"idempotency:{idempotency_key}"
+            if self.store.set(name, json.dumps({"key": key}), ttl=self.result_ttl, nx=True):
+                return
+            stored = self.store.get(name)
+            if stored is not None and json.loads(stored)["key"] != key:
+                raise IdempotencyConflict("Idempotency-Key is in use by a request with different inputs.")
+            return
+        reserved = self._reserved.setdefault(idempotency_key, key)
+        if reserved != key:
+            raise IdempotencyConflict("Idempotency-Key is in use by a request with different inputs.")
+
+    def _settle(self, idempotency_key: str, key: str, task: asyncio.Future):
+        """Stores the result under the idempotency key, or frees the key when the run
+        failed or its result is not replayable."""
+        if (not task.cancelled() and task.exception() is None
+                and (self.replayable is None or self.replayable(task.result()))):
+            self._remember(idempotency_key, key, task.result())
+        elif self.store is not None:
+            name = f"idempotency:{idempotency_key}"
+            stored = self.store.get(name)
+            if stored is not None and json.loads(stored) == {"key": key}:
+                self.store.delete(name)
+        if self._reserved.get(idempotency_key) == key:
+            del self._reserved[idempotency_key]
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for idempotency_key in [k for k, v in self._completed.items() if v[0] < now]:
+            del self._completed[idempotency_key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 idempotency_key: Optional[str] = None) -> Tuple[Any, str]:
+        """Runs fn() once per key; returns (result, source): EXECUTED for the caller
+        whose call ran fn, COALESCED for one that joined a run in progress and
+        REPLAYED for a completed result stored under the idempotency key.
+        """
+        if idempotency_key:
+            result = self._lookup_completed(idempotency_key, key)
+            if result is not None:
+                self.replayed += 1
+                return result, REPLAYED
+            self._reserve(idempotency_key, key)
+
+        task = self._inflight.get(key)
+        source = COALESCED if task is not None else EXECUTED
+        if source == COALESCED:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        if idempotency_key:
+            # Runs before the waiters resume, so the key never looks free between the result and its storage.
+            task.add_done_callback(lambda _: self._settle(idempotency_key, key, task))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(task) == 1:
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(task, 1) - 1
+            if remaining > 0:
+                self._waiters[task] = remaining
+            else:
+                self._waiters.pop(task, None)
+        return result, source
+
+    def _remember(self, idempotency_key: str, key: str, result):
+        if self.store is not None:
+            self.store.set(f"idempotency:{idempotency_key}", json.dumps({"key": key, "result": result}, default=str),
+                           ttl=self.result_ttl)
+            return
+        self._purge_expired()
+        self._completed[idempotency_key] = (time.monotonic() + self.result_ttl, key, result)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "replayed": self.replayed,
+            "remembered_results": len(self._completed),
+            "reserved_keys": len(self._reserved),
+        }
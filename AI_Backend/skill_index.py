@@ -0,0 +1,519 @@
+import contextlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from shared_store import SHARED, shared_store
+
+# In-process inverted index over the candidate profiles the graph extracts:
+# normalized skill, certification, employer and seniority terms map to posting
+# lists of candidate doc ids. It is updated as evaluations complete and answers
+# boolean queries such as
+#     Python AND (Kubernetes OR k8s) AND 5+ years
+# Postings are sorted doc ids stored in blocks of BLOCK_SIZE: the first id and
+# the gaps to it in the narrowest unsigned type that holds them (one byte per
+# candidate for common skills). Blocks are decoded with numpy; the decoded
+# arrays of recently queried terms are cached. A re-evaluated candidate gets a
+# new doc id and the old one is tombstoned; tombstones are compacted away once
+# they make up a quarter of the index. The index is snapshotted to
+# SKILL_INDEX_PATH every SKILL_INDEX_SNAPSHOT_EVERY updates and at shutdown, and
+# restored from it at startup (or on first use outside the server). With several worker processes, updates are
+# appended to a log in the shared store and every worker applies the log in
+# order before it searches, so all of them hold the same index; snapshots
+# record the log position they include.
+SKILL_INDEX_ENABLED = os.getenv("SKILL_INDEX", "true").lower() == "true"
+SKILL_INDEX_PATH = os.getenv("SKILL_INDEX_PATH", os.path.join("data", "skill_index.npz"))
+SKILL_INDEX_SNAPSHOT_EVERY = int(os.getenv("SKILL_INDEX_SNAPSHOT_EVERY", "500"))
+# Log entries kept behind the newest snapshot; a worker further behind restores the snapshot.
+SKILL_INDEX_LOG_KEEP = int(os.getenv("SKILL_INDEX_LOG_KEEP", "20000"))
+LOG_NAME = "skill_index"
+
+BLOCK_SIZE = 256
+DECODE_CACHE_TERMS = 256
+MIN_DEAD_TO_COMPACT = 1000
+SNAPSHOT_VERSION = 1
+FIELDS = ("skill", "cert", "company", "level")
+
+# Spellings of the same skill. Keys and values are normalized forms.
+SKILL_ALIASES = {
+    "k8s": "kubernetes", "golang": "go", "js": "javascript", "ts": "typescript", "postgres": "postgresql",
+    "nodejs": "node.js", "node": "node.js", "reactjs": "react", "react.js": "react", "vuejs": "vue",
+    "vue.js": "vue", "amazon web services": "aws", "gcp": "google cloud", "google cloud platform": "google cloud",
+    "azure cloud": "azure", "microsoft azure": "azure", "ml": "machine learning", "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn", "c sharp": "c#", "dotnet": ".net", "ci cd": "ci/cd", "cicd": "ci/cd",
+    "mongo": "mongodb", "py": "python", "python3": "python", "tf2": "tensorflow", "llms": "llm",
+}
+
+_SPACES = re.compile(r"\s+")
+_VERSION = re.compile(r"\s+v?\d+(\.\d+)*$")
+_PARENTHESES = re.compile(r"\(([^)]*)\)")
+_TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+_YEARS = re.compile(r"^(\d+(?:\.\d+)?)\+?$")
+_YEAR_WORDS = {"year", "years", "yr", "yrs", "y", "yoe"}
+
+index_counts = Counter()
+
+
+class QuerySyntaxError(ValueError):
+    """The search query could not be parsed."""
+
+
+def normalize_term(value: str, skill: bool = True) -> str:
+    """Lowercases and collapses whitespace. Skills also lose a trailing version
+    ("Python 3") and resolve aliases; certification numbers ("ISO 27001") stay.
+    """
+    value = _SPACES.sub(" ", str(value).lower().replace("-", " ")).strip(" .,;:")
+    if not skill:
+        return value
+    value = _VERSION.sub("", value)
+    return SKILL_ALIASES.get(value, value)
+
+
+def _skill_terms(value: str) -> set:
+    # "AWS (EKS, Lambda)" is aws, eks and lambda.
+    terms = {normalize_term(_PARENTHESES.sub("", value))}
+    for inner in _PARENTHESES.findall(value):
+        terms.update(normalize_term(part) for part in inner.split(","))
+    return {term for term in terms if term}
+
+
+def profile_terms(profile: dict) -> set:
+    terms = set()
+    for skill in profile.get("skills") or []:
+        terms.update(f"skill:{term}" for term in _skill_terms(skill))
+    for cert in profile.get("certifications") or []:
+        terms.add(f"cert:{normalize_term(cert.get('name', '') if isinstance(cert, dict) else cert, False)}")
+    for job in profile.get("work_experience") or []:
+        terms.add(f"company:{normalize_term(job.get('company', '') if isinstance(job, dict) else '', False)}")
+    terms.add(f"level:{normalize_term(profile.get('experience_level') or '', False)}")
+    return {term for term in terms if not term.endswith(":")}
+
+
+def _encode_block(ids: np.ndarray) -> tuple:
+    gaps = np.diff(ids)
+    largest = int(gaps.max()) if len(gaps) else 0
+    dtype = "u1" if largest < 2**8 else "u2" if largest < 2**16 else "u4"
+    return int(ids[0]), dtype, gaps.astype(dtype).tobytes()
+
+
+def _decode_block(block: tuple) -> np.ndarray:
+    first, dtype, data = block
+    ids = np.empty(len(data) // np.dtype(dtype).itemsize + 1, dtype=np.int64)
+    ids[0] = first
+    np.cumsum(np.frombuffer(data, dtype=dtype), out=ids[1:])
+    ids[1:] += first
+    return ids
+
+
+class Posting:
+    """Sorted doc ids: compressed blocks of BLOCK_SIZE ids and a tail of 4-byte ids."""
+    __slots__ = ("blocks", "tail")
+
+    def __init__(self):
+        self.blocks = []
+        self.tail = array("I")
+
+    @classmethod
+    def from_ids(cls, ids: np.ndarray) -> "Posting":
+        posting = cls()
+        sealed = len(ids) - len(ids) % BLOCK_SIZE
+        posting.blocks = [_encode_block(ids[i:i + BLOCK_SIZE]) for i in range(0, sealed, BLOCK_SIZE)]
+        posting.tail = array("I", ids[sealed:].astype(np.uint32).tobytes())
+        return posting
+
+    def append(self, doc: int):
+        self.tail.append(doc)
+        if len(self.tail) == BLOCK_SIZE:
+            self.blocks.append(_encode_block(np.frombuffer(self.tail, dtype=np.uint32).astype(np.int64)))
+            self.tail = array("I")
+
+    def __len__(self) -> int:
+        return len(self.blocks) * BLOCK_SIZE + len(self.tail)
+
+    def nbytes(self) -> int:
+        return sum(len(block[2]) + 8 for block in self.blocks) + self.tail.itemsize * len(self.tail)
+
+
+class SkillIndex:
+    """Inverted index of candidate profiles with boolean AND/OR queries.
+    """
+
+    def __init__(self, path: str, snapshot_every: int, log=None):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        # Shared store holding the update log, when the index is shared by worker processes.
+        self.log = log
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}
+        self._decoded = OrderedDict()
+        self._docs = {}
+        self._candidate_ids = []
+        self._years = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._dead = 0
+        self._updates = 0
+        self._snapshot_updates = 0
+        self._applied = 0
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            if os.path.exists(self.path):
+                try:
+                    self._restore()
+                except Exception as e:
+                    print(f"[SKILL_INDEX] Could not restore {self.path}: {e}")
+                    self._reset()
+
+    def load(self):
+        """Restores the snapshot now instead of on first use."""
+        with self._lock:
+            self._ensure_loaded()
+
+    def flush(self):
+        """Snapshots the updates made since the last snapshot, if any."""
+        if self._loaded and self._updates != self._snapshot_updates:
+            self.snapshot()
+
+    def _grow(self, size: int):
+        if size > len(self._alive):
+            capacity = max(size, 2 * len(self._alive))
+            self._years = np.resize(self._years, capacity)
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+
+    def add(self, candidate_id: str, profile: dict):
+        """Indexes the candidate's profile, replacing any earlier one."""
+        profile = profile or {}
+        terms = profile_terms(profile)
+        try:
+            years = float(profile.get("total_years_experience") or 0)
+        except (TypeError, ValueError):
+            years = 0.0
+        with self._lock:
+            self._ensure_loaded()
+            if self.log is not None:
+                entry = {"add": candidate_id, "terms": sorted(terms), "years": years}
+                due = self._catch_up(self.log.append(LOG_NAME, json.dumps(entry)))
+            else:
+                due = self._add(candidate_id, terms, years)
+        if due:
+            self.snapshot()
+
+    def _add(self, candidate_id: str, terms, years: float) -> bool:
+        self._remove(candidate_id)
+        doc = len(self._candidate_ids)
+        self._grow(doc + 1)
+        self._candidate_ids.append(candidate_id)
+        self._docs[candidate_id] = doc
+        self._years[doc] = years
+        self._alive[doc] = True
+        for term in terms:
+            self._postings.setdefault(term, Posting()).append(doc)
+        index_counts["added"] += 1
+        return self._after_update()
+
+    def remove(self, candidate_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            if self.log is not None:
+                self._catch_up()
+                removed = candidate_id in self._docs
+                due = removed and self._catch_up(self.log.append(LOG_NAME, json.dumps({"remove": candidate_id})))
+            else:
+                removed = self._remove(candidate_id)
+                due = removed and self._after_update()
+                if removed:
+                    index_counts["removed"] += 1
+        if due:
+            self.snapshot()
+        return removed
+
+    def _catch_up(self, own: int = 0) -> bool:
+        """Applies the log entries after the last one applied; True when a snapshot
+        is due after this worker's own entry `own`.
+        """
+        if self.log is None:
+            return False
+        trimmed = int(self.log.get(f"{LOG_NAME}:trimmed") or 0)
+        if self._applied < trimmed:
+            # Entries this worker has not applied were trimmed; the snapshot includes them.
+            self._reset()
+            if os.path.exists(self.path):
+                self._restore()
+            if self._applied < trimmed:
+                print(f"[SKILL_INDEX] Log trimmed to {trimmed} but the snapshot is at {self._applied}")
+                self._applied = trimmed
+        due = False
+        while True:
+            entries = self.log.read(LOG_NAME, self._applied)
+            for sequence, value in entries:
+                entry = json.loads(value)
+                if "add" in entry:
+                    update_due = self._add(entry["add"], entry["terms"], entry["years"])
+                elif self._remove(entry["remove"]):
+                    index_counts["removed"] += 1
+                    update_due = self._after_update()
+                else:
+                    update_due = False
+                due = due or (sequence == own and update_due)
+                self._applied = sequence
+            if not entries:
+                return due
+
+    def _remove(self, candidate_id: str) -> bool:
+        doc = self._docs.pop(candidate_id, None)
+        if doc is None:
+            return False
+        self._alive[doc] = False
+        self._dead += 1
+        return True
+
+    def _after_update(self) -> bool:
+        """Compacts when tombstones are due; True when a snapshot is due."""
+        if self._dead >= max(MIN_DEAD_TO_COMPACT, len(self._candidate_ids) // 4):
+            self._compact()
+        self._updates += 1
+        return bool(self.snapshot_every) and self._updates % self.snapshot_every == 0
+
+    def _ids(self, term: str) -> np.ndarray:
+        posting = self._postings.get(term)
+        if posting is None:
+            return np.empty(0, dtype=np.int64)
+        cached = self._decoded.get(term)
+        if cached is None or cached[0] != len(posting.blocks):
+            sealed = (np.concatenate([_decode_block(block) for block in posting.blocks]) if posting.blocks
+                      else np.empty(0, dtype=np.int64))
+            cached = self._decoded[term] = (len(posting.blocks), sealed)
+            if len(self._decoded) > DECODE_CACHE_TERMS:
+                self._decoded.popitem(last=False)
+        self._decoded.move_to_end(term)
+        if not posting.tail:
+            return cached[1]
+        return np.concatenate([cached[1], np.frombuffer(posting.tail, dtype=np.uint32)])
+
+    def _compact(self):
+        """Drops tombstoned doc ids and renumbers the live ones densely."""
+        count = len(self._candidate_ids)
+        alive = self._alive[:count]
+        renumber = np.cumsum(alive) - 1
+        postings = {}
+        for term in self._postings:
+            ids = self._ids(term)
+            ids = renumber[ids[alive[ids]]]
+            if len(ids):
+                postings[term] = Posting.from_ids(ids)
+        self._postings = postings
+        self._decoded.clear()
+        self._candidate_ids = [c for c, live in zip(self._candidate_ids, alive.tolist()) if live]
+        self._docs = {candidate_id: doc for doc, candidate_id in enumerate(self._candidate_ids)}
+        live = len(self._candidate_ids)
+        self._years = np.resize(self._years[:count][alive], max(live, 1024))
+        self._alive = np.zeros(max(live, 1024), dtype=bool)
+        self._alive[:live] = True
+        self._dead = 0
+        index_counts["compactions"] += 1
+
+    def search(self, query: str, limit: int = 100, offset: int = 0) -> dict:
+        """Candidate ids matching the query, in indexing order."""
+        started = time.perf_counter()
+        node = parse_query(query)
+        with self._lock:
+            self._ensure_loaded()
+            self._catch_up()
+            docs = self._evaluate(node)
+            docs = docs[self._alive[docs]]
+            page = [self._candidate_ids[doc] for doc in docs[offset:offset + limit].tolist()]
+        elapsed = (time.perf_counter() - started) * 1000
+        index_counts["searches"] += 1
+        return {"query": query, "total": int(len(docs)), "candidate_ids": page, "took_ms": round(elapsed, 3)}
+
+    def _evaluate(self, node) -> np.ndarray:
+        kind = node[0]
+        if kind == "term":
+            return self._ids(node[1])
+        if kind == "years":
+            count = len(self._candidate_ids)
+            return np.flatnonzero(self._years[:count] >= node[1])
+        if kind == "or":
+            mask = np.zeros(len(self._candidate_ids), dtype=bool)
+            for child in node[1]:
+                mask[self._evaluate(child)] = True
+            return np.flatnonzero(mask)
+        # "and": years conditions filter the smallest posting instead of scanning every doc.
+        minimums = [child[1] for child in node[1] if child[0] == "years"]
+        sets = sorted((self._evaluate(child) for child in node[1] if child[0] != "years"), key=len)
+        if not sets:
+            return self._evaluate(("years", max(minimums)))
+        result = sets[0]
+        mask = np.zeros(len(self._candidate_ids), dtype=bool)
+        for other in sets[1:]:
+            if not len(result):
+                break
+            mask[other] = True
+            result = result[mask[result]]
+            mask[other] = False
+        if minimums:
+            result = result[self._years[result] >= max(minimums)]
+        return result
+
+    def snapshot(self):
+        """Writes the index to SKILL_INDEX_PATH (atomically replaced)."""
+        started = time.perf_counter()
+        with self._lock:
+            self._ensure_loaded()
+            count = len(self._candidate_ids)
+            terms = list(self._postings)
+            gaps, offsets = [], [0]
+            for term in terms:
+                ids = self._ids(term)
+                gaps.append(np.diff(ids, prepend=0).astype(np.uint32))
+                offsets.append(offsets[-1] + len(ids))
+            arrays = {
+                "version": np.array([SNAPSHOT_VERSION]),
+                "terms": np.array(terms, dtype=str),
+                "offsets": np.array(offsets, dtype=np.int64),
+                "gaps": np.concatenate(gaps) if gaps else np.empty(0, dtype=np.uint32),
+                "candidate_ids": np.array(self._candidate_ids, dtype=str),
+                "years": self._years[:count].copy(),
+                "alive": self._alive[:count].copy(),
+                "log_sequence": np.array([self._applied], dtype=np.int64),
+            }
+            self._snapshot_updates = self._updates
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Every worker snapshots the shared index; each writes its own temporary file.
+        fd, temporary = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.", suffix=".tmp",
+                                         dir=os.path.dirname(self.path) or ".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(temporary, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temporary)
+            raise
+        index_counts["snapshots"] += 1
+        if self.log is not None and arrays["log_sequence"][0] > SKILL_INDEX_LOG_KEEP:
+            upto = int(arrays["log_sequence"][0]) - SKILL_INDEX_LOG_KEEP
+            self.log.set(f"{LOG_NAME}:trimmed", str(upto))
+            self.log.trim(LOG_NAME, upto)
+        print(f"[SKILL_INDEX] Snapshot of {count} candidates, {len(terms)} terms in "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _restore(self):
+        started = time.perf_counter()
+        with np.load(self.path, allow_pickle=False) as data:
+            if int(data["version"][0]) != SNAPSHOT_VERSION:
+                raise ValueError(f"snapshot version {int(data['version'][0])}")
+            terms, offsets, gaps = data["terms"].tolist(), data["offsets"], data["gaps"]
+            self._candidate_ids = data["candidate_ids"].tolist()
+            years, alive = data["years"], data["alive"]
+            self._applied = int(data["log_sequence"][0]) if "log_sequence" in data.files else 0
+        count = len(self._candidate_ids)
+        self._grow(count)
+        self._years[:count] = years
+        self._alive[:count] = alive
+        self._dead = count - int(alive.sum())
+        self._docs = {c: doc for doc, (c, live) in enumerate(zip(self._candidate_ids, alive.tolist())) if live}
+        for term, start, end in zip(terms, offsets[:-1].tolist(), offsets[1:].tolist()):
+            self._postings[term] = Posting.from_ids(np.cumsum(gaps[start:end], dtype=np.int64))
+        print(f"[SKILL_INDEX] Restored {len(self._docs)} candidates, {len(terms)} terms in "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._ensure_loaded()
+            self._catch_up()
+            postings = sum(len(p) for p in self._postings.values())
+            return {
+                "enabled": SKILL_INDEX_ENABLED,
+                "candidates": len(self._docs),
+                "tombstones": self._dead,
+                "terms": len(self._postings),
+                "postings": postings,
+                "posting_bytes": sum(p.nbytes() for p in self._postings.values()),
+                **({"log_sequence": self._applied} if self.log is not None else {}),
+                **index_counts,
+            }
+
+
+def parse_query(query: str):
+    """Parses "Python AND (Go OR Rust) AND cert:"AWS Solutions Architect" AND 5+ years".
+
+    AND binds tighter than OR; operators are upper case. A bare value is a skill;
+    cert:, company: and level: select other fields. Consecutive words form one
+    value, so "Machine Learning AND Python" needs no quotes. "N+ years" keeps
+    candidates with at least N years of experience.
+    """
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        raise QuerySyntaxError("Empty query.")
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() == "OR":
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and():
+        children = [parse_atom()]
+        while peek() == "AND":
+            take()
+            children.append(parse_atom())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_atom():
+        token = peek()
+        if token is None or token in ("AND", "OR", ")"):
+            raise QuerySyntaxError(f"Expected a term at {'the end' if token is None else repr(token)}.")
+        if token == "(":
+            take()
+            node = parse_or()
+            if peek() != ")":
+                raise QuerySyntaxError("Missing closing parenthesis.")
+            take()
+            return node
+        words = []
+        while peek() not in (None, "AND", "OR", "(", ")"):
+            words.append(take())
+        years = _YEARS.match(words[0])
+        if years and len(words) == 2 and words[1].lower() in _YEAR_WORDS:
+            return ("years", float(years.group(1)))
+        field = "skill"
+        if ":" in words[0] and words[0].split(":", 1)[0].lower() in FIELDS:
+            field, words[0] = words[0].split(":", 1)
+            field = field.lower()
+        value = normalize_term(" ".join(word.strip('"') for word in words), field == "skill")
+        if not value:
+            raise QuerySyntaxError(f"Empty {field} value.")
+        return ("term", f"{field}:{value}")
+
+    node = parse_or()
+    if peek() is not None:
+        raise QuerySyntaxError(f"Unexpected {peek()!r}.")
+    return node
+
+
+skill_index = SkillIndex(SKILL_INDEX_PATH, SKILL_INDEX_SNAPSHOT_EVERY, shared_store if SHARED else None)
+
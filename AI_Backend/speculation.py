@@ -0,0 +1,145 @@
+import contextvars
+import copy
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from langgraph.config import get_config
+
+from profiling import span
+from tracing import set_attribute, start_span
+
+SPECULATIVE_AGENTS = os.getenv("SPECULATIVE_AGENTS", "true").lower() == "true"
+
+# Candidate profile fields each specialist agent reads. An agent is started
+# speculatively as soon as the streamed extraction has completed all of them.
+AGENT_PROFILE_FIELDS = {
+    "tech_agent": ("skills", "capability_evidence", "certifications", "education"),
+    "exp_agent": ("work_experience", "education"),
+    "culture_agent": ("work_experience", "capability_evidence"),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPECULATIVE_MAX_WORKERS", "8")),
+    thread_name_prefix="speculative"
+)
+# thread_id -> {(node_name, serialized inputs): Future of the LLM answer}
+_calls = {}
+# thread_id -> executor futures of the speculative starts; a run is live from
+# its first speculative start until discard().
+_runs = {}
+_lock = threading.Lock()
+_counters = {"started": 0, "hits": 0, "skipped": 0}
+# Set in the speculative threads, so their LLM calls can be dropped once the run is discarded.
+_speculative = contextvars.ContextVar("speculative", default=False)
+
+
+class RunDiscarded(Exception):
+    """The run finished before a speculative call was made."""
+
+
+def _run_id():
+    try:
+        return get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:
+        # Called outside a graph run.
+        return None
+
+
+def shared_call(node_name: str, inputs: dict, call):
+    """Runs an agent's LLM call at most once per run and exact prompt inputs.
+
+    The speculative run of an agent makes the call first; when the real node
+    later builds identical inputs from the final profile it waits for that
+    answer instead of asking again. Different inputs mean later fields changed
+    the picture, so the node makes its own call and the speculative answer is dropped.
+    """
+    run_id = _run_id() if node_name in AGENT_PROFILE_FIELDS else None
+    if run_id is None:
+        return call()
+    key = (node_name, json.dumps(inputs, sort_keys=True, default=str))
+    with _lock:
+        # Nothing was started speculatively, or the run is already over.
+        live = run_id in _runs
+        if live:
+            calls = _calls.setdefault(run_id, {})
+            future = calls.get(key)
+            owner = future is None
+            if owner:
+                future = calls[key] = Future()
+    if not live:
+        if _speculative.get():
+            raise RunDiscarded(run_id)
+        return call()
+    if not owner:
+        try:
+            result = future.result()
+        except Exception:
+            return call()
+        with _lock:
+            _counters["hits"] += 1
+        set_attribute("speculation.reused", True)
+        print(f"[SPECULATION] {node_name}: reusing the answer started during extraction")
+        return copy.deepcopy(result)
+    try:
+        result = call()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    future.set_result(result)
+    return copy.deepcopy(result)
+
+
+def speculate(node_name: str, node_fn, provisional_state: dict):
+    """Runs node_fn on a provisional state in the background so that its LLM call
+    is already in flight when the real node runs.
+    """
+    run_id = _run_id()
+    if not SPECULATIVE_AGENTS or run_id is None:
+        return
+    print(f"[SPECULATION] Starting {node_name} before extraction has finished")
+    with _lock:
+        _counters["started"] += 1
+        _runs.setdefault(run_id, []).append(_executor.submit(
+            contextvars.copy_context().run, _speculative_run, run_id, node_name, node_fn, provisional_state))
+
+
+def _speculative_run(run_id: str, node_name: str, node_fn, provisional_state: dict):
+    with _lock:
+        if run_id not in _runs:
+            _counters["skipped"] += 1
+            return
+    _speculative.set(True)
+    try:
+        with start_span(f"speculate {node_name}", attributes={"graph.node": node_name}), \
+                span(f"speculate:{node_name}", "speculation", node_name, capture=True):
+            node_fn(provisional_state)
+    except RunDiscarded:
+        with _lock:
+            _counters["skipped"] += 1
+    except Exception as e:
+        print(f"[SPECULATION] {node_name} failed speculatively: {e}")
+
+
+def discard(run_id: str):
+    """Drops the shared answers of a finished run and cancels its queued speculative starts."""
+    with _lock:
+        _calls.pop(run_id, None)
+        futures = _runs.pop(run_id, [])
+    for future in futures:
+        future.cancel()
+
+
+def speculation_stats() -> dict:
+    with _lock:
+        started, hits, skipped = _counters["started"], _counters["hits"], _counters["skipped"]
+        runs = len(_runs)
+    return {
+        "enabled": SPECULATIVE_AGENTS,
+        "started": started,
+        "hits": hits,
+        "skipped_after_run": skipped,
+        "hit_rate": round(hits / started, 3) if started else 0.0,
+        "runs_tracked": runs,
+    }
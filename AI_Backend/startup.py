@@ -0,0 +1,132 @@
+import contextlib
+import importlib
+import os
+import threading
+import time
+
+# Cold start of a new container: importing the app (FastAPI, LangGraph and
+# LangChain, the compiled graph) happens before the server binds its port,
+# everything else is deferred. The parsers are imported on first use, and the
+# LLM clients, their TLS connections and the prompt templates' first rendering
+# would all land on the first evaluation. The warm-up runs those steps in a
+# background thread once the server is up; GET /ready answers 503 until it has
+# finished, so a readiness probe keeps traffic away from a process that is up
+# but cold. A failed step (no network at startup) is reported, and the process
+# still becomes ready: the step is simply paid by the first request.
+WARMUP_ENABLED = os.getenv("WARMUP", "true").lower() == "true"
+# Open one connection per LLM client during the warm-up (a free model-list call).
+WARMUP_CONNECT = os.getenv("WARMUP_CONNECT", "true").lower() == "true"
+WARMUP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("WARMUP_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Imported lazily by the app, preloaded here.
+LAZY_MODULES = ("pypdf", "mammoth")
+
+
+def process_started_at() -> float:
+    """Wall-clock start of this process, from /proc where available."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class Readiness:
+    """Import time, warm-up steps and the warm flag of this process."""
+
+    def __init__(self):
+        self.started_at = process_started_at()
+        self.imported_at = None
+        self.warm_at = None
+        self.steps = {}
+        self._warm = threading.Event()
+        self._thread = None
+
+    def imported(self):
+        self.imported_at = time.time()
+        print(f"[STARTUP] App imported {self.imported_at - self.started_at:.2f}s after process start")
+
+    @property
+    def warm(self) -> bool:
+        return self._warm.is_set()
+
+    def start(self):
+        """Runs the warm-up in a background thread, or marks the process warm when disabled."""
+        if not WARMUP_ENABLED:
+            self._finish()
+        elif self._thread is None:
+            self._thread = threading.Thread(target=self.warm_up, name="warm-up", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._warm.wait(timeout)
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        started = time.perf_counter()
+        entry = self.steps[name] = {"status": "running"}
+        try:
+            yield entry
+            entry["status"] = "done"
+        except Exception as e:
+            entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+            print(f"[STARTUP] Warm-up step {name} failed: {e}")
+        entry["ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def warm_up(self):
+        import llm_router
+        import prompts
+
+        with self.step("parsers"):
+            for module in LAZY_MODULES:
+                importlib.import_module(module)
+        models = {}
+        with self.step("llm_clients"):
+            specs = {spec for node in llm_router.MODEL_ROUTING for spec in llm_router.model_chain(node)}
+            models = {spec: llm_router.get_model(spec) for spec in sorted(specs)}
+        if WARMUP_CONNECT:
+            for spec, model in models.items():
+                with self.step(f"connect:{spec}") as entry:
+                    entry["opened"] = open_connection(model)
+        with self.step("prompts") as entry:
+            templates = [value for name, value in vars(prompts).items() if name.endswith("_PROMPT")]
+            for template in templates:
+                template.invoke({variable: "" for variable in template.input_variables})
+            entry["templates"] = len(templates)
+        self._finish()
+
+    def _finish(self):
+        self.warm_at = time.time()
+        self._warm.set()
+        since_import = f", {self.warm_at - self.imported_at:.2f}s after import" if self.imported_at else ""
+        print(f"[STARTUP] Warm {self.warm_at - self.started_at:.2f}s after process start{since_import}")
+
+    def status(self) -> dict:
+        def elapsed(at):
+            return round(at - self.started_at, 3) if at else None
+
+        return {
+            "status": "warm" if self.warm else "warming",
+            "warm_up": WARMUP_ENABLED,
+            "imported_after_seconds": elapsed(self.imported_at),
+            "warm_after_seconds": elapsed(self.warm_at),
+            "steps": self.steps,
+        }
+
+
+def open_connection(model) -> bool:
+    """Opens the provider connection of a LangChain chat model with a model-list call;
+    False for models without an OpenAI-style SDK client (fakes in benchmarks).
+    """
+    # ChatOpenAI keeps its SDK client as root_client, ChatGroq behind the completions resource.
+    client = getattr(model, "root_client", None) or getattr(getattr(model, "client", None), "_client", None)
+    if client is None or not hasattr(client, "models"):
+        return False
+    client.with_options(timeout=WARMUP_CONNECT_TIMEOUT_SECONDS, max_retries=0).models.list()
+    return True
+
+
+readiness = Readiness()
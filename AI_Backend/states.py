@@ -8,9 +8,13 @@ def merge_dict(existing: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]
 
 
 class InputState(TypedDict):
-    resume_text: str
-    job_description_text: str
+    # References into text_store; the raw texts never enter the checkpointed state.
+    # Each ref is cleared by the last node that reads it.
+    resume_ref: Optional[str]
+    job_description_ref: Optional[str]
     role_name: str
+    # Optional category weights for the aggregator, e.g. {"competency": 0.5, ...}.
+    weights: Optional[Dict[str, float]]
 
 
 class AgentState(InputState):
@@ -0,0 +1,20 @@
+# Settings for importing the app in tests: no real provider calls, every store
+# in a temporary directory, nothing started in the background.
+import os
+import tempfile
+
+_directory = tempfile.mkdtemp(prefix="talentscan-tests-")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("ADMIN_TOKEN", "test")
+os.environ.setdefault("NODE_CACHE", "false")
+os.environ.setdefault("CHECKPOINTER", "memory")
+os.environ.setdefault("RATE_LIMIT", "100000/minute")
+os.environ.setdefault("RESUME_DEDUP", "false")
+os.environ.setdefault("TRACE_EXPORTER", "none")
+os.environ.setdefault("MEMORY_SAMPLE_INTERVAL_SECONDS", "0")
+os.environ.setdefault("WARMUP", "false")
+for name, filename in (("CHECKPOINT_DB_PATH", "checkpoints.sqlite3"), ("NODE_CACHE_PATH", "node_cache.sqlite3"),
+                       ("MARKET_STANDARDS_PATH", "market_standards.sqlite3"),
+                       ("RESUME_DEDUP_PATH", "resume_signatures.sqlite3"), ("SKILL_INDEX_PATH", "skill_index.npz"),
+                       ("TRACE_FILE", "traces.jsonl")):
+    os.environ.setdefault(name, os.path.join(_directory, filename))
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Overloaded, parse_tenant_weights
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def serve(controller: AdmissionController, requests: list) -> list:
+    """Queues the (priority, tenant) requests behind a held slot, then lets them through; returns the serving order."""
+    order = []
+
+    async def run(priority: str, tenant: str):
+        async with controller.slot(priority=priority, tenant=tenant):
+            order.append((priority, tenant))
+            await asyncio.sleep(0)
+
+    held = controller.slot(priority="interactive", tenant="holder")
+    await held.__aenter__()
+    tasks = [asyncio.ensure_future(run(priority, tenant)) for priority, tenant in requests]
+    await settle()
+    await held.__aexit__(None, None, None)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_tenants_share_slots_by_weight():
+    controller = AdmissionController(1, 1000, max_wait=60, tenant_weights={"heavy": 2.0})
+    requests = [("bulk", "light")] * 30 + [("bulk", "heavy")] * 30
+    order = asyncio.run(serve(controller, requests))
+    # While both tenants wait, the heavy one gets two slots for each of the light one's.
+    window = [tenant for _, tenant in order[:30]]
+    assert window.count("heavy") in (19, 20, 21)
+
+
+def test_higher_class_is_served_first():
+    controller = AdmissionController(1, 1000, max_wait=60)
+    requests = [("background", "a"), ("bulk", "a"), ("interactive", "a"), ("bulk", "b")]
+    order = asyncio.run(serve(controller, requests))
+    assert [priority for priority, _ in order] == ["interactive", "bulk", "bulk", "background"]
+
+
+def test_reserved_slot_stays_free_for_interactive_runs():
+    async def scenario():
+        controller = AdmissionController(3, 1000, max_wait=60, reserved_interactive=1)
+        release = asyncio.Event()
+
+        async def bulk():
+            async with controller.slot(priority="bulk", tenant="import"):
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(bulk()) for _ in range(5)]
+        await settle()
+        assert controller.in_flight == 2
+        async with controller.slot(timeout=0.01, priority="interactive", tenant="recruiter"):
+            assert controller.in_flight == 3
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.stats()["classes"]["bulk"]["admitted"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        controller = AdmissionController(1, 1, max_wait=60)
+        async with controller.slot():
+            waiter = asyncio.ensure_future(controller.slot().__aenter__())
+            await settle()
+            with pytest.raises(Overloaded) as shed:
+                async with controller.slot():
+                    pass
+            assert shed.value.retry_after >= 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        assert controller.in_flight == 0 and controller.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_each_class_has_its_own_queue_limit():
+    async def scenario():
+        controller = AdmissionController(1, {"interactive": 1, "bulk": 2, "background": 1}, max_wait=60)
+        async with controller.slot():
+            waiters = [asyncio.ensure_future(controller.slot(priority=priority).__aenter__())
+                       for priority in ("bulk", "bulk", "background")]
+            await settle()
+            with pytest.raises(Overloaded):
+                async with controller.slot(priority="background"):
+                    pass
+            assert controller.queue_depth == 3
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["classes"]["background"]["shed"] == 1 and stats["classes"]["bulk"]["shed"] == 0
+
+
+def test_wait_past_timeout_is_shed():
+    async def scenario():
+        controller = AdmissionController(1, 10, max_wait=60)
+        async with controller.slot():
+            with pytest.raises(Overloaded):
+                async with controller.slot(timeout=0.01):
+                    pass
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"] == 1 and stats["queue_depth"] == 0
+
+
+def test_parse_tenant_weights():
+    assert parse_tenant_weights("a=2, b=0.5,") == {"a": 2.0, "b": 0.5}
+    with pytest.raises(ValueError):
+        parse_tenant_weights("a=0")
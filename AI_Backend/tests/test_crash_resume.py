@@ -0,0 +1,39 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.crash_resume import SCENARIOS, run_scenario
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, constant_latency, install_fake_llm
+from deadlines import Deadline
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_resume_after_crash_reruns_only_unfinished_stages(name):
+    # A child process is killed mid-stage; a fresh one resumes from the same database.
+    assert run_scenario(name, SCENARIOS[name])
+
+
+def test_resume_endpoint_requires_the_admin_token():
+    from main import DURABLE_CHECKPOINTS, app
+
+    async def post(headers: dict) -> int:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return (await client.post("/evaluations/some-id/resume", headers=headers)).status_code
+
+    assert asyncio.run(post({})) == 401
+    assert asyncio.run(post({"X-Admin-Token": "wrong"})) == 401
+    # Authorised: an unknown id, or no resumable runs with in-memory checkpoints.
+    assert asyncio.run(post({"X-Admin-Token": "test"})) == (404 if DURABLE_CHECKPOINTS else 501)
+
+
+def test_retry_of_a_finished_evaluation_returns_its_result(monkeypatch):
+    from main import run_graph
+    monkeypatch.setattr("llm_router.HEDGING_ENABLED", False)
+    fake = install_fake_llm(FakeChatModel(latency=constant_latency(0), calls=[]))
+
+    first = asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(60), evaluation_id="retried"))
+    calls = list(fake.calls)
+    retried = asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(60), evaluation_id="retried"))
+    assert fake.calls == calls
+    assert retried["final_score"] == first["final_score"] and retried["evaluation_id"] == "retried"
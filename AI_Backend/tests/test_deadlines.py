@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from admission import AdmissionController
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, constant_latency, install_fake_llm
+from deadlines import Deadline, DeadlineExceeded, with_deadline
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    monkeypatch.setattr("llm_router.HEDGING_ENABLED", False)
+    return lambda latency: install_fake_llm(FakeChatModel(latency=latency, calls=[]))
+
+
+def analyze(data: dict, headers: dict = None) -> httpx.Response:
+    from main import app
+
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/analyze/graph", data=data, headers=headers or {})
+
+    return asyncio.run(post())
+
+
+def test_a_node_is_skipped_or_the_run_aborted_near_the_deadline():
+    run = with_deadline("tech_agent", lambda state: {"tech_evaluation": {"score": 80}})
+    assert run({}, {"configurable": {"deadline": Deadline(60)}}) == {"tech_evaluation": {"score": 80}}
+    with pytest.raises(DeadlineExceeded):
+        run({}, {"configurable": {"deadline": Deadline(1)}})
+    deadline = Deadline(1, allow_partial=True)
+    assert run({}, {"configurable": {"deadline": deadline}}) == {}
+    assert deadline.skipped == ["tech_agent"]
+
+
+def test_the_timeout_field_is_validated_and_clamped():
+    from main import MAX_TIMEOUT_SECONDS, parse_timeout
+    request = type("Request", (), {"headers": {"X-Request-Timeout": "12.5"}})()
+    assert parse_timeout(request) == 12.5
+    assert parse_timeout(request, "3") == 3
+    assert parse_timeout(request, str(MAX_TIMEOUT_SECONDS * 10)) == MAX_TIMEOUT_SECONDS
+    for value in ("soon", "0", "-1", "nan", "inf"):
+        with pytest.raises(HTTPException) as error:
+            parse_timeout(request, value)
+        assert error.value.status_code == 400
+
+
+def test_timeout_seconds_reaches_the_nodes(fake_llm):
+    fake = fake_llm(constant_latency(0))
+    form = {"raw_text": SAMPLE_RESUME, "job_description": SAMPLE_JD, "role_name": SAMPLE_ROLE}
+    assert analyze({**form, "timeout_seconds": "soon"}).status_code == 400
+    # Under the start margin: no stage fits, so none calls the model.
+    response = analyze({**form, "timeout_seconds": "1"})
+    assert response.status_code == 504 and fake.calls == []
+
+
+def test_the_admission_wait_ends_at_the_deadline(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "admission", AdmissionController(max_in_flight=1, max_queue=4, max_wait=30))
+
+    async def scenario():
+        async with main.admission.slot():
+            started = time.monotonic()
+            with pytest.raises(HTTPException) as error:
+                await main.run_evaluation(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(0.3))
+            return error.value.status_code, time.monotonic() - started
+
+    status, waited = asyncio.run(scenario())
+    assert status == 503 and waited < 2
+
+
+def test_allow_partial_returns_the_agents_that_finished(fake_llm, monkeypatch):
+    from main import run_graph
+    # No start margin, so the slow agent is the one cut off by the deadline.
+    monkeypatch.setattr(Deadline, "is_near", lambda self, margin=0.0: self.remaining() < margin)
+    fake_llm(lambda stage: 2.0 if stage == "culture_agent" else 0.05)
+
+    result = asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(1.0, allow_partial=True)))
+    assert result["partial"] and "culture_agent" in result["skipped_stages"]
+    assert result["agent_reports"]["competency_agent"] and result["agent_reports"]["experience_agent"]
+    assert not result["agent_reports"]["behavioral_agent"]
+
+
+def test_without_allow_partial_a_late_run_is_a_504(fake_llm, monkeypatch):
+    from main import run_graph
+    monkeypatch.setattr(Deadline, "is_near", lambda self, margin=0.0: self.remaining() < margin)
+    fake_llm(lambda stage: 2.0 if stage == "culture_agent" else 0.05)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run_graph(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_ROLE, Deadline(1.0)))
+    assert error.value.status_code == 504
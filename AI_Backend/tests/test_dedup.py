@@ -0,0 +1,87 @@
+import pytest
+
+from benchmarks.dedup import colleague, resubmissions
+from benchmarks.resumes import SAMPLE_RESUMES
+from dedup import RESUME_DEDUP_THRESHOLD, ResumeIndex, content_hash, resume_signature
+
+SCOPE = "jd-hash"
+RESUME = SAMPLE_RESUMES["backend_developer"]["text"]
+RESULT = {"evaluation_id": "eval-1", "final_score": 81, "parsed_profile": {"email": "rahul.mehta@example.in"}}
+
+
+def make_index(tmp_path, keep_results: bool) -> ResumeIndex:
+    return ResumeIndex(str(tmp_path / "signatures.sqlite3"), ttl_seconds=3600, max_entries=1000,
+                       keep_results=keep_results)
+
+
+def add(index: ResumeIndex, text: str, evaluation_id: str = "eval-1", scope: str = SCOPE):
+    index.add(scope, resume_signature(text), content_hash(text), evaluation_id, {**RESULT, "evaluation_id": evaluation_id})
+
+
+def find(index: ResumeIndex, text: str, scope: str = SCOPE):
+    return index.find(scope, resume_signature(text), content_hash(text))
+
+
+@pytest.mark.parametrize("edit", sorted(resubmissions(RESUME)))
+def test_near_identical_resume_is_flagged(tmp_path, edit):
+    index = make_index(tmp_path, keep_results=False)
+    add(index, RESUME)
+    duplicate = find(index, resubmissions(RESUME)[edit])
+    assert duplicate is not None and duplicate["evaluation_id"] == "eval-1"
+    assert duplicate["similarity"] >= RESUME_DEDUP_THRESHOLD
+
+
+def test_identical_resume_is_marked_identical(tmp_path):
+    index = make_index(tmp_path, keep_results=False)
+    add(index, RESUME)
+    assert find(index, RESUME)["identical"]
+
+
+def test_different_resumes_are_not_flagged(tmp_path):
+    index = make_index(tmp_path, keep_results=False)
+    add(index, RESUME)
+    assert find(index, colleague(RESUME)) is None
+    for name, sample in SAMPLE_RESUMES.items():
+        if sample["text"] != RESUME:
+            assert find(index, sample["text"]) is None, name
+
+
+def test_duplicates_are_scoped_to_the_jd(tmp_path):
+    index = make_index(tmp_path, keep_results=False)
+    add(index, RESUME)
+    assert find(index, RESUME, scope="another-jd") is None
+
+
+def test_result_is_returned_only_when_results_are_kept(tmp_path):
+    index = make_index(tmp_path, keep_results=True)
+    add(index, RESUME)
+    assert index.result(find(index, RESUME)) == RESULT
+
+    # Turned off: nothing is returned, and prune clears the stored responses.
+    index = make_index(tmp_path, keep_results=False)
+    duplicate = find(index, RESUME)
+    assert duplicate is not None and index.result(duplicate) is None
+    index.prune()
+    assert make_index(tmp_path, keep_results=True).result(duplicate) is None
+
+
+def test_results_are_not_stored_when_not_kept(tmp_path):
+    add(make_index(tmp_path, keep_results=False), RESUME)
+    index = make_index(tmp_path, keep_results=True)
+    assert index.result(find(index, RESUME)) is None
+
+
+def test_expired_entries_are_pruned(tmp_path):
+    index = make_index(tmp_path, keep_results=True)
+    add(index, RESUME)
+    index.ttl_seconds = -1
+    index.prune()
+    assert find(index, RESUME) is None
+    assert index.stats()["expired"] == 1
+
+
+def test_text_too_short_for_a_signature_is_never_flagged(tmp_path):
+    index = make_index(tmp_path, keep_results=False)
+    add(index, "Python")
+    assert resume_signature("Python") is None
+    assert find(index, "Python") is None
@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import mammoth
+import pytest
+
+from benchmarks.documents import docx_corpus
+from docx_text import UnsupportedDocx, extract_docx_text
+from parsing import normalize_text, parse_docx
+
+CORPUS = docx_corpus()
+
+
+def mammoth_text(data: bytes) -> str:
+    return mammoth.extract_raw_text(io.BytesIO(data)).value
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_fast_path_matches_mammoth(name):
+    data = CORPUS[name]
+    try:
+        text = extract_docx_text(io.BytesIO(data))
+    except UnsupportedDocx:
+        # parse_docx falls back to mammoth for these; checked below.
+        return
+    assert text == mammoth_text(data)
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_parse_docx_matches_mammoth(name):
+    data = CORPUS[name]
+    with contextlib.redirect_stdout(io.StringIO()):
+        parsed = parse_docx(data)
+    assert parsed == normalize_text(mammoth_text(data))
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from json_stream import JsonFieldStream
+
+DOCUMENT = {
+    "candidate_name": "Ana \"AJ\" Jones",
+    "skills": ["Python", "C{++}", "a, b"],
+    "work_experience": [{"company": "Initech", "highlights": [["billing", "API"], []]}],
+    "notes": "closing } and ] and \\ inside a string",
+    "total_years_experience": 7.5,
+}
+
+
+def feed_in_chunks(text: str, size: int) -> tuple:
+    stream = JsonFieldStream()
+    completed = []
+    for start in range(0, len(text), size):
+        completed += stream.feed(text[start:start + size])
+    return stream, completed
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10000])
+def test_fields_split_across_chunks_are_decoded(size):
+    stream, completed = feed_in_chunks(json.dumps(DOCUMENT), size)
+    assert stream.fields == DOCUMENT
+    assert completed == list(DOCUMENT)
+
+
+def test_each_field_completes_when_its_member_ends():
+    stream = JsonFieldStream()
+    assert stream.feed('{"skills": ["Py') == []
+    assert stream.feed('thon"], "name"') == ["skills"]
+    assert stream.feed(': "Ana"') == []
+    assert stream.feed("}") == ["name"]
+
+
+def test_escaped_quotes_and_braces_stay_inside_the_string():
+    stream, _ = feed_in_chunks(r'{"a": "say \"}\" then {", "b": "\\", "c": 1}', 1)
+    assert stream.fields == {"a": 'say "}" then {', "b": "\\", "c": 1}
+
+
+def test_nested_arrays_are_one_field():
+    stream = JsonFieldStream()
+    assert stream.feed('{"matrix": [[1, 2], [3, [4, 5]]], "flag": true}') == ["matrix", "flag"]
+    assert stream.fields == {"matrix": [[1, 2], [3, [4, 5]]], "flag": True}
+
+
+def test_text_before_the_object_is_ignored():
+    stream, _ = feed_in_chunks('```json\n{"a": 1, "b": [2]}\n```', 4)
+    assert stream.fields == {"a": 1, "b": [2]}
+
+
+def test_truncated_input_keeps_only_the_completed_fields():
+    text = json.dumps(DOCUMENT)
+    cut = text.index('"notes"') + 12
+    stream, completed = feed_in_chunks(text[:cut], 5)
+    assert completed == ["candidate_name", "skills", "work_experience"]
+    assert "notes" not in stream.fields
+
+
+def test_a_malformed_member_is_skipped():
+    stream = JsonFieldStream()
+    assert stream.feed('{"a": 1, "b": nope, "c": 3}') == ["a", "c"]
+    assert stream.fields == {"a": 1, "c": 3}
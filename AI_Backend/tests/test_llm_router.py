@@ -0,0 +1,101 @@
+import json
+import threading
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+import llm_router
+from llm_router import NodeStats, _validate
+
+
+def test_node_stats_counts_concurrent_updates():
+    stats = NodeStats()
+
+    def update():
+        for _ in range(2000):
+            stats.count("calls")
+            stats.count("answers")
+            stats.record_latency(0.1)
+
+    threads = [threading.Thread(target=update) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = stats.snapshot()
+    assert snapshot["calls"] == snapshot["answers"] == 16000
+    assert snapshot["latency_p50"] == 0.1
+
+
+class RepairModel:
+    """Answers the field-repair prompt with a canned reply and keeps the messages it got."""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.messages = []
+
+    def invoke(self, messages):
+        self.messages.append(messages)
+        return AIMessage(content=self.reply)
+
+
+@pytest.fixture
+def prompt_value():
+    return ChatPromptTemplate.from_messages([("human", "Write the feedback.")]).invoke({})
+
+
+def install_repair(monkeypatch, reply: str) -> RepairModel:
+    model = RepairModel(reply)
+    monkeypatch.setattr(llm_router, "_json_model", lambda spec: model)
+    return model
+
+
+FEEDBACK = {"feedback_email": {"subject": "Your application", "body": "Thank you."}}
+
+
+def test_valid_answer_needs_no_repair(monkeypatch, prompt_value):
+    model = install_repair(monkeypatch, "{}")
+    result = _validate("feedback", "fake:model", prompt_value, json.dumps({**FEEDBACK, "recommendation": "shortlist"}))
+    assert result["recommendation"] == "Shortlist"
+    assert model.messages == []
+
+
+def test_answer_in_a_markdown_fence_is_accepted(monkeypatch, prompt_value):
+    install_repair(monkeypatch, "{}")
+    content = "```json\n" + json.dumps({"score": "85%", "reasoning": "ok", "matched_competencies": [],
+                                        "missing_competencies": []}) + "\n```"
+    assert _validate("tech_agent", "fake:model", prompt_value, content)["score"] == 85
+
+
+def test_invalid_literal_is_repaired(monkeypatch, prompt_value):
+    model = install_repair(monkeypatch, '{"recommendation": "Reject"}')
+    before = llm_router._node_stats("feedback").snapshot()
+    result = _validate("feedback", "fake:model", prompt_value, json.dumps({**FEEDBACK, "recommendation": "Hire"}))
+    after = llm_router._node_stats("feedback").snapshot()
+    assert result["recommendation"] == "Reject"
+    assert result["feedback_email"] == FEEDBACK["feedback_email"]
+    # Only the failing field is asked for again.
+    assert "recommendation" in model.messages[0][-1].content
+    assert after["validation_failures"] == before["validation_failures"] + 1
+    assert after["repairs_succeeded"] == before["repairs_succeeded"] + 1
+
+
+def test_repair_that_still_fails_raises(monkeypatch, prompt_value):
+    install_repair(monkeypatch, '{"recommendation": "Strong hire"}')
+    with pytest.raises(OutputParserException, match="after repair"):
+        _validate("feedback", "fake:model", prompt_value, json.dumps({**FEEDBACK, "recommendation": "Hire"}))
+
+
+def test_repair_answer_that_is_not_json_raises(monkeypatch, prompt_value):
+    install_repair(monkeypatch, "Sorry, I cannot help with that.")
+    with pytest.raises(OutputParserException, match="not valid JSON"):
+        _validate("feedback", "fake:model", prompt_value, json.dumps({**FEEDBACK, "recommendation": "Hire"}))
+
+
+def test_answer_that_is_not_an_object_is_not_repaired(monkeypatch, prompt_value):
+    model = install_repair(monkeypatch, "{}")
+    with pytest.raises(OutputParserException, match="Expected a JSON object"):
+        _validate("feedback", "fake:model", prompt_value, '["Shortlist"]')
+    assert model.messages == []
@@ -0,0 +1,60 @@
+import pytest
+
+import market_standards
+from benchmarks.fake_llm import FakeChatModel, constant_latency, install_fake_llm
+from market_standards import MarketStandardsStore, role_key, warm_up
+
+
+@pytest.mark.parametrize("title, key", [
+    ("Data Engineer", ("data engineer", "mid")),
+    ("Sr. Data Engineer", ("data engineer", "senior")),
+    ("senior data engineer", ("data engineer", "senior")),
+    ("Data Engineer III", ("data engineer", "senior")),
+    ("Software Engineer - Senior", ("software engineer", "senior")),
+    ("Senior Software Engineer (Backend)", ("software engineer backend", "senior")),
+    ("Jr Frontend Developer", ("frontend developer", "entry")),
+    ("Software Engineer I", ("software engineer", "entry")),
+    ("Mid-Level Data Analyst", ("data analyst", "mid")),
+    ("Entry-level Accountant", ("accountant", "entry")),
+    ("Lead Data Scientist", ("data scientist", "lead")),
+    ("Principal Machine Learning Engineer", ("machine learning engineer", "lead")),
+    ("Head of Data Science", ("data science", "lead")),
+    ("Staff Engineer", ("engineer", "lead")),
+    # Several seniority words: the highest wins, wherever it stands.
+    ("Senior Staff Engineer", ("engineer", "lead")),
+    ("Staff Senior Engineer", ("engineer", "lead")),
+    ("Senior Software Engineer II", ("software engineer", "senior")),
+    ("Junior Developer IV", ("developer", "lead")),
+    ("C# Developer", ("c# developer", "mid")),
+    ("", ("", "mid")),
+    ("Senior", ("", "senior")),
+])
+def test_role_key(title, key):
+    assert role_key(title) == key
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr("llm_router.HEDGING_ENABLED", False)
+    fake = install_fake_llm(FakeChatModel(latency=constant_latency(0), calls=[]))
+    store = MarketStandardsStore(str(tmp_path / "market_standards.sqlite3"), 60)
+    monkeypatch.setattr(market_standards, "market_standards", store)
+    return store, fake
+
+
+def test_warmed_profiles_are_found_by_lookup_titles(store):
+    store, fake = store
+    assert warm_up(["Data Engineer", "Sr. Data Engineer", "Lead Data Scientist"], ("senior", "lead")) == 4
+    assert store.stats()["entries"] == 4
+    calls = len(fake.calls)
+    for title in ("Senior Data Engineer", "Data Engineer III", "Staff Data Scientist", "Senior Staff Data Engineer"):
+        profile = store.profile(title)
+        assert (profile["role_family"], profile["seniority"]) == role_key(title)
+    assert len(fake.calls) == calls and store.counters["hits"] == 4
+
+
+def test_warm_up_skips_stored_profiles(store):
+    store, fake = store
+    assert warm_up(["Data Engineer"], ("mid",)) == 1
+    assert warm_up(["data engineer", "Data Engineer II"], ("mid",)) == 0
+    assert store.stats()["entries"] == 1
@@ -0,0 +1,26 @@
+import asyncio
+
+import httpx
+
+
+def get_metrics(headers: dict) -> httpx.Response:
+    from main import app
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/metrics", headers=headers)
+
+    return asyncio.run(get())
+
+
+def test_metrics_require_the_admin_token():
+    assert get_metrics({}).status_code == 401
+    assert get_metrics({"X-Admin-Token": "wrong"}).status_code == 401
+    response = get_metrics({"X-Admin-Token": "test"})
+    assert response.status_code == 200
+    assert {"admission", "llm", "worker", "memory"} <= set(response.json())
+
+
+def test_metrics_are_disabled_without_an_admin_token(monkeypatch):
+    monkeypatch.setattr("main.ADMIN_TOKEN", "")
+    assert get_metrics({"X-Admin-Token": ""}).status_code == 403
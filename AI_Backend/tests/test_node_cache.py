@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import node_cache
+from deadlines import Deadline, DeadlineExceeded
+
+STATE = {"job_description_ref": "jd-hash"}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(node_cache, "NODE_CACHE_ENABLED", True)
+    monkeypatch.setattr(node_cache, "node_cache", node_cache.NodeCache(str(tmp_path / "nodes.sqlite3"), 60))
+    return node_cache.node_cache
+
+
+def test_concurrent_runs_share_one_computation(cache):
+    calls = []
+
+    def parse_jd(state):
+        calls.append(1)
+        time.sleep(0.2)
+        return {"extracted_scoring_rules": {"skills": ["Python"]}}
+
+    run = node_cache.with_node_cache("jd_parser", parse_jd)
+    with ThreadPoolExecutor(4) as pool:
+        outputs = list(pool.map(run, [STATE] * 4))
+    assert len(calls) == 1
+    assert all(output == outputs[0] for output in outputs)
+    assert cache.coalesced["jd_parser"] == 3
+    # Stored: a later run reads it back.
+    assert run(STATE) == outputs[0] and len(calls) == 1
+
+
+def test_a_waiter_stops_at_its_own_deadline(cache, monkeypatch):
+    release = threading.Event()
+
+    def parse_jd(state):
+        release.wait(5)
+        return {"extracted_scoring_rules": {"skills": ["Python"]}}
+
+    run = node_cache.with_node_cache("jd_parser", parse_jd)
+    with ThreadPoolExecutor(1) as pool:
+        owner = pool.submit(run, STATE)
+        time.sleep(0.05)
+        monkeypatch.setattr(node_cache, "_deadline", lambda: Deadline(0.2))
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            run(STATE)
+        assert time.monotonic() - started < 1
+        release.set()
+        assert owner.result(timeout=5)
+
+
+def test_error_outputs_are_not_stored(cache):
+    run = node_cache.with_node_cache("jd_parser", lambda state: {"extracted_scoring_rules": {"error": "timeout"}})
+    run(STATE)
+    assert cache.stats()["entries"] == 0
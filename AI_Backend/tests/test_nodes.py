@@ -0,0 +1,36 @@
+import threading
+
+import nodes
+
+FIELDS = {"skills": ["Python"], "capability_evidence": [], "certifications": [], "education": [],
+          "work_experience": []}
+
+
+def test_agents_start_once_when_hedged_attempts_stream_together(monkeypatch):
+    started = []
+    monkeypatch.setattr(nodes, "speculate", lambda name, node_fn, state: started.append(name))
+    on_fields = nodes.start_agents_early({"role_name": "Engineer"})
+    barrier = threading.Barrier(8)
+
+    def attempt():
+        barrier.wait()
+        on_fields(dict(FIELDS))
+
+    threads = [threading.Thread(target=attempt) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(started) == ["culture_agent", "exp_agent", "tech_agent"]
+
+
+def test_an_agent_starts_once_its_fields_are_complete(monkeypatch):
+    started = []
+    monkeypatch.setattr(nodes, "speculate", lambda name, node_fn, state: started.append(name))
+    on_fields = nodes.start_agents_early({"role_name": "Engineer"})
+    on_fields({"work_experience": []})
+    assert started == []
+    on_fields({"work_experience": [], "education": []})
+    assert started == ["exp_agent"]
+    on_fields(dict(FIELDS))
+    assert sorted(started) == ["culture_agent", "exp_agent", "tech_agent"]
@@ -0,0 +1,51 @@
+import parsing
+from parsing import PAGE_BREAK, join_normalized, normalize_text
+
+
+def test_layout_is_preserved_by_default():
+    assert parsing.PRESERVE_LAYOUT
+
+
+def test_ligatures_become_letters():
+    assert normalize_text("Certiﬁed in ﬂuid workﬂows, eﬀective and eﬃcient", True) == \
+        "Certified in fluid workflows, effective and efficient"
+
+
+def test_a_word_hyphenated_across_a_line_break_is_joined():
+    assert normalize_text("Led the develop-\n  ment of a billing API", True) == "Led the development of a billing API"
+    assert normalize_text("Led the develop-\nment of a billing API") == "Led the development of a billing API"
+
+
+def test_hyphens_that_are_not_word_breaks_are_kept():
+    assert normalize_text("Front-\nEnd\nInitech, 2019-\n2021", True) == "Front-\nEnd\nInitech, 2019-\n2021"
+    assert normalize_text("Python - Go", True) == "Python - Go"
+
+
+def test_soft_hyphens_and_zero_width_spaces_are_dropped():
+    assert normalize_text("Kuber­netes and Ter​raform", True) == "Kubernetes and Terraform"
+
+
+def test_bullet_glyphs_become_one_bullet():
+    text = "SKILLS\n▪ Python\nGo\n  ●  Rust\n➢ SQL"
+    assert normalize_text(text, True) == "SKILLS\n• Python\n• Go\n• Rust\n• SQL"
+    assert normalize_text(text) == "SKILLS • Python • Go • Rust • SQL"
+
+
+def test_a_glyph_inside_a_line_is_not_a_bullet():
+    assert normalize_text("Python ▪ Go", True) == "Python ▪ Go"
+
+
+def test_whitespace_is_collapsed_within_lines_and_blocks_are_kept():
+    text = "Sam\t Lee \r\n sam@example.com\n\n\n  \nEXPERIENCE  \n Initech"
+    assert normalize_text(text, True) == "Sam Lee\nsam@example.com\n\nEXPERIENCE\nInitech"
+    assert normalize_text(text) == "Sam Lee sam@example.com EXPERIENCE Initech"
+
+
+def test_pages_are_joined_by_a_page_break_line_and_empty_pages_skipped():
+    pages = ["Sam Lee\nEXPERIENCE", "  \n", "SKILLS\nPython"]
+    assert join_normalized(pages, keep_layout=True) == f"Sam Lee\nEXPERIENCE\n{PAGE_BREAK}\nSKILLS\nPython"
+    assert join_normalized(pages) == "Sam Lee EXPERIENCE SKILLS Python"
+
+
+def test_empty_text():
+    assert normalize_text("", True) == normalize_text("") == join_normalized([]) == ""
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from benchmarks.documents import make_pdf
+from parsing import parse_pdf
+from pdf_triage import ImageOnlyPdf, _content_stats, triage_pdf
+
+
+def triage(data: bytes) -> dict:
+    return triage_pdf(PdfReader(io.BytesIO(data)))
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+@pytest.mark.parametrize("pages, kind", [
+    (("text", "text"), "text"),
+    (("image", "image"), "image_only"),
+    (("text", "image", "text"), "mixed"),
+])
+def test_documents_are_classified(pages, kind, compressed):
+    result = triage(make_pdf(pages=pages, compressed=compressed))
+    assert result["kind"] == kind
+    assert [page["kind"] for page in result["page_density"]] == [
+        {"text": "text", "image": "image"}[page] for page in pages]
+    assert result["complete"]
+
+
+def test_compressed_text_is_counted_like_plain_text():
+    plain, compressed = triage(make_pdf()), triage(make_pdf(compressed=True))
+    assert compressed["page_density"][0]["text_bytes"] == plain["page_density"][0]["text_bytes"] > 0
+
+
+def test_only_the_first_pages_are_inspected():
+    result = triage(make_pdf(pages=("image",) * 3 + ("text",)))
+    assert result["kind"] == "image_only"
+    assert (result["inspected"], result["pages"], result["complete"]) == (3, 4, False)
+
+
+def test_scanned_pdf_is_rejected_and_a_late_text_page_is_still_extracted():
+    with pytest.raises(ImageOnlyPdf):
+        parse_pdf(make_pdf(pages=("image",) * 2, compressed=True))
+    assert parse_pdf(make_pdf(pages=("image",) * 3 + ("text",)))
+
+
+def test_text_bytes_count_only_strings_inside_text_objects():
+    content = (b"(outside a text object) Tj\n"
+               b"BT /F1 10 Tf (Hello \\(world\\)) Tj <48 65 6c 6c 6f> Tj [(Kern) -120 (ed)] TJ ET\n"
+               b"BI /W 2 /H 2 /BPC 8 /CS /G ID \x00BT(x)ET\xff EI")
+    stats = _content_stats(content, None)
+    assert stats["text_bytes"] == len(b"Hello \\(world\\)") + 5 + len(b"Kern") + len(b"ed")
+    assert stats["images"] == 1
+
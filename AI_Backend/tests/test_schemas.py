@@ -0,0 +1,57 @@
+import pytest
+from pydantic import ValidationError
+
+from schemas import (CandidateFeedback, CompetencyEvaluation, ExtractionConfidence, FinalEvaluation,
+                     ResumeExtraction)
+
+EVALUATION = {"reasoning": "", "matched_competencies": [], "missing_competencies": []}
+
+
+@pytest.mark.parametrize("raw, score", [(150, 100), (-20, 0), (87.6, 88), ("85", 85), ("92%", 92), (" 40 ", 40)])
+def test_scores_are_clamped_and_coerced(raw, score):
+    assert CompetencyEvaluation.model_validate({**EVALUATION, "score": raw}).score == score
+
+
+@pytest.mark.parametrize("raw", [None, "high", ""])
+def test_unusable_scores_fail(raw):
+    with pytest.raises(ValidationError):
+        CompetencyEvaluation.model_validate({**EVALUATION, "score": raw})
+
+
+def test_category_scores_are_clamped():
+    final = FinalEvaluation.model_validate({"final_score": 101, "category_scores": {"competency": 250, "experience": -3}})
+    assert final.final_score == 100
+    assert final.category_scores == {"competency": 100, "experience": 0}
+
+
+@pytest.mark.parametrize("raw, confidence", [(0.8, 0.8), (80, 0.8), (95.5, 0.95), (250, 1.0), (-0.3, 0.0),
+                                             ("high", None), (None, None)])
+def test_confidences_are_normalised(raw, confidence):
+    assert ExtractionConfidence.model_validate({"email": raw}).email == confidence
+
+
+def test_extraction_normalises_its_fields():
+    profile = ResumeExtraction.model_validate({
+        "email": "  Ana@Example.COM ", "phone_number": "", "total_years_experience": "5+ years",
+        "skills": ["Python"], "education": [], "extraction_confidence": "n/a",
+        "work_experience": [{"company": None, "job_title": "Engineer", "description": "Engineer."}],
+    })
+    assert profile.email == "ana@example.com"
+    assert profile.phone_number is None
+    assert profile.total_years_experience == 5.0
+    assert profile.work_experience[0].company == ""
+    # A description that only repeats the title is cleared.
+    assert profile.work_experience[0].description == ""
+    assert profile.extraction_confidence.email is None
+
+
+def test_recommendation_case_is_normalised_and_others_rejected():
+    email = {"subject": "s", "body": "b"}
+    assert CandidateFeedback.model_validate({"recommendation": " maybe ", "feedback_email": email}).recommendation == "Maybe"
+    with pytest.raises(ValidationError):
+        CandidateFeedback.model_validate({"recommendation": "Strong hire", "feedback_email": email})
+
+
+def test_undeclared_keys_pass_through():
+    evaluation = CompetencyEvaluation.model_validate({**EVALUATION, "score": 70, "jd_role_mismatch": True})
+    assert evaluation.model_dump()["jd_role_mismatch"] is True
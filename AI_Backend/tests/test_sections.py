@@ -0,0 +1,75 @@
+from benchmarks.resumes import SAMPLE_RESUMES
+from parsing import PAGE_BREAK, join_normalized
+from sections import compact_resume, split_sections
+
+TWO_JOBS = """Sam Lee
+sam.lee@example.com
+
+EXPERIENCE
+Software Engineer
+Initech, 2021 – Present
+• Built the billing API
+
+Software Engineer
+Globex, 2018 – 2021
+• Ran the data pipeline
+
+SKILLS
+Python, Go"""
+
+
+def pages(*texts: str) -> str:
+    return join_normalized(texts, keep_layout=True)
+
+
+def test_a_repeated_job_title_is_kept():
+    compact, _ = compact_resume(TWO_JOBS)
+    assert compact.count("Software Engineer") == 2
+
+
+def test_a_repeated_job_title_across_pages_is_kept():
+    text = pages("Sam Lee\n\nEXPERIENCE\nSoftware Engineer\nInitech, 2021 – Present\n• Built the billing API",
+                 "Software Engineer\nGlobex, 2018 – 2021\n• Ran the data pipeline\n\nSKILLS\nPython")
+    compact, _ = compact_resume(text)
+    assert compact.count("Software Engineer") == 2
+
+
+def test_a_running_header_and_footer_are_kept_once():
+    text = pages("Sam Lee — Resume\n\nEXPERIENCE\nInitech, 2021 – Present\n• Built the billing API\n\n"
+                 "Confidential\nPage 1 of 3",
+                 "Sam Lee — Resume\n\nGlobex, 2018 – 2021\n• Ran the data pipeline\n\nConfidential\nPage 2 of 3",
+                 "Sam Lee — Resume\n\nSKILLS\nPython, Go\n\nConfidential\nPage 3 of 3")
+    compact, _ = compact_resume(text)
+    assert compact.count("Sam Lee — Resume") == 1
+    assert compact.count("Confidential") == 1
+    assert "Page" not in compact and PAGE_BREAK not in compact
+    assert "Globex, 2018 – 2021" in compact and "Python, Go" in compact
+
+
+def test_a_line_repeated_on_fewer_pages_than_the_minimum_is_kept(monkeypatch):
+    monkeypatch.setattr("sections.REPEATED_LINE_MIN_PAGES", 3)
+    text = pages("Sam Lee — Resume\n\nEXPERIENCE\nInitech, 2021 – Present",
+                 "Sam Lee — Resume\n\nSKILLS\nPython, Go")
+    compact, _ = compact_resume(text)
+    assert compact.count("Sam Lee — Resume") == 2
+
+
+def test_blank_lines_between_entries_are_kept():
+    compact, _ = compact_resume(TWO_JOBS)
+    assert "• Built the billing API\n\nSoftware Engineer\nGlobex" in compact
+    experience = next(s for s in split_sections(TWO_JOBS) if s["kind"] == "experience")
+    assert experience["lines"].count("") == 1
+
+
+def test_sample_resumes_keep_their_facts_and_lose_the_noise():
+    for name, sample in SAMPLE_RESUMES.items():
+        compact, report = compact_resume(sample["text"])
+        assert report["applied"], name
+        assert all(fact in compact for fact in sample["required"]), name
+        assert not any(noise in compact for noise in sample["irrelevant"]), name
+
+
+def test_text_without_headers_is_unchanged():
+    text = "Sam Lee, engineer at Initech since 2021, Python and Go."
+    assert compact_resume(text) == (text, {"chars_before": len(text), "chars_after": len(text),
+                                           "sections": [], "applied": False})
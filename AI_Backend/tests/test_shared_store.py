@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from shared_store import MemoryStore, SqliteStore, open_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == "memory" else SqliteStore(str(tmp_path / "shared_store.sqlite3"))
+
+
+def test_counters(store):
+    assert store.incr("requests") == 1
+    assert store.incr("requests", 4) == 5
+    assert int(store.get("requests")) == 5
+    store.delete("requests")
+    assert store.get("requests") is None
+
+
+def test_counter_expires_with_the_window_it_was_created_in(store):
+    store.incr("window", ttl=0.2)
+    assert store.incr("window", ttl=0.2) == 2
+    assert store.expires_at("window") > time.time()
+    time.sleep(0.3)
+    assert store.get("window") is None
+    assert store.incr("window", ttl=0.2) == 1
+
+
+def test_concurrent_increments_are_not_lost(store):
+    def count():
+        for _ in range(200):
+            store.incr("hits")
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert int(store.get("hits")) == 1600
+
+
+def test_set_if_absent(store):
+    assert store.set("key", "first", nx=True)
+    assert not store.set("key", "second", nx=True)
+    assert store.get("key") == "first"
+    store.set("expiring", "value", ttl=0.1)
+    time.sleep(0.2)
+    assert store.set("expiring", "again", nx=True)
+
+
+def test_logs(store):
+    sequences = [store.append("log", f"entry {number}") for number in range(5)]
+    assert sequences == sorted(sequences)
+    assert [value for _, value in store.read("log", after=sequences[1])] == ["entry 2", "entry 3", "entry 4"]
+    store.trim("log", sequences[2])
+    assert [value for _, value in store.read("log")] == ["entry 3", "entry 4"]
+
+
+def test_sqlite_counters_are_shared_between_workers(tmp_path):
+    # One connection per worker process.
+    path = str(tmp_path / "shared_store.sqlite3")
+    workers = [open_store(f"sqlite:///{path}") for _ in range(3)]
+    for worker in workers:
+        worker.incr("ratelimit:client", ttl=60)
+    assert all(int(worker.get("ratelimit:client")) == 3 for worker in workers)
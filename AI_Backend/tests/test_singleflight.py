@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.fake_llm import SAMPLE_JD, SAMPLE_RESUME, SAMPLE_ROLE, FakeChatModel, constant_latency, install_fake_llm
+from shared_store import MemoryStore, SqliteStore
+from singleflight import COALESCED, EXECUTED, REPLAYED, IdempotencyConflict, SingleFlight
+
+
+@pytest.fixture(params=["local", "memory", "sqlite"])
+def flight(request, tmp_path):
+    stores = {"local": lambda: None, "memory": MemoryStore,
+              "sqlite": lambda: SqliteStore(str(tmp_path / "shared_store.sqlite3"))}
+    return SingleFlight(result_ttl=60, store=stores[request.param]())
+
+
+def evaluation(runs: list, tag: str, seconds: float = 0.05):
+    async def run():
+        runs.append(tag)
+        await asyncio.sleep(seconds)
+        return {"tag": tag}
+    return run
+
+
+def test_concurrent_identical_calls_share_one_run(flight):
+    runs = []
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("inputs", evaluation(runs, "a")) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert runs == ["a"]
+    assert [result for result, _ in results] == [{"tag": "a"}] * 5
+    assert sorted(source for _, source in results) == [COALESCED] * 4 + [EXECUTED]
+
+
+def test_idempotency_key_replays_the_result(flight):
+    runs = []
+
+    async def scenario():
+        first = await flight.do("inputs", evaluation(runs, "a"), idempotency_key="retry")
+        replay = await flight.do("inputs", evaluation(runs, "b"), idempotency_key="retry")
+        return first, replay
+
+    first, replay = asyncio.run(scenario())
+    assert runs == ["a"]
+    assert replay == ({"tag": "a"}, REPLAYED)
+
+
+def test_concurrent_reuse_of_key_with_other_inputs_conflicts_at_once(flight):
+    runs = []
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("inputs", evaluation(runs, "a", 0.2), idempotency_key="key"))
+        await asyncio.sleep(0.01)
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(IdempotencyConflict):
+            await flight.do("other inputs", evaluation(runs, "b"), idempotency_key="key")
+        waited = asyncio.get_running_loop().time() - started
+        assert not leader.done()
+        await leader
+        return waited
+
+    assert asyncio.run(scenario()) < 0.1
+    assert runs == ["a"]
+
+
+def test_failed_run_frees_the_key(flight):
+    runs = []
+
+    async def failing():
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await flight.do("inputs", failing, idempotency_key="key")
+        return await flight.do("other inputs", evaluation(runs, "b"), idempotency_key="key")
+
+    assert asyncio.run(scenario()) == ({"tag": "b"}, EXECUTED)
+
+
+def test_rejected_result_is_not_replayed(flight):
+    flight.replayable = lambda result: result["tag"] != "partial"
+    runs = []
+
+    async def scenario():
+        first = await flight.do("inputs", evaluation(runs, "partial"), idempotency_key="retry")
+        retry = await flight.do("inputs", evaluation(runs, "full"), idempotency_key="retry")
+        replay = await flight.do("inputs", evaluation(runs, "again"), idempotency_key="retry")
+        return first, retry, replay
+
+    first, retry, replay = asyncio.run(scenario())
+    assert runs == ["partial", "full"]
+    assert retry == ({"tag": "full"}, EXECUTED)
+    assert replay == ({"tag": "full"}, REPLAYED)
+
+
+def test_run_is_cancelled_once_every_waiter_left():
+    flight = SingleFlight()
+
+    async def scenario():
+        started, stopped = asyncio.Event(), asyncio.Event()
+
+        async def run():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flight.do("inputs", run)) for _ in range(2)]
+        await started.wait()
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        assert not stopped.is_set()
+        waiters[1].cancel()
+        await asyncio.wait_for(stopped.wait(), 1)
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_endpoint_reports_a_replay_apart_from_coalescing(monkeypatch):
+    from main import app
+    monkeypatch.setattr("llm_router.HEDGING_ENABLED", False)
+    install_fake_llm(FakeChatModel(latency=constant_latency(0)))
+    form = {"raw_text": SAMPLE_RESUME, "job_description": SAMPLE_JD, "role_name": SAMPLE_ROLE,
+            "idempotency_key": "endpoint-replay"}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.post("/analyze/graph", data=form)
+            replay = await client.post("/analyze/graph", data=form)
+            # allow_partial is one of the inputs the key stands for.
+            partial = await client.post("/analyze/graph", data={**form, "allow_partial": "true"})
+            return first, replay, partial
+
+    first, replay, partial = asyncio.run(scenario())
+    assert first.status_code == 200 and "X-Idempotent-Replay" not in first.headers
+    assert replay.headers["X-Idempotent-Replay"] == "true" and "X-Evaluation-Coalesced" not in replay.headers
+    assert replay.json()["evaluation_id"] == first.json()["evaluation_id"]
+    assert partial.status_code == 409
@@ -0,0 +1,109 @@
+import os
+import random
+import threading
+
+import pytest
+
+from benchmarks.skill_index import QUERIES, linear_scan, synthetic_profiles
+from shared_store import SqliteStore
+from skill_index import QuerySyntaxError, SkillIndex, parse_query, profile_terms
+
+CANDIDATES = 3000
+
+
+def assert_matches_scan(index: SkillIndex, documents: dict):
+    for query in QUERIES:
+        found = index.search(query, limit=len(documents))
+        assert sorted(found["candidate_ids"]) == sorted(linear_scan(parse_query(query), documents)), query
+        assert found["total"] == len(found["candidate_ids"])
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    index = SkillIndex(str(tmp_path / "skill_index.npz"), snapshot_every=0)
+    documents = {}
+    for number, profile in enumerate(synthetic_profiles(CANDIDATES)):
+        index.add(f"cand-{number}", profile)
+        documents[f"cand-{number}"] = (profile_terms(profile), profile["total_years_experience"])
+    return index, documents
+
+
+def test_queries_match_a_linear_scan(indexed):
+    assert_matches_scan(*indexed)
+
+
+def test_reindexed_and_removed_candidates(indexed):
+    index, documents = indexed
+    rng = random.Random(3)
+    for number in rng.sample(range(CANDIDATES), CANDIDATES // 2):
+        profile = next(synthetic_profiles(1, seed=number + 1_000_000))
+        index.add(f"cand-{number}", profile)
+        documents[f"cand-{number}"] = (profile_terms(profile), profile["total_years_experience"])
+    for number in rng.sample(range(CANDIDATES), 100):
+        assert index.remove(f"cand-{number}") == (f"cand-{number}" in documents)
+        documents.pop(f"cand-{number}", None)
+    assert_matches_scan(index, documents)
+
+
+def test_snapshot_restores_the_same_answers(indexed):
+    index, documents = indexed
+    index.snapshot()
+    assert_matches_scan(SkillIndex(index.path, snapshot_every=0), documents)
+
+
+def test_workers_sharing_a_log_see_each_others_updates(tmp_path):
+    log = SqliteStore(str(tmp_path / "shared_store.sqlite3"))
+    path = str(tmp_path / "skill_index.npz")
+    first, second = SkillIndex(path, 0, log), SkillIndex(path, 0, SqliteStore(log.path))
+    first.add("cand-1", {"skills": ["Python", "Kubernetes"], "total_years_experience": 6})
+    second.add("cand-2", {"skills": ["Python"], "total_years_experience": 2})
+    for index in (first, second):
+        assert sorted(index.search("Python")["candidate_ids"]) == ["cand-1", "cand-2"]
+        assert index.search("Python AND Kubernetes AND 5+ years")["candidate_ids"] == ["cand-1"]
+
+
+def test_workers_snapshotting_at_once_do_not_clash(tmp_path):
+    log = SqliteStore(str(tmp_path / "shared_store.sqlite3"))
+    path = str(tmp_path / "skill_index.npz")
+    workers = [SkillIndex(path, 0, SqliteStore(log.path)) for _ in range(4)]
+    for number, profile in enumerate(synthetic_profiles(200)):
+        workers[number % 4].add(f"cand-{number}", profile)
+    barrier = threading.Barrier(len(workers))
+    errors = []
+
+    def snapshot(index):
+        barrier.wait()
+        try:
+            for _ in range(5):
+                index.snapshot()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=snapshot, args=(index,)) for index in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    # A restarted worker loads the last snapshot and replays the log entries after it.
+    restored = SkillIndex(path, 0, SqliteStore(log.path))
+    assert restored.search("Python", limit=200)["total"] == workers[0].search("Python", limit=200)["total"]
+
+
+def test_a_failed_snapshot_leaves_no_temporary_file(indexed, monkeypatch):
+    index, _ = indexed
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("skill_index.np.savez", fail)
+    with pytest.raises(OSError):
+        index.snapshot()
+    assert os.listdir(os.path.dirname(index.path)) == []
+
+
+@pytest.mark.parametrize("query", ["", "Python AND", "(Python OR Go", "Python )", "cert:"])
+def test_invalid_queries_are_rejected(query):
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import tracing
+from tracing import SpanExporter, TraceRequests, load_spans, parse_traceparent, start_span
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "traces.jsonl")
+    monkeypatch.setattr(tracing, "TRACE_FILE", path)
+    monkeypatch.setattr(tracing, "TRACE_EXPORTER", "file")
+    monkeypatch.setattr(tracing, "exporter", SpanExporter("file"))
+    return path
+
+
+def exported(path: str) -> list:
+    tracing.exporter.flush()
+    return load_spans((path,))
+
+
+def test_a_valid_traceparent_is_parsed():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f" 00-{TRACE_ID.upper()}-{PARENT_ID}-03 ") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+
+
+@pytest.mark.parametrize("header", [
+    None, "", "garbage", f"00-{TRACE_ID}-{PARENT_ID}", f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",
+    f"ff-{TRACE_ID}-{PARENT_ID}-01", f"00-{'0' * 32}-{PARENT_ID}-01", f"00-{TRACE_ID}-{'0' * 16}-01",
+    f"00-{TRACE_ID}-{PARENT_ID}-01-extra",
+])
+def test_an_invalid_traceparent_is_ignored(header):
+    assert parse_traceparent(header) is None
+
+
+def test_child_spans_continue_the_trace(trace_file):
+    assert tracing.current_span() is None
+    with start_span("untraced") as span:
+        assert span is None
+    with start_span("POST /analyze/graph", "server", parent=(TRACE_ID, PARENT_ID, True)) as server:
+        with start_span("node extractor", attributes={"retry.attempt": 0}) as node:
+            assert tracing.current_span() is node
+    assert (node.trace_id, node.parent_id) == (TRACE_ID, server.span_id)
+    assert server.parent_id == PARENT_ID and server.traceparent == f"00-{TRACE_ID}-{server.span_id}-01"
+    assert {span["name"] for span in exported(trace_file)} == {"POST /analyze/graph", "node extractor"}
+
+
+def test_unsampled_spans_are_not_exported(trace_file):
+    with start_span("POST /analyze/graph", "server", parent=(TRACE_ID, PARENT_ID, False)) as server:
+        with start_span("node extractor") as node:
+            assert not node.sampled
+    assert server.traceparent.endswith("-00")
+    assert exported(trace_file) == []
+
+
+def test_an_error_is_recorded_on_the_span(trace_file):
+    with pytest.raises(ValueError):
+        with start_span("graph", parent=(TRACE_ID, PARENT_ID, True)):
+            raise ValueError("bad JSON")
+    [span] = exported(trace_file)
+    assert span["status"] == {"code": 2, "message": "ValueError: bad JSON"}
+
+
+def test_spans_are_written_as_otlp_json(trace_file):
+    attributes = {"gen_ai.usage.input_tokens": 812, "llm.hedge": True, "llm.latency_s": 0.25,
+                  "llm.models": ["llama-3.3-70b", "llama-3.1-8b"], "graph.node": "extractor", "ignored": None}
+    with start_span("llm extractor", "client", attributes, parent=(TRACE_ID, PARENT_ID, True)) as span:
+        pass
+    # Exported in batches, not per span.
+    assert not os.path.exists(trace_file) and tracing.exporter.stats()["queued"] == 1
+    tracing.exporter.flush()
+    with open(trace_file, encoding="utf-8") as f:
+        [line] = f.read().splitlines()
+    [resource] = json.loads(line)["resourceSpans"]
+    assert resource["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": tracing.TRACE_SERVICE_NAME}}]
+    [scope] = resource["scopeSpans"]
+    assert scope["scope"] == {"name": "talentscan.tracing"}
+    [otlp] = scope["spans"]
+    assert otlp["traceId"] == TRACE_ID and otlp["spanId"] == span.span_id and otlp["parentSpanId"] == PARENT_ID
+    assert otlp["kind"] == 3 and otlp["name"] == "llm extractor"
+    assert otlp["startTimeUnixNano"] == str(span.start_ns) and otlp["endTimeUnixNano"] == str(span.end_ns)
+    assert otlp["attributes"] == [
+        {"key": "gen_ai.usage.input_tokens", "value": {"intValue": "812"}},
+        {"key": "llm.hedge", "value": {"boolValue": True}},
+        {"key": "llm.latency_s", "value": {"doubleValue": 0.25}},
+        {"key": "llm.models", "value": {"arrayValue": {"values": [{"stringValue": "llama-3.3-70b"},
+                                                                  {"stringValue": "llama-3.1-8b"}]}}},
+        {"key": "graph.node", "value": {"stringValue": "extractor"}},
+    ]
+    assert "status" not in otlp
+    assert tracing.exporter.stats()["exported"] == 1
+
+
+def test_spans_are_posted_to_the_otlp_endpoint(monkeypatch):
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.path, self.headers["Content-Type"],
+                             json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        monkeypatch.setattr(tracing, "TRACE_OTLP_ENDPOINT", f"http://127.0.0.1:{server.server_port}/v1/traces")
+        monkeypatch.setattr(tracing, "exporter", SpanExporter("otlp"))
+        with start_span("graph", parent=(TRACE_ID, PARENT_ID, True)):
+            pass
+        tracing.exporter.flush()
+    finally:
+        server.shutdown()
+    [(path, content_type, body)] = received
+    assert path == "/v1/traces" and content_type == "application/json"
+    assert body["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"] == TRACE_ID
+
+
+def request(headers: dict) -> httpx.Response:
+    api = FastAPI()
+
+    @api.post("/evaluations/{evaluation_id}/resume")
+    async def resume(evaluation_id: str):
+        return {"evaluation_id": evaluation_id}
+
+    async def post():
+        transport = httpx.ASGITransport(app=TraceRequests(api))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/evaluations/abc/resume", headers=headers)
+
+    return asyncio.run(post())
+
+
+def test_the_callers_trace_is_continued(trace_file):
+    response = request({"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    assert response.headers["x-trace-id"] == TRACE_ID
+    [span] = exported(trace_file)
+    assert response.headers["traceresponse"] == f"00-{TRACE_ID}-{span['spanId']}-01"
+    assert span["parentSpanId"] == PARENT_ID and span["kind"] == 2
+    # Named by the route template, not the concrete path.
+    assert span["name"] == "POST /evaluations/{evaluation_id}/resume"
+    assert span["attributes"]["http.response.status_code"] == "200"
+
+
+def test_an_unsampled_caller_is_continued_but_not_exported(trace_file):
+    response = request({"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+    assert response.headers["x-trace-id"] == TRACE_ID
+    assert response.headers["traceresponse"].endswith("-00")
+    assert exported(trace_file) == []
+
+
+def test_an_invalid_traceparent_starts_a_new_trace(trace_file, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    response = request({"traceparent": f"00-{'0' * 32}-{PARENT_ID}-01"})
+    trace_id = response.headers["x-trace-id"]
+    assert len(trace_id) == 32 and trace_id != "0" * 32
+    [span] = exported(trace_file)
+    assert span["traceId"] == trace_id and "parentSpanId" not in span
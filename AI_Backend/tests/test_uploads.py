@@ -0,0 +1,83 @@
+import asyncio
+import tempfile
+
+import httpx
+import pytest
+from starlette.datastructures import UploadFile
+
+from uploads import MAX_UPLOAD_BYTES, MappedUpload, upload_buffer
+
+BOUNDARY = "talentscan-test"
+FORM = {"job_description": "Python developer", "role_name": "Backend Engineer"}
+
+
+def multipart(size: int) -> bytes:
+    fields = b"".join(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+                      for name, value in FORM.items())
+    head = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="resume.pdf"\r\n'
+            f"Content-Type: application/pdf\r\n\r\n").encode()
+    return fields + head + b"x" * size + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def post(content, headers: dict = None) -> httpx.Response:
+    from main import app
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post("/analyze/graph", content=content, headers=headers)
+
+
+def test_an_upload_over_the_limit_with_content_length_is_rejected_unread():
+    sent = []
+
+    async def body():
+        sent.append(1)
+        yield multipart(MAX_UPLOAD_BYTES + 1)
+
+    body_bytes = multipart(MAX_UPLOAD_BYTES + 1)
+    response = asyncio.run(post(body_bytes))
+    assert response.status_code == 413
+    assert "limit" in response.json()["detail"]
+    # Declared length alone: the streamed body is never pulled.
+    response = asyncio.run(post(body(), {"Content-Length": str(len(body_bytes))}))
+    assert response.status_code == 413 and not sent
+
+
+def test_an_upload_over_the_limit_without_content_length_is_cut_off():
+    data = multipart(MAX_UPLOAD_BYTES + 2 * 1024 * 1024)
+    chunk = 256 * 1024
+    sent = []
+
+    async def chunked():
+        for start in range(0, len(data), chunk):
+            sent.append(chunk)
+            yield data[start:start + chunk]
+
+    response = asyncio.run(post(chunked()))
+    assert response.status_code == 413
+    assert "content-length" not in {name.lower() for name in response.request.headers}
+    # Stopped at the first chunk past the limit, not at the end of the body.
+    assert sum(sent) <= MAX_UPLOAD_BYTES + chunk < len(data)
+
+
+def spooled_upload(data: bytes, max_size: int) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_size)
+    spooled.write(data)
+    return UploadFile(spooled, size=len(data), filename="resume.pdf")
+
+
+def test_a_rolled_over_upload_is_mapped_and_the_map_closed_on_error():
+    upload = spooled_upload(b"%PDF" + b"x" * 4096, max_size=1024)
+    with pytest.raises(ValueError):
+        with upload_buffer(upload) as source:
+            assert isinstance(source, MappedUpload)
+            assert source.read(4) == b"%PDF"
+            raise ValueError("parser failed")
+    assert source.closed
+    upload.file.close()
+
+
+def test_a_small_upload_is_read_from_its_own_buffer():
+    upload = spooled_upload(b"%PDF small", max_size=1024)
+    with upload_buffer(upload) as source:
+        assert source is upload.file and source.read() == b"%PDF small"
+    upload.file.close()
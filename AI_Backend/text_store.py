@@ -0,0 +1,54 @@
+import hashlib
+import threading
+from typing import Optional
+
+# Content-addressed side store for the resume and JD texts of in-flight evaluations.
+# Graph state only carries the sha256 reference, so the checkpointer serializes a
+# 64-character key at each superstep instead of the full document.
+_texts: dict = {}
+_refcounts: dict = {}
+_lock = threading.Lock()
+
+
+def text_ref(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def put_text(text: str) -> str:
+    """Stores text once and returns its reference. Identical texts share one entry.
+    """
+    ref = text_ref(text)
+    with _lock:
+        if ref not in _texts:
+            _texts[ref] = text
+        _refcounts[ref] = _refcounts.get(ref, 0) + 1
+    return ref
+
+
+def get_text(ref: Optional[str]) -> str:
+    if not ref:
+        return ""
+    return _texts.get(ref, "")
+
+
+def release_text(ref: Optional[str]) -> None:
+    """Drops one holder of the text; the entry is freed when nobody holds it.
+    """
+    if not ref:
+        return
+    with _lock:
+        remaining = _refcounts.get(ref, 0) - 1
+        if remaining > 0:
+            _refcounts[ref] = remaining
+        else:
+            _refcounts.pop(ref, None)
+            _texts.pop(ref, None)
+
+
+def store_stats() -> dict:
+    with _lock:
+        return {
+            "entries": len(_texts),
+            "holders": sum(_refcounts.values()),
+            "chars": sum(len(text) for text in _texts.values()),
+        }
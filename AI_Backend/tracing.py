@@ -0,0 +1,355 @@
+import argparse
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import Counter
+from typing import Optional
+
+# Distributed tracing of evaluations. A W3C traceparent header from the caller
+# (the NestJS backend) is continued, otherwise a trace is started; the server
+# span of the request gets children for the graph run, every node attempt,
+# every LLM call (with tokens, hedge, fallback and JSON outcome) and
+# speculative agent starts. Finished spans are exported in batches as OTLP/JSON,
+# either appended to TRACE_FILE (one ExportTraceServiceRequest per line, the
+# format of the OpenTelemetry Collector's file exporter and otlpjsonfile
+# receiver) or posted to a local collector's OTLP/HTTP endpoint. No SDK or
+# external service is needed.
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # file | otlp | none; tracing is opt-in
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join("data", "traces.jsonl"))
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(50 * 2**20)))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+# Share of requests without a sampled parent that are traced.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "talentscan-ai-backend")
+TRACE_EXPORT_INTERVAL_SECONDS = float(os.getenv("TRACE_EXPORT_INTERVAL_SECONDS", "2"))
+
+EXPORT_BATCH_SPANS = 512
+MAX_QUEUED_SPANS = 20000
+TRACED_PATHS = ("/analyze/", "/evaluations/", "/rescore/", "/candidates/")
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    """One timed operation of a trace; attributes are set while it is open."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "sampled", "start_ns", "end_ns",
+                 "attributes", "status", "children")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {}
+        self.status = None
+        # Node spans started under this one per node, for retry attempt numbers.
+        self.children = Counter()
+
+    def set_attribute(self, key: str, value):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = (2, f"{type(error).__name__}: {error}"[:500])
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status:
+            span["status"] = {"code": self.status[0], "message": self.status[1]}
+        return span
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter:
+    """Queues finished spans and exports them from a background thread in batches."""
+
+    def __init__(self, exporter: str):
+        self.exporter = exporter
+        self._queue = queue.Queue(MAX_QUEUED_SPANS)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.counters = Counter()
+
+    def submit(self, span: Span):
+        if self.exporter == "none":
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.counters["dropped"] += 1
+            return
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(TRACE_EXPORT_INTERVAL_SECONDS)
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            while True:
+                batch = []
+                while len(batch) < EXPORT_BATCH_SPANS:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                self._export(batch)
+
+    def _export(self, batch: list):
+        body = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "talentscan.tracing"}, "spans": [span.to_otlp() for span in batch]}],
+        }]}, default=str)
+        try:
+            if self.exporter == "otlp":
+                request = urllib.request.Request(TRACE_OTLP_ENDPOINT, data=body.encode("utf-8"), method="POST",
+                                                 headers={"Content-Type": "application/json"})
+                urllib.request.urlopen(request, timeout=5).close()
+            else:
+                self._append(body)
+        except Exception as e:
+            self.counters["failed_exports"] += 1
+            self.counters["dropped"] += len(batch)
+            print(f"[TRACING] Export of {len(batch)} spans failed: {e}")
+            return
+        self.counters["exported"] += len(batch)
+        self.counters["batches"] += 1
+
+    def _append(self, line: str):
+        if os.path.dirname(TRACE_FILE):
+            os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+        # One rotated file is kept, so traces take at most twice TRACE_FILE_MAX_BYTES.
+        if os.path.exists(TRACE_FILE) and os.path.getsize(TRACE_FILE) + len(line) > TRACE_FILE_MAX_BYTES:
+            os.replace(TRACE_FILE, TRACE_FILE + ".1")
+            self.counters["rotations"] += 1
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def stats(self) -> dict:
+        return {"exporter": self.exporter, "sample_rate": TRACE_SAMPLE_RATE, "queued": self._queue.qsize(),
+                **self.counters}
+
+
+exporter = SpanExporter(TRACE_EXPORTER)
+atexit.register(exporter.flush)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent span id, sampled) of a valid W3C traceparent header, else None."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if match is None or match.group(1) == "ff" or set(match.group(2)) == {"0"} or set(match.group(3)) == {"0"}:
+        return None
+    return match.group(2), match.group(3), int(match.group(4), 16) & 1 == 1
+
+
+@contextlib.contextmanager
+def start_span(name: str, kind: str = "internal", attributes: Optional[dict] = None, parent=None):
+    """Opens a child of the current span (or of parent, a parsed traceparent) and
+    makes it current. Yields None when the request is not traced.
+    """
+    if parent is None:
+        current = _current.get()
+        if current is None:
+            yield None
+            return
+        span = Span(name, kind, current.trace_id, current.span_id, current.sampled)
+    else:
+        trace_id, parent_id, sampled = parent
+        span = Span(name, kind, trace_id, parent_id, sampled)
+    for key, value in (attributes or {}).items():
+        span.set_attribute(key, value)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        if span.sampled:
+            exporter.submit(span)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attribute(key: str, value):
+    """Sets an attribute on the current span, if the request is traced."""
+    span = _current.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+def with_tracing(node_name: str, node_fn):
+    """Wraps a graph node in a span per attempt when its request is traced; LangGraph
+    retries of the node are numbered in retry.attempt.
+    """
+    def run(state, config):
+        parent = _current.get()
+        if parent is None:
+            return node_fn(state, config)
+        parent.children[node_name] += 1
+        attributes = {"graph.node": node_name, "retry.attempt": parent.children[node_name] - 1}
+        with start_span(f"node {node_name}", attributes=attributes):
+            return node_fn(state, config)
+
+    # Not functools.wraps: LangGraph inspects the signature to decide whether to pass config.
+    run.__name__ = node_fn.__name__
+    return run
+
+
+class TraceRequests:
+    """ASGI middleware that opens the server span of the evaluation and search
+    endpoints, continuing the caller's traceparent. The response carries the
+    trace id in X-Trace-Id and the server span in traceresponse.
+    """
+
+    def __init__(self, app, paths=TRACED_PATHS):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths) or TRACE_EXPORTER == "none":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        if parent is None:
+            parent = (os.urandom(16).hex(), None, random.random() < TRACE_SAMPLE_RATE)
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"],
+                      "client.address": (scope.get("client") or ("",))[0]}
+        with start_span(f"{scope['method']} {scope['path']}", "server", attributes, parent=parent) as span:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-trace-id", span.trace_id.encode("latin-1")),
+                        (b"traceresponse", span.traceparent.encode("latin-1"))]
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = (2, f"HTTP {message['status']}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                # The route template keeps span names low-cardinality (/evaluations/{evaluation_id}/resume).
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
+
+
+def load_spans(paths=(TRACE_FILE + ".1", TRACE_FILE)) -> list:
+    """Spans of an OTLP/JSON trace file (and its rotated predecessor) as flat dicts."""
+    spans = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                for resource in json.loads(line)["resourceSpans"]:
+                    for scope in resource["scopeSpans"]:
+                        for span in scope["spans"]:
+                            spans.append({
+                                **span,
+                                "attributes": {a["key"]: next(iter(a["value"].values())) for a in span["attributes"]},
+                                "duration_ms": (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6,
+                            })
+    return spans
+
+
+def print_trace(spans: list, trace_id: str):
+    spans = sorted((span for span in spans if span["traceId"] == trace_id),
+                   key=lambda span: int(span["startTimeUnixNano"]))
+    if not spans:
+        print(f"No spans for trace {trace_id}")
+        return
+    ids = {span["spanId"] for span in spans}
+    children = {}
+    for span in spans:
+        children.setdefault(span.get("parentSpanId") if span.get("parentSpanId") in ids else None, []).append(span)
+    origin = int(spans[0]["startTimeUnixNano"])
+    labels = {"cache.status": "cache", "retry.attempt": "retry", "llm.hedge": "hedge", "llm.fallback": "fallback",
+              "gen_ai.usage.input_tokens": "in", "gen_ai.usage.output_tokens": "out", "llm.json.outcome": "json",
+              "speculation.reused": "reused", "http.response.status_code": "status"}
+
+    def show(span, depth):
+        notes = ", ".join(f"{label}={span['attributes'][key]}" for key, label in labels.items()
+                          if span["attributes"].get(key) not in (None, "0", False))
+        error = f"  ERROR {span['status'].get('message', '')}" if span.get("status", {}).get("code") == 2 else ""
+        offset = (int(span["startTimeUnixNano"]) - origin) / 1e6
+        print(f"{offset:>9.1f} ms {span['duration_ms']:>9.1f} ms  {'  ' * depth}{span['name']}"
+              f"{'  (' + notes + ')' if notes else ''}{error}")
+        for child in children.get(span["spanId"], []):
+            show(child, depth + 1)
+
+    for root in children.get(None, []):
+        show(root, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show traces from the local trace file.")
+    parser.add_argument("trace_id", nargs="?", help="print this trace as a tree; omitted: list the latest traces")
+    parser.add_argument("--file", default=TRACE_FILE)
+    parser.add_argument("--last", type=int, default=20)
+    args = parser.parse_args()
+    spans = load_spans((args.file + ".1", args.file))
+    if args.trace_id:
+        print_trace(spans, args.trace_id.lower())
+        return
+    ids = {span["spanId"] for span in spans}
+    roots = [span for span in spans if span.get("parentSpanId") not in ids]
+    for root in sorted(roots, key=lambda span: int(span["startTimeUnixNano"]))[-args.last:]:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(int(root["startTimeUnixNano"]) / 1e9))
+        print(f"{started}  {root['traceId']}  {root['duration_ms']:>9.1f} ms  {root['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import contextlib
+import mmap
+import os
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+# Resume uploads are streamed by the multipart parser into a SpooledTemporaryFile
+# (in memory up to 1 MB, then on disk). The request body is counted while it is
+# received and the request fails with 413 as soon as it passes MAX_UPLOAD_BYTES,
+# so an oversized or endless upload is never read, let alone buffered, in full.
+# The limit covers the whole multipart body, form fields included.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_PATHS = ("/analyze/graph",)
+
+
+def too_large_detail() -> str:
+    return f"Upload exceeds the {MAX_UPLOAD_BYTES // 1024} KB limit."
+
+
+class UploadSizeLimit:
+    """ASGI middleware that enforces MAX_UPLOAD_BYTES on the upload endpoints.
+
+    A declared Content-Length over the limit is rejected before any byte is read;
+    chunked or understated bodies are cut off at the first chunk past the limit.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES, paths=UPLOAD_PATHS):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length", b"").decode("latin-1")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            print(f"[UPLOAD] Rejected {declared}-byte body before reading it")
+            response = JSONResponse({"detail": too_large_detail()}, status_code=413,
+                                    headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    print(f"[UPLOAD] Aborted upload after {received} bytes")
+                    # Raised inside the endpoint's form parsing, so FastAPI turns it into the response.
+                    raise HTTPException(413, too_large_detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class MappedUpload(mmap.mmap):
+    """A read-only map of an upload; mmap is file-like but only reports itself
+    seekable from Python 3.13, and zipfile (DOCX) checks.
+    """
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+
+@contextlib.contextmanager
+def upload_buffer(upload: UploadFile):
+    """Yields a seekable, read-only view of the spooled upload without copying it.
+
+    A file rolled over to disk is memory-mapped, so the parser pages in only what
+    it reads; a small upload still held in memory is read from its own buffer.
+    """
+    spooled = upload.file
+    # SpooledTemporaryFile.fileno() forces a rollover, so check before asking for it.
+    if getattr(spooled, "_rolled", False) and upload.size:
+        spooled.flush()
+        with MappedUpload(spooled.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+    else:
+        spooled.seek(0)
+        yield spooled
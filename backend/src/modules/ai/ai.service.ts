@@ -1,8 +1,11 @@
 import { Injectable, HttpException, HttpStatus, Logger } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
 import axios from 'axios';
+import { randomBytes } from 'crypto';
 import FormData from 'form-data';
 
+export type EvaluationPriority = 'interactive' | 'bulk';
+
 @Injectable()
 export class AiService {
   private readonly logger = new Logger(AiService.name);
@@ -12,34 +15,65 @@ export class AiService {
     this.aiServiceUrl = this.configService.get('AI_SERVICE_URL', 'http://localhost:8000');
   }
 
-  async evaluateCandidateGraph(rawText: string, jobRole: string, jobDescription?: string) {
+  async evaluateCandidateGraph(
+    rawText: string,
+    jobRole: string,
+    jobDescription?: string,
+    options: {
+      priority?: EvaluationPriority;
+      tenantId?: string;
+      candidateId?: string;
+      evaluationId?: string;
+    } = {},
+  ) {
+    // W3C trace context: the AI service continues this trace, so its graph, node and
+    // LLM spans can be found by the trace id logged here.
+    const traceId = randomBytes(16).toString('hex');
+    const traceparent = `00-${traceId}-${randomBytes(8).toString('hex')}-01`;
     try {
-      this.logger.log('Starting LangGraph Evaluation via /analyze/graph');
+      this.logger.log(`Starting LangGraph Evaluation via /analyze/graph (trace ${traceId})`);
       const startTime = Date.now();
 
       const formData = new FormData();
       formData.append('raw_text', rawText);
       formData.append('role_name', jobRole);
       formData.append('job_description', jobDescription || this.getJobDescription(jobRole));
+      // Leave headroom under the axios timeout so the AI service stops spending LLM calls first.
+      formData.append('timeout_seconds', '110');
+      // Adds the extracted profile to the AI service's skill index under this id.
+      if (options.candidateId) {
+        formData.append('candidate_id', options.candidateId);
+      }
+      // Checkpoints the run under this id so a retried job can resume it.
+      if (options.evaluationId) {
+        formData.append('evaluation_id', options.evaluationId);
+      }
 
       const response = await axios.post(
         `${this.aiServiceUrl}/analyze/graph`,
         formData,
         {
-          headers: { ...formData.getHeaders() },
+          headers: {
+            ...formData.getHeaders(),
+            traceparent,
+            // The AI service schedules interactive evaluations ahead of bulk imports,
+            // and shares its slots fairly between recruiters.
+            'X-Priority': options.priority || 'interactive',
+            ...(options.tenantId && { 'X-Tenant-Id': options.tenantId }),
+          },
           timeout: 120000
         }
       );
 
       const processingTime = ((Date.now() - startTime) / 1000).toFixed(1);
-      this.logger.log(`Graph Analysis complete in ${processingTime}s`);
+      this.logger.log(`Graph Analysis complete in ${processingTime}s (trace ${traceId})`);
 
       const { final_score, summary, agent_reports, parsed_profile } = response.data;
 
       return this.transformGraphResponse(final_score, summary, agent_reports, parsed_profile);
 
     } catch (error) {
-      this.handleError(error, 'LangGraph evaluation failed');
+      this.handleError(error, `LangGraph evaluation failed (trace ${traceId})`);
     }
   }
 
@@ -68,6 +68,7 @@ describe('AiProcessor', () => {
   const createMockJob = (data: any): jest.Mocked<Job> => ({
     data,
     id: 'job-123',
+    timestamp: 1700000000000,
     progress: jest.fn(),
     moveToCompleted: jest.fn(),
     moveToFailed: jest.fn(),
@@ -132,7 +133,8 @@ describe('AiProcessor', () => {
       expect(aiService.evaluateCandidateGraph).toHaveBeenCalledWith(
         mockCandidate.rawText,
         'Backend Engineer',
-        'Node.js experience required'
+        'Node.js experience required',
+        expect.objectContaining({ candidateId: 'candidate-123', evaluationId: 'ai-job-123-1700000000000' })
       );
 
       // Verify final update with AI results
@@ -157,7 +159,8 @@ describe('AiProcessor', () => {
       expect(aiService.evaluateCandidateGraph).toHaveBeenCalledWith(
         mockCandidate.rawText,
         'Backend Engineer',
-        undefined
+        undefined,
+        expect.objectContaining({ candidateId: 'candidate-123' })
       );
     });
 
@@ -28,7 +28,7 @@ export class AiProcessor {
 
   @Process('process-candidate')
   async handleAIProcessing(job: Job) {
-    const { candidateId, jobRole, jobDescription, userId } = job.data;
+    const { candidateId, jobRole, jobDescription, userId, priority } = job.data;
     const startTime = Date.now();
 
     try {
@@ -52,7 +52,16 @@ export class AiProcessor {
       const result = await this.aiService.evaluateCandidateGraph(
         candidate.rawText,
         jobRole,
-        jobDescription
+        jobDescription,
+        {
+          priority,
+          tenantId: userId || candidate.createdBy?.toString(),
+          candidateId,
+          // The same id on every attempt of this job: a retry after an AI service crash
+          // resumes the evaluation from its last checkpoint, and one after a lost
+          // response gets the stored result instead of a second run.
+          evaluationId: `ai-${job.id}-${job.timestamp}`,
+        }
       );
 
       const processingTime = Date.now() - startTime;
@@ -2,6 +2,7 @@ import { Injectable, Logger } from '@nestjs/common';
 import { InjectQueue } from '@nestjs/bull';
 import { Queue } from 'bull';
 import { NotificationEventService } from '../notifications/notification-event.service';
+import { EvaluationPriority } from '../ai/ai.service';
 
 @Injectable()
 export class QueueService {
@@ -13,13 +14,22 @@ export class QueueService {
     private notificationEventService: NotificationEventService,
   ) {}
 
-  async addAIProcessingJob(candidateId: string, jobRole: string, jobDescription?: string, userId?: string) {
+  async addAIProcessingJob(
+    candidateId: string,
+    jobRole: string,
+    jobDescription?: string,
+    userId?: string,
+    priority: EvaluationPriority = 'interactive',
+  ) {
     return this.aiProcessingQueue.add('process-candidate', {
       candidateId,
       jobRole,
       userId,
+      priority,
       ...(jobDescription && { jobDescription }),
     }, {
+      // Bull serves lower numbers first: single uploads overtake queued bulk imports.
+      priority: priority === 'bulk' ? 10 : 1,
       attempts: 3,
       backoff: {
         type: 'exponential',
@@ -40,7 +50,8 @@ export class QueueService {
             candidate.candidateId,
             candidate.jobRole,
             candidate.jobDescription,
-            userId
+            userId,
+            'bulk'
           );
           jobs.push(job);
         } catch (error) {